@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Benchmark: dependency-graph executor vs two-wave asyncio.gather() for aggregates
+
+Replaces the sub-fetches used by fetch_complete_wallet_summary with sleep-based
+fakes of realistic, uneven upstream latencies, then times:
+
+- waves: the previous structure - gather() every first-wave call, then gather()
+         the vesting calls once the whole first wave has finished
+- graph: the FetchGraph version in functions.aggregate_functions, where the vesting
+         calls start as soon as the vesting check resolves
+
+The wallet is a vesting account, so the dependent wave is exercised.
+
+Usage:
+    uv run python benchmarks/aggregate_graph_benchmark.py [--iterations 20]
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import functions.aggregate_functions as aggregates  # noqa: E402
+
+# Simulated upstream latency per sub-fetch, in seconds
+LATENCIES = {
+    "fetch_account_info": 0.08,
+    "fetch_account_is_vesting": 0.08,
+    "fetch_total_delegation_data": 0.25,
+    "fetch_current_fm_account_balance_data": 0.12,
+    "fetch_current_fm_account_info": 0.10,
+    "fetch_vesting_total_unvested_amount": 0.15,
+    "fetch_available_committed_amount": 0.12,
+}
+
+RESPONSES = {
+    "fetch_account_info": {"account": {"coins": [{"denom": "nhash", "amount": "100"}]}},
+    "fetch_account_is_vesting": {"wallet_is_vesting": True},
+    "fetch_total_delegation_data": {"delegated_total_delegated_amount": 50},
+    "fetch_current_fm_account_balance_data": {"balances": []},
+    "fetch_current_fm_account_info": {},
+    "fetch_vesting_total_unvested_amount": {"vesting_total_unvested_amount": 25},
+    "fetch_available_committed_amount": {},
+}
+
+
+def install_fakes() -> None:
+    """Point the aggregate module's sub-fetch names at sleep-based fakes"""
+    for name, delay in LATENCIES.items():
+        async def fake(wallet_address, name=name, delay=delay):
+            await asyncio.sleep(delay)
+            return RESPONSES[name]
+        setattr(aggregates, name, fake)
+
+
+async def waves_summary(wallet_address: str) -> dict:
+    """The previous two-wave structure of fetch_complete_wallet_summary"""
+    results = await asyncio.gather(
+        aggregates.fetch_account_info(wallet_address),
+        aggregates.fetch_account_is_vesting(wallet_address),
+        aggregates.fetch_total_delegation_data(wallet_address),
+        aggregates.fetch_current_fm_account_balance_data(wallet_address),
+        aggregates.fetch_current_fm_account_info(wallet_address),
+        return_exceptions=True,
+    )
+    if results[1].get("wallet_is_vesting") is True:
+        await asyncio.gather(
+            aggregates.fetch_vesting_total_unvested_amount(wallet_address),
+            aggregates.fetch_available_committed_amount(wallet_address),
+            return_exceptions=True,
+        )
+    return {}
+
+
+async def measure(fn, iterations: int) -> dict:
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        await fn("pb1benchmarkwallet")
+        samples.append((time.perf_counter() - start) * 1000)
+    return {
+        "median_ms": round(statistics.median(samples), 1),
+        "max_ms": round(max(samples), 1),
+    }
+
+
+async def main(iterations: int) -> dict:
+    install_fakes()
+    waves = await measure(waves_summary, iterations)
+    graph = await measure(aggregates.fetch_complete_wallet_summary, iterations)
+    return {
+        "iterations": iterations,
+        "waves": waves,
+        "graph": graph,
+        "speedup": round(waves["median_ms"] / graph["median_ms"], 2),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--iterations", type=int, default=20)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(main(args.iterations)), indent=2))
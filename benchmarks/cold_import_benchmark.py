@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Lambda cold-start import time, eager vs manifest-driven lazy loading
+
+Imports lambda_handler_unified in fresh interpreters under `python -X importtime`:
+
+- eager: FUNCTIONS_LAZY_LOADING=false - every function module imported at startup
+- lazy:  functions registered from the registry manifest, modules imported on first use
+
+The manifest is built into a temporary file first (scripts/build_registry_manifest.py
+does the same at deploy time). For each mode the script reports the cumulative import
+time of lambda_handler_unified and of the functions package, the number of function
+modules imported, and the slowest imports by cumulative time (median over runs).
+
+Usage:
+    uv run python benchmarks/cold_import_benchmark.py [--runs 5] [--top 8]
+"""
+
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+PROBE = (
+    "import sys, lambda_handler_unified; "
+    "print(sum(1 for m in sys.modules if m.startswith('functions.')))"
+)
+
+
+def build_manifest(path: Path) -> None:
+    subprocess.run(
+        [sys.executable, str(ROOT / "scripts" / "build_registry_manifest.py"), "--output", str(path)],
+        check=True, capture_output=True, cwd=ROOT,
+    )
+
+
+def run_once(env: dict) -> dict:
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", PROBE],
+        env=env, cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    cumulative = {}
+    for line in proc.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            cumulative[match.group(4)] = int(match.group(2))
+    return {
+        "cumulative_us": cumulative,
+        "function_modules": int(proc.stdout.strip().splitlines()[-1]),
+    }
+
+
+def measure(env: dict, runs: int, top: int) -> dict:
+    samples = [run_once(env) for _ in range(runs)]
+
+    def median_ms(module: str) -> float:
+        return round(statistics.median(s["cumulative_us"].get(module, 0) for s in samples) / 1000, 1)
+
+    slowest = sorted(samples[-1]["cumulative_us"].items(), key=lambda item: -item[1])
+    return {
+        "lambda_handler_unified_ms": median_ms("lambda_handler_unified"),
+        "functions_package_ms": median_ms("functions"),
+        "function_modules_imported": samples[-1]["function_modules"],
+        "slowest_imports_ms": {
+            module: round(us / 1000, 1)
+            for module, us in slowest[:top] if module != "lambda_handler_unified"
+        },
+    }
+
+
+def main(runs: int, top: int) -> dict:
+    base_env = dict(os.environ)
+    base_env.setdefault("AWS_DEFAULT_REGION", "us-west-1")
+    base_env["PYTHONPATH"] = str(ROOT)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        manifest = Path(tmp) / "registry_manifest.json"
+        build_manifest(manifest)
+
+        eager = measure({**base_env, "FUNCTIONS_LAZY_LOADING": "false"}, runs, top)
+        lazy = measure({**base_env, "FUNCTIONS_LAZY_LOADING": "true",
+                        "FUNCTIONS_MANIFEST_PATH": str(manifest)}, runs, top)
+
+    return {
+        "runs": runs,
+        "eager": eager,
+        "lazy": lazy,
+        "saved_ms": round(eager["lambda_handler_unified_ms"] - lazy["lambda_handler_unified_ms"], 1),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=8)
+    args = parser.parse_args()
+    print(json.dumps(main(args.runs, args.top), indent=2))
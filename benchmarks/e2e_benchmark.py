@@ -0,0 +1,511 @@
+#!/usr/bin/env python3
+"""
+Benchmark: end-to-end latency, throughput and memory of every registered tool
+
+Drives both production entry points with upstreams served by the local stand-in
+(tests/standin.py, started in its own process so it does not compete with the
+server under test for the GIL):
+
+- lambda_mcp:  lambda_handler_unified.lambda_handler with synthetic API Gateway
+               POST /mcp tools/call events
+- lambda_rest: lambda_handler_unified.lambda_handler with synthetic API Gateway
+               REST events (GET /api/...)
+- asgi:        the FastAPI app in web_app_unified over ASGI (httpx ASGITransport),
+               sequentially and at each --concurrency level (asgi_c<N>)
+
+Per tool and entry point it reports warm latency (p50/p95/p99 from the metrics
+module's histograms), throughput, tracemalloc peak allocation per request and errors;
+per entry module the cold import time and RSS in a fresh interpreter (median over
+--cold-runs). A Lambda execution environment serves one request at a time, so Lambda
+throughput is sequential requests per second.
+
+Results are printed as JSON. --save-baseline stores them; --baseline compares against
+a stored run and lists every median, mean, throughput, allocation and import metric
+that got worse by more than --threshold (exit status 1 if any did).
+
+Usage:
+    uv run python benchmarks/e2e_benchmark.py [--requests 50] [--concurrency 1,16]
+        [--upstream-latency lognormal:40:15] [--tools fetch_current_fm_data,...]
+        [--baseline benchmarks/baselines/e2e_baseline.json] [--save-baseline]
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import logging
+import os
+import platform
+import resource
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+import uuid
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+from urllib.parse import quote
+
+ROOT = Path(__file__).parent.parent
+DEFAULT_BASELINE = ROOT / "benchmarks" / "baselines" / "e2e_baseline.json"
+
+os.environ.setdefault("AWS_DEFAULT_REGION", "us-west-1")
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "src"))
+
+# Tools backed by the public upstreams the stand-in serves; the remaining modules need
+# DynamoDB, S3, SQS or a browser
+BENCHMARK_MODULES = (
+    "functions.aggregate_functions",
+    "functions.blockchain_functions",
+    "functions.figure_markets_functions",
+    "functions.stats_functions",
+    "functions.system_functions",
+)
+SKIP_TOOLS = {"mcp_test_server", "set_debug_logging"}
+
+# Arguments matching the stand-in fixtures (the vesting wallet exercises every branch)
+SAMPLE_ARGUMENTS = {
+    "wallet_address": "pb1standinvesting0wallet0000000000000000000",
+    "token_pair": "HASH-USD",
+}
+
+# Metrics checked against the baseline: +1 higher is better, -1 lower is better.
+# Tail percentiles are reported but not compared (too noisy at benchmark sample
+# sizes). A change must also exceed the noise floor in absolute terms (in the
+# metric's unit; for rps, in milliseconds per request) to count.
+METRIC_DIRECTIONS = {
+    "p50_ms": -1, "mean_ms": -1, "rps": 1, "alloc_peak_kb": -1, "import_ms": -1, "rss_mb": -1,
+}
+NOISE_FLOORS = {"ms": 1.0, "mb": 2.0, "kb": 16.0}
+
+COLD_IMPORT_PROBE = (
+    "import json, resource, sys, time; start = time.perf_counter(); import {module}; "
+    "print(json.dumps({{'import_ms': (time.perf_counter() - start) * 1000, "
+    "'rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024}}))"
+)
+
+
+class LambdaContext:
+    """Minimal Lambda context object"""
+    function_name = "pb-fm-mcp-benchmark"
+    function_version = "$LATEST"
+    invoked_function_arn = "arn:aws:lambda:us-west-1:123456789012:function:pb-fm-mcp-benchmark"
+    memory_limit_in_mb = "512"
+
+    def __init__(self):
+        self.aws_request_id = str(uuid.uuid4())
+
+    def get_remaining_time_in_millis(self) -> int:
+        return 30000
+
+
+# =============================================================================
+# Requests
+# =============================================================================
+
+def api_gateway_event(
+    method: str,
+    path: str,
+    query: Optional[Dict[str, str]] = None,
+    body: Optional[str] = None
+) -> Dict[str, Any]:
+    """Synthetic API Gateway REST API (v1) proxy integration event"""
+    headers = {
+        "Accept": "application/json, text/event-stream",
+        "Host": "benchmark.execute-api.us-west-1.amazonaws.com",
+        "User-Agent": "e2e-benchmark/1.0",
+        "X-Forwarded-For": "203.0.113.7",
+        "X-Forwarded-Proto": "https",
+    }
+    if body is not None:
+        headers["Content-Type"] = "application/json"
+    request_id = str(uuid.uuid4())
+    return {
+        "resource": "/{proxy+}",
+        "path": path,
+        "httpMethod": method,
+        "headers": headers,
+        "multiValueHeaders": {key: [value] for key, value in headers.items()},
+        "queryStringParameters": query or None,
+        "multiValueQueryStringParameters": {k: [v] for k, v in query.items()} if query else None,
+        "pathParameters": {"proxy": path.lstrip("/")},
+        "stageVariables": None,
+        "requestContext": {
+            "resourcePath": "/{proxy+}",
+            "httpMethod": method,
+            "path": f"/v1{path}",
+            "stage": "v1",
+            "requestId": request_id,
+            "requestTimeEpoch": int(time.time() * 1000),
+            "identity": {"sourceIp": "203.0.113.7", "userAgent": "e2e-benchmark/1.0"},
+        },
+        "body": body,
+        "isBase64Encoded": False,
+    }
+
+
+def mcp_call_event(tool: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
+    body = {"jsonrpc": "2.0", "id": 1, "method": "tools/call", "params": {"name": tool, "arguments": arguments}}
+    return api_gateway_event("POST", "/mcp", body=json.dumps(body))
+
+
+def rest_request(meta) -> tuple:
+    """Method, concrete path and query string for a REST function"""
+    path = meta.rest_path
+    for name in meta.binder.params:
+        placeholder = "{" + name + "}"
+        if placeholder in path:
+            path = path.replace(placeholder, quote(str(SAMPLE_ARGUMENTS[name]), safe=""))
+    query = {
+        name: str(SAMPLE_ARGUMENTS[name]) for name in meta.binder.params
+        if name in SAMPLE_ARGUMENTS and "{" + name + "}" not in meta.rest_path
+        and name not in meta.binder.defaults
+    }
+    return meta.rest_method, path, query
+
+
+def mcp_arguments(meta) -> Dict[str, Any]:
+    return {name: SAMPLE_ARGUMENTS[name] for name in meta.binder.params if name not in meta.binder.defaults}
+
+
+def lambda_response_ok(response: Dict[str, Any], mcp: bool) -> bool:
+    if response.get("statusCode") != 200 or "MCP-ERROR" in response.get("body", ""):
+        return False
+    if not mcp:
+        return True
+    result = json.loads(response["body"]).get("result") or {}
+    return not result.get("isError", False)
+
+
+def select_tools(registry, names: Optional[List[str]]) -> list:
+    selected = []
+    for name, meta in sorted(registry.get_all_functions().items()):
+        if names and name not in names:
+            continue
+        if name in SKIP_TOOLS or meta.func.__module__ not in BENCHMARK_MODULES:
+            continue
+        exposed = {p.value for p in meta.protocols}
+        if not exposed & {"mcp", "rest"}:
+            continue
+        if any(p not in SAMPLE_ARGUMENTS for p in meta.binder.params if p not in meta.binder.defaults):
+            continue
+        selected.append(meta)
+    return selected
+
+
+# =============================================================================
+# Measurement
+# =============================================================================
+
+def summarize(histogram, errors: int, elapsed: float, count: int) -> Dict[str, Any]:
+    summary = histogram.summary()
+    return {
+        **{key: summary[key] for key in ("mean_ms", "p50_ms", "p95_ms", "p99_ms") if key in summary},
+        "rps": round(count / elapsed, 1) if elapsed else 0.0,
+        "errors": errors,
+    }
+
+
+def peak_alloc_kb(call: Callable[[], Any], samples: int) -> float:
+    """Median tracemalloc peak above the pre-request baseline, in KB"""
+    peaks = []
+    for _ in range(samples):
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        call()
+        peaks.append(tracemalloc.get_traced_memory()[1] - current)
+    return round(statistics.median(peaks) / 1024, 1)
+
+
+def current_rss_mb() -> float:
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def bench_lambda(handler, make_event: Callable[[], dict], mcp: bool, requests: int, warmup: int) -> Dict[str, Any]:
+    from metrics import LatencyHistogram
+
+    def invoke() -> bool:
+        return lambda_response_ok(handler.lambda_handler(make_event(), LambdaContext()), mcp)
+
+    for _ in range(warmup):
+        invoke()
+    histogram, errors = LatencyHistogram(), 0
+    start = time.perf_counter()
+    for _ in range(requests):
+        t0 = time.perf_counter()
+        ok = invoke()
+        histogram.record(time.perf_counter() - t0)
+        errors += not ok
+    return summarize(histogram, errors, time.perf_counter() - start, requests)
+
+
+async def bench_asgi(
+    client, method: str, path: str, query: dict, requests: int, concurrency: int,
+    before: Callable[[], None] = lambda: None
+) -> Dict[str, Any]:
+    from metrics import LatencyHistogram
+
+    histogram, errors = LatencyHistogram(), 0
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one() -> None:
+        nonlocal errors
+        async with semaphore:
+            before()
+            t0 = time.perf_counter()
+            response = await client.request(method, path, params=query)
+            histogram.record(time.perf_counter() - t0)
+            errors += response.status_code != 200
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(requests)))
+    return summarize(histogram, errors, time.perf_counter() - start, requests)
+
+
+def cold_imports(env: Dict[str, str], runs: int) -> Dict[str, Any]:
+    results = {}
+    for module in ("lambda_handler_unified", "web_app_unified"):
+        samples = []
+        for _ in range(runs):
+            proc = subprocess.run(
+                [sys.executable, "-c", COLD_IMPORT_PROBE.format(module=module)],
+                env=env, cwd=ROOT, capture_output=True, text=True, check=True,
+            )
+            samples.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+        results[module] = {
+            key: round(statistics.median(sample[key] for sample in samples), 1)
+            for key in ("import_ms", "rss_mb")
+        }
+    return results
+
+
+@contextlib.contextmanager
+def standin_process(latency: str, seed: int):
+    """Run scripts/upstream_standin.py on a free port until the block exits"""
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    proc = subprocess.Popen(
+        [sys.executable, str(ROOT / "scripts" / "upstream_standin.py"),
+         "--port", str(port), "--latency", latency, "--seed", str(seed)],
+        cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        deadline = time.monotonic() + 10
+        while True:
+            try:
+                socket.create_connection(("127.0.0.1", port), timeout=0.2).close()
+                break
+            except OSError as e:
+                if proc.poll() is not None or time.monotonic() > deadline:
+                    raise RuntimeError("upstream stand-in did not start") from e
+                time.sleep(0.05)
+        yield f"http://127.0.0.1:{port}"
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+
+
+# =============================================================================
+# Baseline comparison
+# =============================================================================
+
+def flatten(results: Dict[str, Any], prefix: str = "") -> Dict[str, float]:
+    flat = {}
+    for key, value in results.items():
+        name = f"{prefix}.{key}" if prefix else key
+        if isinstance(value, dict):
+            flat.update(flatten(value, name))
+        elif key in METRIC_DIRECTIONS and isinstance(value, (int, float)):
+            flat[name] = value
+    return flat
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> Dict[str, Any]:
+    """Metrics worse than the baseline by more than threshold (a fraction)"""
+    now = flatten({"cold_import": current["cold_import"], "tools": current["tools"]})
+    before = flatten({"cold_import": baseline.get("cold_import", {}), "tools": baseline.get("tools", {})})
+    regressions, improvements = {}, {}
+    for name, old in before.items():
+        new = now.get(name)
+        if new is None:
+            continue
+        metric = name.rsplit(".", 1)[1]
+        if not old or not new:
+            continue
+        if metric == "rps":
+            delta = abs(1000 / new - 1000 / old)
+            floor = NOISE_FLOORS["ms"]
+        else:
+            delta = abs(new - old)
+            floor = NOISE_FLOORS[metric.rsplit("_", 1)[-1]]
+        if delta < floor:
+            continue
+        change = (new - old) / old * METRIC_DIRECTIONS[metric]
+        entry = {"baseline": old, "current": new, "change_pct": round(change * 100, 1)}
+        if change < -threshold:
+            regressions[name] = entry
+        elif change > threshold:
+            improvements[name] = entry
+    return {
+        "threshold_pct": round(threshold * 100, 1),
+        "compared": len(set(before) & set(now)),
+        "regressions": regressions,
+        "improvements": improvements,
+    }
+
+
+# =============================================================================
+# Main
+# =============================================================================
+
+def main(args) -> Dict[str, Any]:
+    tool_names = [name for name in args.tools.split(",") if name] if args.tools else None
+    concurrency = [int(level) for level in args.concurrency.split(",") if level]
+
+    with standin_process(args.upstream_latency, args.seed) as standin_url:
+        os.environ["UPSTREAM_BASE_URL"] = standin_url
+        if not args.upstream_limits:
+            os.environ["UPSTREAM_LIMITS"] = "off"
+        env = {**os.environ, "PYTHONPATH": f"{ROOT}{os.pathsep}{ROOT / 'src'}"}
+        cold = cold_imports(env, args.cold_runs)
+
+        rss_start = current_rss_mb()
+        with contextlib.redirect_stdout(sys.stderr):
+            import lambda_handler_unified as handler
+            import web_app_unified
+        from registry import get_registry
+        from request_logging import LogSettings, configure_logging
+        from upstream import close_http_clients, get_response_cache, reset_upstream_urls
+
+        reset_upstream_urls()
+        configure_logging(LogSettings(fmt="json", level=logging.CRITICAL))  # request lines silenced
+        tools = select_tools(get_registry(), tool_names)
+        results: Dict[str, Dict[str, Any]] = {}
+
+        def cache_off():
+            if not args.upstream_cache:
+                get_response_cache().clear()
+
+        with contextlib.redirect_stdout(sys.stderr):
+            for meta in tools:
+                entries = results.setdefault(meta.name, {})
+                exposed = {p.value for p in meta.protocols}
+                lambda_calls = {}
+                if "mcp" in exposed:
+                    arguments = mcp_arguments(meta)
+                    lambda_calls["lambda_mcp"] = (lambda a=arguments, n=meta.name: mcp_call_event(n, a), True)
+                if "rest" in exposed and meta.rest_path:
+                    method, path, query = rest_request(meta)
+                    lambda_calls["lambda_rest"] = (lambda m=method, p=path, q=query: api_gateway_event(m, p, q), False)
+
+                for entry, (make_event, mcp) in lambda_calls.items():
+                    def make(make_event=make_event):
+                        cache_off()
+                        return make_event()
+                    entries[entry] = bench_lambda(handler, make, mcp, args.requests, args.warmup)
+                    tracemalloc.start()
+                    entries[entry]["alloc_peak_kb"] = peak_alloc_kb(
+                        lambda: handler.lambda_handler(make(), LambdaContext()), args.memory_samples
+                    )
+                    tracemalloc.stop()
+
+            async def asgi_pass():
+                import httpx
+
+                transport = httpx.ASGITransport(app=web_app_unified.app)
+                async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+                    for meta in tools:
+                        if "rest" not in {p.value for p in meta.protocols} or not meta.rest_path:
+                            continue
+                        method, path, query = rest_request(meta)
+                        entries = results[meta.name]
+
+                        async def request():
+                            cache_off()
+                            return await client.request(method, path, params=query)
+
+                        for _ in range(args.warmup):
+                            await request()
+                        entries["asgi"] = await bench_asgi(client, method, path, query, args.requests, 1, cache_off)
+                        tracemalloc.start()
+                        peaks = []
+                        for _ in range(args.memory_samples):
+                            current, _ = tracemalloc.get_traced_memory()
+                            tracemalloc.reset_peak()
+                            await request()
+                            peaks.append(tracemalloc.get_traced_memory()[1] - current)
+                        tracemalloc.stop()
+                        entries["asgi"]["alloc_peak_kb"] = round(statistics.median(peaks) / 1024, 1)
+                        for level in concurrency:
+                            if level > 1:
+                                entries[f"asgi_c{level}"] = await bench_asgi(
+                                    client, method, path, query, args.requests * level, level, cache_off
+                                )
+                await close_http_clients()
+
+            asyncio.run(asgi_pass())
+
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "git_sha": git_sha(),
+            "timestamp": int(time.time()),
+            "requests": args.requests,
+            "warmup": args.warmup,
+            "concurrency": concurrency,
+            "upstream_latency": args.upstream_latency,
+            "upstream_cache": args.upstream_cache,
+            "upstream_limits": args.upstream_limits,
+        },
+        "cold_import": cold,
+        "rss_growth_mb": round(current_rss_mb() - rss_start, 1),
+        "tools": results,
+    }
+
+
+def git_sha() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--requests", type=int, default=50, help="Measured requests per tool and entry point")
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--memory-samples", type=int, default=5)
+    parser.add_argument("--concurrency", default="1,16", help="ASGI concurrency levels")
+    parser.add_argument("--cold-runs", type=int, default=3)
+    parser.add_argument("--tools", default="", help="Comma-separated tool names (default: all)")
+    parser.add_argument("--upstream-latency", default="0", help="Stand-in latency spec, e.g. lognormal:40:15")
+    parser.add_argument("--no-upstream-cache", dest="upstream_cache", action="store_false",
+                        help="Clear the upstream response cache before every request")
+    parser.add_argument("--upstream-limits", action="store_true",
+                        help="Apply the per-upstream rate limits (off by default: they would cap throughput)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--baseline", type=Path, default=None, help="Compare against this stored run")
+    parser.add_argument("--save-baseline", nargs="?", type=Path, const=DEFAULT_BASELINE, default=None,
+                        help=f"Store this run as the baseline (default {DEFAULT_BASELINE.relative_to(ROOT)})")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Regression threshold (fraction)")
+    args = parser.parse_args()
+
+    results = main(args)
+    if args.baseline:
+        results["comparison"] = compare(results, json.loads(args.baseline.read_text()), args.threshold)
+    if args.save_baseline:
+        args.save_baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.save_baseline.write_text(json.dumps(results, indent=2) + "\n")
+    print(json.dumps(results, indent=2))
+    sys.exit(1 if results.get("comparison", {}).get("regressions") else 0)
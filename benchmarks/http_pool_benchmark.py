@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Benchmark: pooled vs per-call HTTP clients for async_http_get_json
+
+Starts a local keep-alive HTTP/1.1 stub server that counts accepted connections,
+then issues the same sequence of GETs two ways:
+
+- per_call: a fresh httpx.AsyncClient for every request (the previous behaviour)
+- pooled:   utils.async_http_get_json backed by the shared client pool
+
+The stub server is plain HTTP, so the numbers show the TCP connect savings only.
+Against the real upstreams every avoided connection also avoids a TLS handshake,
+which is typically several times more expensive than the TCP connect measured here.
+
+Usage:
+    uv run python benchmarks/http_pool_benchmark.py [--requests 200] [--concurrency 8]
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from upstream import close_http_clients, get_http_pool  # noqa: E402
+from utils import async_http_get_json  # noqa: E402
+
+PAYLOAD = json.dumps({"currentSupply": {"amount": "1", "denom": "nhash"}}).encode()
+
+
+class CountingHandler(BaseHTTPRequestHandler):
+    """Keep-alive JSON handler that counts new TCP connections"""
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    connections = 0
+    lock = threading.Lock()
+
+    def setup(self):
+        super().setup()
+        with CountingHandler.lock:
+            CountingHandler.connections += 1
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(PAYLOAD)))
+        self.end_headers()
+        self.wfile.write(PAYLOAD)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stub_server() -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), CountingHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+async def per_call_get(url: str) -> None:
+    async with httpx.AsyncClient(timeout=10.0) as client:
+        response = await client.get(url, headers={"Accept": "application/json"})
+        response.json()
+
+
+async def run_mode(mode: str, url: str, total: int, concurrency: int) -> dict:
+    CountingHandler.connections = 0
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one():
+        async with semaphore:
+            start = time.perf_counter()
+            if mode == "pooled":
+                await async_http_get_json(url)
+            else:
+                await per_call_get(url)
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    wall_start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(total)))
+    wall_ms = (time.perf_counter() - wall_start) * 1000
+
+    if mode == "pooled":
+        await close_http_clients()
+
+    latencies.sort()
+    return {
+        "mode": mode,
+        "requests": total,
+        "concurrency": concurrency,
+        "tcp_connections": CountingHandler.connections,
+        "wall_ms": round(wall_ms, 2),
+        "mean_ms": round(sum(latencies) / len(latencies), 3),
+        "p50_ms": round(latencies[len(latencies) // 2], 3),
+        "p99_ms": round(latencies[int(len(latencies) * 0.99) - 1], 3),
+    }
+
+
+async def main(total: int, concurrency: int) -> None:
+    server = start_stub_server()
+    url = f"http://127.0.0.1:{server.server_address[1]}/api/v3/utility_token/stats"
+    try:
+        results = [
+            await run_mode("per_call", url, total, concurrency),
+            await run_mode("pooled", url, total, concurrency),
+        ]
+    finally:
+        server.shutdown()
+
+    per_call, pooled = results
+    print(json.dumps({
+        "results": results,
+        "connections_saved": per_call["tcp_connections"] - pooled["tcp_connections"],
+        "speedup": round(per_call["wall_ms"] / pooled["wall_ms"], 2),
+        "pool": get_http_pool().stats(),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.concurrency))
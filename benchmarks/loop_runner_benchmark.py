@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Benchmark: per-invocation overhead of asyncio.run() vs the persistent loop runner
+
+Drives the same trivial coroutine, and a pooled async_http_get_json call against a
+local keep-alive stub server, through:
+
+- asyncio_run: a new event loop per call (the previous lambda_handler_unified behaviour)
+- runner:      loop_runner.LoopRunner, one long-lived loop reused across calls
+
+The HTTP case also reports how many TCP connections the stub server accepted: with
+asyncio.run() every call's loop is discarded along with its pooled client.
+
+Usage:
+    uv run python benchmarks/loop_runner_benchmark.py [--calls 2000] [--http-calls 200]
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from http_pool_benchmark import CountingHandler, start_stub_server  # noqa: E402
+from loop_runner import LoopRunner  # noqa: E402
+from upstream import close_http_clients  # noqa: E402
+from utils import async_http_get_json  # noqa: E402
+
+
+async def noop():
+    return None
+
+
+def time_calls(call, n: int) -> float:
+    """Mean microseconds per call"""
+    start = time.perf_counter()
+    for _ in range(n):
+        call()
+    return round((time.perf_counter() - start) / n * 1e6, 1)
+
+
+def main(calls: int, http_calls: int) -> dict:
+    runner = LoopRunner()
+    results = {
+        "noop_us_per_call": {
+            "asyncio_run": time_calls(lambda: asyncio.run(noop()), calls),
+            "runner": time_calls(lambda: runner.run(noop()), calls),
+        }
+    }
+
+    server = start_stub_server()
+    url = f"http://127.0.0.1:{server.server_address[1]}/api/v3/utility_token/stats"
+    try:
+        http = {}
+        for mode, call in (
+            ("asyncio_run", lambda: asyncio.run(async_http_get_json(url))),
+            ("runner", lambda: runner.run(async_http_get_json(url))),
+        ):
+            CountingHandler.connections = 0
+            http[mode] = {
+                "us_per_call": time_calls(call, http_calls),
+                "connections": CountingHandler.connections,
+            }
+        results["http_get"] = http
+        runner.run(close_http_clients())
+    finally:
+        server.shutdown()
+        runner.close()
+
+    results["noop_speedup"] = round(
+        results["noop_us_per_call"]["asyncio_run"] / results["noop_us_per_call"]["runner"], 2
+    )
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--calls", type=int, default=2000)
+    parser.add_argument("--http-calls", type=int, default=200)
+    args = parser.parse_args()
+    print(json.dumps(main(args.calls, args.http_calls), indent=2))
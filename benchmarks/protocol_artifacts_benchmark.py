@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Benchmark: precomputed protocol artifacts vs regenerating per request
+
+Times the Lambda handler's MCP tools/list, /openapi.json and /docs responses:
+
+- regenerate: building each document from the registry on every request (the
+              previous behaviour; tools/list through the AWS MCP handler)
+- cached:     serving the precomputed strings from protocol_artifacts
+
+Usage:
+    uv run python benchmarks/protocol_artifacts_benchmark.py [--requests 200]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+os.environ.setdefault("AWS_DEFAULT_REGION", "us-west-1")
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import lambda_handler_unified as handler  # noqa: E402
+
+TOOLS_LIST_EVENT = {
+    "httpMethod": "POST",
+    "path": "/mcp",
+    "headers": {"Content-Type": "application/json"},
+    "body": json.dumps({"jsonrpc": "2.0", "id": 1, "method": "tools/list"}),
+}
+
+
+def per_request_us(fn, n: int) -> float:
+    start = time.perf_counter()
+    for _ in range(n):
+        fn()
+    return round((time.perf_counter() - start) / n * 1e6, 1)
+
+
+def main(n: int) -> dict:
+    handler.protocol_artifacts.get()  # warm
+    results = {
+        "tools_list": {
+            "regenerate": per_request_us(lambda: handler.mcp_server.handle_request(TOOLS_LIST_EVENT, None), n),
+            "cached": per_request_us(lambda: handler.precomputed_tools_list_response(TOOLS_LIST_EVENT), n),
+        },
+        "openapi": {
+            "regenerate": per_request_us(lambda: json.dumps(handler.build_openapi_spec(), indent=2), n),
+            "cached": per_request_us(lambda: handler.handle_docs_request({"path": "/openapi.json"}, None), n),
+        },
+        "docs": {
+            "regenerate": per_request_us(handler.build_docs_html, n),
+            "cached": per_request_us(lambda: handler.handle_docs_request({"path": "/docs"}, None), n),
+        },
+    }
+    for timings in results.values():
+        timings["speedup"] = round(timings["regenerate"] / timings["cached"], 1)
+    results["artifacts"] = handler.protocol_artifacts.stats()
+    return {"requests": n, "us_per_request": results}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+    print(json.dumps(main(args.requests), indent=2))
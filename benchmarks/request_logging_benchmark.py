@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Benchmark: per-request print debugging vs structured, sampled logging
+
+Times MCP tools/list requests through the Lambda handler with log output sent to
+/dev/null, and counts the log lines each configuration writes:
+
+- print:    the previous handler's unconditional debug prints (headers, identifiers,
+            body and response dumps) before and after each request
+- info:     structured logging at INFO - one summary line per request
+- sampled:  INFO with LOG_SAMPLE_RATES "/mcp=0.1"
+- debug:    structured logging in debug mode (request/response detail events)
+
+Usage:
+    uv run python benchmarks/request_logging_benchmark.py [--requests 2000]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import logging
+import os
+import sys
+import time
+from pathlib import Path
+
+os.environ.setdefault("AWS_DEFAULT_REGION", "us-west-1")
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import lambda_handler_unified as handler  # noqa: E402
+from request_logging import LogSettings, configure_logging, set_debug_logging  # noqa: E402
+
+HEADERS = {
+    "Content-Type": "application/json",
+    "Accept": "application/json, text/event-stream",
+    "User-Agent": "benchmark-client/1.0",
+    "X-Amzn-Trace-Id": "Root=1-00000000-000000000000000000000000",
+    "X-Forwarded-For": "203.0.113.7",
+}
+EVENT = {
+    "httpMethod": "POST",
+    "path": "/mcp",
+    "headers": HEADERS,
+    "body": json.dumps({"jsonrpc": "2.0", "id": 1, "method": "tools/list"}),
+}
+
+
+def legacy_print_request(event, context):
+    """The removed print-based debug output around an MCP request"""
+    headers, body = event["headers"], event["body"]
+    print("🔍 === MCP REQUEST DEBUG (AI INSTANCE INVESTIGATION) ===")
+    print(f"📍 Method: {event['httpMethod']}")
+    print(f"📍 Path: {event['path']}")
+    print("📍 ALL HEADERS:")
+    for key, value in headers.items():
+        print(f"    {key}: {value}")
+    print("📍 POTENTIAL AI IDENTIFIERS:")
+    for key in ("user-agent", "mcp-session-id", "x-request-id", "x-amzn-trace-id", "authorization", "x-forwarded-for"):
+        print(f"    {key}: {headers.get(key.title()) or 'NOT PRESENT'}")
+    print(f"📍 Body: {body[:200]}{'...' if len(body) > 200 else ''}")
+    response = handler.handle_mcp_request(event, context)
+    print("📤 === MCP RESPONSE DEBUG ===")
+    print(f"📍 Status Code: {response.get('statusCode')}")
+    print(f"📍 Response Body: {response['body'][:200]}{'...' if len(response['body']) > 200 else ''}")
+    print("🔍 === END DEBUG ===\n")
+    return response
+
+
+def run(fn, n: int) -> dict:
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out):
+        start = time.perf_counter()
+        for _ in range(n):
+            fn(EVENT, None)
+        elapsed = time.perf_counter() - start
+    return {
+        "us_per_request": round(elapsed / n * 1e6, 1),
+        "log_lines_per_request": round(out.getvalue().count("\n") / n, 2),
+        "log_bytes_per_request": round(len(out.getvalue()) / n),
+    }
+
+
+def main(n: int) -> dict:
+    handler.protocol_artifacts.get()  # warm
+    results = {}
+
+    configure_logging(LogSettings(fmt="json", level=logging.CRITICAL))  # structured output silenced
+    results["print"] = run(legacy_print_request, n)
+
+    configure_logging(LogSettings(fmt="json"))
+    results["info"] = run(handler.lambda_handler, n)
+
+    configure_logging(LogSettings(fmt="json", sample_rates=[("/mcp", 0.1)]))
+    results["sampled"] = run(handler.lambda_handler, n)
+
+    set_debug_logging(True)
+    results["debug"] = run(handler.lambda_handler, n)
+    set_debug_logging(False)
+
+    return {"requests": n, "results": results}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+    print(json.dumps(main(args.requests), indent=2))
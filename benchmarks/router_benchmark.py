@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Benchmark: compiled route trie vs linear regex scan for REST dispatch
+
+Builds a request for every registered REST route (path parameters filled with
+sample values) and dispatches each one two ways:
+
+- linear: the previous handle_api_function loop - for every candidate function,
+          re.escape() and compile its pattern, then extract parameters the same way
+- trie:   registry.get_router().match(), built once from the registry
+
+Usage:
+    uv run python benchmarks/router_benchmark.py [--rounds 200]
+"""
+
+import argparse
+import json
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import functions  # noqa: E402,F401  (registers all @api_function functions)
+from registry import get_registry  # noqa: E402
+
+
+def legacy_convert(value: str, param_type: type):
+    if param_type == int:
+        return int(value)
+    elif param_type == float:
+        return float(value)
+    elif param_type == bool:
+        return value.lower() in ('true', '1', 'yes', 'on')
+    return value
+
+
+def legacy_matches(pattern: str, path: str) -> bool:
+    pattern_regex = re.escape(pattern)
+    pattern_regex = re.sub(r'\\{[^}]+\\}', r'[^/]+', pattern_regex)
+    return re.match(f'^{pattern_regex}$', path) is not None
+
+
+def legacy_extract(pattern: str, path: str) -> dict:
+    param_names = re.findall(r'{([^}]+)}', pattern)
+    if not param_names:
+        return {}
+    pattern_regex = re.escape(pattern)
+    pattern_regex = re.sub(r'\\{[^}]+\\}', r'([^/]+)', pattern_regex)
+    match = re.match(f'^{pattern_regex}$', path)
+    return dict(zip(param_names, match.groups())) if match else {}
+
+
+def legacy_dispatch(functions_list, method: str, path: str):
+    for meta in functions_list:
+        if legacy_matches(meta.rest_path, path) and meta.rest_method == method:
+            params = {}
+            for name, value in legacy_extract(meta.rest_path, path).items():
+                params[name] = legacy_convert(value, meta.type_hints.get(name, str))
+            return meta, params
+    return None
+
+
+def sample_path(pattern: str) -> str:
+    return re.sub(r'{([^}]+)}', lambda m: "1" if "number" in m.group(1) else "pb1sample", pattern)
+
+
+def main(rounds: int) -> dict:
+    registry = get_registry()
+    rest_functions = registry.get_rest_functions()
+    router = registry.get_router()
+    requests = [(r.method, sample_path(r.pattern)) for r in router.routes]
+
+    # Both dispatchers must agree on every request
+    for method, path in requests:
+        assert legacy_dispatch(rest_functions, method, path)[0] is router.match(method, path).meta
+
+    def timed(dispatch) -> float:
+        start = time.perf_counter()
+        for _ in range(rounds):
+            for method, path in requests:
+                dispatch(method, path)
+        return round((time.perf_counter() - start) / (rounds * len(requests)) * 1e6, 2)
+
+    linear = timed(lambda m, p: legacy_dispatch(rest_functions, m, p))
+    trie = timed(router.match)
+    return {
+        "routes": len(requests),
+        "linear_us_per_dispatch": linear,
+        "trie_us_per_dispatch": trie,
+        "speedup": round(linear / trie, 1),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+    print(json.dumps(main(args.rounds), indent=2))
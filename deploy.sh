@@ -347,6 +347,32 @@ sync_function_protocols() {
     print_success "Function protocols synced successfully"
 }
 
+# Build the registry manifest used for lazy function loading
+build_registry_manifest() {
+    print_header "Building Registry Manifest"
+    
+    # Must run after the protocol sync so the manifest matches the deployed decorators
+    if ! uv run python scripts/build_registry_manifest.py; then
+        print_error "Registry manifest build failed"
+        exit 1
+    fi
+    
+    print_success "Registry manifest built"
+}
+
+# Precompute the tools/list payload, OpenAPI document and docs page
+build_protocol_artifacts() {
+    print_header "Building Protocol Artifacts"
+    
+    # Must run after the manifest build so the artifacts match the deployed registry
+    if ! uv run python scripts/build_protocol_artifacts.py; then
+        print_error "Protocol artifacts build failed"
+        exit 1
+    fi
+    
+    print_success "Protocol artifacts built"
+}
+
 # Build the application
 build_application() {
     print_header "Building Application"
@@ -703,6 +729,8 @@ main() {
     
     # Sync function protocols from CSV
     sync_function_protocols "$environment"
+    build_registry_manifest
+    build_protocol_artifacts
     
     # Build application
     build_application
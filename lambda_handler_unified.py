@@ -9,7 +9,6 @@ Architecture:
 import json
 import sys
 import os
-from datetime import UTC, datetime
 from pathlib import Path
 
 # Add src directory to path for local imports
@@ -17,6 +16,7 @@ sys.path.insert(0, str(Path(__file__).parent / "src"))
 
 # AWS Lambda MCP Handler
 from awslabs.mcp_lambda_handler import MCPLambdaHandler
+from awslabs.mcp_lambda_handler.session import NoOpSessionStore
 
 # Import registry and function modules
 from registry import get_registry
@@ -25,6 +25,13 @@ import functions  # This registers all @api_function decorated functions
 # Version management
 from version import get_version_string
 
+# Structured logging (replaces per-request print debugging)
+import structlog
+from request_logging import configure_logging, current_request, lazy, redact_headers, request_scope
+
+configure_logging()
+logger = structlog.get_logger()
+
 
 # =============================================================================
 # AWS MCP Handler Snake Case Fix (Monkey Patch)
@@ -68,9 +75,7 @@ def create_snake_case_tool_decorator(original_tool_method):
     return patched_tool
 
 # Apply the monkey patch before creating any MCP server instances
-print("🐍 Applying AWS MCP Handler snake_case monkey patch...")
 MCPLambdaHandler.tool = create_snake_case_tool_decorator(MCPLambdaHandler.tool)
-print("✅ Snake_case monkey patch applied successfully")
 
 
 # =============================================================================
@@ -78,41 +83,36 @@ print("✅ Snake_case monkey patch applied successfully")
 # =============================================================================
 
 import asyncio
+from contextlib import nullcontext
 from functools import wraps
 from typing import Callable, Any
 
+from loop_runner import get_loop_runner
+from metrics import get_metrics
+from registry.artifacts import ArtifactCache, surface_fingerprint
+from registry.decorator import require_function_meta
+
+# Long-lived event loop reused across warm invocations, so loop-bound resources
+# (pooled HTTP clients, in-flight coalesced requests) survive between calls
+loop_runner = get_loop_runner()
+
+
 def create_mcp_sync_wrapper(async_func: Callable) -> Callable:
     """
     Clean sync wrapper specifically for AWS MCP Handler.
+    Runs the coroutine on the module's persistent loop runner.
     """
+    # Never dispatch without the binder: raises if the function is unregistered
+    meta = require_function_meta(async_func)
+    
     @wraps(async_func)
     def sync_wrapper(*args, **kwargs):
+        # Coerce tool arguments with the function's compiled binder
+        if not args:
+            kwargs = meta.binder.bind(kwargs)
         if not asyncio.iscoroutinefunction(async_func):
             return async_func(*args, **kwargs)
-            
-        # Try asyncio.run first (cleanest approach)
-        try:
-            return asyncio.run(async_func(*args, **kwargs))
-        except RuntimeError as e:
-            if "cannot be called from a running event loop" in str(e):
-                # Fallback: create new event loop in thread
-                import concurrent.futures
-                import threading
-                
-                def run_in_thread():
-                    # Create isolated event loop
-                    loop = asyncio.new_event_loop()
-                    asyncio.set_event_loop(loop)
-                    try:
-                        return loop.run_until_complete(async_func(*args, **kwargs))
-                    finally:
-                        loop.close()
-                
-                with concurrent.futures.ThreadPoolExecutor() as executor:
-                    future = executor.submit(run_in_thread)
-                    return future.result(timeout=30)
-            else:
-                raise
+        return loop_runner.run(async_func(*args, **kwargs))
     
     return sync_wrapper
 
@@ -125,7 +125,6 @@ def create_mcp_sync_wrapper(async_func: Callable) -> Callable:
 mcp_server = MCPLambdaHandler(name="pb-fm-mcp", version=get_version_string())
 
 # Register MCP tools
-print("🔧 Registering MCP tools...")
 registry = get_registry()
 mcp_functions = registry.get_mcp_functions()
 
@@ -139,7 +138,7 @@ for func_meta in mcp_functions:
     # Register with MCP server (monkey patch handles snake_case preservation)
     mcp_tool = mcp_server.tool()(sync_func)
 
-print(f"✅ Registered {len(mcp_functions)} MCP tools")
+logger.info("mcp_tools_registered", count=len(mcp_functions))
 
 
 # =============================================================================
@@ -224,111 +223,108 @@ def handle_rest_request(event, context):
 
 
 def handle_api_function(event, context):
-    """Handle /api/* function calls using the registry"""
+    """Handle /api/* function calls using the registry's compiled router"""
     path = event.get('path', '')
     method = event.get('httpMethod', 'GET')
     
-    # Find matching function in registry with path parameter support
-    for func_meta in registry.get_rest_functions():
-        if matches_path_pattern(func_meta.rest_path, path) and func_meta.rest_method == method:
-            try:
-                # Extract parameters
-                kwargs = {}
-                
-                # Path parameters from URL pattern matching
-                path_params = extract_path_parameters(func_meta.rest_path, path)
-                for param_name, param_value in path_params.items():
-                    # Type conversion based on function signature
-                    param = func_meta.signature.parameters.get(param_name)
-                    if param:
-                        param_type = func_meta.type_hints.get(param_name, str)
-                        kwargs[param_name] = convert_parameter_type(param_value, param_type)
-                    else:
-                        kwargs[param_name] = param_value
-                
-                # Additional path parameters from API Gateway (filter out proxy parameter)
-                if event.get('pathParameters'):
-                    for param_name, param_value in event['pathParameters'].items():
-                        if param_name != 'proxy' and param_name not in kwargs:  # Don't override pattern params
-                            kwargs[param_name] = param_value
-                
-                # Query string parameters
-                if event.get('queryStringParameters'):
-                    for param_name, param_value in event['queryStringParameters'].items():
-                        # Type conversion based on function signature
-                        param = func_meta.signature.parameters.get(param_name)
-                        if param:
-                            param_type = func_meta.type_hints.get(param_name, str)
-                            kwargs[param_name] = convert_parameter_type(param_value, param_type)
-                        else:
-                            kwargs[param_name] = param_value
-                
-                # Body parameters for POST/PUT
-                if method in ['POST', 'PUT', 'PATCH'] and event.get('body'):
-                    try:
-                        body_data = json.loads(event['body'])
-                        if isinstance(body_data, dict):
-                            for param_name, param_value in body_data.items():
-                                param = func_meta.signature.parameters.get(param_name)
-                                if param:
-                                    param_type = func_meta.type_hints.get(param_name, str)
-                                    kwargs[param_name] = convert_parameter_type(param_value, param_type)
-                                else:
-                                    kwargs[param_name] = param_value
-                    except json.JSONDecodeError:
-                        return {
-                            'statusCode': 400,
-                            'headers': {'Content-Type': 'application/json'},
-                            'body': json.dumps({
-                                'error': 'Bad Request',
-                                'message': 'Invalid JSON in request body'
-                            })
-                        }
-                
-                # Add default values for missing optional parameters
-                for param_name, param in func_meta.signature.parameters.items():
-                    if param_name not in kwargs and param.default != param.empty:
-                        kwargs[param_name] = param.default
-                
-                # Call the function
-                if asyncio.iscoroutinefunction(func_meta.func):
-                    result = asyncio.run(func_meta.func(**kwargs))
-                else:
-                    result = func_meta.func(**kwargs)
-                
-                # Handle error responses
-                if isinstance(result, dict) and result.get("MCP-ERROR"):
+    # Dispatch method + path through the registry's route trie, compiled on first use
+    # and recompiled only when registrations change
+    try:
+        match = registry.get_router().match(method, path)
+    except ValueError as e:
+        return {
+            'statusCode': 400,
+            'headers': {'Content-Type': 'application/json'},
+            'body': json.dumps({
+                'error': 'Bad Request',
+                'message': str(e)
+            })
+        }
+    
+    if match is not None:
+        func_meta = match.meta
+        try:
+            # Body parameters for POST/PUT
+            body_data = None
+            if method in ['POST', 'PUT', 'PATCH'] and event.get('body'):
+                try:
+                    body_data = json.loads(event['body'])
+                except json.JSONDecodeError:
                     return {
-                        'statusCode': 500,
+                        'statusCode': 400,
                         'headers': {'Content-Type': 'application/json'},
                         'body': json.dumps({
-                            'error': 'Function Error',
-                            'message': result["MCP-ERROR"]
+                            'error': 'Bad Request',
+                            'message': 'Invalid JSON in request body'
                         })
                     }
-                
-                # Success response
+                if not isinstance(body_data, dict):
+                    body_data = None
+            
+            # Build kwargs in one pass with the function's compiled binder:
+            # path pattern params > body > query string > API Gateway path params
+            gateway_params = {
+                name: value for name, value in (event.get('pathParameters') or {}).items()
+                if name != 'proxy'
+            }
+            try:
+                kwargs = func_meta.binder.bind(
+                    match.params,
+                    body_data,
+                    event.get('queryStringParameters'),
+                    gateway_params
+                )
+            except ValueError as e:
                 return {
-                    'statusCode': 200,
-                    'headers': {
-                        'Content-Type': 'application/json',
-                        'Access-Control-Allow-Origin': '*'
-                    },
-                    'body': json.dumps(result)
+                    'statusCode': 400,
+                    'headers': {'Content-Type': 'application/json'},
+                    'body': json.dumps({
+                        'error': 'Bad Request',
+                        'message': str(e)
+                    })
                 }
-                
-            except Exception as e:
-                print(f"🚨 Error in API function {func_meta.name}: {e}")
-                import traceback
-                traceback.print_exc()
+            
+            # Call the function
+            request_log = current_request()
+            if request_log is not None:
+                request_log.set(function=func_meta.name)
+            with request_log.timer("function") if request_log is not None else nullcontext():
+                if func_meta.binder.is_coroutine:
+                    result = loop_runner.run(func_meta.func(**kwargs))
+                else:
+                    result = func_meta.func(**kwargs)
+            
+            # Handle error responses
+            if isinstance(result, dict) and result.get("MCP-ERROR"):
                 return {
                     'statusCode': 500,
                     'headers': {'Content-Type': 'application/json'},
                     'body': json.dumps({
-                        'error': 'Internal Server Error',
-                        'message': str(e)
+                        'error': 'Function Error',
+                        'message': result["MCP-ERROR"]
                     })
                 }
+            
+            # Success response
+            return {
+                'statusCode': 200,
+                'headers': {
+                    'Content-Type': 'application/json',
+                    'Access-Control-Allow-Origin': '*'
+                },
+                'body': json.dumps(result)
+            }
+            
+        except Exception as e:
+            logger.exception("api_function_error", function=func_meta.name, error=str(e))
+            return {
+                'statusCode': 500,
+                'headers': {'Content-Type': 'application/json'},
+                'body': json.dumps({
+                    'error': 'Internal Server Error',
+                    'message': str(e)
+                })
+            }
     
     # No matching function found
     return {
@@ -341,109 +337,36 @@ def handle_api_function(event, context):
     }
 
 
-def matches_path_pattern(pattern: str, path: str) -> bool:
-    """
-    Check if a path matches a pattern with path parameters.
-    
-    Examples:
-        matches_path_pattern("/api/fetch_account_info/{wallet_address}", "/api/fetch_account_info/pb123") -> True
-        matches_path_pattern("/api/fetch_current_hash_statistics", "/api/fetch_current_hash_statistics") -> True
-    """
-    if not pattern or not path:
-        return False
-    
-    # Convert pattern to regex by replacing {param} with [^/]+
-    import re
-    pattern_regex = re.escape(pattern)
-    pattern_regex = re.sub(r'\\{[^}]+\\}', r'[^/]+', pattern_regex)
-    pattern_regex = f'^{pattern_regex}$'
-    
-    return re.match(pattern_regex, path) is not None
-
-
-def extract_path_parameters(pattern: str, path: str) -> dict:
-    """
-    Extract path parameters from a path using a pattern.
-    
-    Examples:
-        extract_path_parameters("/api/user/{id}", "/api/user/123") -> {"id": "123"}
-        extract_path_parameters("/api/user/{id}/posts/{post_id}", "/api/user/123/posts/456") -> {"id": "123", "post_id": "456"}
-    """
-    if not pattern or not path:
-        return {}
-    
-    import re
-    
-    # Find all parameter names in the pattern
-    param_names = re.findall(r'{([^}]+)}', pattern)
-    
-    if not param_names:
-        return {}
+def build_docs_html() -> str:
+    """Generate the /docs HTML page from the registry"""
+    rest_functions = registry.get_rest_functions()
+    mcp_functions = registry.get_mcp_functions()
     
-    # Convert pattern to regex with capture groups
-    pattern_regex = re.escape(pattern)
-    pattern_regex = re.sub(r'\\{[^}]+\\}', r'([^/]+)', pattern_regex)
-    pattern_regex = f'^{pattern_regex}$'
+    # Build endpoints HTML from registry
+    endpoints_html = []
     
-    match = re.match(pattern_regex, path)
-    if match:
-        return dict(zip(param_names, match.groups()))
+    # Add health endpoint (hardcoded special endpoint)
+    endpoints_html.append(
+        '<div class="endpoint">'
+        '<span class="method">GET</span> /health - Health check endpoint'
+        '</div>'
+    )
     
-    return {}
-
-
-def convert_parameter_type(value: str, param_type: type) -> Any:
-    """Convert string parameter to the correct type"""
-    if param_type == int:
-        return int(value)
-    elif param_type == float:
-        return float(value)
-    elif param_type == bool:
-        return value.lower() in ('true', '1', 'yes', 'on')
-    else:
-        return value
-
-
-def handle_docs_request(event, context):
-    """Dynamic docs handler - generates documentation from registry"""
-    path = event.get('path', '')
-    
-    if path == '/docs':
-        # Generate dynamic HTML docs from registry
-        rest_functions = registry.get_rest_functions()
-        mcp_functions = registry.get_mcp_functions()
-        
-        # Build endpoints HTML from registry
-        endpoints_html = []
+    # Add all REST API endpoints from registry
+    for func_meta in rest_functions:
+        method = func_meta.rest_method or 'GET'
+        path_display = func_meta.rest_path or f'/api/{func_meta.name}'
+        description = func_meta.description or f'{func_meta.name} function'
         
-        # Add health endpoint (hardcoded special endpoint)
         endpoints_html.append(
-            '<div class="endpoint">'
-            '<span class="method">GET</span> /health - Health check endpoint'
-            '</div>'
+            f'<div class="endpoint">'
+            f'<span class="method">{method}</span> {path_display} - {description}'
+            f'</div>'
         )
-        
-        # Add all REST API endpoints from registry
-        for func_meta in rest_functions:
-            method = func_meta.rest_method or 'GET'
-            path_display = func_meta.rest_path or f'/api/{func_meta.name}'
-            description = func_meta.description or f'{func_meta.name} function'
-            
-            endpoints_html.append(
-                f'<div class="endpoint">'
-                f'<span class="method">{method}</span> {path_display} - {description}'
-                f'</div>'
-            )
-        
-        endpoints_section = '\n'.join(endpoints_html)
-        
-        return {
-            'statusCode': 200,
-            'headers': {
-                'Content-Type': 'text/html',
-                'Access-Control-Allow-Origin': '*'
-            },
-            'body': f"""
+    
+    endpoints_section = '\n'.join(endpoints_html)
+    
+    return f"""
 <!DOCTYPE html>
 <html>
 <head>
@@ -488,32 +411,31 @@ def handle_docs_request(event, context):
 </body>
 </html>
 """
-        }
+
+
+def build_openapi_spec() -> dict:
+    """Generate the OpenAPI document from the registry"""
+    rest_functions = registry.get_rest_functions()
+    mcp_functions = registry.get_mcp_functions()
     
-    elif path == '/openapi.json':
-        # Generate dynamic OpenAPI spec from registry
-        rest_functions = registry.get_rest_functions()
-        mcp_functions = registry.get_mcp_functions()
-        
-        # Build paths object from registry
-        paths = {}
-        
-        # Add health endpoint
-        paths["/health"] = {
-            "get": {
-                "summary": "Health check endpoint",
-                "description": "Returns server health status and version",
-                "responses": {
-                    "200": {
-                        "description": "Server is healthy",
-                        "content": {
-                            "application/json": {
-                                "schema": {
-                                    "type": "object",
-                                    "properties": {
-                                        "status": {"type": "string", "example": "healthy"},
-                                        "version": {"type": "string", "example": get_version_string()}
-                                    }
+    # Build paths object from registry
+    paths = {}
+    
+    # Add health endpoint
+    paths["/health"] = {
+        "get": {
+            "summary": "Health check endpoint",
+            "description": "Returns server health status and version",
+            "responses": {
+                "200": {
+                    "description": "Server is healthy",
+                    "content": {
+                        "application/json": {
+                            "schema": {
+                                "type": "object",
+                                "properties": {
+                                    "status": {"type": "string", "example": "healthy"},
+                                    "version": {"type": "string", "example": get_version_string()}
                                 }
                             }
                         }
@@ -521,243 +443,316 @@ def handle_docs_request(event, context):
                 }
             }
         }
+    }
+    
+    # Add all REST endpoints from registry
+    for func_meta in rest_functions:
+        path_key = func_meta.rest_path or f'/api/{func_meta.name}'
+        method = (func_meta.rest_method or 'GET').lower()
         
-        # Add all REST endpoints from registry
-        for func_meta in rest_functions:
-            path_key = func_meta.rest_path or f'/api/{func_meta.name}'
-            method = (func_meta.rest_method or 'GET').lower()
-            
-            # Extract path parameters
-            path_params = []
-            if '{' in path_key:
-                import re
-                param_matches = re.findall(r'{([^}]+)}', path_key)
-                for param_name in param_matches:
-                    param_type = func_meta.type_hints.get(param_name, str)
-                    openapi_type = "string"
-                    if param_type == int:
-                        openapi_type = "integer"
-                    elif param_type == float:
-                        openapi_type = "number"
-                    elif param_type == bool:
-                        openapi_type = "boolean"
-                    
-                    path_params.append({
-                        "name": param_name,
-                        "in": "path",
-                        "required": True,
-                        "schema": {"type": openapi_type},
-                        "description": f"The {param_name} parameter"
-                    })
-            
-            # Build operation object
-            operation = {
-                "summary": func_meta.description or f"{func_meta.name} function",
-                "description": func_meta.docstring or func_meta.description or f"Execute {func_meta.name}",
-                "responses": {
-                    "200": {
-                        "description": "Successful response",
-                        "content": {
-                            "application/json": {
-                                "schema": {"type": "object"}
-                            }
+        # Extract path parameters
+        path_params = []
+        if '{' in path_key:
+            import re
+            param_matches = re.findall(r'{([^}]+)}', path_key)
+            for param_name in param_matches:
+                param_type = func_meta.type_hints.get(param_name, str)
+                openapi_type = "string"
+                if param_type == int:
+                    openapi_type = "integer"
+                elif param_type == float:
+                    openapi_type = "number"
+                elif param_type == bool:
+                    openapi_type = "boolean"
+                
+                path_params.append({
+                    "name": param_name,
+                    "in": "path",
+                    "required": True,
+                    "schema": {"type": openapi_type},
+                    "description": f"The {param_name} parameter"
+                })
+        
+        # Build operation object
+        operation = {
+            "summary": func_meta.description or f"{func_meta.name} function",
+            "description": func_meta.docstring or func_meta.description or f"Execute {func_meta.name}",
+            "responses": {
+                "200": {
+                    "description": "Successful response",
+                    "content": {
+                        "application/json": {
+                            "schema": {"type": "object"}
                         }
-                    },
-                    "400": {
-                        "description": "Bad request - invalid parameters"
-                    },
-                    "500": {
-                        "description": "Internal server error"
                     }
+                },
+                "400": {
+                    "description": "Bad request - invalid parameters"
+                },
+                "500": {
+                    "description": "Internal server error"
                 }
             }
+        }
+        
+        # Add parameters if any
+        if path_params:
+            operation["parameters"] = path_params
+        
+        # Add query parameters for GET requests
+        if method == 'get':
+            query_params = []
+            for param_name, param in func_meta.signature.parameters.items():
+                if param_name in ('self', 'cls'):
+                    continue
+                
+                # Skip path parameters
+                if any(pp["name"] == param_name for pp in path_params):
+                    continue
+                
+                param_type = func_meta.type_hints.get(param_name, str)
+                openapi_type = "string"
+                if param_type == int:
+                    openapi_type = "integer"
+                elif param_type == float:
+                    openapi_type = "number"
+                elif param_type == bool:
+                    openapi_type = "boolean"
+                
+                is_required = param.default == param.empty
+                
+                query_params.append({
+                    "name": param_name,
+                    "in": "query",
+                    "required": is_required,
+                    "schema": {"type": openapi_type},
+                    "description": f"The {param_name} parameter"
+                })
             
-            # Add parameters if any
-            if path_params:
-                operation["parameters"] = path_params
+            if query_params:
+                if "parameters" not in operation:
+                    operation["parameters"] = []
+                operation["parameters"].extend(query_params)
+        
+        # Add request body for POST requests
+        elif method == 'post':
+            body_properties = {}
+            required_fields = []
             
-            # Add query parameters for GET requests
-            if method == 'get':
-                query_params = []
-                for param_name, param in func_meta.signature.parameters.items():
-                    if param_name in ('self', 'cls'):
-                        continue
-                    
-                    # Skip path parameters
-                    if any(pp["name"] == param_name for pp in path_params):
-                        continue
-                    
-                    param_type = func_meta.type_hints.get(param_name, str)
-                    openapi_type = "string"
-                    if param_type == int:
-                        openapi_type = "integer"
-                    elif param_type == float:
-                        openapi_type = "number"
-                    elif param_type == bool:
-                        openapi_type = "boolean"
-                    
-                    is_required = param.default == param.empty
-                    
-                    query_params.append({
-                        "name": param_name,
-                        "in": "query",
-                        "required": is_required,
-                        "schema": {"type": openapi_type},
-                        "description": f"The {param_name} parameter"
-                    })
+            for param_name, param in func_meta.signature.parameters.items():
+                if param_name in ('self', 'cls'):
+                    continue
                 
-                if query_params:
-                    if "parameters" not in operation:
-                        operation["parameters"] = []
-                    operation["parameters"].extend(query_params)
-            
-            # Add request body for POST requests
-            elif method == 'post':
-                body_properties = {}
-                required_fields = []
+                param_type = func_meta.type_hints.get(param_name, str)
+                openapi_type = "string"
+                if param_type == int:
+                    openapi_type = "integer"
+                elif param_type == float:
+                    openapi_type = "number"
+                elif param_type == bool:
+                    openapi_type = "boolean"
                 
-                for param_name, param in func_meta.signature.parameters.items():
-                    if param_name in ('self', 'cls'):
-                        continue
-                    
-                    param_type = func_meta.type_hints.get(param_name, str)
-                    openapi_type = "string"
-                    if param_type == int:
-                        openapi_type = "integer"
-                    elif param_type == float:
-                        openapi_type = "number"
-                    elif param_type == bool:
-                        openapi_type = "boolean"
-                    
-                    body_properties[param_name] = {
-                        "type": openapi_type,
-                        "description": f"The {param_name} parameter"
-                    }
-                    
-                    if param.default == param.empty:
-                        required_fields.append(param_name)
+                body_properties[param_name] = {
+                    "type": openapi_type,
+                    "description": f"The {param_name} parameter"
+                }
                 
-                if body_properties:
-                    request_body = {
-                        "required": len(required_fields) > 0,
-                        "content": {
-                            "application/json": {
-                                "schema": {
-                                    "type": "object",
-                                    "properties": body_properties
-                                }
-                            }
-                        }
-                    }
-                    
-                    if required_fields:
-                        request_body["content"]["application/json"]["schema"]["required"] = required_fields
-                    
-                    operation["requestBody"] = request_body
-            
-            # Add tags based on function categories
-            if func_meta.tags:
-                operation["tags"] = func_meta.tags
-            else:
-                # Auto-categorize based on function name
-                if 'delegation' in func_meta.name.lower():
-                    operation["tags"] = ["Delegation"]
-                elif 'vesting' in func_meta.name.lower():
-                    operation["tags"] = ["Vesting"]
-                elif 'account' in func_meta.name.lower() or 'wallet' in func_meta.name.lower():
-                    operation["tags"] = ["Wallet"]
-                elif 'market' in func_meta.name.lower() or 'fm' in func_meta.name.lower():
-                    operation["tags"] = ["Markets"]
-                elif 'session' in func_meta.name.lower() or 'message' in func_meta.name.lower():
-                    operation["tags"] = ["Sessions"]
-                else:
-                    operation["tags"] = ["General"]
+                if param.default == param.empty:
+                    required_fields.append(param_name)
             
-            # Add to paths
-            if path_key not in paths:
-                paths[path_key] = {}
-            paths[path_key][method] = operation
-        
-        # Add MCP endpoint
-        paths["/mcp"] = {
-            "post": {
-                "summary": "MCP Protocol endpoint",
-                "description": f"JSON-RPC 2.0 endpoint with {len(mcp_functions)} available tools",
-                "tags": ["MCP"],
-                "requestBody": {
-                    "required": True,
+            if body_properties:
+                request_body = {
+                    "required": len(required_fields) > 0,
                     "content": {
                         "application/json": {
                             "schema": {
                                 "type": "object",
-                                "properties": {
-                                    "jsonrpc": {"type": "string", "example": "2.0"},
-                                    "method": {"type": "string", "example": "tools/list"},
-                                    "id": {"type": "string", "example": "1"},
-                                    "params": {"type": "object"}
-                                },
-                                "required": ["jsonrpc", "method", "id"]
+                                "properties": body_properties
                             }
                         }
                     }
-                },
-                "responses": {
-                    "200": {
-                        "description": "MCP JSON-RPC response",
-                        "content": {
-                            "application/json": {
-                                "schema": {"type": "object"}
-                            }
+                }
+                
+                if required_fields:
+                    request_body["content"]["application/json"]["schema"]["required"] = required_fields
+                
+                operation["requestBody"] = request_body
+        
+        # Add tags based on function categories
+        if func_meta.tags:
+            operation["tags"] = func_meta.tags
+        else:
+            # Auto-categorize based on function name
+            if 'delegation' in func_meta.name.lower():
+                operation["tags"] = ["Delegation"]
+            elif 'vesting' in func_meta.name.lower():
+                operation["tags"] = ["Vesting"]
+            elif 'account' in func_meta.name.lower() or 'wallet' in func_meta.name.lower():
+                operation["tags"] = ["Wallet"]
+            elif 'market' in func_meta.name.lower() or 'fm' in func_meta.name.lower():
+                operation["tags"] = ["Markets"]
+            elif 'session' in func_meta.name.lower() or 'message' in func_meta.name.lower():
+                operation["tags"] = ["Sessions"]
+            else:
+                operation["tags"] = ["General"]
+        
+        # Add to paths
+        if path_key not in paths:
+            paths[path_key] = {}
+        paths[path_key][method] = operation
+    
+    # Add MCP endpoint
+    paths["/mcp"] = {
+        "post": {
+            "summary": "MCP Protocol endpoint",
+            "description": f"JSON-RPC 2.0 endpoint with {len(mcp_functions)} available tools",
+            "tags": ["MCP"],
+            "requestBody": {
+                "required": True,
+                "content": {
+                    "application/json": {
+                        "schema": {
+                            "type": "object",
+                            "properties": {
+                                "jsonrpc": {"type": "string", "example": "2.0"},
+                                "method": {"type": "string", "example": "tools/list"},
+                                "id": {"type": "string", "example": "1"},
+                                "params": {"type": "object"}
+                            },
+                            "required": ["jsonrpc", "method", "id"]
+                        }
+                    }
+                }
+            },
+            "responses": {
+                "200": {
+                    "description": "MCP JSON-RPC response",
+                    "content": {
+                        "application/json": {
+                            "schema": {"type": "object"}
                         }
                     }
                 }
             }
         }
-        
-        # Build complete OpenAPI spec
-        openapi_spec = {
-            "openapi": "3.0.0",
-            "info": {
-                "title": "PB-FM Unified API",
-                "version": get_version_string(),
-                "description": "Unified MCP + REST API for Provenance Blockchain and Figure Markets data",
-                "contact": {
-                    "name": "PB-FM API Support",
-                    "url": "https://pb-fm-mcp-dev.creativeapptitude.com/"
-                }
+    }
+    
+    # Build complete OpenAPI spec
+    openapi_spec = {
+        "openapi": "3.0.0",
+        "info": {
+            "title": "PB-FM Unified API",
+            "version": get_version_string(),
+            "description": "Unified MCP + REST API for Provenance Blockchain and Figure Markets data",
+            "contact": {
+                "name": "PB-FM API Support",
+                "url": "https://pb-fm-mcp-dev.creativeapptitude.com/"
+            }
+        },
+        "servers": [
+            {
+                "url": "https://pb-fm-mcp-dev.creativeapptitude.com",
+                "description": "Development server"
             },
-            "servers": [
-                {
-                    "url": "https://pb-fm-mcp-dev.creativeapptitude.com",
-                    "description": "Development server"
-                },
-                {
-                    "url": "https://7fucgrbd16.execute-api.us-west-1.amazonaws.com/v1",
-                    "description": "API Gateway endpoint"
-                }
-            ],
-            "tags": [
-                {"name": "General", "description": "General API endpoints"},
-                {"name": "Wallet", "description": "Wallet and account operations"},
-                {"name": "Delegation", "description": "Staking and delegation operations"},
-                {"name": "Vesting", "description": "Vesting and token release operations"},
-                {"name": "Markets", "description": "Figure Markets exchange operations"},
-                {"name": "Sessions", "description": "Session and messaging operations"},
-                {"name": "MCP", "description": "Model Context Protocol operations"}
-            ],
-            "paths": paths
+            {
+                "url": "https://7fucgrbd16.execute-api.us-west-1.amazonaws.com/v1",
+                "description": "API Gateway endpoint"
+            }
+        ],
+        "tags": [
+            {"name": "General", "description": "General API endpoints"},
+            {"name": "Wallet", "description": "Wallet and account operations"},
+            {"name": "Delegation", "description": "Staking and delegation operations"},
+            {"name": "Vesting", "description": "Vesting and token release operations"},
+            {"name": "Markets", "description": "Figure Markets exchange operations"},
+            {"name": "Sessions", "description": "Session and messaging operations"},
+            {"name": "MCP", "description": "Model Context Protocol operations"}
+        ],
+        "paths": paths
+    }
+    
+    return openapi_spec
+
+
+def generate_protocol_documents() -> dict:
+    """Build the tools/list payload, OpenAPI document and docs page from scratch"""
+    return {
+        "tools_list": json.dumps({"tools": list(mcp_server.tools.values())}),
+        "openapi": json.dumps(build_openapi_spec(), indent=2),
+        "docs_html": build_docs_html()
+    }
+
+
+# Protocol documents are served as precomputed strings: loaded from the build
+# artifact when it matches, regenerated only when the registry changes
+protocol_artifacts = ArtifactCache(
+    registry,
+    fingerprint=lambda: surface_fingerprint(registry, mcp_server.tools.values(), get_version_string()),
+    generate=generate_protocol_documents
+)
+
+
+def handle_docs_request(event, context):
+    """Serve the precomputed docs page and OpenAPI document"""
+    path = event.get('path', '')
+    artifacts = protocol_artifacts.get()
+    
+    if path == '/docs':
+        return {
+            'statusCode': 200,
+            'headers': {
+                'Content-Type': 'text/html',
+                'Access-Control-Allow-Origin': '*'
+            },
+            'body': artifacts.docs_html
         }
-        
+    
+    elif path == '/openapi.json':
         return {
             'statusCode': 200,
             'headers': {
                 'Content-Type': 'application/json',
                 'Access-Control-Allow-Origin': '*'
             },
-            'body': json.dumps(openapi_spec, indent=2)
+            'body': artifacts.openapi
         }
 
 
+def precomputed_tools_list_response(event, body=None):
+    """
+    Serve MCP tools/list from the precomputed payload.
+    
+    body is the already-parsed JSON-RPC request, if the caller has it.
+    Returns None for anything the AWS MCP handler must process itself: other methods,
+    notifications, malformed requests, or session stores that need validating.
+    """
+    if not isinstance(mcp_server.session_store, NoOpSessionStore):
+        return None
+    
+    headers = {k.lower(): v for k, v in (event.get('headers') or {}).items()}
+    if headers.get('content-type') != 'application/json':
+        return None
+    
+    if body is None:
+        try:
+            body = json.loads(event.get('body') or '')
+        except json.JSONDecodeError:
+            return None
+    if not (isinstance(body, dict) and body.get('jsonrpc') == '2.0'
+            and body.get('method') == 'tools/list' and 'id' in body):
+        return None
+    
+    response_headers = {'Content-Type': 'application/json', 'MCP-Version': '0.6'}
+    if headers.get('mcp-session-id'):
+        response_headers['MCP-Session-Id'] = headers['mcp-session-id']
+    
+    return {
+        'statusCode': 200,
+        'body': protocol_artifacts.get().tools_list_response_body(body['id']),
+        'headers': response_headers
+    }
+
+
 # =============================================================================
 # Main Lambda Handler with Dual-Path Routing
 # =============================================================================
@@ -769,46 +764,52 @@ def lambda_handler(event, context):
     Architecture:
     - MCP requests (/mcp) → Direct AWS MCP Handler 
     - REST requests (/api/*, /docs, etc.) → FastAPI via Web Adapter
+    
+    Every invocation emits one compact "request" log line (sampled per route);
+    per-tool and per-upstream latency is aggregated by the metrics module.
     """
+    # Extract request details
+    http_method = event.get('httpMethod', 'POST')
+    path = event.get('path', '/mcp')
     
-    try:
-        # Extract request details
-        http_method = event.get('httpMethod', 'POST')
-        path = event.get('path', '/mcp')
-        headers = event.get('headers', {})
-        
-        print(f"🔍 Lambda handler: {http_method} {path}")
-        
-        # Path-based routing: determine which handler to use
-        if path.startswith('/api/') or path in ['/', '/health']:
-            # Route to native REST handler (no FastAPI!)
-            print(f"🌐 Routing {http_method} {path} to native REST handler")
-            return handle_rest_request(event, context)
+    with request_scope(
+        logger,
+        method=http_method,
+        path=path,
+        request_id=getattr(context, 'aws_request_id', None)
+    ) as request_log:
+        try:
+            # Path-based routing: determine which handler to use
+            if path.startswith('/api/') or path in ['/', '/health']:
+                # Route to native REST handler (no FastAPI!)
+                request_log.set(handler="rest")
+                response = handle_rest_request(event, context)
+                
+            elif path == '/docs' or path == '/openapi.json':
+                request_log.set(handler="docs")
+                response = handle_docs_request(event, context)
             
-        elif path == '/docs' or path == '/openapi.json':
-            # Simple docs response for now
-            print(f"📖 Routing {http_method} {path} to docs handler")
-            return handle_docs_request(event, context)
+            else:
+                # Route to MCP handler (default for /mcp and unknown paths)
+                request_log.set(handler="mcp")
+                response = handle_mcp_request(event, context)
+                
+        except Exception as e:
+            logger.exception("lambda_handler_error", error=str(e))
+            response = {
+                'statusCode': 500,
+                'headers': {'Content-Type': 'application/json'},
+                'body': json.dumps({
+                    'error': 'Internal server error',
+                    'message': str(e)
+                })
+            }
         
-        else:
-            # Route to MCP handler (default for /mcp and unknown paths)
-            print(f"🔧 Routing {http_method} {path} to MCP handler")
-            
-            # Handle MCP requests directly
-            return handle_mcp_request(event, context)
-            
-    except Exception as e:
-        print(f"🚨 EXCEPTION in lambda_handler: {e}")
-        import traceback
-        traceback.print_exc()
-        return {
-            'statusCode': 500,
-            'headers': {'Content-Type': 'application/json'},
-            'body': json.dumps({
-                'error': 'Internal server error',
-                'message': str(e)
-            })
-        }
+        request_log.set(status=(response or {}).get('statusCode'))
+    
+    # CloudWatch EMF metrics (opt-in with METRICS_EMF), written at most once per interval
+    get_metrics().maybe_flush_emf()
+    return response
 
 
 def handle_mcp_request(event, context):
@@ -822,36 +823,14 @@ def handle_mcp_request(event, context):
         query_params = event.get('queryStringParameters') or {}
         body = event.get('body') or ''
         
-        # Enhanced debug logging to capture AI instance identifiers
-        print("🔍 === MCP REQUEST DEBUG (AI INSTANCE INVESTIGATION) ===")
-        print(f"📍 Timestamp: {datetime.now(UTC).isoformat()}")
-        print(f"📍 Method: {http_method}")
-        print(f"📍 Path: {path}")
-        print(f"📍 Lambda Request ID: {context.aws_request_id if hasattr(context, 'aws_request_id') else 'N/A'}")
-        
-        # Log ALL headers for AI instance identification
-        print("📍 ALL HEADERS:")
-        for key, value in headers.items():
-            print(f"    {key}: {value}")
-        
-        # Look for specific headers that might identify AI instances
-        potential_identifiers = {
-            'user-agent': headers.get('User-Agent') or headers.get('user-agent'),
-            'mcp-session-id': headers.get('MCP-Session-Id') or headers.get('mcp-session-id'),
-            'x-request-id': headers.get('X-Request-ID') or headers.get('x-request-id'),
-            'x-amzn-trace-id': headers.get('X-Amzn-Trace-Id') or headers.get('x-amzn-trace-id'),
-            'authorization': headers.get('Authorization') or headers.get('authorization'),
-            'x-forwarded-for': headers.get('X-Forwarded-For') or headers.get('x-forwarded-for')
-        }
-        
-        print("📍 POTENTIAL AI IDENTIFIERS:")
-        for key, value in potential_identifiers.items():
-            if value:
-                print(f"    {key}: {value}")
-            else:
-                print(f"    {key}: NOT PRESENT")
-        
-        print(f"📍 Body: {body[:200]}{'...' if len(body) > 200 else ''}")
+        # Request details are only rendered in debug mode (see set_debug_logging)
+        logger.debug(
+            "mcp_request",
+            method=http_method,
+            path=path,
+            headers=lazy(lambda: redact_headers(headers)),
+            body=lazy(lambda: body[:200] + ('...' if len(body) > 200 else ''))
+        )
         
         # Check Accept header for proper MCP client detection
         accept_header = ''
@@ -860,13 +839,10 @@ def handle_mcp_request(event, context):
                 accept_header = value.lower()
                 break
         
-        print(f"📍 Accept header: {accept_header}")
-        
         # Handle different request types
         if http_method == 'GET':
             # Handle GET requests (Claude.ai connection testing)
             if 'text/event-stream' in accept_header:
-                print("❌ Client requesting SSE - returning 405")
                 return {
                     'statusCode': 405,
                     'headers': {
@@ -882,7 +858,6 @@ def handle_mcp_request(event, context):
                 }
             else:
                 # Regular GET - return server info
-                print("✅ Handling GET request - returning server info")
                 return {
                     'statusCode': 200,
                     'headers': {
@@ -903,27 +878,32 @@ def handle_mcp_request(event, context):
         
         elif http_method == 'POST':
             # Handle POST requests (actual MCP protocol)
-            # Check if client accepts both application/json and text/event-stream
-            if 'application/json' in accept_header and 'text/event-stream' in accept_header:
-                print("✅ Proper MCP client detected - using direct MCP handler")
-            else:
-                print("⚠️ Non-standard accept header - using MCP handler anyway")
+            request_log = current_request()
+            try:
+                rpc = json.loads(body) if body else None
+            except json.JSONDecodeError:
+                rpc = None
+            if request_log is not None and isinstance(rpc, dict):
+                request_log.set(rpc_method=rpc.get('method'))
+                if rpc.get('method') == 'tools/call':
+                    request_log.set(tool=(rpc.get('params') or {}).get('name'))
             
-            # Use direct AWS MCP handler - this is the key!
-            print("🔧 Calling mcp_server.handle_request() directly")
-            response = mcp_server.handle_request(event, context)
+            # tools/list is answered from the precomputed payload; everything
+            # else goes to the direct AWS MCP handler - this is the key!
+            response = precomputed_tools_list_response(event, rpc)
+            if response is None:
+                with request_log.timer("mcp") if request_log is not None else nullcontext():
+                    response = mcp_server.handle_request(event, context)
             
-            # Debug response
-            print("📤 === MCP RESPONSE DEBUG ===")
-            print(f"📍 Status Code: {response.get('statusCode')}")
-            response_body = response.get('body', '')
-            print(f"📍 Response Body: {response_body[:200]}{'...' if len(response_body) > 200 else ''}")
-            print("🔍 === END DEBUG ===\n")
+            logger.debug(
+                "mcp_response",
+                status=response.get('statusCode'),
+                body=lazy(lambda: response.get('body', '')[:200])
+            )
             
             return response
         
         elif http_method == 'OPTIONS':
-            print("🔎 Processing OPTIONS (CORS preflight) request")
             return {
                 'statusCode': 200,
                 'headers': {
@@ -936,7 +916,6 @@ def handle_mcp_request(event, context):
             }
         
         else:
-            print(f"🔎 Unsupported method {http_method}")
             return {
                 'statusCode': 405,
                 'headers': {'Content-Type': 'application/json'},
@@ -947,9 +926,7 @@ def handle_mcp_request(event, context):
             }
             
     except Exception as e:
-        print(f"🚨 EXCEPTION in handle_mcp_request: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("mcp_request_error", error=str(e))
         return {
             'statusCode': 500,
             'headers': {'Content-Type': 'application/json'},
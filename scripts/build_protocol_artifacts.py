@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Build the Precomputed Protocol Artifacts
+
+Imports the Lambda handler (registering every MCP tool and REST route exactly as the
+deployed function will) and serializes the MCP tools/list payload, the OpenAPI
+document and the /docs page to src/functions/protocol_artifacts.json. The handler
+loads them on the first request instead of regenerating them, and falls back to
+regenerating if the registry no longer matches the artifact's fingerprint.
+
+Run after scripts/build_registry_manifest.py:
+
+    uv run python scripts/build_protocol_artifacts.py [--output PATH]
+"""
+
+import argparse
+import os
+import sys
+from pathlib import Path
+
+# Modules that create boto3 clients at import time need a region (no AWS calls are made)
+os.environ.setdefault("AWS_DEFAULT_REGION", "us-west-1")
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "src"))
+
+import lambda_handler_unified  # noqa: E402
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Build the protocol artifacts")
+    parser.add_argument("--output", type=Path, default=None, help="Artifact path")
+    args = parser.parse_args()
+
+    cache = lambda_handler_unified.protocol_artifacts
+    output = args.output or cache.path
+    artifacts = cache.write(output)
+
+    print(f"✅ Wrote {output} (fingerprint {artifacts.fingerprint[:12]})")
+    print(f"  tools/list: {len(artifacts.tools_list)} bytes")
+    print(f"  openapi.json: {len(artifacts.openapi)} bytes")
+    print(f"  docs: {len(artifacts.docs_html)} bytes")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
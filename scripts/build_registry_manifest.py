@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Build the Registry Manifest for Lazy Function Loading
+
+Imports every function module eagerly, then writes src/functions/registry_manifest.json
+with each registered function's module, metadata, signature and MCP schema. At
+runtime the functions package registers stubs from the manifest and imports a
+module only when one of its functions is first invoked.
+
+Run after scripts/update_function_protocols.py so the manifest reflects the
+protocols that are being deployed:
+
+    uv run python scripts/build_registry_manifest.py [--output PATH]
+"""
+
+import argparse
+import os
+import sys
+from collections import Counter
+from pathlib import Path
+
+# The build must see every module, never a previous manifest
+os.environ["FUNCTIONS_LAZY_LOADING"] = "false"
+# Modules that create boto3 clients at import time need a region (no AWS calls are made)
+os.environ.setdefault("AWS_DEFAULT_REGION", "us-west-1")
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import functions  # noqa: E402,F401  (registers all @api_function functions)
+from registry.manifest import manifest_path, write_manifest  # noqa: E402
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Build the registry manifest")
+    parser.add_argument("--output", type=Path, default=None, help="Manifest path")
+    args = parser.parse_args()
+
+    output = args.output or manifest_path()
+    manifest = write_manifest(output)
+
+    per_module = Counter(entry["module"] for entry in manifest["functions"])
+    print(f"✅ Wrote {output} with {len(manifest['functions'])} functions from {len(per_module)} modules")
+    for module, count in sorted(per_module.items()):
+        print(f"  {module}: {count}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
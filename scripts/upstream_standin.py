@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Run the Upstream Stand-In Server
+
+Serves recorded explorer, Provenance API, Figure Markets and system-context payloads
+on one local port, with configurable latency, jitter and failure injection, so the
+MCP/REST server can be benchmarked and load tested without touching production APIs.
+Point the server under test at it with UPSTREAM_BASE_URL:
+
+    uv run python scripts/upstream_standin.py --port 8765 --latency lognormal:40:15
+    UPSTREAM_BASE_URL=http://127.0.0.1:8765 uv run python benchmarks/...
+
+Latency specs are "kind:mean_ms[:jitter_ms]" with kind one of fixed, uniform, normal,
+lognormal or exponential. Use --upstream-latency to override one upstream:
+
+    --upstream-latency explorer=lognormal:120:60 --upstream-latency figure_markets=30
+
+With --record, requests without a fixture are forwarded to the real upstreams and the
+captured responses are written to the fixtures directory on exit.
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).parent.parent / "tests"))
+
+from standin import DEFAULT_FIXTURES_DIR, UpstreamStandin  # noqa: E402
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Run the upstream stand-in server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--fixtures", type=Path, default=DEFAULT_FIXTURES_DIR, help="Fixtures directory")
+    parser.add_argument("--latency", default="0", help="Latency spec for every upstream")
+    parser.add_argument("--upstream-latency", action="append", default=[], metavar="NAME=SPEC",
+                        help="Latency spec for one upstream (repeatable)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests that fail")
+    parser.add_argument("--error-status", type=int, default=503)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--record", action="store_true", help="Forward and capture unknown requests")
+    args = parser.parse_args()
+
+    latency = {"*": args.latency}
+    for item in args.upstream_latency:
+        name, _, spec = item.partition("=")
+        latency[name] = spec
+
+    standin = UpstreamStandin(
+        fixtures=args.fixtures,
+        latency=latency,
+        mode="record" if args.record else "replay",
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        host=args.host,
+        port=args.port,
+        seed=args.seed,
+    )
+    print(f"🧪 Upstream stand-in serving {len(standin.fixtures.fixtures())} fixtures on {standin.url}")
+    print(f"   export UPSTREAM_BASE_URL={standin.url}")
+    try:
+        standin.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if standin.recorded:
+            for path in standin.save_recordings(args.fixtures):
+                print(f"💾 Saved recordings to {path}")
+        print(json.dumps(standin.stats(), indent=2))
+        standin.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
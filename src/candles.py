@@ -0,0 +1,171 @@
+"""
+OHLCV Candles over Exchange Trades
+
+Rolls the trades held in the trade store into open/high/low/close/volume bars of a
+fixed interval (1m, 5m, 15m, 1h, 4h, 1d; UTC-aligned). Candles are only made for
+intervals with trades.
+
+Each (pair, interval) series keeps its candles in parallel typed arrays, bounded to
+max_candles (the oldest are dropped), and remembers how far into the pair's trades it
+has read. Updating a series folds in only the trades appended since the last update;
+it is rebuilt from all trades when the trade store replaced the pair's history.
+
+Trades are bucketed a run at a time rather than trade by trade: the trades are time
+ordered, so the end of each bucket is found by bisection and its high, low and volume
+are computed over the array slice by the built-in min, max and sum.
+"""
+
+import threading
+from array import array
+from bisect import bisect_left
+from typing import Any
+
+from trade_store import PairTrades, TradeStore
+
+INTERVALS = {
+    "1m": 60_000,
+    "5m": 300_000,
+    "15m": 900_000,
+    "1h": 3_600_000,
+    "4h": 14_400_000,
+    "1d": 86_400_000,
+}
+MAX_CANDLES = 1000
+
+
+class CandleSeries:
+    """Candles of one pair at one interval, oldest first"""
+
+    def __init__(self, pair: str, interval: str, max_candles: int = MAX_CANDLES):
+        """
+        Raises:
+            ValueError: If interval is not one of INTERVALS
+        """
+        if interval not in INTERVALS:
+            raise ValueError(f"Unknown interval {interval!r}, expected one of {', '.join(INTERVALS)}")
+        self.pair = pair
+        self.interval = interval
+        self.width = INTERVALS[interval]
+        self.max_candles = max_candles
+        self.source: PairTrades | None = None
+        self.generation = -1
+        self.position = 0             # trades of the source generation folded in so far
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        self.times = array("q")
+        self.open, self.high, self.low = array("d"), array("d"), array("d")
+        self.close, self.volume = array("d"), array("d")
+        self.trades = array("q")
+
+    def __len__(self) -> int:
+        return len(self.times)
+
+    def add(self, times: array, prices: array, quantities: array, start: int = 0) -> None:
+        """Fold the trades times[start:] (time ordered) into the candles"""
+        end = len(times)
+        i = start
+        while i < end:
+            bucket = times[i] - times[i] % self.width
+            j = bisect_left(times, bucket + self.width, i, end)
+            high, low = max(prices[i:j]), min(prices[i:j])
+            volume = sum(quantities[i:j])
+            if self.times and self.times[-1] == bucket:
+                self.high[-1] = max(self.high[-1], high)
+                self.low[-1] = min(self.low[-1], low)
+                self.close[-1] = prices[j - 1]
+                self.volume[-1] += volume
+                self.trades[-1] += j - i
+            else:
+                self.times.append(bucket)
+                self.open.append(prices[i])
+                self.high.append(high)
+                self.low.append(low)
+                self.close.append(prices[j - 1])
+                self.volume.append(volume)
+                self.trades.append(j - i)
+            i = j
+        self.trim()
+
+    def trim(self) -> None:
+        """Drop the oldest candles beyond max_candles"""
+        excess = len(self.times) - self.max_candles
+        if excess > 0:
+            for column in (self.times, self.open, self.high, self.low, self.close, self.volume, self.trades):
+                del column[:excess]
+
+    def columns(self, limit: int) -> dict[str, Any]:
+        """The last limit candles as parallel lists"""
+        start = max(0, len(self.times) - limit)
+        return {
+            "pair": self.pair,
+            "interval": self.interval,
+            "times_ms": self.times[start:].tolist(),
+            "open": self.open[start:].tolist(),
+            "high": self.high[start:].tolist(),
+            "low": self.low[start:].tolist(),
+            "close": self.close[start:].tolist(),
+            "volume": self.volume[start:].tolist(),
+            "trades": self.trades[start:].tolist(),
+            "count": len(self.times) - start,
+        }
+
+
+class CandleEngine:
+    """Candle series per (pair, interval), kept up to date with a trade store"""
+
+    def __init__(self, max_candles: int = MAX_CANDLES):
+        self.max_candles = max_candles
+        self._series: dict[tuple[str, str], CandleSeries] = {}
+        self._lock = threading.Lock()
+
+    def series(self, pair: str, interval: str) -> CandleSeries:
+        """
+        Raises:
+            ValueError: If interval is not one of INTERVALS
+        """
+        with self._lock:
+            series = self._series.get((pair, interval))
+            if series is None:
+                series = self._series[(pair, interval)] = CandleSeries(pair, interval, self.max_candles)
+            return series
+
+    @staticmethod
+    def update(series: CandleSeries, trades: PairTrades) -> None:
+        """Fold the trades appended since the last update into series"""
+        with trades.lock:
+            if series.source is not trades or series.generation != trades.generation:
+                series.reset()
+                series.source, series.generation = trades, trades.generation
+                series.position = trades.trimmed
+            start = max(0, series.position - trades.trimmed)
+            if start < len(trades):
+                series.add(trades.times, trades.prices, trades.quantities, start)
+            series.position = trades.trimmed + len(trades)
+
+    def candles(self, store: TradeStore, pair: str, interval: str, limit: int = 100) -> dict[str, Any]:
+        """The last limit candles of a pair from the trades in store, as parallel lists"""
+        trades = store.get(pair)
+        if trades is None:
+            # No series is kept for pairs the store does not hold
+            return CandleSeries(pair, interval, self.max_candles).columns(limit)
+        series = self.series(pair, interval)
+        with series.lock:
+            self.update(series, trades)
+            return series.columns(limit)
+
+
+# Global engine instance
+_global_engine: CandleEngine | None = None
+_global_lock = threading.Lock()
+
+
+def get_candle_engine() -> CandleEngine:
+    """Get the global candle engine (created on first use)"""
+    global _global_engine
+    if _global_engine is None:
+        with _global_lock:
+            if _global_engine is None:
+                _global_engine = CandleEngine()
+    return _global_engine
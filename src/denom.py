@@ -1,4 +1,5 @@
-from typing import Any, Union
+import time
+from typing import Any, Iterable, NamedTuple, Union
 from decimal import Decimal
 
 # Base Currency in Trading Pairs: In a crypto trading pair like BTC/USDT, 
@@ -53,16 +54,131 @@ assets_denoms = [
 		
 	]
 
+class DenomEntry(NamedTuple):
+	base_denom: str
+	conv: int
+	unit_denom: str
+	symbol: str
+
+
+def _build_index(entries: Iterable[dict]) -> dict[str, DenomEntry]:
+	return {e["denom"]: DenomEntry(e["base_denom"], int(e["conv"]), e["unit_denom"], e["symbol"]) for e in entries}
+
+
+# denom -> (base_denom, conv, unit_denom, symbol), from assets_denoms plus the assets
+# picked up by update_denom_index()
+denom_index: dict[str, DenomEntry] = _build_index(assets_denoms)
+_index_refreshed_at = 0.0
+
+DENOM_INDEX_MAX_AGE = 3600
+
+
+def base_amount(amount: Any, conv: int) -> int:
+	"""amount (int, decimal string, Decimal or float) times conv as an integer, truncated
+		toward zero like int(Decimal(amount) * conv), but computed on integers only so
+		large amounts do not lose digits to the decimal context's precision.
+	"""
+	if isinstance(amount, int) and not isinstance(amount, bool):
+		return amount * conv
+	sign, digits, exponent = (amount if isinstance(amount, Decimal) else Decimal(amount)).as_tuple()
+	if not isinstance(exponent, int):
+		raise ValueError(f"Not a finite amount: {amount!r}")
+	value = int("".join(map(str, digits)) or "0") * conv
+	value = value * 10 ** exponent if exponent >= 0 else value // 10 ** -exponent
+	return -value if sign else value
+
+
 def amt_base_denom(amt_denom: Any) -> Any:
 	"""for an amount-denom, like {"amount": 123, "denom": "hash"},
 		the function converts the amount of the equivalent base denom according to the assets_denoms table,
 		and will return: {"amount": 123000000000, "denom": "nhash"}
 		if it does not recognize the denom, it will return the amount-denom unchanged.
 	"""
-	for asset_denom in assets_denoms:
-		if amt_denom["denom"] == asset_denom["denom"]:
-			return {"amount": int(Decimal(amt_denom["amount"]) * asset_denom["conv"]), "denom": asset_denom["base_denom"]}
-	return amt_denom
+	entry = denom_index.get(amt_denom["denom"])
+	if entry is None:
+		return amt_denom
+	return {"amount": base_amount(amt_denom["amount"], entry.conv), "denom": entry.base_denom}
+
+
+def amts_base_denom(amt_denoms: Iterable[dict]) -> list[dict]:
+	"""amt_base_denom() for a list of amount-denoms in one pass;
+		amount-denoms with unrecognized denoms are returned unchanged.
+	"""
+	index = denom_index
+	converted = []
+	for amt_denom in amt_denoms:
+		entry = index.get(amt_denom["denom"])
+		if entry is None:
+			converted.append(amt_denom)
+		else:
+			converted.append({"amount": base_amount(amt_denom["amount"], entry.conv), "denom": entry.base_denom})
+	return converted
+
+
+def sum_amts_base_denom(amt_denoms: Iterable[dict]) -> dict[str, int]:
+	"""Integer totals per base denom of a list of amount-denoms, like
+		{"nhash": 123000000000, "uusd": 5000000}.
+		Unrecognized denoms are their own base denom.
+	"""
+	index = denom_index
+	totals: dict[str, int] = {}
+	for amt_denom in amt_denoms:
+		entry = index.get(amt_denom["denom"])
+		if entry is None:
+			denom, amount = amt_denom["denom"], base_amount(amt_denom["amount"], 1)
+		else:
+			denom, amount = entry.base_denom, base_amount(amt_denom["amount"], entry.conv)
+		totals[denom] = totals.get(denom, 0) + amount
+	return totals
+
+
+def update_denom_index(assets: Iterable[dict]) -> list[str]:
+	"""Add the denoms of exchange assets missing from the index, from the output of
+		fetch_figure_markets_assets_info(). A new marker denom of a known unit denom
+		(its lower-cased asset name, with a matching exponent) shares that unit's base
+		denom, like uusdc.figure.se -> uusdc; otherwise the marker denom becomes a base
+		denom and the unit denom is worth 10**asset_exponent of it.
+		Denoms already in the index keep their entries. Returns the denoms added.
+	"""
+	global denom_index
+	index = dict(denom_index)
+	added = []
+	for asset in assets:
+		marker, name, exponent = asset.get("asset_denom"), asset.get("asset_name"), asset.get("asset_exponent")
+		if not marker or not name or exponent is None:
+			continue
+		unit, conv = name.lower(), 10 ** int(exponent)
+		known_unit = index.get(unit)
+		if marker not in index:
+			if known_unit is not None and known_unit.conv == conv:
+				index[marker] = DenomEntry(known_unit.base_denom, 1, known_unit.unit_denom, known_unit.symbol)
+			else:
+				index[marker] = DenomEntry(marker, 1, unit, name.upper())
+			added.append(marker)
+		if known_unit is None:
+			base = index[marker]
+			index[unit] = DenomEntry(base.base_denom, conv, unit, base.symbol)
+			added.append(unit)
+	denom_index = index  # swapped whole: readers never see a half-updated index
+	return added
+
+
+async def refresh_denom_index(max_age: float = DENOM_INDEX_MAX_AGE) -> list[str]:
+	"""Update the index from the assets listed on Figure Markets when it was last
+		refreshed more than max_age seconds ago. Returns the denoms added; a failed
+		fetch leaves the index as it is.
+	"""
+	global _index_refreshed_at
+	if time.monotonic() - _index_refreshed_at < max_age and _index_refreshed_at:
+		return []
+	# Import here to avoid circular imports
+	from functions.figure_markets_functions import fetch_figure_markets_assets_info
+
+	assets = await fetch_figure_markets_assets_info()
+	if not isinstance(assets, list):
+		return []
+	_index_refreshed_at = time.monotonic()
+	return update_denom_index(assets)
 
 
 if __name__ == "__main__":
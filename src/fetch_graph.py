@@ -0,0 +1,244 @@
+"""
+Dependency-Graph Executor for Aggregate Functions
+
+Aggregate functions declare their sub-fetches as nodes of a small DAG. Every node
+starts as soon as the nodes it depends on have resolved, instead of waiting for a
+whole asyncio.gather() wave to finish. Each node runs under its own timeout, and a
+failing or slow node never fails the graph: its slot holds an MCP-ERROR dict and the
+remaining nodes still complete, so callers always get partial results.
+
+Example:
+    graph = FetchGraph(default_timeout=10.0)
+    graph.add("is_vesting", lambda: fetch_account_is_vesting(wallet))
+    graph.add(
+        "vesting_data",
+        lambda is_vesting: fetch_vesting_total_unvested_amount(wallet),
+        depends_on=["is_vesting"],
+        when=lambda is_vesting: is_vesting.get("wallet_is_vesting") is True,
+        default={},
+    )
+    result = await graph.run()
+    result["vesting_data"]
+
+Batch aggregates that run the same fetch over many inputs (e.g. one summary per
+wallet) use fan_out() instead: at most max_concurrency fetches in flight, results
+yielded as they complete, with the same per-fetch timeout and MCP-ERROR semantics.
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterable, TypeVar
+
+from utils import JSONType
+
+T = TypeVar("T")
+
+
+@dataclass
+class FetchNode:
+    """A single sub-fetch of an aggregate"""
+    name: str
+    fetch: Callable[..., Awaitable[JSONType]]
+    depends_on: list[str] = field(default_factory=list)
+    timeout: float | None = None
+    when: Callable[..., bool] | None = None
+    default: JSONType = None
+
+
+@dataclass
+class GraphResult:
+    """Results of a graph run, keyed by node name"""
+    values: dict[str, JSONType]
+    timings_ms: dict[str, dict[str, float]]
+    skipped: list[str]
+    total_ms: float
+
+    def __getitem__(self, name: str) -> JSONType:
+        return self.values[name]
+
+    @property
+    def errors(self) -> dict[str, str]:
+        """Nodes whose result is an MCP-ERROR dict"""
+        return {
+            name: value["MCP-ERROR"]
+            for name, value in self.values.items()
+            if isinstance(value, dict) and value.get("MCP-ERROR")
+        }
+
+    @property
+    def partial(self) -> bool:
+        return bool(self.errors)
+
+
+def is_error(value: Any) -> bool:
+    """True if a node value is an MCP-ERROR dict"""
+    return isinstance(value, dict) and bool(value.get("MCP-ERROR"))
+
+
+class FetchGraph:
+    """
+    Declarative DAG of async sub-fetches.
+
+    Nodes receive the results of their dependencies as keyword arguments named after
+    the dependency nodes. A node whose dependency failed is not run; it resolves to an
+    MCP-ERROR naming the failed dependency. A node whose 'when' predicate returns False
+    is skipped and resolves to its 'default' value.
+    """
+
+    def __init__(self, default_timeout: float | None = 10.0):
+        self.default_timeout = default_timeout
+        self._nodes: dict[str, FetchNode] = {}
+
+    def add(
+        self,
+        name: str,
+        fetch: Callable[..., Awaitable[JSONType]],
+        depends_on: list[str] | None = None,
+        timeout: float | None = None,
+        when: Callable[..., bool] | None = None,
+        default: JSONType = None,
+    ) -> "FetchGraph":
+        """
+        Declare a sub-fetch.
+
+        Args:
+            name: Node name, also the key of its result
+            fetch: Coroutine factory; called with dependency results as kwargs
+            depends_on: Names of nodes whose results this node needs
+            timeout: Seconds before the node resolves to a timeout error
+                     (defaults to the graph's default_timeout)
+            when: Predicate over the dependency results; False skips the node
+            default: Result of the node when it is skipped
+
+        Returns:
+            The graph, so declarations can be chained
+        """
+        if name in self._nodes:
+            raise ValueError(f"Duplicate node '{name}'")
+        self._nodes[name] = FetchNode(
+            name=name,
+            fetch=fetch,
+            depends_on=list(depends_on or []),
+            timeout=timeout,
+            when=when,
+            default=default,
+        )
+        return self
+
+    def _topological_order(self) -> list[str]:
+        """Validate dependencies and return node names with dependencies first"""
+        order: list[str] = []
+        state: dict[str, str] = {}
+
+        def visit(name: str, path: list[str]) -> None:
+            if state.get(name) == "done":
+                return
+            if state.get(name) == "visiting":
+                raise ValueError(f"Dependency cycle: {' -> '.join([*path, name])}")
+            if name not in self._nodes:
+                raise ValueError(f"Unknown dependency '{name}' of node '{path[-1]}'")
+            state[name] = "visiting"
+            for dep in self._nodes[name].depends_on:
+                visit(dep, [*path, name])
+            state[name] = "done"
+            order.append(name)
+
+        for name in self._nodes:
+            visit(name, [])
+        return order
+
+    async def run(self) -> GraphResult:
+        """Run every node as soon as its dependencies resolve"""
+        order = self._topological_order()
+        tasks: dict[str, asyncio.Task] = {}
+        timings: dict[str, dict[str, float]] = {}
+        skipped: list[str] = []
+        graph_start = time.perf_counter()
+
+        def elapsed_ms() -> float:
+            return round((time.perf_counter() - graph_start) * 1000, 2)
+
+        async def run_node(node: FetchNode) -> JSONType:
+            inputs = {}
+            for dep in node.depends_on:
+                inputs[dep] = await tasks[dep]
+
+            failed = [dep for dep, value in inputs.items() if is_error(value)]
+            if failed:
+                skipped.append(node.name)
+                return {"MCP-ERROR": f"Dependency failed: {', '.join(failed)}"}
+
+            if node.when is not None and not node.when(**inputs):
+                skipped.append(node.name)
+                return node.default
+
+            timeout = node.timeout if node.timeout is not None else self.default_timeout
+            start = elapsed_ms()
+            try:
+                return await asyncio.wait_for(node.fetch(**inputs), timeout)
+            except asyncio.TimeoutError:
+                return {"MCP-ERROR": f"Timed out after {timeout}s"}
+            except Exception as e:
+                return {"MCP-ERROR": str(e)}
+            finally:
+                timings[node.name] = {"start_ms": start, "end_ms": elapsed_ms()}
+
+        for name in order:
+            tasks[name] = asyncio.ensure_future(run_node(self._nodes[name]))
+
+        values = dict(zip(order, await asyncio.gather(*tasks.values())))
+        return GraphResult(
+            values={name: values[name] for name in self._nodes},
+            timings_ms=timings,
+            skipped=skipped,
+            total_ms=elapsed_ms(),
+        )
+
+
+async def fan_out(
+    items: Iterable[T],
+    fetch: Callable[[T], Awaitable[JSONType]],
+    max_concurrency: int = 8,
+    timeout: float | None = 10.0,
+) -> AsyncIterator[tuple[int, JSONType]]:
+    """
+    Run fetch(item) for every item with bounded concurrency.
+
+    Yields (index, result) pairs in completion order. A fetch that fails or exceeds
+    its timeout yields an MCP-ERROR dict instead of raising. Closing the generator
+    early cancels the fetches still in flight.
+
+    Args:
+        items: Inputs, each passed to fetch
+        fetch: Coroutine function called once per item
+        max_concurrency: Maximum number of fetches in flight
+        timeout: Seconds before a single fetch resolves to a timeout error
+    """
+    if max_concurrency < 1:
+        raise ValueError("max_concurrency must be at least 1")
+    items = list(items)
+    results: asyncio.Queue = asyncio.Queue()
+    next_index = 0
+
+    async def worker() -> None:
+        nonlocal next_index
+        while next_index < len(items):
+            index = next_index
+            next_index += 1
+            try:
+                value = await asyncio.wait_for(fetch(items[index]), timeout)
+            except asyncio.TimeoutError:
+                value = {"MCP-ERROR": f"Timed out after {timeout}s"}
+            except Exception as e:
+                value = {"MCP-ERROR": str(e)}
+            results.put_nowait((index, value))
+
+    workers = [asyncio.ensure_future(worker()) for _ in range(min(max_concurrency, len(items)))]
+    try:
+        for _ in range(len(items)):
+            yield await results.get()
+    finally:
+        for task in workers:
+            task.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
@@ -4,87 +4,20 @@ Business Functions for pb-fm-mcp
 This module contains all business logic functions organized by domain.
 Each function is decorated with @api_function to be automatically exposed
 via both MCP and REST protocols.
-"""
-
-# Import function modules to trigger decorator registration
-try:
-    from . import stats_functions
-except Exception as e:
-    print(f"❌ Failed to import stats_functions: {e}")
-
-try:
-    from . import delegation_functions
-except Exception as e:
-    print(f"❌ Failed to import delegation_functions: {e}")
-
-try:
-    from . import blockchain_functions
-except Exception as e:
-    print(f"❌ Failed to import blockchain_functions: {e}")
-
-try:
-    from . import figure_markets_functions
-except Exception as e:
-    print(f"❌ Failed to import figure_markets_functions: {e}")
-
-try:
-    from . import aggregate_functions
-except Exception as e:
-    print(f"❌ Failed to import aggregate_functions: {e}")
-
-try:
-    from . import system_functions
-except Exception as e:
-    print(f"❌ Failed to import system_functions: {e}")
-
-try:
-    from . import webui_functions
-except Exception as e:
-    print(f"❌ Failed to import webui_functions: {e}")
-
-try:
-    from . import visualization_functions
-except Exception as e:
-    print(f"❌ Failed to import visualization_functions: {e}")
-
-try:
-    from . import browser_automation
-except Exception as e:
-    print(f"❌ Failed to import browser_automation: {e}")
 
-try:
-    from . import dynamic_visualization
-except Exception as e:
-    print(f"❌ Failed to import dynamic_visualization: {e}")
-
-try:
-    from . import debug_functions
-except Exception as e:
-    print(f"❌ Failed to import debug_functions: {e}")
-
-try:
-    from . import declarative_dashboard
-except Exception as e:
-    print(f"❌ Failed to import declarative_dashboard: {e}")
-
-try:
-    from . import dashboard_coordinator
-except Exception as e:
-    print(f"❌ Failed to import dashboard_coordinator: {e}")
+When a registry manifest built for the current sources is present (see
+registry.manifest), the function modules are not imported here: every function is
+registered from the manifest and its module is imported on first invocation.
+Set FUNCTIONS_LAZY_LOADING=false to always import every module eagerly.
+"""
 
-try:
-    from . import sqs_traffic_light
-except Exception as e:
-    print(f"❌ Failed to import sqs_traffic_light: {e}")
+import importlib
 
-try:
-    from . import ai_terminal
-except Exception as e:
-    print(f"❌ Failed to import ai_terminal: {e}")
+from registry.manifest import lazy_loading_enabled, load_manifest, register_lazy_functions
 
-__all__ = [
+FUNCTION_MODULES = [
     "stats_functions",
-    "delegation_functions", 
+    "delegation_functions",
     "blockchain_functions",
     "figure_markets_functions",
     "aggregate_functions",
@@ -98,4 +31,23 @@ __all__ = [
     "dashboard_coordinator",
     "sqs_traffic_light",
     "ai_terminal",
-]
\ No newline at end of file
+]
+
+
+def import_function_modules() -> None:
+    """Import every function module to trigger decorator registration"""
+    for module_name in FUNCTION_MODULES:
+        try:
+            importlib.import_module(f".{module_name}", __name__)
+        except Exception as e:
+            print(f"❌ Failed to import {module_name}: {e}")
+
+
+manifest = load_manifest() if lazy_loading_enabled() else None
+
+if manifest is not None:
+    register_lazy_functions(manifest)
+else:
+    import_function_modules()
+
+__all__ = FUNCTION_MODULES
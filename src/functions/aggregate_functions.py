@@ -3,22 +3,26 @@ Aggregate Functions for Common MCP Usage Patterns
 
 These functions combine multiple individual API calls to provide comprehensive
 data summaries that are especially useful for MCP agents. Each aggregate function
-uses asyncio.gather() for concurrent API calls and provides comprehensive error handling.
+declares its sub-fetches as a FetchGraph, so every call starts as soon as its own
+inputs are available, runs under its own timeout, and failures yield partial results.
 
 All functions are decorated with @api_function to be automatically exposed via MCP and/or REST protocols.
 """
 
-import asyncio
-from typing import Any
+import re
+from decimal import Decimal
+from typing import Any, AsyncIterator
 
 import structlog
 
+from fetch_graph import FetchGraph, fan_out, is_error
 from functions.blockchain_functions import (
     fetch_account_info,
     fetch_account_is_vesting,
     fetch_available_committed_amount,
     fetch_total_delegation_data,
     fetch_vesting_total_unvested_amount,
+    fetch_wallet_balances,
 )
 from functions.figure_markets_functions import (
     fetch_current_fm_account_balance_data,
@@ -30,10 +34,43 @@ from functions.figure_markets_functions import (
 from functions.stats_functions import fetch_current_hash_statistics, get_system_context
 from registry import api_function
 from utils import JSONType
+from valuation import PriceSnapshot, get_price_snapshot, usd, value_holdings
 
 # Set up logging
 logger = structlog.get_logger()
 
+# Batch wallet summaries
+MAX_BATCH_WALLETS = 500
+MAX_BATCH_CONCURRENCY = 32
+BATCH_WALLET_TIMEOUT = 30.0  # the vesting fetches run after the vesting check
+BECH32_ADDRESS = re.compile(r"^[a-z]{1,83}1[a-z0-9]{6,}$")
+ROLLUP_FIELDS = (
+    "account_liquid_hash",
+    "delegation_total_hash",
+    "trading_liquid_hash",
+    "vesting_unvested_hash",
+    "total_hash_all_sources",
+)
+
+# Batch market prices
+MAX_BATCH_PAIRS = 200
+MARKET_PRICE_CONCURRENCY = 8
+TOKEN_PAIR = re.compile(r"^[A-Z0-9.]+-[A-Z0-9.]+$")
+MARKET_STATS_24H = {
+    "price_change_24h": "priceChange24h",
+    "percentage_change_24h": "percentageChange24h",
+    "volume_24h": "volume24h",
+    "high_24h": "high24h",
+    "low_24h": "low24h",
+    "trade_count_24h": "tradeCount24h",
+}
+
+
+def _nhash_amount(value: Any) -> int:
+    """Integer nhash amount from a plain number or an {"amount", "denom"} dict"""
+    if isinstance(value, dict):
+        value = value.get("amount", 0)
+    return int(value or 0)
 
 
 @api_function(
@@ -66,48 +103,47 @@ async def fetch_complete_wallet_summary(wallet_address: str) -> JSONType:
     """
     logger.info(f"Fetching complete wallet summary for {wallet_address}")
     
-    # Define all concurrent tasks
-    tasks = [
-        fetch_account_info(wallet_address),
-        fetch_account_is_vesting(wallet_address), 
-        fetch_total_delegation_data(wallet_address),
-        fetch_current_fm_account_balance_data(wallet_address),
-        fetch_current_fm_account_info(wallet_address)
-    ]
-    
-    # Execute all tasks concurrently
-    results = await asyncio.gather(*tasks, return_exceptions=True)
-    
-    # Extract individual results with error handling
-    account_info = results[0] if not isinstance(results[0], Exception) else {"MCP-ERROR": str(results[0])}
-    is_vesting_result = results[1] if not isinstance(results[1], Exception) else {"MCP-ERROR": str(results[1])}
-    delegation_data = results[2] if not isinstance(results[2], Exception) else {"MCP-ERROR": str(results[2])}
-    trading_balance = results[3] if not isinstance(results[3], Exception) else {"MCP-ERROR": str(results[3])}
-    trading_account = results[4] if not isinstance(results[4], Exception) else {"MCP-ERROR": str(results[4])}
-    
-    # Handle vesting-specific data if account is vesting
-    vesting_data = {}
-    available_committed = {}
-    
-    if is_vesting_result.get("is_vesting_account") is True:
-        # Fetch additional vesting data concurrently
-        vesting_tasks = [
-            fetch_vesting_total_unvested_amount(wallet_address),
-            fetch_available_committed_amount(wallet_address)
-        ]
-        
-        vesting_results = await asyncio.gather(*vesting_tasks, return_exceptions=True)
-        
-        vesting_data = vesting_results[0] if not isinstance(vesting_results[0], Exception) else {"MCP-ERROR": str(vesting_results[0])}
-        available_committed = vesting_results[1] if not isinstance(vesting_results[1], Exception) else {"MCP-ERROR": str(vesting_results[1])}
+    # Declare all sub-fetches; the vesting fetches start as soon as the vesting
+    # check resolves instead of waiting for every other first-wave call
+    graph = FetchGraph()
+    graph.add("account_info", lambda: fetch_account_info(wallet_address))
+    graph.add("is_vesting", lambda: fetch_account_is_vesting(wallet_address))
+    graph.add("delegation_data", lambda: fetch_total_delegation_data(wallet_address))
+    graph.add("trading_balance", lambda: fetch_current_fm_account_balance_data(wallet_address))
+    graph.add("trading_account", lambda: fetch_current_fm_account_info(wallet_address))
+    
+    # Vesting-specific data is only fetched for vesting accounts
+    for name, fetch in (
+        ("vesting_data", fetch_vesting_total_unvested_amount),
+        ("available_committed", fetch_available_committed_amount),
+    ):
+        graph.add(
+            name,
+            lambda is_vesting, fetch=fetch: fetch(wallet_address),
+            depends_on=["is_vesting"],
+            when=lambda is_vesting: is_vesting.get("wallet_is_vesting") is True,
+            default={}
+        )
+    
+    results = await graph.run()
+    
+    account_info = results["account_info"]
+    is_vesting_result = results["is_vesting"]
+    delegation_data = results["delegation_data"]
+    trading_balance = results["trading_balance"]
+    trading_account = results["trading_account"]
+    
+    # A failed vesting check leaves the vesting fields empty, as before
+    vesting_data = results["vesting_data"] if not is_error(is_vesting_result) else {}
+    available_committed = results["available_committed"] if not is_error(is_vesting_result) else {}
     
     # Calculate summary totals (only if no critical errors)
     summary_totals = {}
     
     if not delegation_data.get("MCP-ERROR") and not account_info.get("MCP-ERROR"):
         try:
-            # Extract amounts from delegation data
-            delegated_total = delegation_data.get("delegated_total_delegated_amount", 0)
+            # Extract amounts from delegation data (amount-denom dicts in nhash)
+            delegated_total = _nhash_amount(delegation_data.get("delegated_total_delegated_amount", 0))
             
             # Extract account balance
             account_balance = 0
@@ -138,7 +174,7 @@ async def fetch_complete_wallet_summary(wallet_address: str) -> JSONType:
             
             # Add vesting amounts if applicable
             if vesting_data and not vesting_data.get("MCP-ERROR"):
-                vesting_amount = vesting_data.get("vesting_total_unvested_amount", 0)
+                vesting_amount = _nhash_amount(vesting_data.get("vesting_total_unvested_amount", 0))
                 summary_totals["vesting_unvested_hash"] = vesting_amount
                 summary_totals["total_hash_all_sources"] += vesting_amount
                 
@@ -183,36 +219,27 @@ async def fetch_market_overview_summary() -> JSONType:
     """
     logger.info("Fetching comprehensive market overview")
     
-    # Define concurrent market data tasks
-    tasks = [
-        fetch_current_fm_data(),
-        fetch_current_hash_statistics(), 
-        fetch_figure_markets_assets_info(),
-        get_system_context()
-    ]
+    # All market data and key token prices are independent - run them as one graph
+    graph = FetchGraph()
+    graph.add("fm_data", fetch_current_fm_data)
+    graph.add("hash_stats", fetch_current_hash_statistics)
+    graph.add("trading_assets", fetch_figure_markets_assets_info)
+    graph.add("system_context", get_system_context, timeout=30.0)
+    graph.add("HASH_USD", lambda: fetch_last_crypto_token_price("HASH-USD", 1))
+    graph.add("BTC_USD", lambda: fetch_last_crypto_token_price("BTC-USD", 1))
+    graph.add("ETH_USD", lambda: fetch_last_crypto_token_price("ETH-USD", 1))
     
-    # Execute market data tasks concurrently
-    results = await asyncio.gather(*tasks, return_exceptions=True)
+    results = await graph.run()
     
-    # Extract results with error handling
-    fm_data = results[0] if not isinstance(results[0], Exception) else {"MCP-ERROR": str(results[0])}
-    hash_stats = results[1] if not isinstance(results[1], Exception) else {"MCP-ERROR": str(results[1])}
-    trading_assets = results[2] if not isinstance(results[2], Exception) else {"MCP-ERROR": str(results[2])}
-    system_context = results[3] if not isinstance(results[3], Exception) else {"MCP-ERROR": str(results[3])}
-    
-    # Fetch key token prices concurrently
-    price_tasks = [
-        fetch_last_crypto_token_price("HASH-USD", 1),
-        fetch_last_crypto_token_price("BTC-USD", 1), 
-        fetch_last_crypto_token_price("ETH-USD", 1)
-    ]
-    
-    price_results = await asyncio.gather(*price_tasks, return_exceptions=True)
+    fm_data = results["fm_data"]
+    hash_stats = results["hash_stats"]
+    trading_assets = results["trading_assets"]
+    system_context = results["system_context"]
     
     key_token_prices = {
-        "HASH_USD": price_results[0] if not isinstance(price_results[0], Exception) else {"MCP-ERROR": str(price_results[0])},
-        "BTC_USD": price_results[1] if not isinstance(price_results[1], Exception) else {"MCP-ERROR": str(price_results[1])},
-        "ETH_USD": price_results[2] if not isinstance(price_results[2], Exception) else {"MCP-ERROR": str(price_results[2])}
+        "HASH_USD": results["HASH_USD"],
+        "BTC_USD": results["BTC_USD"],
+        "ETH_USD": results["ETH_USD"]
     }
     
     return {
@@ -224,4 +251,386 @@ async def fetch_market_overview_summary() -> JSONType:
     }
 
 
+def normalize_token_pairs(token_pairs: list[str] | str) -> list[str]:
+    """
+    Deduplicated, upper-cased trading pairs in input order.
+
+    Accepts a list or a comma-separated string (REST query parameters).
+
+    Raises:
+        ValueError: If the list is empty, too long, or holds malformed pairs
+    """
+    if isinstance(token_pairs, str):
+        token_pairs = token_pairs.split(",")
+    pairs = list(dict.fromkeys(
+        pair.strip().upper() for pair in token_pairs if isinstance(pair, str) and pair.strip()
+    ))
+    if not pairs:
+        raise ValueError("token_pairs must contain at least one pair")
+    if len(pairs) > MAX_BATCH_PAIRS:
+        raise ValueError(f"At most {MAX_BATCH_PAIRS} pairs per batch, got {len(pairs)}")
+    invalid = [pair for pair in pairs if not TOKEN_PAIR.match(pair)]
+    if invalid:
+        raise ValueError(f"Invalid token pair(s): {', '.join(invalid[:5])}")
+    return pairs
+
+
+@api_function(
+    protocols=["mcp", "rest"],
+    path="/api/fetch_market_prices",
+    method="GET",
+    description="Get last price, 24h change and 24h volume for many Figure Markets pairs in one call",
+    tags=["aggregates", "markets", "prices", "batch"]
+)
+async def fetch_market_prices(token_pairs: list[str] | None = None) -> JSONType:
+    """
+    Get the last traded price with the 24 hour change, range and volume for a list of
+    trading pairs in a single call, keyed by pair.
+    
+    The 24 hour figures of all pairs come from one market data fetch; the last trades
+    of the pairs are fetched concurrently through the trade store, so a repeated call
+    only downloads trades made since the previous one.
+    
+    Args:
+        token_pairs: Pairs like HASH-USD or BTC-USD, as a list or comma-separated
+                     (default: every pair listed on Figure Markets)
+        
+    Returns:
+        Dictionary containing:
+        - prices: Per pair: last_price, last_trade_time, price_change_24h,
+          percentage_change_24h, volume_24h, high_24h, low_24h and trade_count_24h,
+          plus stale_age_seconds when any of them was served stale (the age of the
+          oldest stale source)
+        - pair_count: Number of pairs with prices
+        - errors: Error message per pair without a price
+    """
+    if token_pairs:
+        try:
+            pairs = normalize_token_pairs(token_pairs)
+        except ValueError as e:
+            return {"MCP-ERROR": str(e)}
+    else:
+        pairs = None
+    
+    fm_data = await fetch_current_fm_data()
+    if is_error(fm_data):
+        return fm_data
+    markets = {market.get("symbol"): market for market in fm_data.get("data", [])}
+    market_stale = fm_data.get("MCP-STALE")
+    if pairs is None:
+        pairs = [symbol for symbol in markets if symbol]
+    
+    prices: dict[str, Any] = {}
+    errors: dict[str, str] = {}
+    listed = [pair for pair in pairs if pair in markets]
+    errors.update({pair: "Not listed on Figure Markets" for pair in pairs if pair not in markets})
+    
+    async for index, last_trade in fan_out(
+        listed, lambda pair: fetch_last_crypto_token_price(pair, 1), max_concurrency=MARKET_PRICE_CONCURRENCY
+    ):
+        pair = listed[index]
+        market = markets[pair]
+        matches = [] if is_error(last_trade) else last_trade.get("matches") or []
+        entry = {
+            # The last trade is fresher than the market data's cached lastTradedPrice
+            "last_price": matches[0]["price"] if matches else market.get("lastTradedPrice"),
+            "last_trade_time": matches[0]["created"] if matches else None,
+        }
+        entry.update({name: market.get(field) for name, field in MARKET_STATS_24H.items()})
+        stale_ages = [
+            stale["max_age_seconds"]
+            for stale in (market_stale, last_trade.get("MCP-STALE") if matches else None) if stale
+        ]
+        if stale_ages:
+            entry["stale_age_seconds"] = max(stale_ages)
+        if entry["last_price"] is None:
+            errors[pair] = last_trade["MCP-ERROR"] if is_error(last_trade) else "No trades"
+            continue
+        prices[pair] = entry
+    
+    return {
+        "prices": {pair: prices[pair] for pair in pairs if pair in prices},
+        "pair_count": len(prices),
+        "errors": errors,
+    }
+
+
+def normalize_wallet_addresses(wallet_addresses: list[str] | str) -> list[str]:
+    """
+    Deduplicated wallet addresses in input order.
+
+    Accepts a list or a comma-separated string (REST query parameters).
+
+    Raises:
+        ValueError: If the list is empty, too long, or holds malformed addresses
+    """
+    if isinstance(wallet_addresses, str):
+        wallet_addresses = wallet_addresses.split(",")
+    addresses = list(dict.fromkeys(
+        address.strip() for address in wallet_addresses if isinstance(address, str) and address.strip()
+    ))
+    if not addresses:
+        raise ValueError("wallet_addresses must contain at least one address")
+    if len(addresses) > MAX_BATCH_WALLETS:
+        raise ValueError(f"At most {MAX_BATCH_WALLETS} wallets per batch, got {len(addresses)}")
+    invalid = [address for address in addresses if not BECH32_ADDRESS.match(address)]
+    if invalid:
+        raise ValueError(f"Invalid Bech32 address(es): {', '.join(invalid[:5])}")
+    return addresses
+
+
+class WalletRollup:
+    """Running totals across the wallet summaries of a batch"""
+
+    def __init__(self):
+        self.totals = dict.fromkeys(ROLLUP_FIELDS, 0)
+        self.wallets = 0
+        self.complete = 0
+        self.vesting_wallets = 0
+        self.errors: dict[str, str] = {}
+
+    def add(self, wallet_address: str, summary: JSONType) -> None:
+        self.wallets += 1
+        if is_error(summary):
+            self.errors[wallet_address] = summary["MCP-ERROR"]
+            return
+        totals = summary.get("summary_totals") or {}
+        if not totals or is_error(totals):
+            self.errors[wallet_address] = (totals or {}).get("MCP-ERROR", "Totals unavailable")
+            return
+        self.complete += 1
+        if "vesting_unvested_hash" in totals:
+            self.vesting_wallets += 1
+        for name in ROLLUP_FIELDS:
+            self.totals[name] += totals.get(name, 0)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            **self.totals,
+            "denom": "nhash",
+            "wallets": self.wallets,
+            "wallets_with_totals": self.complete,
+            "vesting_wallets": self.vesting_wallets,
+        }
+
+
+async def stream_wallet_summaries(
+    wallet_addresses: list[str],
+    max_concurrency: int = 8,
+    include_details: bool = True
+) -> AsyncIterator[dict[str, Any]]:
+    """
+    Fetch complete wallet summaries for many wallets, yielding each as it completes.
+
+    Yields {"type": "wallet", "index", "wallet_address", "summary"} per wallet in
+    completion order, then one {"type": "rollup", "rollup", "errors"} event. Every
+    wallet runs fetch_complete_wallet_summary, so the batch shares the pooled HTTP
+    clients, the response cache and request coalescing with single-wallet calls.
+
+    Args:
+        wallet_addresses: Validated addresses (see normalize_wallet_addresses)
+        max_concurrency: Wallets fetched at the same time
+        include_details: False keeps only each wallet's summary_totals
+    """
+    rollup = WalletRollup()
+    async for index, summary in fan_out(
+        wallet_addresses,
+        fetch_complete_wallet_summary,
+        max_concurrency=max_concurrency,
+        timeout=BATCH_WALLET_TIMEOUT,
+    ):
+        wallet_address = wallet_addresses[index]
+        rollup.add(wallet_address, summary)
+        if not include_details and not is_error(summary):
+            summary = {"wallet_address": wallet_address, "summary_totals": summary.get("summary_totals", {})}
+        yield {"type": "wallet", "index": index, "wallet_address": wallet_address, "summary": summary}
+    yield {"type": "rollup", "rollup": rollup.to_dict(), "errors": rollup.errors}
+
+
+@api_function(
+    protocols=["mcp", "rest"],
+    path="/api/fetch_wallet_summaries_batch",
+    method="POST",
+    description="Get complete wallet summaries for many wallets in one call, with totals rolled up across all of them",
+    tags=["aggregates", "wallet", "summary", "batch"]
+)
+async def fetch_wallet_summaries_batch(
+    wallet_addresses: list[str],
+    max_concurrency: int = 8,
+    include_details: bool = True
+) -> JSONType:
+    """
+    Get complete wallet summaries for a list of wallets in a single call.
+    
+    Each wallet gets the same summary as fetch_complete_wallet_summary; wallets are
+    fetched concurrently (at most max_concurrency at a time) and one failing wallet
+    does not fail the batch. The REST app also serves this batch as NDJSON, one line
+    per wallet as it completes, at POST /api/fetch_wallet_summaries_batch/stream.
+    
+    Args:
+        wallet_addresses: Wallets' Bech32 addresses (duplicates are fetched once)
+        max_concurrency: Wallets fetched at the same time (1-32, default 8)
+        include_details: False returns only each wallet's summary_totals
+        
+    Returns:
+        Dictionary containing:
+        - wallet_count: Number of distinct wallets
+        - wallets: Per-wallet summaries in input order
+        - rollup: Summed summary_totals (nhash) across all wallets with totals
+        - errors: Error message per wallet whose summary or totals failed
+    """
+    try:
+        addresses = normalize_wallet_addresses(wallet_addresses)
+    except ValueError as e:
+        return {"MCP-ERROR": str(e)}
+    max_concurrency = max(1, min(int(max_concurrency), MAX_BATCH_CONCURRENCY))
+    logger.info(f"Fetching wallet summaries for {len(addresses)} wallets")
+    
+    summaries: list[JSONType] = [None] * len(addresses)
+    result: dict[str, Any] = {}
+    async for event in stream_wallet_summaries(addresses, max_concurrency, include_details):
+        if event["type"] == "wallet":
+            summaries[event["index"]] = event["summary"]
+        else:
+            result = event
+    
+    return {
+        "wallet_count": len(addresses),
+        "wallets": summaries,
+        "rollup": result["rollup"],
+        "errors": result["errors"],
+    }
+
+
+async def value_wallet(wallet_address: str, snapshot: PriceSnapshot) -> JSONType:
+    """USD valuation of a wallet's liquid balances and delegated HASH at snapshot's prices"""
+    graph = FetchGraph()
+    graph.add("balances", lambda: fetch_wallet_balances(wallet_address))
+    graph.add("delegation", lambda: fetch_total_delegation_data(wallet_address))
+    results = await graph.run()
+    
+    balances = results["balances"]
+    if is_error(balances):
+        return balances
+    holdings = {
+        balance["denom"]: {"liquid": balance["amount"], "delegated": 0}
+        for balance in balances["wallet_balances"]
+    }
+    
+    # Without the delegations the valuation is partial, not failed
+    errors: dict[str, str] = {}
+    if balances.get("truncated"):
+        errors["balances"] = "Too many balance pages: only part of the balances was valued"
+    delegation = results["delegation"]
+    if is_error(delegation):
+        errors["delegation"] = delegation["MCP-ERROR"]
+    else:
+        delegated = _nhash_amount(delegation.get("delegated_total_delegated_amount", 0))
+        if delegated:
+            holdings.setdefault("nhash", {"liquid": 0, "delegated": 0})["delegated"] = delegated
+    
+    return {"wallet_address": wallet_address, **value_holdings(holdings, snapshot), "errors": errors}
+
+
+@api_function(
+    protocols=["mcp", "rest"],
+    path="/api/fetch_portfolio_valuation/{wallet_address}",
+    description="Get the USD value of every asset in a wallet and its total, at current Figure Markets prices",
+    tags=["aggregates", "wallet", "valuation", "prices"]
+)
+async def fetch_portfolio_valuation(wallet_address: str) -> JSONType:
+    """
+    Get the USD valuation of a wallet: every denomination it holds, normalized to its
+    base denomination, plus its delegated HASH, valued at the last traded USD prices
+    on Figure Markets.
+    
+    Prices come from a price snapshot shared by all valuations for 30 seconds.
+    
+    Args:
+        wallet_address: Wallet's Bech32 address
+        
+    Returns:
+        Dictionary containing:
+        - wallet_address: The wallet
+        - assets: Per base denomination, largest value first: denom, symbol, amount
+          (liquid + delegated, in the base denomination), liquid, delegated,
+          price_usd (per whole unit, like 1 HASH) and value_usd
+        - total_value_usd: Total USD value of the priced assets, rounded to cents
+        - unpriced: Base denominations without a USD price (not in the total)
+        - price_time: When the prices were taken (ISO 8601 UTC)
+        - prices_stale: Whether the market data was served stale (price_time is then
+          the time of the stale data)
+        - errors: Parts of the wallet that could not be fetched (e.g. delegation)
+    """
+    snapshot = await get_price_snapshot()
+    if is_error(snapshot):
+        return snapshot
+    return await value_wallet(wallet_address, snapshot)
+
+
+@api_function(
+    protocols=["mcp", "rest"],
+    path="/api/fetch_portfolio_valuations_batch",
+    method="POST",
+    description="Get USD valuations for many wallets in one call, all at the same prices, with a combined total",
+    tags=["aggregates", "wallet", "valuation", "prices", "batch"]
+)
+async def fetch_portfolio_valuations_batch(
+    wallet_addresses: list[str],
+    max_concurrency: int = 8
+) -> JSONType:
+    """
+    Get the USD valuations of a list of wallets in a single call.
+    
+    Each wallet gets the same valuation as fetch_portfolio_valuation. All wallets are
+    valued against one price snapshot taken at the start of the batch; wallets are
+    fetched concurrently (at most max_concurrency at a time) and one failing wallet
+    does not fail the batch.
+    
+    Args:
+        wallet_addresses: Wallets' Bech32 addresses (duplicates are valued once)
+        max_concurrency: Wallets fetched at the same time (1-32, default 8)
+        
+    Returns:
+        Dictionary containing:
+        - wallet_count: Number of distinct wallets
+        - wallets: Per-wallet valuations in input order
+        - total_value_usd: Sum of the wallets' total_value_usd
+        - price_time: When the prices were taken (ISO 8601 UTC)
+        - prices_stale: Whether the market data was served stale
+        - errors: Error message per wallet that could not be valued
+    """
+    try:
+        addresses = normalize_wallet_addresses(wallet_addresses)
+    except ValueError as e:
+        return {"MCP-ERROR": str(e)}
+    max_concurrency = max(1, min(int(max_concurrency), MAX_BATCH_CONCURRENCY))
+    
+    snapshot = await get_price_snapshot()
+    if is_error(snapshot):
+        return snapshot
+    
+    valuations: list[JSONType] = [None] * len(addresses)
+    errors: dict[str, str] = {}
+    total = Decimal(0)
+    async for index, valuation in fan_out(
+        addresses, lambda address: value_wallet(address, snapshot),
+        max_concurrency=max_concurrency, timeout=BATCH_WALLET_TIMEOUT
+    ):
+        valuations[index] = valuation
+        if is_error(valuation):
+            errors[addresses[index]] = valuation["MCP-ERROR"]
+        else:
+            total += Decimal(valuation["total_value_usd"])
+    
+    return {
+        "wallet_count": len(addresses),
+        "wallets": valuations,
+        "total_value_usd": usd(total),
+        "price_time": snapshot.as_of,
+        "prices_stale": snapshot.stale,
+        "errors": errors,
+    }
+
+
 # Large commented-out function removed to improve code maintainability
\ No newline at end of file
@@ -6,12 +6,19 @@ All functions are decorated with @api_function to be automatically exposed via M
 and/or REST protocols.
 """
 
-import asyncio
+import calendar
+import re
+from contextlib import aclosing
+from datetime import UTC, datetime
 from typing import Any
 
 import structlog
 
+from denom import sum_amts_base_denom
+from fetch_graph import FetchGraph
+from pagination import fetch_all_pages, iter_pages
 from registry import api_function
+from upstream import EXPLORER, PROVENANCE_API, upstream_url
 from utils import async_http_get_json, JSONType
 
 # Set up logging
@@ -39,6 +46,19 @@ def amount_denom_add(amount1: dict[str, Any], amount2: dict[str, Any]) -> dict[s
     }
 
 
+def vested_amounts(original_amount: int, start_ms: int, end_ms: int, times_ms: list[int]) -> list[int]:
+    """
+    Vested amounts of a linear vesting schedule at many points in time.
+    
+    Nothing is vested before start_ms, everything after end_ms, and the amount grows
+    linearly in between (exact integer arithmetic, rounded down).
+    """
+    span = end_ms - start_ms
+    if span <= 0:
+        return [original_amount if t >= end_ms else 0 for t in times_ms]
+    return [original_amount * min(max(t - start_ms, 0), span) // span for t in times_ms]
+
+
 #########################################################################################
 # Account Information Functions
 #########################################################################################
@@ -67,7 +87,7 @@ async def fetch_account_info(wallet_address: str) -> JSONType:
     Raises:
         HTTPError: If the Provenance blockchain API is unavailable
     """
-    url = f"https://service-explorer.provenance.io/api/v2/accounts/{wallet_address}"
+    url = upstream_url(EXPLORER, f"/api/v2/accounts/{wallet_address}")
     response = await async_http_get_json(url)
     
     if response.get("MCP-ERROR"):
@@ -107,7 +127,7 @@ async def fetch_account_is_vesting(wallet_address: str) -> JSONType:
     Raises:
         HTTPError: If the Provenance blockchain API is unavailable
     """
-    url = f"https://service-explorer.provenance.io/api/v2/accounts/{wallet_address}"
+    url = upstream_url(EXPLORER, f"/api/v2/accounts/{wallet_address}")
     response = await async_http_get_json(url)
     
     if response.get("MCP-ERROR"):
@@ -146,7 +166,7 @@ async def fetch_delegated_rewards_amount(wallet_address: str) -> JSONType:
     Raises:
         HTTPError: If the Provenance blockchain API is unavailable
     """
-    url = f"https://service-explorer.provenance.io/api/v2/accounts/{wallet_address}/rewards"
+    url = upstream_url(EXPLORER, f"/api/v2/accounts/{wallet_address}/rewards")
     response = await async_http_get_json(url)
     
     if response.get("MCP-ERROR"):
@@ -196,7 +216,7 @@ async def fetch_delegated_staked_amount(wallet_address: str) -> JSONType:
     Raises:
         HTTPError: If the Provenance blockchain API is unavailable
     """
-    url = f"https://service-explorer.provenance.io/api/v2/accounts/{wallet_address}/delegations"
+    url = upstream_url(EXPLORER, f"/api/v2/accounts/{wallet_address}/delegations")
     response = await async_http_get_json(url)
     
     if response.get("MCP-ERROR"):
@@ -241,7 +261,7 @@ async def fetch_delegated_unbonding_amount(wallet_address: str) -> JSONType:
     Raises:
         HTTPError: If the Provenance blockchain API is unavailable
     """
-    url = f"https://service-explorer.provenance.io/api/v2/accounts/{wallet_address}/unbonding"
+    url = upstream_url(EXPLORER, f"/api/v2/accounts/{wallet_address}/unbonding")
     response = await async_http_get_json(url)
     
     if response.get("MCP-ERROR"):
@@ -284,7 +304,7 @@ async def fetch_delegated_redelegation_amount(wallet_address: str) -> JSONType:
     Raises:
         HTTPError: If the Provenance blockchain API is unavailable
     """
-    url = f"https://service-explorer.provenance.io/api/v2/accounts/{wallet_address}/redelegations"
+    url = upstream_url(EXPLORER, f"/api/v2/accounts/{wallet_address}/redelegations")
     response = await async_http_get_json(url)
     
     if response.get("MCP-ERROR"):
@@ -344,27 +364,25 @@ async def fetch_total_delegation_data(wallet_address: str) -> JSONType:
     Raises:
         HTTPError: If any of the Provenance blockchain APIs are unavailable
     """
-    # Fetch all delegation data concurrently for better performance
-    tasks = [
-        fetch_delegated_staked_amount(wallet_address),
-        fetch_delegated_redelegation_amount(wallet_address),
-        fetch_delegated_unbonding_amount(wallet_address),
-        fetch_delegated_rewards_amount(wallet_address)
-    ]
+    # Fetch all delegation data concurrently, each under its own timeout
+    graph = FetchGraph()
+    graph.add("staked", lambda: fetch_delegated_staked_amount(wallet_address))
+    graph.add("redelegation", lambda: fetch_delegated_redelegation_amount(wallet_address))
+    graph.add("unbonding", lambda: fetch_delegated_unbonding_amount(wallet_address))
+    graph.add("rewards", lambda: fetch_delegated_rewards_amount(wallet_address))
     
-    results = await asyncio.gather(*tasks)
+    results = await graph.run()
     
-    # Check for errors in any of the results
-    for result in results:
-        if result.get("MCP-ERROR"):
-            return result
+    # The totals need all four amounts - report the first failure
+    if results.errors:
+        return {"MCP-ERROR": next(iter(results.errors.values()))}
     
     try:
         # Extract individual amounts from the results
-        staked_data = results[0]
-        redelegation_data = results[1]  
-        unbonding_data = results[2]
-        rewards_data = results[3]
+        staked_data = results["staked"]
+        redelegation_data = results["redelegation"]
+        unbonding_data = results["unbonding"]
+        rewards_data = results["rewards"]
         
         # Get the amount/denom structures
         staked_amount_data = staked_data["delegated_staked_amount"]
@@ -396,6 +414,104 @@ async def fetch_total_delegation_data(wallet_address: str) -> JSONType:
         return {"MCP-ERROR": f"Calculation error: {e!s}"}
 
 
+# Per-validator HASH columns of fetch_delegation_breakdown
+BREAKDOWN_COLUMNS = ("staked", "rewards", "unbonding", "redelegated")
+
+
+@api_function(
+    protocols=["mcp", "rest"],
+    path="/api/fetch_delegation_breakdown/{wallet_address}",
+    method="GET",
+    tags=["delegation", "validators"],
+    description="Fetch staked, rewards, unbonding and redelegated HASH per validator as parallel arrays"
+)
+async def fetch_delegation_breakdown(wallet_address: str) -> JSONType:
+    """
+    For a wallet address, fetch the staked, rewards, unbonding and redelegated HASH
+    amounts per validator.
+    
+    All pages of the wallet's delegations are fetched concurrently, together with its
+    rewards, unbonding and redelegation records, and joined by validator address.
+    Redelegated HASH is attributed to the destination validator. The result is
+    columnar: entry i of every amount list belongs to validators[i], which keeps
+    wallets delegating to many validators small on the wire.
+    
+    Args:
+        wallet_address: Wallet's Bech32 address
+        
+    Returns:
+        Dictionary containing:
+        - validators: Validator addresses (order of first appearance: delegations,
+          rewards, unbonding, redelegations)
+        - staked, rewards, unbonding, redelegated: Integer HASH amounts per validator
+        - totals: Sum of each amount list
+        - denom: Denomination of all amounts (nhash)
+        - validator_count: Number of validators
+        
+    Raises:
+        HTTPError: If any of the Provenance blockchain APIs are unavailable
+    """
+    graph = FetchGraph()
+    graph.add("delegations", lambda: fetch_all_pages(
+        upstream_url(EXPLORER, f"/api/v2/accounts/{wallet_address}/delegations")
+    ))
+    graph.add("rewards", lambda: async_http_get_json(
+        upstream_url(EXPLORER, f"/api/v2/accounts/{wallet_address}/rewards")
+    ))
+    graph.add("unbonding", lambda: async_http_get_json(
+        upstream_url(EXPLORER, f"/api/v2/accounts/{wallet_address}/unbonding")
+    ))
+    graph.add("redelegations", lambda: async_http_get_json(
+        upstream_url(EXPLORER, f"/api/v2/accounts/{wallet_address}/redelegations")
+    ))
+    
+    results = await graph.run()
+    
+    # A partial breakdown would misstate the totals - report the first failure
+    if results.errors:
+        return {"MCP-ERROR": next(iter(results.errors.values()))}
+    if results["delegations"].get("truncated"):
+        return {"MCP-ERROR": f"Too many delegation pages to add up: {results['delegations']['pages']}"}
+    
+    try:
+        validators: list[str] = []
+        slots: dict[str, int] = {}
+        columns: dict[str, list[int]] = {name: [] for name in BREAKDOWN_COLUMNS}
+        
+        def add(column: str, validator: str | None, amount: dict[str, Any]) -> None:
+            if not validator or amount.get('denom') != 'nhash':
+                return
+            slot = slots.get(validator)
+            if slot is None:
+                slot = slots[validator] = len(validators)
+                validators.append(validator)
+                for values in columns.values():
+                    values.append(0)
+            columns[column][slot] += parse_amount(amount['amount'])
+        
+        for record in results["delegations"]['results']:
+            add("staked", record.get('validatorSrcAddr'), record['amount'])
+        for record in results["rewards"].get('rewards', []):
+            for amount in record.get('reward', []):
+                add("rewards", record.get('validatorAddress'), amount)
+        for record in results["unbonding"].get('records', []):
+            add("unbonding", record.get('validatorSrcAddr'), record['amount'])
+        for record in results["redelegations"].get('records', []):
+            add("redelegated", record.get('validatorDstAddr'), record['amount'])
+        
+        return {
+            'validators': validators,
+            **columns,
+            'totals': {name: sum(values) for name, values in columns.items()},
+            'denom': 'nhash',
+            'validator_count': len(validators)
+        }
+        
+    except (AttributeError, KeyError, ValueError, TypeError) as e:
+        logger.error(f"Could not join delegation breakdown: {e}")
+        return {"MCP-ERROR": f"Data parsing error: {e!s}"}
+
+
 @api_function(
     protocols=["mcp", "rest"],
     path="/api/fetch_vesting_total_unvested_amount/{wallet_address}",
@@ -431,7 +547,7 @@ async def fetch_vesting_total_unvested_amount(
         HTTPError: If the Provenance blockchain API is unavailable
     """
     try:
-        url = f"https://service-explorer.provenance.io/api/v3/accounts/{wallet_address}/vesting"
+        url = upstream_url(EXPLORER, f"/api/v3/accounts/{wallet_address}/vesting")
         response = await async_http_get_json(url)
         
         if response.get("MCP-ERROR"):
@@ -455,14 +571,9 @@ async def fetch_vesting_total_unvested_amount(
         denom = response['originalVestingList'][0]['denom']
         
         # Calculate vested amount based on linear schedule
-        if dtms < start_time_ms:
-            total_vested_amount = 0
-        elif dtms > end_time_ms:
-            total_vested_amount = vesting_original_amount
-        else:
-            total_vested_amount = int(
-                vesting_original_amount * (dtms - start_time_ms) / (end_time_ms - start_time_ms)
-            )
+        [total_vested_amount] = vested_amounts(
+            vesting_original_amount, start_time_ms, end_time_ms, [dtms]
+        )
         
         total_unvested_amount = vesting_original_amount - total_vested_amount
         
@@ -487,6 +598,167 @@ async def fetch_vesting_total_unvested_amount(
         return {"MCP-ERROR": f"Vesting data fetch error: {e!s}"}
 
 
+# Longest vesting projection returned by fetch_vesting_schedule_projection
+MAX_PROJECTION_POINTS = 1000
+
+# Projection step: <count><unit> with unit h(ours), d(ays), w(eeks), mo(nths) or y(ears)
+PROJECTION_STEP = re.compile(r"^(\d+)(h|d|w|mo|y)$")
+STEP_UNIT_MS = {"h": 3_600_000, "d": 86_400_000, "w": 604_800_000}
+
+
+def _iso_to_ms(value: str) -> int:
+    """Epoch milliseconds of an ISO 8601 date-time (UTC when it has no offset)"""
+    moment = datetime.fromisoformat(value.strip())
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=UTC)
+    return int(moment.timestamp() * 1000)
+
+
+def _ms_to_iso(ms: int) -> str:
+    return datetime.fromtimestamp(ms / 1000, tz=UTC).isoformat()
+
+
+def _add_months(moment: datetime, months: int) -> datetime:
+    """Same day and time months later, clamped to the end of shorter months"""
+    index = moment.month - 1 + months
+    year, month = moment.year + index // 12, index % 12 + 1
+    return moment.replace(year=year, month=month, day=min(moment.day, calendar.monthrange(year, month)[1]))
+
+
+def projection_times(start_ms: int, end_ms: int, step: str) -> list[int]:
+    """
+    Points from start_ms to end_ms (both included) every step.
+    
+    Months and years are calendar steps from the start date.
+    
+    Raises:
+        ValueError: On a malformed step or more than MAX_PROJECTION_POINTS points
+    """
+    match = PROJECTION_STEP.match(step.strip().lower())
+    if not match or int(match.group(1)) == 0:
+        raise ValueError(f"Invalid step: {step} (expected e.g. 1d, 2w, 1mo, 1y)")
+    count, unit = int(match.group(1)), match.group(2)
+    if end_ms < start_ms:
+        raise ValueError("end_time is before start_time")
+    
+    if unit in STEP_UNIT_MS:
+        step_ms = count * STEP_UNIT_MS[unit]
+        if (end_ms - start_ms) // step_ms + 2 > MAX_PROJECTION_POINTS:
+            raise ValueError(f"More than {MAX_PROJECTION_POINTS} points - use a larger step")
+        times = list(range(start_ms, end_ms + 1, step_ms))
+    else:
+        months = count * (12 if unit == "y" else 1)
+        start = datetime.fromtimestamp(start_ms / 1000, tz=UTC)
+        times = []
+        while True:
+            t = int(_add_months(start, len(times) * months).timestamp() * 1000)
+            if t > end_ms:
+                break
+            # Leave room for end_ms, appended below unless it falls on a step
+            if len(times) + (t != end_ms) >= MAX_PROJECTION_POINTS:
+                raise ValueError(f"More than {MAX_PROJECTION_POINTS} points - use a larger step")
+            times.append(t)
+    if times[-1] != end_ms:
+        times.append(end_ms)
+    return times
+
+
+@api_function(
+    protocols=["mcp", "rest"],
+    path="/api/fetch_vesting_schedule_projection/{wallet_address}",
+    method="GET",
+    tags=["vesting", "blockchain"],
+    description="Project vested and unvested HASH of a vesting wallet over many dates in one call"
+)
+async def fetch_vesting_schedule_projection(
+    wallet_address: str,
+    timestamps: list[str] | None = None,
+    start_time: str | None = None,
+    end_time: str | None = None,
+    step: str = "1mo"
+) -> JSONType:
+    """
+    Project the vested and unvested HASH of a vesting wallet at many points in time,
+    e.g. a monthly unlock schedule, from a single fetch of its vesting schedule.
+    
+    Uses the same linear vesting estimate as fetch_vesting_total_unvested_amount. The
+    points are either the given timestamps or a range from start_time to end_time
+    every step (defaulting to the wallet's whole vesting period, monthly). The result
+    is columnar and sorted by time, ready for charting.
+    
+    Args:
+        wallet_address: Wallet's Bech32 address
+        timestamps: ISO 8601 date-times to project (list or comma-separated string);
+                   overrides start_time/end_time/step
+        start_time: ISO 8601 start of the range. Defaults to the vesting start
+        end_time: ISO 8601 end of the range (always included). Defaults to the vesting end
+        step: Range step such as 1d, 2w, 1mo, 3mo or 1y. Defaults to 1mo
+        
+    Returns:
+        Dictionary containing:
+        - timestamps: ISO 8601 UTC date-times of the points, ascending
+        - vested: nhash vested at each point
+        - unvested: nhash still unvested at each point
+        - vested_in_period: nhash vested since the previous point (0 for the first)
+        - vesting_original_amount: Original number of nano-HASH subject to vesting
+        - denom: Token denomination
+        - start_time, end_time: Vesting period of the wallet
+        - points: Number of points
+        
+    Raises:
+        HTTPError: If the Provenance blockchain API is unavailable
+    """
+    try:
+        times_ms = None
+        if timestamps:
+            if isinstance(timestamps, str):
+                timestamps = [value for value in timestamps.split(",") if value.strip()]
+            if len(timestamps) > MAX_PROJECTION_POINTS:
+                raise ValueError(f"More than {MAX_PROJECTION_POINTS} timestamps")
+            times_ms = sorted(_iso_to_ms(value) for value in timestamps)
+    except ValueError as e:
+        return {"MCP-ERROR": f"Invalid projection request: {e!s}"}
+    
+    try:
+        url = upstream_url(EXPLORER, f"/api/v3/accounts/{wallet_address}/vesting")
+        response = await async_http_get_json(url)
+        
+        if response.get("MCP-ERROR"):
+            return response
+        
+        # Parse the schedule once for all points
+        vesting_start_ms = _iso_to_ms(response["startTime"])
+        vesting_end_ms = _iso_to_ms(response["endTime"])
+        vesting_original_amount = parse_amount(response['originalVestingList'][0]['amount'])
+        denom = response['originalVestingList'][0]['denom']
+    except Exception as e:
+        logger.error(f"Could not fetch vesting schedule: {e}")
+        return {"MCP-ERROR": f"Vesting data fetch error: {e!s}"}
+    
+    try:
+        if times_ms is None:
+            times_ms = projection_times(
+                _iso_to_ms(start_time) if start_time else vesting_start_ms,
+                _iso_to_ms(end_time) if end_time else vesting_end_ms,
+                step
+            )
+    except ValueError as e:
+        return {"MCP-ERROR": f"Invalid projection request: {e!s}"}
+    
+    vested = vested_amounts(vesting_original_amount, vesting_start_ms, vesting_end_ms, times_ms)
+    return {
+        'timestamps': [_ms_to_iso(t) for t in times_ms],
+        'vested': vested,
+        'unvested': [vesting_original_amount - amount for amount in vested],
+        'vested_in_period': [0] + [b - a for a, b in zip(vested, vested[1:])],
+        'vesting_original_amount': vesting_original_amount,
+        'denom': denom,
+        'start_time': response["startTime"],
+        'end_time': response["endTime"],
+        'points': len(times_ms)
+    }
+
+
 @api_function(
     protocols=["rest"],
     path="/api/wallet_liquid_balance/{wallet_address}",
@@ -514,23 +786,21 @@ async def fetch_wallet_liquid_balance(wallet_address: str) -> JSONType:
         HTTPError: If the Provenance blockchain API is unavailable
     """
     try:
-        url = f"https://service-explorer.provenance.io/api/v2/accounts/{wallet_address}/balances"
-        params = {"count": 20, "page": 1}
-        response = await async_http_get_json(url, params=params)
-        
-        if response.get("MCP-ERROR"):
-            return response
-            
-        # Find HASH balance in the results
-        balance_list = response.get('results', [])
-        for balance in balance_list:
-            if balance.get('denom') == 'nhash':
-                return {
-                    'wallet_liquid_balance': {
-                        'amount': parse_amount(balance['amount']),
-                        'denom': balance['denom']
-                    }
-                }
+        url = upstream_url(EXPLORER, f"/api/v2/accounts/{wallet_address}/balances")
+        
+        # HASH can be on any page of the balance list - stop at the page holding it
+        async with aclosing(iter_pages(url)) as pages:
+            async for _, page in pages:
+                if page.get("MCP-ERROR"):
+                    return page
+                for balance in page.get('results', []):
+                    if balance.get('denom') == 'nhash':
+                        return {
+                            'wallet_liquid_balance': {
+                                'amount': parse_amount(balance['amount']),
+                                'denom': balance['denom']
+                            }
+                        }
         
         # No HASH found - return zero balance
         return {
@@ -545,6 +815,60 @@ async def fetch_wallet_liquid_balance(wallet_address: str) -> JSONType:
         return {"MCP-ERROR": f"Wallet balance fetch error: {e!s}"}
 
 
+@api_function(
+    protocols=["mcp", "rest"],
+    path="/api/fetch_wallet_balances/{wallet_address}",
+    method="GET",
+    tags=["balance", "blockchain"],
+    description="Fetch every token balance in a wallet, normalized to base denominations"
+)
+async def fetch_wallet_balances(wallet_address: str) -> JSONType:
+    """
+    Fetch the balances of every denomination held in the wallet (not delegated or
+    committed), across all pages of the explorer's balance list.
+    
+    Amounts are normalized to their base denomination (e.g. uusd.trading -> uusd,
+    neth.figure.se -> neth) and balances of denominations sharing a base denomination
+    are added up. Unknown denominations are returned unchanged.
+    
+    Args:
+        wallet_address: Wallet's Bech32 address
+        
+    Returns:
+        Dictionary containing:
+        - wallet_balances: List of balances sorted by denomination, each with
+          standardized amount/denom structure
+          - amount: Integer amount in the base denomination
+          - denom: Base denomination (e.g. nhash, uusd, neth)
+        - denom_count: Number of base denominations held
+        - truncated: True when the wallet has more balance pages than are read
+          (MAX_PAGES); the balances are then partial
+        
+    Raises:
+        HTTPError: If the Provenance blockchain API is unavailable
+    """
+    try:
+        url = upstream_url(EXPLORER, f"/api/v2/accounts/{wallet_address}/balances")
+        response = await fetch_all_pages(url)
+        
+        if response.get("MCP-ERROR"):
+            return response
+        
+        totals = sum_amts_base_denom(response['results'])
+        
+        return {
+            'wallet_balances': [
+                {'amount': amount, 'denom': denom} for denom, amount in sorted(totals.items())
+            ],
+            'denom_count': len(totals),
+            'truncated': response['truncated']
+        }
+        
+    except Exception as e:
+        logger.error(f"Could not fetch wallet balances: {e}")
+        return {"MCP-ERROR": f"Wallet balances fetch error: {e!s}"}
+
+
 @api_function(
     protocols=["mcp", "rest"],
     path="/api/fetch_available_committed_amount/{wallet_address}",
@@ -572,7 +896,7 @@ async def fetch_available_committed_amount(wallet_address: str) -> JSONType:
         HTTPError: If the Provenance blockchain API is unavailable
     """
     try:
-        url = f"https://api.provenance.io/provenance/exchange/v1/commitments/account/{wallet_address}"
+        url = upstream_url(PROVENANCE_API, f"/provenance/exchange/v1/commitments/account/{wallet_address}")
         response = await async_http_get_json(url)
         
         if response.get("MCP-ERROR"):
@@ -12,6 +12,7 @@ from typing import Any
 import structlog
 
 from registry import api_function
+from upstream import EXPLORER, upstream_url
 from utils import async_http_get_json, JSONType
 
 # Set up logging
@@ -48,7 +49,7 @@ async def fetch_delegated_rewards_amount(wallet_address: str) -> JSONType:
     Raises:
         HTTPError: If the Provenance blockchain API is unavailable
     """
-    url = f"https://service-explorer.provenance.io/api/v2/accounts/{wallet_address}/rewards"
+    url = upstream_url(EXPLORER, f"/api/v2/accounts/{wallet_address}/rewards")
     response = await async_http_get_json(url)
     
     if response.get("MCP-ERROR"):
@@ -94,7 +95,7 @@ async def fetch_delegated_staked_amount(wallet_address: str) -> JSONType:
     Raises:
         HTTPError: If the Provenance blockchain API is unavailable
     """
-    url = f"https://service-explorer.provenance.io/api/v2/accounts/{wallet_address}/delegations"
+    url = upstream_url(EXPLORER, f"/api/v2/accounts/{wallet_address}/delegations")
     response = await async_http_get_json(url)
     
     if response.get("MCP-ERROR"):
@@ -144,7 +145,7 @@ async def fetch_delegated_unbonding_amount(wallet_address: str) -> JSONType:
     Raises:
         HTTPError: If the Provenance blockchain API is unavailable
     """
-    url = f"https://service-explorer.provenance.io/api/v2/accounts/{wallet_address}/unbonding"
+    url = upstream_url(EXPLORER, f"/api/v2/accounts/{wallet_address}/unbonding")
     response = await async_http_get_json(url)
     
     if response.get("MCP-ERROR"):
@@ -189,7 +190,7 @@ async def fetch_delegated_redelegation_amount(wallet_address: str) -> JSONType:
     Raises:
         HTTPError: If the Provenance blockchain API is unavailable
     """
-    url = f"https://service-explorer.provenance.io/api/v2/accounts/{wallet_address}/redelegations"
+    url = upstream_url(EXPLORER, f"/api/v2/accounts/{wallet_address}/redelegations")
     response = await async_http_get_json(url)
     
     if response.get("MCP-ERROR"):
@@ -10,7 +10,10 @@ from typing import Any
 
 import structlog
 
+from candles import INTERVALS, MAX_CANDLES, get_candle_engine
 from registry import api_function
+from trade_store import MAX_SYNC_SIZE, get_trade_store, trade_time_ms
+from upstream import FIGURE_MARKETS, note_stale_response, upstream_url
 from utils import async_http_get_json, JSONType
 
 # Set up logging
@@ -28,7 +31,8 @@ logger = structlog.get_logger()
     path="/api/fetch_current_fm_data",
     method="GET",
     tags=["markets", "trading"],
-    description="Fetch current market data from Figure Markets exchange"
+    description="Fetch current market data from Figure Markets exchange",
+    cache_ttl=30
 )
 async def fetch_current_fm_data() -> JSONType:
     """
@@ -45,7 +49,7 @@ async def fetch_current_fm_data() -> JSONType:
     Raises:
         HTTPError: If the Figure Markets API is unavailable
     """
-    url = 'https://www.figuremarkets.com/service-hft-exchange/api/v1/markets'
+    url = upstream_url(FIGURE_MARKETS, '/service-hft-exchange/api/v1/markets')
     
     # Use async HTTP call directly
     response = await async_http_get_json(url)
@@ -61,7 +65,8 @@ async def fetch_current_fm_data() -> JSONType:
     path="/api/fetch_last_crypto_token_price/{token_pair}",
     method="GET",
     tags=["markets", "prices"],
-    description="Fetch last crypto token prices from Figure Markets exchange"
+    description="Fetch last crypto token prices from Figure Markets exchange",
+    cache_ttl=5
 )
 async def fetch_last_crypto_token_price(
     token_pair: str = "HASH-USD", last_number_of_trades: int = 1
@@ -72,26 +77,144 @@ async def fetch_last_crypto_token_price(
     
     Args:
         token_pair: Two token/crypto symbols separated by '-', like BTC-USDC or HASH-USD
-        last_number_of_trades: Number of recent trades to return (default: 1)
+        last_number_of_trades: Number of recent trades to return (default: 1, max: 1000)
         
     Returns:
         Dictionary containing:
-        - matches: List of individual trade details with prices and volumes
+        - matches: List of individual trade details with prices and volumes, newest
+          first
         
     Raises:
         HTTPError: If the Figure Markets API is unavailable
     """
-    url = f'https://www.figuremarkets.com/service-hft-exchange/api/v1/trades/{token_pair}'
-    params = {'size': last_number_of_trades}
+    if not 1 <= last_number_of_trades <= MAX_SYNC_SIZE:
+        return {"MCP-ERROR": f"last_number_of_trades must be between 1 and {MAX_SYNC_SIZE}"}
+    # Trades are kept in the trade store: a call only downloads the trades made since
+    # the previous one
+    store = get_trade_store()
+    synced = await store.sync(token_pair, min_trades=last_number_of_trades)
+    if synced.get("MCP-ERROR"):
+        age = store.age(token_pair)
+        if age is None:
+            return synced
+        note_stale_response(age)
     
-    # Run sync HTTP call in thread pool to avoid event loop conflicts
-    # Use async HTTP call directly
-    response = await async_http_get_json(url, params=params)
+    return store.response(token_pair, last_number_of_trades)
+
+
+@api_function(
+    protocols=["mcp", "rest"],
+    path="/api/fetch_trade_history/{token_pair}",
+    method="GET",
+    tags=["markets", "prices", "trading"],
+    description="Fetch recent trades of a Figure Markets pair as columns, optionally within a time range"
+)
+async def fetch_trade_history(
+    token_pair: str = "HASH-USD",
+    last_number_of_trades: int = 100,
+    start_time: str | None = None,
+    end_time: str | None = None,
+) -> JSONType:
+    """
+    Fetch the recent trades of a trading pair from the Figure Markets exchange as
+    parallel columns, oldest trade first.
     
-    if response.get("MCP-ERROR"):
-        return response
+    Without start_time and end_time the last last_number_of_trades trades are returned.
+    With either of them, the trades within that time range that are in the trade
+    store's history (the last trades, up to 1000 when first fetched, growing as
+    trading continues) are returned.
     
-    return response
+    Args:
+        token_pair: Two token/crypto symbols separated by '-', like BTC-USDC or HASH-USD
+        last_number_of_trades: Number of recent trades to return (default: 100, max: 1000)
+        start_time: ISO 8601 time of the earliest trade to return, UTC if no offset is given
+        end_time: ISO 8601 time of the latest trade to return, UTC if no offset is given
+        
+    Returns:
+        Dictionary containing:
+        - pair: The trading pair
+        - times_ms: Trade times in epoch milliseconds
+        - prices: Trade prices in the quote denomination
+        - quantities: Traded quantities
+        - sides: Initiator side of each trade (BUY or SELL)
+        - ids: Trade ids
+        - count: Number of trades returned
+        
+    Raises:
+        HTTPError: If the Figure Markets API is unavailable
+    """
+    if not 1 <= last_number_of_trades <= MAX_SYNC_SIZE:
+        return {"MCP-ERROR": f"last_number_of_trades must be between 1 and {MAX_SYNC_SIZE}"}
+    try:
+        start_ms = trade_time_ms(start_time) if start_time else None
+        end_ms = trade_time_ms(end_time) if end_time else None
+    except ValueError as e:
+        return {"MCP-ERROR": f"Invalid time: {e}"}
+    
+    store = get_trade_store()
+    in_range = start_ms is not None or end_ms is not None
+    synced = await store.sync(token_pair, min_trades=MAX_SYNC_SIZE if in_range else last_number_of_trades)
+    if synced.get("MCP-ERROR"):
+        age = store.age(token_pair)
+        if age is None:
+            return synced
+        note_stale_response(age)
+    
+    if in_range:
+        return store.between(token_pair, start_ms, end_ms)
+    return store.last(token_pair, last_number_of_trades)
+
+
+@api_function(
+    protocols=["mcp", "rest"],
+    path="/api/fetch_price_candles/{token_pair}",
+    method="GET",
+    tags=["markets", "prices", "trading"],
+    description="Fetch OHLCV price candles of a Figure Markets pair as columns"
+)
+async def fetch_price_candles(
+    token_pair: str = "HASH-USD", interval: str = "1h", limit: int = 100
+) -> JSONType:
+    """
+    Fetch open/high/low/close/volume candles of a trading pair from the Figure Markets
+    exchange as parallel columns, oldest candle first.
+    
+    Candles are computed from the recent trades in the trade store (the last trades,
+    up to 1000 when first fetched, growing as trading continues); intervals without
+    trades have no candle.
+    
+    Args:
+        token_pair: Two token/crypto symbols separated by '-', like BTC-USDC or HASH-USD
+        interval: Candle width: 1m, 5m, 15m, 1h, 4h or 1d (default: 1h), aligned to UTC
+        limit: Number of most recent candles to return (default: 100, max: 1000)
+        
+    Returns:
+        Dictionary containing:
+        - pair: The trading pair
+        - interval: The candle width
+        - times_ms: Candle start times in epoch milliseconds
+        - open, high, low, close: Trade prices in the quote denomination
+        - volume: Traded quantity per candle
+        - trades: Number of trades per candle
+        - count: Number of candles returned
+        
+    Raises:
+        HTTPError: If the Figure Markets API is unavailable
+    """
+    if interval not in INTERVALS:
+        return {"MCP-ERROR": f"Unknown interval {interval!r}, expected one of {', '.join(INTERVALS)}"}
+    if not 1 <= limit <= MAX_CANDLES:
+        return {"MCP-ERROR": f"limit must be between 1 and {MAX_CANDLES}"}
+    
+    store = get_trade_store()
+    synced = await store.sync(token_pair, min_trades=MAX_SYNC_SIZE)
+    if synced.get("MCP-ERROR"):
+        age = store.age(token_pair)
+        if age is None:
+            return synced
+        note_stale_response(age)
+    
+    return get_candle_engine().candles(store, token_pair, interval, limit)
 
 
 # NOTE: This API endpoint is not publicly accessible - Figure Markets account APIs are private
@@ -121,7 +244,7 @@ async def fetch_current_fm_account_balance_data(wallet_address: str) -> JSONType
     Raises:
         HTTPError: If the Figure Markets API is unavailable
     """
-    url = f'https://www.figuremarkets.com/service-account-balance/api/v1/account/{wallet_address}/balance'
+    url = upstream_url(FIGURE_MARKETS, f'/service-account-balance/api/v1/account/{wallet_address}/balance')
     
     # Run sync HTTP call in thread pool to avoid event loop conflicts  
     # Use async HTTP call directly
@@ -155,7 +278,7 @@ async def fetch_current_fm_account_info(wallet_address: str) -> JSONType:
     Raises:
         HTTPError: If the Figure Markets API is unavailable
     """
-    url = f'https://www.figuremarkets.com/service-account/api/v1/account/{wallet_address}'
+    url = upstream_url(FIGURE_MARKETS, f'/service-account/api/v1/account/{wallet_address}')
     
     # Use async HTTP call directly
     response = await async_http_get_json(url)
@@ -171,7 +294,8 @@ async def fetch_current_fm_account_info(wallet_address: str) -> JSONType:
     path="/api/fetch_figure_markets_assets_info",
     method="GET",
     tags=["assets", "markets"],
-    description="Fetch list of assets traded on Figure Markets exchange"
+    description="Fetch list of assets traded on Figure Markets exchange",
+    cache_ttl=300
 )
 async def fetch_figure_markets_assets_info() -> JSONType:
     """
@@ -191,7 +315,7 @@ async def fetch_figure_markets_assets_info() -> JSONType:
     Raises:
         HTTPError: If the Figure Markets API is unavailable
     """
-    url = 'https://www.figuremarkets.com/service-hft-exchange/api/v1/assets'
+    url = upstream_url(FIGURE_MARKETS, '/service-hft-exchange/api/v1/assets')
     
     # Use async HTTP call directly
     response = await async_http_get_json(url)
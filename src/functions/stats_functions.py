@@ -11,6 +11,7 @@ from typing import Any
 import structlog
 
 from registry import api_function
+from upstream import EXPLORER, GITHUB_RAW, upstream_url
 from utils import async_http_get_json, JSONType
 
 # Set up logging
@@ -19,7 +20,7 @@ logger = structlog.get_logger()
 
 
 
-@api_function(protocols=["mcp", "rest"])
+@api_function(protocols=["mcp", "rest"], cache_ttl=60)
 
 
 
@@ -47,7 +48,7 @@ async def fetch_current_hash_statistics() -> JSONType:
     Raises:
         HTTPError: If the Provenance blockchain API is unavailable
     """
-    url = "https://service-explorer.provenance.io/api/v3/utility_token/stats"
+    url = upstream_url(EXPLORER, "/api/v3/utility_token/stats")
     response = await async_http_get_json(url)
     
     if response.get("MCP-ERROR"):
@@ -94,7 +95,7 @@ async def get_system_context() -> JSONType:
         HTTPError: If the context documentation is unavailable
     """
     try:
-        url = "https://raw.githubusercontent.com/franks42/FigureMarkets-MCP-Server/refs/heads/main/FigureMarketsContext.md"
+        url = upstream_url(GITHUB_RAW, "/franks42/FigureMarkets-MCP-Server/refs/heads/main/FigureMarketsContext.md")
         
         # Run sync HTTP call in thread pool to avoid event loop conflicts
         import httpx
@@ -11,7 +11,16 @@ from typing import Any
 
 import structlog
 
+import request_logging
+from metrics import emf_enabled, get_metrics
 from registry import api_function, get_registry
+from upstream import (
+    get_circuit_breakers,
+    get_response_cache,
+    get_retry_executor,
+    get_singleflight,
+    get_upstream_limiter,
+)
 from utils import JSONType
 
 # Set up logging
@@ -196,6 +205,277 @@ async def get_registry_summary() -> JSONType:
         return {"MCP-ERROR": f"Registry summary failed: {e!s}"}
 
 
+@api_function(
+    protocols=["mcp", "rest"],
+    path="/api/get_upstream_cache_stats",
+    method="GET",
+    tags=["system", "performance"],
+    description="Get hit/miss statistics of the upstream response cache"
+)
+async def get_upstream_cache_stats() -> JSONType:
+    """
+    Get hit/miss statistics and occupancy of the TTL response cache that sits in
+    front of the Provenance and Figure Markets upstream APIs.
+    
+    Returns:
+        Dictionary containing:
+        - hits, hits_memory, hits_shared: Lookups answered from the cache
+        - misses, expired: Lookups that had to go to the upstream
+        - hit_rate: Fraction of lookups answered from the cache
+        - memory_entries, memory_bytes, evictions: In-memory LRU tier occupancy
+        - shared_tier: Name of the shared tier, if one is configured
+        - ttl_by_function: Cache TTL in seconds declared by each cacheable function
+        
+    Raises:
+        Exception: If cache access fails
+    """
+    try:
+        registry = get_registry()
+        ttl_by_function = {
+            name: meta.cache_ttl
+            for name, meta in sorted(registry.get_all_functions().items())
+            if meta.cache_ttl
+        }
+        
+        return {
+            **get_response_cache().stats(),
+            "ttl_by_function": ttl_by_function
+        }
+        
+    except Exception as e:
+        logger.error(f"Cache stats error: {e}")
+        return {"MCP-ERROR": f"Cache stats failed: {e!s}"}
+
+
+@api_function(
+    protocols=["mcp", "rest"],
+    path="/api/get_upstream_coalescing_stats",
+    method="GET",
+    tags=["system", "performance"],
+    description="Get counters of concurrent identical upstream requests collapsed into one"
+)
+async def get_upstream_coalescing_stats() -> JSONType:
+    """
+    Get counters of the in-flight request deduplication (singleflight) layer.
+    
+    Concurrent identical upstream GETs share one request; these counters show how
+    many calls were collapsed instead of reaching the upstream APIs.
+    
+    Returns:
+        Dictionary containing:
+        - calls: Upstream GETs requested by functions (after cache hits)
+        - upstream_requests: Requests actually sent to the upstreams
+        - collapsed: Calls that joined an identical request already in flight
+        - collapse_rate: Fraction of calls that were collapsed
+        - in_flight: Shared requests currently in flight
+        - collapsed_by_host: Collapsed calls per upstream host
+        
+    Raises:
+        Exception: If the counters cannot be read
+    """
+    try:
+        return get_singleflight().stats()
+        
+    except Exception as e:
+        logger.error(f"Coalescing stats error: {e}")
+        return {"MCP-ERROR": f"Coalescing stats failed: {e!s}"}
+
+
+@api_function(
+    protocols=["mcp", "rest"],
+    path="/api/get_upstream_limit_stats",
+    method="GET",
+    tags=["system", "performance"],
+    description="Get the rate limits, concurrency bounds and queue state of each upstream"
+)
+async def get_upstream_limit_stats() -> JSONType:
+    """
+    Get the per-upstream rate limiter and concurrency bound that every upstream
+    request passes through, with live queue state.
+    
+    Queue-time percentiles and rejections per host are in get_latency_metrics.
+    
+    Returns:
+        Dictionary containing:
+        - enabled: Whether upstream limits are applied (UPSTREAM_LIMITS)
+        - upstreams: Per upstream its limit (rate, burst, concurrency, max_wait,
+          fast_fail) and, once used, granted/rejected/timed_out counters, in_flight,
+          queued, mean_hold_ms and available tokens
+        
+    Raises:
+        Exception: If the limiter state cannot be read
+    """
+    try:
+        return get_upstream_limiter().stats()
+        
+    except Exception as e:
+        logger.error(f"Upstream limit stats error: {e}")
+        return {"MCP-ERROR": f"Upstream limit stats failed: {e!s}"}
+
+
+@api_function(
+    protocols=["mcp", "rest"],
+    path="/api/get_upstream_retry_stats",
+    method="GET",
+    tags=["system", "performance"],
+    description="Get the retry and hedging policies and per-endpoint retry, hedge and budget counters"
+)
+async def get_upstream_retry_stats() -> JSONType:
+    """
+    Get the retry and hedging policy of each upstream and endpoint, with how often
+    requests were retried or hedged.
+    
+    Per-host retry and hedge counts are also in get_latency_metrics.
+    
+    Returns:
+        Dictionary containing:
+        - enabled: Whether retries and hedging are applied (UPSTREAM_RETRIES)
+        - policies: Per upstream and endpoint its attempts, base_delay, max_delay,
+          deadline and hedge setting
+        - endpoints: Per endpoint used so far its requests, retries, retry_successes,
+          budget_exhausted, deadline_exceeded (retries not started for lack of time),
+          hedges, hedge_wins and failures, the current hedge delay
+          (hedge_after_ms) and the latency of successful attempts
+        - budgets: Per upstream the requests and retries in the budget window
+        
+    Raises:
+        Exception: If the retry state cannot be read
+    """
+    try:
+        return get_retry_executor().stats()
+        
+    except Exception as e:
+        logger.error(f"Upstream retry stats error: {e}")
+        return {"MCP-ERROR": f"Upstream retry stats failed: {e!s}"}
+
+
+@api_function(
+    protocols=["mcp", "rest"],
+    path="/api/get_upstream_breaker_stats",
+    method="GET",
+    tags=["system", "performance"],
+    description="Get the circuit breaker state of each upstream host and how often stale responses were served"
+)
+async def get_upstream_breaker_stats() -> JSONType:
+    """
+    Get the circuit breaker of each upstream host used so far. While a breaker is
+    open, requests to its host fail fast or are served the last-known-good cached
+    response, marked with an MCP-STALE entry giving its age.
+    
+    Returns:
+        Dictionary containing:
+        - enabled: Whether circuit breakers are applied (UPSTREAM_BREAKERS)
+        - stale_max_age_s: Oldest cached response served while an upstream fails
+        - stale_served: Stale responses served so far
+        - hosts: Per host its state (closed, open, half_open), upstream,
+          consecutive_failures, retry_in_s (until an open breaker lets a probe
+          through), last_failure, successes, failures, opened, short_circuited and
+          policy (failure_threshold, open_for, half_open_probes)
+        
+    Raises:
+        Exception: If the breaker state cannot be read
+    """
+    try:
+        stats = get_circuit_breakers().stats()
+        stats["stale_served"] = get_response_cache().stats()["stale_served"]
+        return stats
+        
+    except Exception as e:
+        logger.error(f"Upstream breaker stats error: {e}")
+        return {"MCP-ERROR": f"Upstream breaker stats failed: {e!s}"}
+
+
+@api_function(
+    protocols=["mcp", "rest"],
+    path="/api/get_latency_metrics",
+    method="GET",
+    tags=["system", "performance"],
+    description="Get p50/p95/p99 latency per tool and per upstream host"
+)
+async def get_latency_metrics(reset: bool = False) -> JSONType:
+    """
+    Get latency percentiles recorded in this server process: per registered function
+    (every MCP and REST call, including functions called by aggregate functions) and
+    per upstream host (every request that reached the Provenance or Figure Markets
+    APIs; cache hits and coalesced calls are not upstream requests).
+    
+    Metrics are kept in memory per execution environment, so on Lambda they cover the
+    calls handled by the environment that answers this request.
+    
+    Args:
+        reset: Clear the recorded metrics after reading them
+        
+    Returns:
+        Dictionary containing:
+        - since: Unix timestamp when recording started (or was last reset)
+        - tools: Per function count, errors, mean_ms, min_ms, p50_ms, p95_ms, p99_ms, max_ms
+        - upstreams: Per host the same latency fields plus statuses (count per HTTP
+          status or failure kind), bytes_total, bytes_mean, queue (time spent
+          waiting for a rate/concurrency permit), rejected, retries, hedges,
+          hedge_wins, retry_budget_exhausted, short_circuited (requests failed fast
+          by an open circuit breaker) and stale_served
+        - emf_enabled: Whether metrics are also emitted to CloudWatch as EMF
+        
+    Raises:
+        Exception: If the metrics cannot be read
+    """
+    try:
+        metrics = get_metrics()
+        snapshot = metrics.snapshot()
+        if reset:
+            metrics.reset()
+        return {**snapshot, "emf_enabled": emf_enabled()}
+        
+    except Exception as e:
+        logger.error(f"Latency metrics error: {e}")
+        return {"MCP-ERROR": f"Latency metrics failed: {e!s}"}
+
+
+@api_function(
+    protocols=["mcp", "rest"],
+    path="/api/set_debug_logging",
+    method="POST",
+    tags=["system", "logging"],
+    description="Turn verbose debug logging on or off for a limited time"
+)
+async def set_debug_logging(enabled: bool = True, duration_seconds: int = 900) -> JSONType:
+    """
+    Turn verbose debug logging on or off at runtime, without a redeploy.
+    
+    In debug mode every request is logged (no sampling) along with request headers
+    (credentials redacted) and truncated bodies. Debug mode switches itself off after
+    duration_seconds, at most one hour. The setting applies to the execution environment
+    that handles this call; other concurrently running Lambda environments are not
+    affected. Not exposed in production (function_protocols_prod.csv).
+    
+    Args:
+        enabled: True to turn debug logging on, False to turn it off
+        duration_seconds: How long debug logging stays on (default 15 minutes, longer
+                          durations are clamped to 3600)
+        
+    Returns:
+        Dictionary containing:
+        - level, base_level: Effective and configured log levels
+        - debug: Whether debug mode is on
+        - debug_seconds_remaining: Time until debug mode expires
+        - format, sample_rates, slow_ms: Output format and sampling configuration
+        
+    Raises:
+        Exception: If logging cannot be reconfigured
+    """
+    if enabled and duration_seconds <= 0:
+        return {"MCP-ERROR": f"duration_seconds must be positive, got {duration_seconds}"}
+    duration_seconds = min(duration_seconds, request_logging.MAX_DEBUG_SECONDS)
+    try:
+        state = request_logging.set_debug_logging(enabled, duration_seconds)
+        logger.info("debug_logging_changed", debug=state["debug"], duration_seconds=duration_seconds)
+        return state
+        
+    except Exception as e:
+        logger.error(f"Debug logging toggle error: {e}")
+        return {"MCP-ERROR": f"Debug logging toggle failed: {e!s}"}
+
+
 @api_function(protocols=["mcp", "rest"])
 
 
@@ -223,15 +503,14 @@ async def mcp_warmup_ping() -> JSONType:
         Dictionary containing:
         - status: "warm" to indicate successful ping
         - timestamp: Current Unix timestamp 
-        - response_time_ms: Function execution time in milliseconds
+        - response_time_ms: Time spent handling this request so far in milliseconds
         - container_info: Basic Lambda container information
         - message: Instructions for Claude.ai timeout recovery
     """
-    start_time = time.time()
-    
-    # Minimal processing - just return status info
+    # Time spent handling this request so far (routing, binding and this call)
+    request = request_logging.current_request()
+    response_time_ms = request.elapsed_ms if request is not None else 0.0
     current_timestamp = int(time.time())
-    response_time_ms = (time.time() - start_time) * 1000
     
     return {
         "status": "warm",
@@ -0,0 +1,119 @@
+"""
+Persistent Event Loop Runner
+
+The AWS MCP handler calls tool functions synchronously, and the native REST handler
+in lambda_handler_unified is synchronous too. Driving each async call with
+asyncio.run() creates and tears down an event loop per invocation, which throws away
+every loop-bound resource (pooled httpx clients, in-flight singleflight tasks) before
+the next warm invocation can reuse it.
+
+LoopRunner owns one long-lived event loop on a daemon thread. Synchronous callers
+submit coroutines to it and block on the result, so the same loop - and everything
+bound to it - survives across warm invocations. Because the loop runs on its own
+thread, callers that are themselves inside a running event loop (e.g. FastAPI
+handlers) can use it as well.
+"""
+
+import asyncio
+import threading
+import time
+from typing import Any, Coroutine
+
+
+class LoopRunner:
+    """Runs coroutines to completion on a single long-lived event loop"""
+
+    def __init__(self, name: str = "loop-runner"):
+        self.name = name
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+        self.started_at: float | None = None
+        self.runs = 0
+
+    def _ensure_started(self) -> asyncio.AbstractEventLoop:
+        """Start the loop thread on first use (or after the loop was closed)"""
+        with self._lock:
+            if self._loop is not None and self._thread is not None and self._thread.is_alive():
+                return self._loop
+
+            loop = asyncio.new_event_loop()
+            ready = threading.Event()
+
+            def serve():
+                asyncio.set_event_loop(loop)
+                loop.call_soon(ready.set)
+                loop.run_forever()
+
+            thread = threading.Thread(target=serve, name=self.name, daemon=True)
+            thread.start()
+            ready.wait()
+
+            self._loop = loop
+            self._thread = thread
+            self.started_at = time.time()
+            return loop
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        """The runner's event loop, started if necessary"""
+        return self._ensure_started()
+
+    def run(self, coro: Coroutine[Any, Any, Any], timeout: float | None = None) -> Any:
+        """
+        Run a coroutine on the persistent loop and block until it completes.
+
+        Args:
+            coro: Coroutine to run
+            timeout: Seconds to wait for the result (None waits indefinitely)
+
+        Returns:
+            The coroutine's result; exceptions raised by the coroutine propagate
+        """
+        loop = self._ensure_started()
+        if threading.current_thread() is self._thread:
+            coro.close()
+            raise RuntimeError("LoopRunner.run() cannot be called from the runner's own loop")
+
+        self.runs += 1
+        future = asyncio.run_coroutine_threadsafe(coro, loop)
+        try:
+            return future.result(timeout)
+        except TimeoutError:
+            future.cancel()
+            raise
+
+    def close(self) -> None:
+        """Stop the loop thread and close the loop"""
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = None
+        if loop is None:
+            return
+        loop.call_soon_threadsafe(loop.stop)
+        if thread is not None:
+            thread.join(timeout=5)
+        loop.close()
+
+    def stats(self) -> dict[str, Any]:
+        """Runner state for diagnostics"""
+        return {
+            "running": self._thread is not None and self._thread.is_alive(),
+            "loop_id": id(self._loop) if self._loop is not None else None,
+            "uptime_seconds": round(time.time() - self.started_at, 1) if self.started_at and self._loop else 0.0,
+            "runs": self.runs,
+        }
+
+
+# Global runner shared by the Lambda handler and the MCP tool wrappers
+_global_runner = LoopRunner()
+
+
+def get_loop_runner() -> LoopRunner:
+    """Get the process-wide loop runner"""
+    return _global_runner
+
+
+def run_sync(coro: Coroutine[Any, Any, Any], timeout: float | None = None) -> Any:
+    """Run a coroutine to completion on the process-wide persistent loop"""
+    return _global_runner.run(coro, timeout)
@@ -0,0 +1,386 @@
+"""
+In-Process Latency Metrics
+
+Every @api_function call and every upstream GET made by async_http_get_json is timed
+and aggregated in process memory:
+
+- Tools: latency histogram and error count per registered function
+- Upstreams: latency histogram, status code counts and response bytes per host, plus
+  the time requests queued for a rate/concurrency permit and how many were rejected,
+  and retry, hedge, retry-budget, circuit-breaker and stale-response counters
+
+Histograms are HDR-style: values are recorded in microseconds into log-linear buckets
+(exact below 128us, then 64 buckets per power of two, each under 1.6% wide) and
+reported as their bucket's midpoint, so any recorded value is reported with under 1%
+relative error, from microseconds to hours, in a few KB per histogram and O(1) per
+record. get_latency_metrics exposes p50/p95/p99 per tool and per host.
+
+With METRICS_EMF=true the metrics recorded since the last flush are also written to
+stdout as CloudWatch Embedded Metric Format (EMF) lines every METRICS_EMF_INTERVAL
+seconds (default 60); CloudWatch turns them into metrics without any API calls.
+Histograms are emitted as EMF value/count arrays, so CloudWatch percentiles work on
+the full distribution.
+"""
+
+import json
+import os
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+SUB_BUCKET_BITS = 7
+SUB_BUCKETS = 1 << SUB_BUCKET_BITS     # 128 exact buckets below 128us
+HALF_BUCKETS = SUB_BUCKETS >> 1        # 64 buckets per power of two above that
+
+# Per-host event counters of the retry layer (see upstream.retry) and circuit breakers
+# (see upstream.breaker)
+UPSTREAM_EVENTS = (
+    "retries", "hedges", "hedge_wins", "retry_budget_exhausted", "short_circuited", "stale_served",
+)
+
+EMF_NAMESPACE = os.environ.get("METRICS_EMF_NAMESPACE", "pb-fm-mcp")
+
+
+def _bucket_index(value: int) -> int:
+    if value < SUB_BUCKETS:
+        return value
+    shift = value.bit_length() - SUB_BUCKET_BITS
+    return SUB_BUCKETS + (shift - 1) * HALF_BUCKETS + ((value >> shift) - HALF_BUCKETS)
+
+
+def _bucket_range(index: int) -> Tuple[int, int]:
+    """Lowest and highest value (inclusive) recorded into a bucket"""
+    if index < SUB_BUCKETS:
+        return index, index
+    shift = (index - SUB_BUCKETS) // HALF_BUCKETS + 1
+    mantissa = (index - SUB_BUCKETS) % HALF_BUCKETS + HALF_BUCKETS
+    return mantissa << shift, ((mantissa + 1) << shift) - 1
+
+
+class LatencyHistogram:
+    """Log-linear latency histogram with microsecond resolution (not thread-safe)"""
+
+    __slots__ = ("counts", "count", "total_us", "min_us", "max_us")
+
+    def __init__(self):
+        self.counts: Dict[int, int] = {}
+        self.count = 0
+        self.total_us = 0
+        self.min_us: Optional[int] = None
+        self.max_us = 0
+
+    def record(self, seconds: float) -> None:
+        value = max(int(seconds * 1_000_000), 0)
+        index = _bucket_index(value)
+        counts = self.counts
+        counts[index] = counts.get(index, 0) + 1
+        self.count += 1
+        self.total_us += value
+        if self.min_us is None or value < self.min_us:
+            self.min_us = value
+        if value > self.max_us:
+            self.max_us = value
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        for index, count in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + count
+        self.count += other.count
+        self.total_us += other.total_us
+        if other.min_us is not None and (self.min_us is None or other.min_us < self.min_us):
+            self.min_us = other.min_us
+        self.max_us = max(self.max_us, other.max_us)
+
+    def buckets(self) -> Iterator[Tuple[int, int]]:
+        """(representative value in us, count) per non-empty bucket, ascending"""
+        for index in sorted(self.counts):
+            low, high = _bucket_range(index)
+            yield min((low + high) // 2, self.max_us), self.counts[index]
+
+    def percentile(self, percentile: float) -> float:
+        """Value at the given percentile (0-100) in microseconds, as its bucket's midpoint"""
+        if not self.count:
+            return 0.0
+        rank = max(int(self.count * percentile / 100.0 + 0.5), 1)
+        seen = 0
+        for value, count in self.buckets():
+            seen += count
+            if seen >= rank:
+                return float(value)
+        return float(self.max_us)
+
+    def summary(self) -> Dict[str, Any]:
+        """Count, mean, min/max and p50/p95/p99 in milliseconds"""
+        if not self.count:
+            return {"count": 0}
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total_us / self.count / 1000, 3),
+            "min_ms": round((self.min_us or 0) / 1000, 3),
+            "p50_ms": round(self.percentile(50) / 1000, 3),
+            "p95_ms": round(self.percentile(95) / 1000, 3),
+            "p99_ms": round(self.percentile(99) / 1000, 3),
+            "max_ms": round(self.max_us / 1000, 3),
+        }
+
+
+class _ToolStats:
+    __slots__ = ("latency", "errors")
+
+    def __init__(self):
+        self.latency = LatencyHistogram()
+        self.errors = 0
+
+    def merge(self, other: "_ToolStats") -> None:
+        self.latency.merge(other.latency)
+        self.errors += other.errors
+
+
+class _UpstreamStats:
+    __slots__ = ("latency", "statuses", "bytes", "queue", "rejected", "events")
+
+    def __init__(self):
+        self.latency = LatencyHistogram()
+        self.statuses: Counter = Counter()
+        self.bytes = 0
+        self.queue = LatencyHistogram()
+        self.rejected = 0
+        self.events: Counter = Counter()
+
+    def merge(self, other: "_UpstreamStats") -> None:
+        self.latency.merge(other.latency)
+        self.statuses.update(other.statuses)
+        self.bytes += other.bytes
+        self.queue.merge(other.queue)
+        self.rejected += other.rejected
+        self.events.update(other.events)
+
+
+class MetricsRegistry:
+    """Per-tool and per-upstream-host latency metrics for this process"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # Calls are recorded into the current interval, which is folded into the
+        # totals when it is flushed as EMF or read by snapshot()
+        self._tools: Dict[str, _ToolStats] = {}
+        self._upstreams: Dict[str, _UpstreamStats] = {}
+        self._interval_tools: Dict[str, _ToolStats] = {}
+        self._interval_upstreams: Dict[str, _UpstreamStats] = {}
+        self._emf_tools: Dict[str, _ToolStats] = {}
+        self._emf_upstreams: Dict[str, _UpstreamStats] = {}
+        self.started_at = time.time()
+        self.last_flush = time.monotonic()
+
+    def record_tool(self, name: str, seconds: float, error: bool = False) -> None:
+        """Record one call of a registered function"""
+        with self._lock:
+            entry = self._interval_tools.get(name)
+            if entry is None:
+                entry = self._interval_tools[name] = _ToolStats()
+            entry.latency.record(seconds)
+            if error:
+                entry.errors += 1
+
+    def record_upstream(self, host: str, seconds: float, status: Any, nbytes: int = 0) -> None:
+        """
+        Record one upstream request.
+
+        Args:
+            host: Upstream host (netloc)
+            seconds: Time until the response (or failure)
+            status: HTTP status code, or a failure kind such as "timeout"
+            nbytes: Response body size
+        """
+        with self._lock:
+            entry = self._interval_upstreams.get(host)
+            if entry is None:
+                entry = self._interval_upstreams[host] = _UpstreamStats()
+            entry.latency.record(seconds)
+            entry.statuses[str(status)] += 1
+            entry.bytes += nbytes
+
+    def record_upstream_queue(self, host: str, seconds: float, rejected: bool = False) -> None:
+        """Record the time a request waited for an upstream permit (see upstream.limits)"""
+        with self._lock:
+            entry = self._interval_upstreams.get(host)
+            if entry is None:
+                entry = self._interval_upstreams[host] = _UpstreamStats()
+            entry.queue.record(seconds)
+            if rejected:
+                entry.rejected += 1
+
+    def record_upstream_event(self, host: str, event: str) -> None:
+        """Count one of the UPSTREAM_EVENTS for a host"""
+        with self._lock:
+            entry = self._interval_upstreams.get(host)
+            if entry is None:
+                entry = self._interval_upstreams[host] = _UpstreamStats()
+            entry.events[event] += 1
+
+    def _fold_interval(self) -> None:
+        """Move the current interval into the totals and the unflushed EMF interval"""
+        for interval, *targets in (
+            (self._interval_tools, self._tools, self._emf_tools),
+            (self._interval_upstreams, self._upstreams, self._emf_upstreams),
+        ):
+            for key, entry in interval.items():
+                for target in targets:
+                    if key not in target:
+                        target[key] = type(entry)()
+                    target[key].merge(entry)
+            interval.clear()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """p50/p95/p99 and counters per tool and per upstream host"""
+        with self._lock:
+            self._fold_interval()
+            tools = {
+                name: {**entry.latency.summary(), "errors": entry.errors}
+                for name, entry in sorted(self._tools.items())
+            }
+            upstreams = {
+                host: {
+                    **entry.latency.summary(),
+                    "statuses": dict(sorted(entry.statuses.items())),
+                    "bytes_total": entry.bytes,
+                    "bytes_mean": round(entry.bytes / entry.latency.count) if entry.latency.count else 0,
+                    "queue": entry.queue.summary(),
+                    "rejected": entry.rejected,
+                    **{event: entry.events[event] for event in UPSTREAM_EVENTS},
+                }
+                for host, entry in sorted(self._upstreams.items())
+            }
+        return {
+            "since": self.started_at,
+            "tools": tools,
+            "upstreams": upstreams,
+        }
+
+    def reset(self) -> None:
+        """Discard everything recorded so far"""
+        with self._lock:
+            for stats in (
+                self._tools, self._upstreams, self._interval_tools,
+                self._interval_upstreams, self._emf_tools, self._emf_upstreams,
+            ):
+                stats.clear()
+            self.started_at = time.time()
+
+    # -------------------------------------------------------------------------
+    # CloudWatch Embedded Metric Format
+    # -------------------------------------------------------------------------
+
+    def emf_documents(self, namespace: str = EMF_NAMESPACE, reset: bool = True) -> List[Dict[str, Any]]:
+        """
+        EMF documents for the metrics recorded since the last flush.
+
+        One document per tool (dimension Tool) and per upstream host (dimension Host).
+        Latency is a histogram in milliseconds given as EMF Values/Counts arrays.
+
+        Args:
+            namespace: CloudWatch metrics namespace
+            reset: Start a new interval (what a flush does)
+        """
+        with self._lock:
+            self._fold_interval()
+            tools, upstreams = self._emf_tools, self._emf_upstreams
+            if reset:
+                self._emf_tools, self._emf_upstreams = {}, {}
+                self.last_flush = time.monotonic()
+
+        timestamp = int(time.time() * 1000)
+        documents = []
+        for name, entry in sorted(tools.items()):
+            documents.append(_emf_document(
+                namespace, timestamp, "Tool", name, entry.latency,
+                {"Errors": (entry.errors, "Count")}
+            ))
+        for host, entry in sorted(upstreams.items()):
+            failures = sum(
+                count for status, count in entry.statuses.items()
+                if status != "cancelled" and (not status.isdigit() or int(status) >= 500)
+            )
+            documents.append(_emf_document(
+                namespace, timestamp, "Host", host, entry.latency,
+                {
+                    "Bytes": (entry.bytes, "Bytes"),
+                    "Failures": (failures, "Count"),
+                    "Rejected": (entry.rejected, "Count"),
+                    "QueueTimeMax": (round(entry.queue.max_us / 1000, 3), "Milliseconds"),
+                    "Retries": (entry.events["retries"], "Count"),
+                    "Hedges": (entry.events["hedges"], "Count"),
+                    "HedgeWins": (entry.events["hedge_wins"], "Count"),
+                    "RetryBudgetExhausted": (entry.events["retry_budget_exhausted"], "Count"),
+                    "ShortCircuited": (entry.events["short_circuited"], "Count"),
+                    "StaleServed": (entry.events["stale_served"], "Count"),
+                }
+            ))
+        return documents
+
+    def maybe_flush_emf(self, interval: Optional[float] = None) -> int:
+        """
+        Print EMF lines if enabled (METRICS_EMF) and the flush interval has passed.
+
+        Returns:
+            Number of EMF lines written
+        """
+        if not emf_enabled():
+            return 0
+        if interval is None:
+            interval = float(os.environ.get("METRICS_EMF_INTERVAL", 60))
+        if time.monotonic() - self.last_flush < interval:
+            return 0
+        documents = self.emf_documents()
+        for document in documents:
+            print(json.dumps(document, separators=(",", ":")))
+        return len(documents)
+
+
+def _emf_document(
+    namespace: str,
+    timestamp: int,
+    dimension: str,
+    value: str,
+    latency: LatencyHistogram,
+    extra: Dict[str, Tuple[float, str]]
+) -> Dict[str, Any]:
+    buckets = list(latency.buckets())
+    document: Dict[str, Any] = {
+        "_aws": {
+            "Timestamp": timestamp,
+            "CloudWatchMetrics": [{
+                "Namespace": namespace,
+                "Dimensions": [[dimension]],
+                "Metrics": [{"Name": "Latency", "Unit": "Milliseconds"}] + [
+                    {"Name": name, "Unit": unit} for name, (_, unit) in extra.items()
+                ],
+            }],
+        },
+        dimension: value,
+        "Latency": {
+            "Values": [round(us / 1000, 3) for us, _ in buckets],
+            "Counts": [count for _, count in buckets],
+            "Min": round((latency.min_us or 0) / 1000, 3),
+            "Max": round(latency.max_us / 1000, 3),
+            "Count": latency.count,
+            "Sum": round(latency.total_us / 1000, 3),
+        },
+    }
+    for name, (amount, _) in extra.items():
+        document[name] = amount
+    return document
+
+
+def emf_enabled() -> bool:
+    """EMF output is opt-in with METRICS_EMF=true"""
+    return os.environ.get("METRICS_EMF", "").lower() in ("true", "1", "yes", "on")
+
+
+# Global metrics for this process
+_global_metrics = MetricsRegistry()
+
+
+def get_metrics() -> MetricsRegistry:
+    """Get the process-wide metrics registry"""
+    return _global_metrics
@@ -0,0 +1,126 @@
+"""
+Paginated Explorer List Endpoints
+
+Explorer list endpoints (balances, delegations, ...) answer
+GET <url>?count=<page size>&page=<n> with {"pages", "total", "results"}. Reading only
+page 1 silently drops everything after it, and reading page after page serializes
+one round trip per page.
+
+iter_pages() fetches page 1, which tells how many pages there are, and then fetches
+the remaining pages concurrently, yielding every page as soon as it arrives. Callers
+looking for one item can stop early; closing the generator (async with aclosing(...))
+cancels the pages still in flight:
+
+    async with aclosing(iter_pages(url)) as pages:
+        async for page_number, page in pages:
+            ...
+
+fetch_all_pages() collects every page into one {"results", "total", "pages"} dict with
+results in page order.
+
+Every page goes through async_http_get_json, so pages share the pooled clients, the
+response cache, request coalescing, rate limits and retries of single requests.
+"""
+
+import math
+from contextlib import aclosing
+from typing import Any, AsyncIterator
+
+from fetch_graph import fan_out, is_error
+from utils import JSONType, async_http_get_json
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGES = 100
+
+
+def page_count(first_page: dict[str, Any], page_size: int) -> int:
+    """Number of pages announced by the first page of a list endpoint"""
+    pages = first_page.get("pages")
+    if pages is not None:
+        return int(pages)
+    total = int(first_page.get("total") or 0)
+    return max(1, math.ceil(total / page_size))
+
+
+async def iter_pages(
+    url: str,
+    params: dict | None = None,
+    page_size: int = DEFAULT_PAGE_SIZE,
+    max_concurrency: int = 4,
+    max_pages: int = MAX_PAGES,
+    timeout: float = 10.0,
+) -> AsyncIterator[tuple[int, JSONType]]:
+    """
+    Fetch every page of an explorer list endpoint.
+
+    Yields (page number, page) with page 1 first and the remaining pages in
+    completion order. A page that fails is yielded as its MCP-ERROR dict; when page 1
+    fails nothing else is fetched.
+
+    Args:
+        url: List endpoint URL
+        params: Extra query parameters (count and page are set per request)
+        page_size: Items requested per page
+        max_concurrency: Pages fetched at the same time after page 1
+        max_pages: Pages fetched at most
+        timeout: Seconds per page request
+    """
+    base_params = dict(params or {})
+
+    def fetch_page(page: int):
+        return async_http_get_json(url, params={**base_params, "count": page_size, "page": page}, timeout=timeout)
+
+    first = await fetch_page(1)
+    yield 1, first
+    if is_error(first) or not isinstance(first, dict):
+        return
+
+    remaining = list(range(2, min(page_count(first, page_size), max_pages) + 1))
+    async for index, page in fan_out(remaining, fetch_page, max_concurrency=max_concurrency, timeout=None):
+        yield remaining[index], page
+
+
+async def fetch_all_pages(
+    url: str,
+    params: dict | None = None,
+    page_size: int = DEFAULT_PAGE_SIZE,
+    max_concurrency: int = 4,
+    max_pages: int = MAX_PAGES,
+    timeout: float = 10.0,
+) -> JSONType:
+    """
+    Fetch every page of an explorer list endpoint and concatenate the results.
+
+    Args:
+        url: List endpoint URL
+        params: Extra query parameters
+        page_size: Items requested per page
+        max_concurrency: Pages fetched at the same time after page 1
+        max_pages: Pages fetched at most
+        timeout: Seconds per page request
+
+    Returns:
+        Dictionary containing:
+        - results: Items of all pages, in page order
+        - total: Item count reported by the endpoint
+        - pages: Page count reported by the endpoint
+        - truncated: True when more than max_pages pages exist
+        Or the MCP-ERROR dict of the first page that failed
+    """
+    pages: dict[int, dict[str, Any]] = {}
+    async with aclosing(iter_pages(url, params, page_size, max_concurrency, max_pages, timeout)) as stream:
+        async for page_number, page in stream:
+            if is_error(page):
+                return page
+            if not isinstance(page, dict):
+                return {"MCP-ERROR": f"Unexpected list page format: {type(page).__name__}"}
+            pages[page_number] = page
+
+    first = pages[1]
+    announced = page_count(first, page_size)
+    return {
+        "results": [item for number in sorted(pages) for item in pages[number].get("results", [])],
+        "total": int(first.get("total") or 0),
+        "pages": announced,
+        "truncated": announced > max_pages,
+    }
@@ -8,11 +8,14 @@ REST API endpoints.
 
 from .decorator import api_function
 from .registry import FunctionRegistry, get_registry
+from .router import Router, RouteMatch
 from .generators import RegistryGenerator
 
 __all__ = [
     "api_function", 
     "FunctionRegistry", 
     "get_registry",
+    "Router",
+    "RouteMatch",
     "RegistryGenerator"
 ]
\ No newline at end of file
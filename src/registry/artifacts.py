@@ -0,0 +1,157 @@
+"""
+Precomputed Protocol Artifacts
+
+The MCP tools/list payload, the OpenAPI document and the /docs page only change when
+the registry (or the deployed version) changes, yet building them introspects every
+function's signature and parses its docstring. ArtifactCache serves them as
+precomputed strings:
+
+- At deploy time scripts/build_protocol_artifacts.py serializes them to
+  src/functions/protocol_artifacts.json, which is loaded on the first request.
+- At runtime the artifacts are keyed by a fingerprint of the exposed surface. When
+  the registry changes (a new registration, or a stale build artifact), they are
+  regenerated once and cached again.
+
+Checking for changes is a counter comparison per request: the fingerprint is only
+recomputed when FunctionRegistry.version has moved.
+"""
+
+import hashlib
+import json
+import threading
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from .registry import FunctionRegistry
+
+DEFAULT_ARTIFACTS_PATH = Path(__file__).parent.parent / "functions" / "protocol_artifacts.json"
+
+
+@dataclass
+class ProtocolArtifacts:
+    """Serialized protocol documents for one registry surface"""
+    fingerprint: str
+    tools_list: str   # JSON of the tools/list result: {"tools": [...]}
+    openapi: str      # OpenAPI document body
+    docs_html: str    # /docs page body
+    generated_at: float
+    source: str = "runtime"  # "build" when loaded from the build artifact
+
+    def tools_list_response_body(self, request_id: Any) -> str:
+        """JSON-RPC tools/list response body, byte-identical to the MCP handler's"""
+        return f'{{"jsonrpc": "2.0", "id": {json.dumps(request_id)}, "result": {self.tools_list}}}'
+
+
+def surface_fingerprint(
+    registry: FunctionRegistry,
+    mcp_tools: Iterable[Dict[str, Any]],
+    version: str = ""
+) -> str:
+    """
+    Hash of everything the artifacts are generated from.
+
+    Args:
+        registry: Function registry (REST surface and docstrings)
+        mcp_tools: MCP tool definitions as served by tools/list
+        version: Deployed version string embedded in the documents
+    """
+    digest = hashlib.sha256(version.encode())
+    digest.update(json.dumps(list(mcp_tools), sort_keys=True).encode())
+    for meta in registry.get_rest_functions():
+        digest.update(json.dumps([
+            meta.name, meta.rest_method, meta.rest_path, meta.description,
+            meta.docstring, str(meta.signature), meta.tags,
+        ]).encode())
+    return digest.hexdigest()
+
+
+class ArtifactCache:
+    """Serves protocol artifacts, regenerating them only when the registry changes"""
+
+    def __init__(
+        self,
+        registry: FunctionRegistry,
+        fingerprint: Callable[[], str],
+        generate: Callable[[], Dict[str, str]],
+        path: Optional[Path] = DEFAULT_ARTIFACTS_PATH
+    ):
+        """
+        Args:
+            registry: Registry whose version signals possible changes
+            fingerprint: Computes the current surface fingerprint
+            generate: Builds {"tools_list", "openapi", "docs_html"} from scratch
+            path: Build artifact to try before generating (None to skip)
+        """
+        self.registry = registry
+        self._fingerprint = fingerprint
+        self._generate = generate
+        self.path = Path(path) if path else None
+        self._artifacts: Optional[ProtocolArtifacts] = None
+        self._registry_version: Optional[int] = None
+        self._lock = threading.Lock()
+        self.regenerations = 0
+
+    def get(self) -> ProtocolArtifacts:
+        """Current artifacts (fast path: no work unless the registry version moved)"""
+        artifacts = self._artifacts
+        if artifacts is not None and self._registry_version == self.registry.version:
+            return artifacts
+
+        with self._lock:
+            version = self.registry.version
+            if self._artifacts is not None and self._registry_version == version:
+                return self._artifacts
+
+            fingerprint = self._fingerprint()
+            if self._artifacts is None:
+                self._artifacts = self._load(fingerprint)
+            if self._artifacts is None or self._artifacts.fingerprint != fingerprint:
+                self._artifacts = self.generate(fingerprint)
+                self.regenerations += 1
+
+            self._registry_version = version
+            return self._artifacts
+
+    def generate(self, fingerprint: Optional[str] = None) -> ProtocolArtifacts:
+        """Build fresh artifacts for the current registry"""
+        documents = self._generate()
+        return ProtocolArtifacts(
+            fingerprint=fingerprint or self._fingerprint(),
+            tools_list=documents["tools_list"],
+            openapi=documents["openapi"],
+            docs_html=documents["docs_html"],
+            generated_at=time.time(),
+        )
+
+    def _load(self, fingerprint: str) -> Optional[ProtocolArtifacts]:
+        """Load the build artifact if it exists and matches the current surface"""
+        if self.path is None:
+            return None
+        try:
+            data = json.loads(self.path.read_text())
+            artifacts = ProtocolArtifacts(**{**data, "source": "build"})
+        except (OSError, ValueError, TypeError):
+            return None
+        return artifacts if artifacts.fingerprint == fingerprint else None
+
+    def write(self, path: Optional[Path] = None) -> ProtocolArtifacts:
+        """Generate the artifacts and write them to the build artifact file"""
+        artifacts = self.generate()
+        target = Path(path or self.path)
+        target.write_text(json.dumps(asdict(artifacts)))
+        return artifacts
+
+    def stats(self) -> Dict[str, Any]:
+        """Where the current artifacts came from and how often they were rebuilt"""
+        artifacts = self._artifacts
+        return {
+            "loaded": artifacts is not None,
+            "source": artifacts.source if artifacts else None,
+            "fingerprint": artifacts.fingerprint[:12] if artifacts else None,
+            "generated_at": artifacts.generated_at if artifacts else None,
+            "regenerations": self.regenerations,
+            "tools_list_bytes": len(artifacts.tools_list) if artifacts else 0,
+            "openapi_bytes": len(artifacts.openapi) if artifacts else 0,
+        }
@@ -0,0 +1,119 @@
+"""
+Argument Binders
+
+Each registered function gets an ArgumentBinder compiled once in
+FunctionRegistry.register: its signature, a converter per parameter resolved from the
+type hints, and a template of default values. Protocol handlers (native Lambda REST,
+FastAPI, MCP) hand the binder their raw parameter sources and get the function's
+kwargs back in a single pass, instead of re-inspecting the signature and walking
+if/elif conversion chains on every request.
+"""
+
+import inspect
+import types
+import typing
+from typing import Any, Callable, Dict, Mapping, Optional, Tuple
+
+
+def _unwrap_optional(param_type: Any) -> Any:
+    """Optional[X] / X | None -> X; anything else is returned unchanged"""
+    if typing.get_origin(param_type) in (typing.Union, types.UnionType):
+        args = [arg for arg in typing.get_args(param_type) if arg is not type(None)]
+        if len(args) == 1:
+            return args[0]
+    return param_type
+
+
+def _to_bool(value: Any) -> bool:
+    if isinstance(value, bool):
+        return value
+    return str(value).lower() in ('true', '1', 'yes', 'on')
+
+
+def _identity(value: Any) -> Any:
+    return value
+
+
+def make_converter(param_type: Any) -> Callable[[Any], Any]:
+    """Build the converter applied to raw (string or JSON) values of a parameter"""
+    param_type = _unwrap_optional(param_type)
+    if param_type is int:
+        return int
+    if param_type is float:
+        return float
+    if param_type is bool:
+        return _to_bool
+    return _identity
+
+
+class ArgumentBinder:
+    """Compiled kwargs builder for one registered function"""
+
+    def __init__(self, func: Callable):
+        self.signature = inspect.signature(func)
+        self.type_hints: Dict[str, Any] = dict(getattr(func, '__annotations__', {}))
+        self.is_coroutine = inspect.iscoroutinefunction(func)
+
+        parameters = [
+            param for name, param in self.signature.parameters.items()
+            if name not in ('self', 'cls')
+            and param.kind not in (param.VAR_POSITIONAL, param.VAR_KEYWORD)
+        ]
+        self.params: Tuple[str, ...] = tuple(param.name for param in parameters)
+        self.converters: Dict[str, Callable[[Any], Any]] = {
+            param.name: make_converter(self.type_hints.get(param.name, str))
+            for param in parameters
+        }
+        self.defaults: Dict[str, Any] = {
+            param.name: param.default
+            for param in parameters
+            if param.default is not param.empty
+        }
+        self.accepts_extra = any(
+            param.kind is param.VAR_KEYWORD for param in self.signature.parameters.values()
+        )
+
+    def convert(self, name: str, value: Any) -> Any:
+        """
+        Convert a raw value for parameter name.
+
+        Raises:
+            ValueError: If the value cannot be converted to the parameter's type
+        """
+        converter = self.converters.get(name, _identity)
+        try:
+            return converter(value)
+        except (ValueError, TypeError) as e:
+            raise ValueError(f"Invalid value for parameter {name}: {value}") from e
+
+    def bind(self, *sources: Optional[Mapping[str, Any]]) -> Dict[str, Any]:
+        """
+        Build the function's kwargs from raw parameter sources.
+
+        Sources are given in priority order: for each parameter the first source that
+        has it wins. Values are converted to the parameter's type, missing parameters
+        with a default get the default, and names the function does not accept are
+        dropped (unless it takes **kwargs).
+
+        Raises:
+            ValueError: If a value cannot be converted to its parameter's type
+        """
+        sources = [source for source in sources if source]
+        kwargs: Dict[str, Any] = {}
+
+        for name in self.params:
+            for source in sources:
+                if name in source:
+                    kwargs[name] = self.convert(name, source[name])
+                    break
+            else:
+                if name in self.defaults:
+                    kwargs[name] = self.defaults[name]
+
+        if self.accepts_extra:
+            for source in reversed(sources):
+                for name, value in source.items():
+                    if name not in self.converters:
+                        kwargs[name] = value
+
+        return kwargs
@@ -8,17 +8,31 @@ exposed as both MCP tools and REST API endpoints with unified documentation.
 from typing import Callable, List, Optional, Union, Any
 from functools import wraps
 import asyncio
+import time
+
+from metrics import get_metrics
+from upstream.cache import cache_ttl_scope, stale_response_scope
 
 from .registry import get_registry, Protocol
 
 
+def _mark_stale(result: Any, stale_ages: List[float]) -> None:
+    """Flag a result built from stale upstream responses with the oldest one's age"""
+    if stale_ages and isinstance(result, dict) and "MCP-ERROR" not in result:
+        result["MCP-STALE"] = {
+            "stale_responses": len(stale_ages),
+            "max_age_seconds": round(max(stale_ages), 1),
+        }
+
+
 def api_function(
     protocols: Union[List[str], List[Protocol]] = None,
     description: Optional[str] = None,
     path: Optional[str] = None,
     method: str = "GET",
     tags: Optional[List[str]] = None,
-    name: Optional[str] = None
+    name: Optional[str] = None,
+    cache_ttl: Optional[float] = None
 ):
     """
     Decorator to register a function for automatic MCP and REST endpoint generation.
@@ -33,6 +47,8 @@ def api_function(
         method: HTTP method for REST endpoint (GET, POST, etc.)
         tags: Tags for grouping functions in documentation
         name: Custom function name (defaults to actual function name)
+        cache_ttl: Seconds that upstream GET responses fetched by this function may be
+                   served from the response cache (None disables caching)
     
     Example:
         ```python
@@ -87,25 +103,53 @@ def api_function(
             rest_path=rest_path,
             rest_method=method,
             tags=tags,
-            name=name
+            name=name,
+            cache_ttl=cache_ttl
         )
         
         # Create async-compatible wrapper
+        # The wrapper scopes this function's cache TTL over every upstream GET it makes,
+        # marks results built from stale upstream responses (see upstream/breaker.py)
+        # and records the call's latency (and whether it failed) in the process metrics
+        metrics = get_metrics()
+        func_name = meta.name
+        
         if asyncio.iscoroutinefunction(func):
             @wraps(func)
             async def async_wrapper(*args, **kwargs):
-                return await func(*args, **kwargs)
+                start = time.perf_counter()
+                failed = True
+                try:
+                    with cache_ttl_scope(meta.cache_ttl), stale_response_scope() as stale_ages:
+                        result = await func(*args, **kwargs)
+                    _mark_stale(result, stale_ages)
+                    failed = isinstance(result, dict) and "MCP-ERROR" in result
+                    return result
+                finally:
+                    metrics.record_tool(func_name, time.perf_counter() - start, failed)
             wrapper = async_wrapper
         else:
             @wraps(func)
             def sync_wrapper(*args, **kwargs):
-                return func(*args, **kwargs)
+                start = time.perf_counter()
+                failed = True
+                try:
+                    with cache_ttl_scope(meta.cache_ttl), stale_response_scope() as stale_ages:
+                        result = func(*args, **kwargs)
+                    _mark_stale(result, stale_ages)
+                    failed = isinstance(result, dict) and "MCP-ERROR" in result
+                    return result
+                finally:
+                    metrics.record_tool(func_name, time.perf_counter() - start, failed)
             wrapper = sync_wrapper
         
         # Attach metadata to the wrapper function for introspection
         wrapper._api_meta = meta
         wrapper._original_func = func
         
+        # Protocol handlers call meta.func, so they must go through the wrapper too
+        meta.func = wrapper
+        
         return wrapper
     
     return decorator
@@ -121,4 +165,27 @@ def get_function_meta(func: Callable) -> Optional[Any]:
     Returns:
         FunctionMeta object if function is decorated, None otherwise
     """
-    return getattr(func, '_api_meta', None)
\ No newline at end of file
+    return getattr(func, '_api_meta', None)
+
+
+def require_function_meta(func: Callable) -> Any:
+    """
+    Get the API metadata of a registered function, falling back to a registry
+    lookup by name (e.g. for lazy stubs).
+    
+    Args:
+        func: The registered function
+        
+    Returns:
+        FunctionMeta object
+        
+    Raises:
+        LookupError: If the function is not in the registry, so it would be
+                     called without its argument binder
+    """
+    meta = get_function_meta(func)
+    if meta is None:
+        meta = get_registry().get_function(getattr(func, '__name__', ''))
+    if meta is None:
+        raise LookupError(f"No API metadata for {getattr(func, '__name__', func)!r}: not a registered function")
+    return meta
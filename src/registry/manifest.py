@@ -0,0 +1,275 @@
+"""
+Registry Manifest for Lazy Function Loading
+
+Importing every function module at cold start is expensive: several of them create
+boto3 clients and resources at module level even when the deployment only exposes
+the core blockchain tools. The manifest is built at deploy time (see
+scripts/build_registry_manifest.py) and records, for every registered function, the
+module that defines it plus the metadata and signature the protocol handlers need
+(MCP schemas, OpenAPI and argument binders are derived from the signature).
+
+At runtime the functions package registers a lightweight stub per manifest entry
+instead of importing the modules. A stub carries the real function's name,
+docstring, signature and annotations, so MCP tool registration, OpenAPI generation
+and argument binding work unchanged. The defining module is imported on the first
+invocation of one of its functions, which replaces the stub in the registry with the
+real decorated function.
+
+The manifest stores a fingerprint of the functions package sources. If the sources
+have changed since the manifest was built, it is ignored and every module is
+imported eagerly, as before.
+"""
+
+import functools
+import hashlib
+import importlib
+import inspect
+import json
+import os
+import sys
+import threading
+import typing
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import structlog
+
+from .registry import FunctionMeta, FunctionRegistry, get_registry
+
+logger = structlog.get_logger()
+
+MANIFEST_VERSION = 1
+
+FUNCTIONS_DIR = Path(__file__).parent.parent / "functions"
+DEFAULT_MANIFEST_PATH = FUNCTIONS_DIR / "registry_manifest.json"
+
+_PARAMETER_KINDS = {kind.name: kind for kind in inspect._ParameterKind}
+
+
+def manifest_path() -> Path:
+    """Location of the manifest (overridable with FUNCTIONS_MANIFEST_PATH)"""
+    return Path(os.environ.get("FUNCTIONS_MANIFEST_PATH", DEFAULT_MANIFEST_PATH))
+
+
+def lazy_loading_enabled() -> bool:
+    """Lazy loading is on unless FUNCTIONS_LAZY_LOADING is set to false"""
+    return os.environ.get("FUNCTIONS_LAZY_LOADING", "true").lower() not in ("false", "0", "no", "off")
+
+
+def source_fingerprint(package_dir: Path = FUNCTIONS_DIR) -> str:
+    """SHA-256 over the relative paths and contents of the package's .py files"""
+    digest = hashlib.sha256()
+    for path in sorted(package_dir.rglob("*.py")):
+        digest.update(str(path.relative_to(package_dir)).encode())
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+# =============================================================================
+# Annotation (de)serialization
+# =============================================================================
+
+@functools.lru_cache(maxsize=1)
+def _annotation_namespace() -> Dict[str, Any]:
+    from utils import JSONType
+    namespace = {name: getattr(typing, name) for name in typing.__all__}
+    namespace.update({
+        "typing": typing,
+        "NoneType": type(None),
+        "JSONType": JSONType,
+        "str": str, "int": int, "float": float, "bool": bool,
+        "dict": dict, "list": list, "tuple": tuple, "set": set, "bytes": bytes,
+    })
+    return namespace
+
+
+def annotation_to_str(annotation: Any) -> Optional[str]:
+    """Serialize a type annotation; None when the parameter is unannotated"""
+    from utils import JSONType
+    if annotation is inspect.Parameter.empty:
+        return None
+    if annotation == JSONType:
+        return "JSONType"
+    if isinstance(annotation, type):
+        return annotation.__name__
+    return repr(annotation)
+
+
+def annotation_from_str(text: Optional[str]) -> Any:
+    """Rebuild a type annotation serialized by annotation_to_str (Any if unresolvable)"""
+    if text is None:
+        return inspect.Parameter.empty
+    try:
+        return eval(text, _annotation_namespace())
+    except Exception:
+        return typing.Any
+
+
+# =============================================================================
+# Build time
+# =============================================================================
+
+def _entry(meta: FunctionMeta) -> Dict[str, Any]:
+    original = getattr(meta.func, "_original_func", meta.func)
+    signature = meta.signature
+    hints = meta.type_hints
+
+    parameters = []
+    for param in signature.parameters.values():
+        spec = {
+            "name": param.name,
+            "kind": param.kind.name,
+            "annotation": annotation_to_str(hints.get(param.name, inspect.Parameter.empty)),
+        }
+        if param.default is not param.empty:
+            spec["default"] = param.default
+        parameters.append(spec)
+
+    return {
+        "name": meta.name,
+        "module": original.__module__,
+        "is_async": meta.binder.is_coroutine,
+        "protocols": [p.value for p in meta.protocols],
+        "description": meta.description,
+        "docstring": inspect.getdoc(meta.func),
+        "rest_path": meta.rest_path,
+        "rest_method": meta.rest_method,
+        "tags": meta.tags,
+        "cache_ttl": meta.cache_ttl,
+        "parameters": parameters,
+        "return_annotation": annotation_to_str(hints.get("return", inspect.Parameter.empty)),
+    }
+
+
+def build_manifest(registry: Optional[FunctionRegistry] = None) -> Dict[str, Any]:
+    """Build the manifest from a fully imported registry"""
+    registry = registry or get_registry()
+    functions = [
+        _entry(meta) for meta in registry.get_all_functions().values()
+        if not meta.lazy
+    ]
+    return {
+        "manifest_version": MANIFEST_VERSION,
+        "source_fingerprint": source_fingerprint(),
+        "modules": sorted({entry["module"] for entry in functions}),
+        "functions": functions,
+    }
+
+
+def write_manifest(path: Optional[Path] = None, registry: Optional[FunctionRegistry] = None) -> Dict[str, Any]:
+    """Build the manifest and write it as JSON"""
+    manifest = build_manifest(registry)
+    path = Path(path or manifest_path())
+    path.write_text(json.dumps(manifest, indent=1, sort_keys=True))
+    return manifest
+
+
+# =============================================================================
+# Runtime
+# =============================================================================
+
+def load_manifest(path: Optional[Path] = None, check_fingerprint: bool = True) -> Optional[Dict[str, Any]]:
+    """
+    Load the manifest if it exists and matches the current sources.
+
+    Returns:
+        The manifest dict, or None if it is missing, unreadable, from another
+        manifest version, or stale
+    """
+    path = Path(path or manifest_path())
+    try:
+        manifest = json.loads(path.read_text())
+    except (OSError, ValueError):
+        return None
+
+    if manifest.get("manifest_version") != MANIFEST_VERSION:
+        return None
+    if check_fingerprint and manifest.get("source_fingerprint") != source_fingerprint():
+        logger.warning("registry_manifest_stale", manifest=path.name, fallback="eager_import")
+        return None
+    return manifest
+
+
+_import_lock = threading.RLock()
+
+
+def _make_stub(entry: Dict[str, Any], registry: FunctionRegistry) -> Callable:
+    """Create a stand-in with the real function's signature that imports its module on call"""
+    name = entry["name"]
+    module = entry["module"]
+
+    def resolve() -> Callable:
+        meta = registry.get_function(name)
+        if meta is None or meta.lazy:
+            with _import_lock:
+                importlib.import_module(module)
+            meta = registry.get_function(name)
+        if meta is None or meta.lazy:
+            raise RuntimeError(f"Function '{name}' was not registered by module {module}")
+        return meta.func
+
+    if entry["is_async"]:
+        async def stub(*args, **kwargs):
+            return await resolve()(*args, **kwargs)
+    else:
+        def stub(*args, **kwargs):
+            return resolve()(*args, **kwargs)
+
+    parameters = []
+    annotations = {}
+    for spec in entry["parameters"]:
+        annotation = annotation_from_str(spec["annotation"])
+        if annotation is not inspect.Parameter.empty:
+            annotations[spec["name"]] = annotation
+        parameters.append(inspect.Parameter(
+            spec["name"],
+            _PARAMETER_KINDS[spec["kind"]],
+            default=spec.get("default", inspect.Parameter.empty),
+            annotation=annotation,
+        ))
+    return_annotation = annotation_from_str(entry["return_annotation"])
+    if return_annotation is not inspect.Parameter.empty:
+        annotations["return"] = return_annotation
+
+    stub.__name__ = name
+    stub.__qualname__ = name
+    stub.__module__ = module
+    stub.__doc__ = entry["docstring"]
+    stub.__annotations__ = annotations
+    stub.__signature__ = inspect.Signature(parameters, return_annotation=return_annotation)
+    stub._lazy_module = module
+    return stub
+
+
+def register_lazy_functions(manifest: Dict[str, Any], registry: Optional[FunctionRegistry] = None) -> int:
+    """
+    Register a stub for every manifest entry not already in the registry.
+
+    Returns:
+        Number of stubs registered
+    """
+    registry = registry or get_registry()
+    count = 0
+    for entry in manifest["functions"]:
+        if entry["name"] in registry:
+            continue
+        meta = registry.register(
+            func=_make_stub(entry, registry),
+            protocols=entry["protocols"],
+            description=entry["description"],
+            rest_path=entry["rest_path"],
+            rest_method=entry["rest_method"],
+            tags=entry["tags"],
+            name=entry["name"],
+            cache_ttl=entry["cache_ttl"],
+        )
+        meta.lazy = True
+        # Protocol wrappers find the binder through _api_meta, as on decorated functions
+        meta.func._api_meta = meta
+        count += 1
+    return count
+
+
+def loaded_modules(manifest: Dict[str, Any]) -> List[str]:
+    """Manifest modules that have been imported so far"""
+    return [module for module in manifest["modules"] if module in sys.modules]
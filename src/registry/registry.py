@@ -10,6 +10,8 @@ from typing import Dict, List, Callable, Any, Optional, Union
 from dataclasses import dataclass, field
 from enum import Enum
 
+from .binder import ArgumentBinder
+
 
 class Protocol(Enum):
     """Supported protocols for function exposure"""
@@ -28,6 +30,13 @@ class FunctionMeta:
     rest_path: Optional[str] = None
     rest_method: str = "GET"
     tags: List[str] = field(default_factory=list)
+    cache_ttl: Optional[float] = None
+    binder: Optional[ArgumentBinder] = None
+    lazy: bool = False  # Stub from the registry manifest; module not imported yet
+    
+    def __post_init__(self):
+        if self.binder is None:
+            self.binder = ArgumentBinder(self.func)
     
     @property
     def docstring(self) -> str:
@@ -36,13 +45,13 @@ class FunctionMeta:
     
     @property
     def signature(self) -> inspect.Signature:
-        """Get the function's signature for type introspection"""
-        return inspect.signature(self.func)
+        """Get the function's signature for type introspection (cached by the binder)"""
+        return self.binder.signature
     
     @property
     def type_hints(self) -> Dict[str, Any]:
-        """Get the function's type hints"""
-        return getattr(self.func, '__annotations__', {})
+        """Get the function's type hints (cached by the binder)"""
+        return self.binder.type_hints
 
 
 class FunctionRegistry:
@@ -55,6 +64,8 @@ class FunctionRegistry:
     
     def __init__(self):
         self._functions: Dict[str, FunctionMeta] = {}
+        self._router = None
+        self.version = 0  # Bumped on every registration; lets caches detect changes
     
     def register(
         self, 
@@ -64,7 +75,8 @@ class FunctionRegistry:
         rest_path: Optional[str] = None,
         rest_method: str = "GET",
         tags: Optional[List[str]] = None,
-        name: Optional[str] = None
+        name: Optional[str] = None,
+        cache_ttl: Optional[float] = None
     ) -> FunctionMeta:
         """
         Register a function in the registry.
@@ -77,6 +89,7 @@ class FunctionRegistry:
             rest_method: HTTP method for REST endpoint
             tags: Tags for grouping functions
             name: Custom name (defaults to function name)
+            cache_ttl: Seconds upstream responses may be cached for this function
             
         Returns:
             FunctionMeta: The registered function metadata
@@ -100,10 +113,14 @@ class FunctionRegistry:
             description=func_description,
             rest_path=rest_path,
             rest_method=rest_method.upper(),
-            tags=tags or []
+            tags=tags or [],
+            cache_ttl=cache_ttl,
+            binder=ArgumentBinder(func)  # Compiled once; reused by every protocol handler
         )
         
         self._functions[func_name] = meta
+        self._router = None  # Recompiled on next dispatch
+        self.version += 1
         return meta
     
     def get_function(self, name: str) -> Optional[FunctionMeta]:
@@ -132,6 +149,13 @@ class FunctionRegistry:
         """Get all functions that support REST protocol"""
         return self.get_functions_by_protocol(Protocol.REST)
     
+    def get_router(self) -> "Router":
+        """Get the compiled REST router, building it if the registry changed"""
+        if self._router is None:
+            from .router import Router
+            self._router = Router(self.get_rest_functions())
+        return self._router
+    
     def __len__(self) -> int:
         """Get number of registered functions"""
         return len(self._functions)
@@ -0,0 +1,149 @@
+"""
+Compiled REST Router
+
+Segment trie over the registry's REST path patterns. The trie is built once from the
+registry and dispatches a method + path by walking the path's segments, instead of
+trying every registered pattern as a freshly compiled regex. Path parameters are
+converted by each function's compiled ArgumentBinder, so a match yields typed
+parameters directly.
+
+Static segments take precedence over parameter segments at the same position, and
+when two functions declare the same method and pattern the first one registered wins,
+matching the previous linear scan.
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from .registry import FunctionMeta
+
+
+@dataclass
+class Route:
+    """A compiled REST route"""
+    meta: FunctionMeta
+    method: str
+    pattern: str
+    param_names: List[str]
+
+
+@dataclass
+class RouteMatch:
+    """Result of a successful dispatch"""
+    route: Route
+    params: Dict[str, Any]
+
+    @property
+    def meta(self) -> FunctionMeta:
+        return self.route.meta
+
+
+@dataclass
+class _Node:
+    static: Dict[str, "_Node"] = field(default_factory=dict)
+    param: Optional["_Node"] = None
+    routes: Dict[str, Route] = field(default_factory=dict)
+
+
+def _segments(path: str) -> List[str]:
+    return path.split('/')
+
+
+def _is_param(segment: str) -> bool:
+    return len(segment) > 2 and segment[0] == '{' and segment[-1] == '}'
+
+
+class Router:
+    """Method + path dispatcher compiled from registered REST functions"""
+
+    def __init__(self, functions: Optional[List[FunctionMeta]] = None):
+        self._root = _Node()
+        self.routes: List[Route] = []
+        for meta in functions or []:
+            self.add(meta)
+
+    def add(self, meta: FunctionMeta) -> Optional[Route]:
+        """
+        Compile a function's REST path into the trie.
+
+        Returns:
+            The new route, or None if the method and pattern were already taken
+        """
+        if not meta.rest_path:
+            return None
+
+        node = self._root
+        param_names = []
+        for segment in _segments(meta.rest_path):
+            if _is_param(segment):
+                param_names.append(segment[1:-1])
+                if node.param is None:
+                    node.param = _Node()
+                node = node.param
+            else:
+                node = node.static.setdefault(segment, _Node())
+
+        if meta.rest_method in node.routes:
+            return None
+
+        route = Route(
+            meta=meta,
+            method=meta.rest_method,
+            pattern=meta.rest_path,
+            param_names=param_names
+        )
+        node.routes[route.method] = route
+        self.routes.append(route)
+        return route
+
+    def _find(
+        self, node: _Node, method: str, segments: List[str], index: int, values: List[str]
+    ) -> Optional[Route]:
+        """Walk the trie, preferring static segments and backtracking to parameters"""
+        if index == len(segments):
+            return node.routes.get(method)
+
+        segment = segments[index]
+        child = node.static.get(segment)
+        if child is not None:
+            found = self._find(child, method, segments, index + 1, values)
+            if found is not None:
+                return found
+
+        if node.param is not None and segment:
+            values.append(segment)
+            found = self._find(node.param, method, segments, index + 1, values)
+            if found is not None:
+                return found
+            values.pop()
+
+        return None
+
+    def match(self, method: str, path: str) -> Optional[RouteMatch]:
+        """
+        Dispatch a request.
+
+        Returns:
+            The matched route with converted path parameters, or None if no route
+            matches the method and path
+
+        Raises:
+            ValueError: If a path parameter cannot be converted to its declared type
+        """
+        if not path:
+            return None
+
+        values: List[str] = []
+        route = self._find(self._root, method.upper(), _segments(path), 0, values)
+        if route is None:
+            return None
+
+        binder = route.meta.binder
+        params = {
+            name: binder.convert(name, value)
+            for name, value in zip(route.param_names, values)
+        }
+        return RouteMatch(route=route, params=params)
+
+    def __len__(self) -> int:
+        return len(self.routes)
@@ -0,0 +1,287 @@
+"""
+Structured, Sampled Request Logging
+
+Replaces per-request print debugging in the Lambda handler with structlog:
+
+- Levels: LOG_LEVEL (default INFO). Calls below the level are dropped by structlog's
+  filtering logger before any event dict is built or rendered.
+- Lazy formatting: wrap expensive values in lazy(...); they are only evaluated when
+  the event is actually emitted.
+- Debug mode: set_debug_logging() lowers the level to DEBUG at runtime for at most
+  MAX_DEBUG_SECONDS (LOG_DEBUG=true enables it from startup, without a time limit).
+  It only affects the process it runs in, i.e. one Lambda execution environment.
+- One compact line per request: request_scope() emits a single "request" event with
+  route, status and timing fields when the request finishes.
+- Per-route sampling: successful, fast requests are logged at the rate configured for
+  their path in LOG_SAMPLE_RATES (e.g. "/mcp=0.1,/api/*=0.25,*=1"). Errors, slow
+  requests (LOG_SLOW_MS) and everything in debug mode are always logged.
+
+Output is one JSON object per line (LOG_FORMAT=json, the default in Lambda) or
+structlog's console renderer (LOG_FORMAT=console, the default elsewhere).
+"""
+
+import fnmatch
+import logging
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import structlog
+
+SENSITIVE_HEADERS = {"authorization", "cookie", "x-api-key", "x-amz-security-token"}
+
+# Longest runtime debug mode, in seconds; longer requests are clamped to it
+MAX_DEBUG_SECONDS = 3600
+
+
+class Lazy:
+    """A log value computed only if the event is emitted"""
+    __slots__ = ("fn",)
+
+    def __init__(self, fn: Callable[[], Any]):
+        self.fn = fn
+
+
+def lazy(fn: Callable[[], Any]) -> Lazy:
+    """Defer computing a log value until the event is rendered"""
+    return Lazy(fn)
+
+
+def _resolve_lazy(logger, method_name, event_dict):
+    for key, value in event_dict.items():
+        if isinstance(value, Lazy):
+            try:
+                event_dict[key] = value.fn()
+            except Exception as e:
+                event_dict[key] = f"<unavailable: {e}>"
+    return event_dict
+
+
+def redact_headers(headers: Optional[Dict[str, str]]) -> Dict[str, str]:
+    """Headers with credential values masked"""
+    return {
+        key: "***" if key.lower() in SENSITIVE_HEADERS else value
+        for key, value in (headers or {}).items()
+    }
+
+
+def _parse_sample_rates(spec: str) -> List[Tuple[str, float]]:
+    """Parse "pattern=rate,..." into (fnmatch pattern, rate) pairs"""
+    rates = []
+    for item in spec.split(","):
+        if "=" not in item:
+            continue
+        pattern, _, rate = item.partition("=")
+        try:
+            rates.append((pattern.strip(), min(max(float(rate), 0.0), 1.0)))
+        except ValueError:
+            continue
+    return rates
+
+
+@dataclass
+class LogSettings:
+    """Logging configuration, read from the environment by default"""
+    level: int = logging.INFO
+    fmt: str = "console"
+    sample_rates: List[Tuple[str, float]] = field(default_factory=list)
+    slow_ms: float = 1000.0
+    debug_until: Optional[float] = None
+
+    @classmethod
+    def from_env(cls) -> "LogSettings":
+        in_lambda = bool(os.environ.get("AWS_LAMBDA_FUNCTION_NAME"))
+        level_name = os.environ.get("LOG_LEVEL", "INFO").upper()
+        settings = cls(
+            level=logging.getLevelNamesMapping().get(level_name, logging.INFO),
+            fmt=os.environ.get("LOG_FORMAT", "json" if in_lambda else "console").lower(),
+            sample_rates=_parse_sample_rates(os.environ.get("LOG_SAMPLE_RATES", "")),
+        )
+        try:
+            settings.slow_ms = float(os.environ.get("LOG_SLOW_MS", settings.slow_ms))
+        except ValueError:
+            pass
+        if os.environ.get("LOG_DEBUG", "").lower() in ("true", "1", "yes", "on"):
+            settings.debug_until = float("inf")
+        return settings
+
+    @property
+    def debug(self) -> bool:
+        return self.debug_until is not None and time.time() < self.debug_until
+
+    @property
+    def effective_level(self) -> int:
+        return logging.DEBUG if self.debug else self.level
+
+    def sample_rate(self, path: str) -> float:
+        """Sampling rate of the first pattern matching path (1.0 if none match)"""
+        for pattern, rate in self.sample_rates:
+            if fnmatch.fnmatchcase(path, pattern):
+                return rate
+        return 1.0
+
+
+_settings = LogSettings.from_env()
+_configured_level: Optional[int] = None
+_lock = threading.Lock()
+
+
+def configure_logging(settings: Optional[LogSettings] = None) -> None:
+    """Configure structlog for the process (idempotent; re-run after level changes)"""
+    global _settings, _configured_level
+    with _lock:
+        if settings is not None:
+            _settings = settings
+        renderer = (
+            structlog.processors.JSONRenderer()
+            if _settings.fmt == "json"
+            else structlog.dev.ConsoleRenderer(colors=False)
+        )
+        structlog.configure(
+            processors=[
+                structlog.contextvars.merge_contextvars,
+                structlog.processors.add_log_level,
+                structlog.processors.TimeStamper(fmt="iso", utc=True),
+                _resolve_lazy,
+                structlog.processors.format_exc_info,
+                renderer,
+            ],
+            wrapper_class=structlog.make_filtering_bound_logger(_settings.effective_level),
+            cache_logger_on_first_use=False,
+        )
+        _configured_level = _settings.effective_level
+
+
+def _refresh_level() -> None:
+    """Reconfigure if debug mode started or expired since the last configuration"""
+    if _configured_level is not None and _settings.effective_level != _configured_level:
+        configure_logging()
+
+
+def set_debug_logging(enabled: bool, duration_seconds: float = 900) -> Dict[str, Any]:
+    """
+    Toggle debug logging at runtime.
+
+    Args:
+        enabled: Turn debug mode on or off
+        duration_seconds: How long debug mode stays on, at most MAX_DEBUG_SECONDS
+
+    Returns:
+        The resulting logging state
+
+    Raises:
+        ValueError: If debug mode is turned on for zero or negative seconds
+    """
+    if enabled:
+        if not duration_seconds > 0:
+            raise ValueError(f"duration_seconds must be positive, got {duration_seconds}")
+        _settings.debug_until = time.time() + min(duration_seconds, MAX_DEBUG_SECONDS)
+    else:
+        _settings.debug_until = None
+    configure_logging()
+    return get_logging_state()
+
+
+def get_logging_state() -> Dict[str, Any]:
+    """Current level, debug mode and sampling configuration"""
+    remaining = None
+    if _settings.debug and _settings.debug_until != float("inf"):
+        remaining = round(_settings.debug_until - time.time())
+    return {
+        "level": logging.getLevelName(_settings.effective_level),
+        "base_level": logging.getLevelName(_settings.level),
+        "debug": _settings.debug,
+        "debug_seconds_remaining": remaining,
+        "format": _settings.fmt,
+        "sample_rates": dict(_settings.sample_rates),
+        "slow_ms": _settings.slow_ms,
+    }
+
+
+def debug_enabled() -> bool:
+    """True when debug events would be emitted (use to skip building large payloads)"""
+    return _settings.effective_level <= logging.DEBUG
+
+
+# =============================================================================
+# Per-request summary line
+# =============================================================================
+
+class RequestLog:
+    """Fields and timings of one request, emitted as a single summary event"""
+
+    def __init__(self, **fields: Any):
+        self.fields: Dict[str, Any] = dict(fields)
+        self.timings: Dict[str, float] = {}
+        self.start = time.perf_counter()
+
+    def set(self, **fields: Any) -> None:
+        self.fields.update(fields)
+
+    @contextmanager
+    def timer(self, name: str) -> Iterator[None]:
+        """Record the duration of a block as the '<name>_ms' field"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[f"{name}_ms"] = round((time.perf_counter() - start) * 1000, 2)
+
+    @property
+    def elapsed_ms(self) -> float:
+        return round((time.perf_counter() - self.start) * 1000, 2)
+
+
+_current_request: ContextVar[Optional[RequestLog]] = ContextVar("current_request", default=None)
+_cold_start = True
+
+
+def current_request() -> Optional[RequestLog]:
+    """The request being handled in this context, if any"""
+    return _current_request.get()
+
+
+def should_log_request(path: str, status: Optional[int], duration_ms: float) -> Tuple[bool, float]:
+    """Sampling decision for a request summary: (log it, sample rate applied)"""
+    if _settings.debug or status is None or status >= 400 or duration_ms >= _settings.slow_ms:
+        return True, 1.0
+    rate = _settings.sample_rate(path)
+    return rate >= 1.0 or random.random() < rate, rate
+
+
+@contextmanager
+def request_scope(logger, **fields: Any) -> Iterator[RequestLog]:
+    """
+    Track one request and emit its compact summary line on exit.
+
+    The summary carries the given fields plus status (set by the caller),
+    duration_ms, any timer() fields, cold_start and the sample rate applied.
+    """
+    global _cold_start
+    _refresh_level()
+    request = RequestLog(**fields)
+    token = _current_request.set(request)
+    cold_start, _cold_start = _cold_start, False
+    try:
+        yield request
+    except Exception:
+        request.fields.setdefault("status", 500)
+        raise
+    finally:
+        _current_request.reset(token)
+        duration_ms = request.elapsed_ms
+        log, rate = should_log_request(request.fields.get("path", ""), request.fields.get("status"), duration_ms)
+        if log:
+            logger.info(
+                "request",
+                **request.fields,
+                duration_ms=duration_ms,
+                **request.timings,
+                cold_start=cold_start,
+                sample_rate=rate,
+            )
@@ -0,0 +1,533 @@
+"""
+Trade History Store for Figure Markets Pairs
+
+Keeps the recent trades of each trading pair in process memory, so "last N trades"
+and "trades between two times" are answered without downloading the same trades
+again on every call.
+
+Per pair, trades are held oldest first in typed arrays: trade time (int64 epoch
+milliseconds), price and quantity (float64) and initiator side (int8: 1 buy,
+-1 sell), plus the trade ids. The upstream's own records of the newest RAW_MATCHES
+trades are kept as well, so trades can be returned exactly as the exchange sent them
+(price and quantity strings, and any other fields).
+
+Pairs are only added to the store by a sync that returns trades (or by loading an
+earlier snapshot): looking up, or failing to sync, a pair that is not listed does not
+leave an entry behind.
+
+Syncing is incremental. The trades endpoint only takes a window size (newest trades
+first), so a sync asks for a small window and doubles it until the window reaches
+back to the store's high-water mark (its newest trade); only the trades past the
+mark are appended. A pair that fell too far behind (no overlap within
+MAX_SYNC_SIZE trades) is rebuilt from the latest window. Syncs of a pair are at
+most every sync_interval seconds; in between, queries are served from memory.
+
+Snapshots of each pair are written to TRADE_STORE_DIR (default: <tmp>/pb-fm-mcp-trades,
+"off" disables them) at most every snapshot_interval seconds, and loaded on first
+use, so a new process on a warm host starts with the history of the previous one.
+"""
+
+import json
+import os
+import re
+import sys
+import tempfile
+import threading
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+import structlog
+
+from upstream import FIGURE_MARKETS, upstream_url
+from utils import JSONType, async_http_get_json
+
+logger = structlog.get_logger()
+
+SNAPSHOT_VERSION = 2
+INITIAL_SYNC_SIZE = 200
+INCREMENTAL_SYNC_SIZE = 25
+MAX_SYNC_SIZE = 1000
+RAW_MATCHES = MAX_SYNC_SIZE
+
+SIDES = {"BUY": 1, "SELL": -1}
+SIDE_NAMES = {1: "BUY", -1: "SELL", 0: None}
+SNAPSHOT_PAIR = re.compile(r"^[A-Za-z0-9._-]+$")
+
+
+def trade_time_ms(created: str) -> int:
+    """Epoch milliseconds of an ISO 8601 time like a trade's 'created' (UTC if it has no offset)"""
+    moment = datetime.fromisoformat(created.strip())
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=UTC)
+    return round(moment.timestamp() * 1000)
+
+
+def iso_time(time_ms: int) -> str:
+    """ISO 8601 UTC time of epoch milliseconds, in the upstream's 'created' format"""
+    seconds, millis = divmod(time_ms, 1000)
+    text = datetime.fromtimestamp(seconds, UTC).strftime("%Y-%m-%dT%H:%M:%S")
+    return f"{text}.{millis:03d}Z" if millis else f"{text}Z"
+
+
+def format_number(value: float) -> str:
+    """Decimal string of a stored price or quantity, without float noise"""
+    return f"{value:.15g}"
+
+
+class PairTrades:
+    """Trades of one pair, oldest first, in parallel typed arrays"""
+
+    def __init__(self, pair: str):
+        self.pair = pair
+        self.times = array("q")
+        self.prices = array("d")
+        self.quantities = array("d")
+        self.sides = array("b")
+        self.ids: list[str] = []
+        self.raw: dict[str, dict[str, Any]] = {}      # upstream records of the newest trades, by id
+        self.envelope: dict[str, Any] = {}            # the last trades response, without its matches
+        self.synced_at = 0.0          # monotonic time of the last successful sync
+        self.updated_at = 0.0         # wall-clock time of the last successful sync (survives snapshots)
+        self.exhausted = False        # the upstream has no trades older than ours
+        self.snapshot_at = 0.0
+        self.dirty = False
+        self.lock = threading.Lock()
+        # Readers following the trades incrementally (candles) track a position in
+        # the trades of one generation: trades [position - trimmed:] are new to them
+        self.generation = 0           # bumped whenever the trades are replaced
+        self.trimmed = 0              # trades of this generation dropped from the front
+
+    def __len__(self) -> int:
+        return len(self.times)
+
+    def age(self) -> float | None:
+        """Seconds since the trades were last brought up to date, None if there are none"""
+        if not self.times or not self.updated_at:
+            return None
+        return max(0.0, time.time() - self.updated_at)
+
+    @property
+    def high_water_mark(self) -> int | None:
+        return self.times[-1] if self.times else None
+
+    def append(self, trades: list[tuple[int, float, float, int, str]]) -> None:
+        """Append trades (oldest first) that are all newer than the high-water mark"""
+        for time_ms, price, quantity, side, trade_id in trades:
+            self.times.append(time_ms)
+            self.prices.append(price)
+            self.quantities.append(quantity)
+            self.sides.append(side)
+            self.ids.append(trade_id)
+
+    def replace(self, trades: list[tuple[int, float, float, int, str]]) -> None:
+        """Replace all trades with trades (oldest first)"""
+        self.times, self.prices = array("q"), array("d")
+        self.quantities, self.sides, self.ids = array("d"), array("b"), []
+        self.generation += 1
+        self.trimmed = 0
+        self.append(trades)
+
+    def rows(self) -> list[tuple[int, float, float, int, str]]:
+        return list(zip(self.times, self.prices, self.quantities, self.sides, self.ids))
+
+    def trim(self, max_trades: int) -> None:
+        """Drop the oldest trades beyond max_trades"""
+        excess = len(self.times) - max_trades
+        if excess > 0:
+            for column in (self.times, self.prices, self.quantities, self.sides, self.ids):
+                del column[:excess]
+            self.trimmed += excess
+            self.exhausted = False
+
+    def remember(self, response: dict[str, Any], limit: int = RAW_MATCHES) -> None:
+        """Keep the upstream records of a trades response, for the newest limit trades"""
+        self.envelope = {**response, "matches": None}
+        for match in response.get("matches") or []:
+            self.raw[str(match.get("id", ""))] = match
+        if len(self.raw) > limit:
+            self.raw = {trade_id: self.raw[trade_id] for trade_id in self.ids[-limit:] if trade_id in self.raw}
+
+    def match(self, index: int) -> dict[str, Any]:
+        """Trade index in the upstream's format, as received if its record is kept"""
+        trade_id = self.ids[index]
+        raw = self.raw.get(trade_id)
+        if raw is not None:
+            return raw
+        return {
+            "id": trade_id,
+            "symbol": self.pair,
+            "price": format_number(self.prices[index]),
+            "quantity": format_number(self.quantities[index]),
+            "created": iso_time(self.times[index]),
+            "initiatorSide": SIDE_NAMES[self.sides[index]],
+        }
+
+    def columns(self, start: int, stop: int) -> dict[str, Any]:
+        """Trades [start, stop) as parallel lists"""
+        return {
+            "pair": self.pair,
+            "times_ms": self.times[start:stop].tolist(),
+            "prices": self.prices[start:stop].tolist(),
+            "quantities": self.quantities[start:stop].tolist(),
+            "sides": [SIDE_NAMES[side] for side in self.sides[start:stop]],
+            "ids": self.ids[start:stop],
+            "count": max(0, stop - start),
+        }
+
+    # -------------------------------------------------------------------------
+    # Snapshots
+    # -------------------------------------------------------------------------
+
+    def to_bytes(self) -> bytes:
+        ids = "\n".join(self.ids).encode()
+        raw = json.dumps({"envelope": self.envelope, "matches": list(self.raw.values())}).encode()
+        header = {
+            "version": SNAPSHOT_VERSION,
+            "pair": self.pair,
+            "count": len(self.times),
+            "byteorder": sys.byteorder,
+            "exhausted": self.exhausted,
+            "updated_at": self.updated_at,
+            "ids_bytes": len(ids),
+            "raw_bytes": len(raw),
+        }
+        return b"".join((
+            json.dumps(header).encode(), b"\n",
+            self.times.tobytes(), self.prices.tobytes(), self.quantities.tobytes(), self.sides.tobytes(),
+            ids, raw,
+        ))
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "PairTrades":
+        """
+        Raises:
+            ValueError: If the snapshot is malformed or from another format version
+        """
+        newline = data.index(b"\n")
+        header = json.loads(data[:newline])
+        if header.get("version") != SNAPSHOT_VERSION or header.get("byteorder") != sys.byteorder:
+            raise ValueError("incompatible trade snapshot")
+        trades = cls(header["pair"])
+        count, offset = header["count"], newline + 1
+        for column in (trades.times, trades.prices, trades.quantities, trades.sides):
+            size = count * column.itemsize
+            column.frombytes(data[offset:offset + size])
+            offset += size
+        ids = data[offset:offset + header["ids_bytes"]].decode()
+        trades.ids = ids.split("\n") if ids else []
+        offset += header["ids_bytes"]
+        raw = json.loads(data[offset:offset + header["raw_bytes"]])
+        if not (len(trades.times) == len(trades.sides) == len(trades.ids) == count):
+            raise ValueError("truncated trade snapshot")
+        trades.envelope = raw["envelope"]
+        trades.raw = {str(match.get("id", "")): match for match in raw["matches"]}
+        trades.exhausted = bool(header.get("exhausted"))
+        trades.updated_at = float(header.get("updated_at") or 0.0)
+        return trades
+
+
+class TradeStore:
+    """Per-pair trade history with incremental sync and local snapshots"""
+
+    def __init__(
+        self,
+        directory: str | Path | None = None,
+        max_trades: int = 50_000,
+        sync_interval: float = 5.0,
+        snapshot_interval: float = 30.0,
+    ):
+        if directory is None:
+            directory = os.environ.get("TRADE_STORE_DIR") or Path(tempfile.gettempdir()) / "pb-fm-mcp-trades"
+        self.directory = None if str(directory).lower() == "off" else Path(directory)
+        self.max_trades = max_trades
+        self.sync_interval = sync_interval
+        self.snapshot_interval = snapshot_interval
+        self._pairs: dict[str, PairTrades] = {}
+        self._lock = threading.RLock()  # pair() loads snapshots, which count, under it
+        self._counters = dict.fromkeys(
+            ("syncs", "sync_requests", "sync_errors", "trades_added", "rebuilds", "snapshots_saved", "snapshots_loaded"), 0
+        )
+
+    def _count(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            self._counters[name] += amount
+
+    def get(self, pair: str) -> PairTrades | None:
+        """Trades of a pair, loaded from its snapshot on first use; None if it was never synced"""
+        trades = self._pairs.get(pair)
+        if trades is None:
+            with self._lock:
+                trades = self._pairs.get(pair)
+                if trades is None:
+                    trades = self._load(pair)
+                    if trades is not None:
+                        self._pairs[pair] = trades
+        return trades
+
+    def pair(self, pair: str) -> PairTrades:
+        """Trades of a pair, added to the store if it has none (tests, benchmarks)"""
+        trades = self.get(pair)
+        if trades is None:
+            with self._lock:
+                trades = self._pairs.setdefault(pair, PairTrades(pair))
+        return trades
+
+    def age(self, pair: str) -> float | None:
+        """Seconds since a pair's trades were last brought up to date, None if there are none"""
+        trades = self.get(pair)
+        return trades.age() if trades is not None else None
+
+    # -------------------------------------------------------------------------
+    # Sync
+    # -------------------------------------------------------------------------
+
+    async def _fetch(self, pair: str, size: int) -> JSONType:
+        url = upstream_url(FIGURE_MARKETS, f"/service-hft-exchange/api/v1/trades/{pair}")
+        self._count("sync_requests")
+        # The store is the cache: don't keep a second copy of every window
+        return await async_http_get_json(url, params={"size": size}, cache_ttl=0)
+
+    @staticmethod
+    def _parse(matches: list[dict[str, Any]]) -> list[tuple[int, float, float, int, str]]:
+        """Upstream trades (newest first) as rows, oldest first"""
+        rows = [
+            (
+                trade_time_ms(match["created"]),
+                float(match["price"]),
+                float(match["quantity"]),
+                SIDES.get(match.get("initiatorSide"), 0),
+                str(match.get("id", "")),
+            )
+            for match in matches
+        ]
+        rows.sort(key=lambda row: row[0])
+        return rows
+
+    async def sync(self, pair: str, min_trades: int = 0, force: bool = False) -> JSONType:
+        """
+        Bring a pair up to date with the upstream.
+
+        Args:
+            pair: Trading pair, e.g. HASH-USD
+            min_trades: Fetch older trades too until the store holds this many (as far
+                        as the upstream has them, up to MAX_SYNC_SIZE)
+            force: Sync even if the last sync is less than sync_interval ago
+
+        Returns:
+            {"pair", "added", "trades"} or an MCP-ERROR dict
+        """
+        # Unknown pairs sync into a detached entry, added only once trades arrive
+        trades = self.get(pair) or PairTrades(pair)
+        min_trades = min(min_trades, MAX_SYNC_SIZE, self.max_trades)
+        backfill = len(trades) < min_trades and not trades.exhausted
+        if not force and not backfill and time.monotonic() - trades.synced_at < self.sync_interval:
+            return {"pair": pair, "added": 0, "trades": len(trades)}
+
+        hwm = trades.high_water_mark
+        if hwm is None or backfill:
+            size = max(INITIAL_SYNC_SIZE, min_trades)
+        else:
+            size = INCREMENTAL_SYNC_SIZE
+        size = min(size, MAX_SYNC_SIZE)
+
+        while True:
+            response = await self._fetch(pair, size)
+            if not isinstance(response, dict) or response.get("MCP-ERROR"):
+                self._count("sync_errors")
+                return response if isinstance(response, dict) else {"MCP-ERROR": "Unexpected trades response"}
+            matches = response.get("matches") or []
+            complete = len(matches) < size
+            rows = self._parse(matches)
+            # Done when the window reaches back to the high-water mark, holds everything
+            # the upstream has, or cannot grow further
+            if hwm is None or backfill or complete or size >= MAX_SYNC_SIZE or (rows and rows[0][0] <= hwm):
+                break
+            size = min(size * 2, MAX_SYNC_SIZE)
+
+        if not rows and not len(trades):
+            return {"pair": pair, "added": 0, "trades": 0}
+        if self._pairs.get(pair) is not trades:
+            with self._lock:
+                trades = self._pairs.setdefault(pair, trades)
+        added = self._merge(trades, rows, complete)
+        with trades.lock:
+            trades.remember(response)
+        trades.synced_at, trades.updated_at = time.monotonic(), time.time()
+        self._count("syncs")
+        self._count("trades_added", added)
+        self._maybe_snapshot(trades)
+        return {"pair": pair, "added": added, "trades": len(trades)}
+
+    def _merge(self, trades: PairTrades, rows: list[tuple[int, float, float, int, str]], complete: bool) -> int:
+        """Add the rows not in the store yet; returns how many were added"""
+        with trades.lock:
+            before = len(trades)
+            hwm = trades.high_water_mark
+            if not rows:
+                added = 0
+            elif hwm is None:
+                trades.replace(rows)
+                added = len(rows)
+            elif rows[0][0] <= hwm:
+                if rows[0][0] < trades.times[0] and not trades.exhausted:
+                    # Backfill: the window also reaches further back than the store
+                    self._rebuild(trades, rows)
+                    added = len(trades) - before
+                else:
+                    # Append what is past the mark; ids tell apart the trades sharing
+                    # the mark's millisecond
+                    at_mark = set()
+                    index = before - 1
+                    while index >= 0 and trades.times[index] == hwm:
+                        at_mark.add(trades.ids[index])
+                        index -= 1
+                    newer = [row for row in rows if row[0] > hwm or (row[0] == hwm and row[4] not in at_mark)]
+                    trades.append(newer)
+                    added = len(newer)
+            else:
+                # No overlap within the largest window: there is a gap, start over
+                trades.replace(rows)
+                trades.exhausted = False
+                added = len(rows)
+                self._count("rebuilds")
+            if complete:
+                trades.exhausted = True
+            trades.trim(self.max_trades)
+            trades.dirty = trades.dirty or added > 0 or complete
+            return added
+
+    def _rebuild(self, trades: PairTrades, rows: list[tuple[int, float, float, int, str]]) -> None:
+        """Union of the stored trades and rows, deduplicated by id"""
+        merged = {row[4]: row for row in trades.rows()}
+        for row in rows:
+            merged.setdefault(row[4], row)
+        trades.replace(sorted(merged.values(), key=lambda row: row[0]))
+
+    # -------------------------------------------------------------------------
+    # Queries
+    # -------------------------------------------------------------------------
+
+    def last(self, pair: str, n: int) -> dict[str, Any]:
+        """The n most recent trades of a pair, oldest first, as parallel lists"""
+        trades = self.get(pair) or PairTrades(pair)
+        with trades.lock:
+            return trades.columns(max(0, len(trades) - n), len(trades))
+
+    def between(self, pair: str, start_ms: int | None = None, end_ms: int | None = None) -> dict[str, Any]:
+        """Trades of a pair with start_ms <= time <= end_ms, oldest first, as parallel lists"""
+        trades = self.get(pair) or PairTrades(pair)
+        with trades.lock:
+            start = 0 if start_ms is None else bisect_left(trades.times, start_ms)
+            stop = len(trades) if end_ms is None else bisect_right(trades.times, end_ms)
+            return trades.columns(start, stop)
+
+    def matches(self, pair: str, n: int) -> list[dict[str, Any]]:
+        """The n most recent trades in the upstream's format (newest first)"""
+        trades = self.get(pair) or PairTrades(pair)
+        with trades.lock:
+            return [trades.match(index) for index in range(len(trades) - 1, max(0, len(trades) - n) - 1, -1)]
+
+    def response(self, pair: str, n: int) -> dict[str, Any]:
+        """The n most recent trades as the upstream's trades response"""
+        trades = self.get(pair) or PairTrades(pair)
+        with trades.lock:
+            envelope = dict(trades.envelope)
+        return {**envelope, "matches": self.matches(pair, n)}
+
+    # -------------------------------------------------------------------------
+    # Snapshots
+    # -------------------------------------------------------------------------
+
+    def _snapshot_path(self, pair: str) -> Path | None:
+        if self.directory is None or not SNAPSHOT_PAIR.match(pair):
+            return None
+        return self.directory / f"{pair}.trades"
+
+    def _load(self, pair: str) -> PairTrades | None:
+        path = self._snapshot_path(pair)
+        if path is None or not path.exists():
+            return None
+        try:
+            trades = PairTrades.from_bytes(path.read_bytes())
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Ignoring trade snapshot {path}: {e}")
+            return None
+        trades.trim(self.max_trades)
+        self._count("snapshots_loaded")
+        return trades
+
+    def _maybe_snapshot(self, trades: PairTrades) -> None:
+        if trades.dirty and time.monotonic() - trades.snapshot_at >= self.snapshot_interval:
+            self.save(trades.pair)
+
+    def save(self, pair: str | None = None) -> int:
+        """Write snapshots of one pair (or all pairs with new trades); returns files written"""
+        if pair:
+            pairs = [trades for trades in (self.get(pair),) if trades is not None]
+        else:
+            with self._lock:
+                pairs = list(self._pairs.values())
+        written = 0
+        for trades in pairs:
+            path = self._snapshot_path(trades.pair)
+            if path is None:
+                continue
+            with trades.lock:
+                data = trades.to_bytes()
+                trades.dirty = False
+                trades.snapshot_at = time.monotonic()
+            try:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                partial = path.with_suffix(f".tmp{os.getpid()}")
+                partial.write_bytes(data)
+                os.replace(partial, path)
+                written += 1
+            except OSError as e:
+                logger.warning(f"Could not write trade snapshot {path}: {e}")
+        self._count("snapshots_saved", written)
+        return written
+
+    def stats(self) -> dict[str, Any]:
+        """Counters and per-pair trade counts and time span"""
+        with self._lock:
+            pairs = dict(self._pairs)
+            counters = dict(self._counters)
+        return {
+            **counters,
+            "snapshot_dir": str(self.directory) if self.directory else None,
+            "pairs": {
+                name: {
+                    "trades": len(trades),
+                    "oldest": iso_time(trades.times[0]) if len(trades) else None,
+                    "newest": iso_time(trades.times[-1]) if len(trades) else None,
+                    "exhausted": trades.exhausted,
+                }
+                for name, trades in sorted(pairs.items())
+            },
+        }
+
+
+# Global store instance
+_global_store: TradeStore | None = None
+_global_lock = threading.Lock()
+
+
+def get_trade_store() -> TradeStore:
+    """Get the global trade store (created on first use)"""
+    global _global_store
+    if _global_store is None:
+        with _global_lock:
+            if _global_store is None:
+                _global_store = TradeStore()
+    return _global_store
+
+
+def set_trade_store(store: TradeStore | None) -> TradeStore | None:
+    """Replace the global store (tests, benchmarks); returns the previous one"""
+    global _global_store
+    previous, _global_store = _global_store, store
+    return previous
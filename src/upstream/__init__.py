@@ -0,0 +1,117 @@
+"""
+Upstream HTTP Layer for pb-fm-mcp
+
+Shared machinery that sits underneath utils.async_http_get_json and is used for
+every call to the Provenance explorer, Provenance API and Figure Markets upstreams:
+connection pool, response cache, request coalescing, per-upstream rate limits,
+retry/hedging policies and per-host circuit breakers.
+"""
+
+from .pool import HTTPClientPool, close_http_clients, get_http_pool
+from .cache import (
+    CacheEntry,
+    DynamoDBCacheTier,
+    LRUCacheTier,
+    ResponseCache,
+    SharedCacheTier,
+    cache_key,
+    cache_ttl_scope,
+    current_cache_ttl,
+    get_response_cache,
+    note_stale_response,
+    stale_response_scope,
+)
+from .singleflight import SingleFlight, get_singleflight
+from .limits import (
+    DEFAULT_LIMITS,
+    HostLimit,
+    UpstreamLimiter,
+    UpstreamQueueFull,
+    get_upstream_limiter,
+    set_upstream_limiter,
+)
+from .retry import (
+    ENDPOINT_POLICIES,
+    UPSTREAM_POLICIES,
+    EndpointPolicy,
+    RetryBudget,
+    RetryExecutor,
+    RetryPolicy,
+    get_retry_executor,
+    set_retry_executor,
+)
+from .breaker import (
+    DEFAULT_BREAKERS,
+    STALE_MAX_AGE,
+    BreakerPolicy,
+    CircuitBreaker,
+    CircuitBreakers,
+    get_circuit_breakers,
+    outcome_of,
+    set_circuit_breakers,
+)
+from .endpoints import (
+    EXPLORER,
+    FIGURE_MARKETS,
+    GITHUB_RAW,
+    PROVENANCE_API,
+    override_upstream_urls,
+    reset_upstream_urls,
+    set_upstream_base_url,
+    upstream_base_url,
+    upstream_base_urls,
+    upstream_for_url,
+    upstream_url,
+)
+
+__all__ = [
+    "HTTPClientPool",
+    "close_http_clients",
+    "get_http_pool",
+    "CacheEntry",
+    "DynamoDBCacheTier",
+    "LRUCacheTier",
+    "ResponseCache",
+    "SharedCacheTier",
+    "cache_key",
+    "cache_ttl_scope",
+    "current_cache_ttl",
+    "get_response_cache",
+    "note_stale_response",
+    "stale_response_scope",
+    "SingleFlight",
+    "get_singleflight",
+    "DEFAULT_LIMITS",
+    "HostLimit",
+    "UpstreamLimiter",
+    "UpstreamQueueFull",
+    "get_upstream_limiter",
+    "set_upstream_limiter",
+    "ENDPOINT_POLICIES",
+    "UPSTREAM_POLICIES",
+    "EndpointPolicy",
+    "RetryBudget",
+    "RetryExecutor",
+    "RetryPolicy",
+    "get_retry_executor",
+    "set_retry_executor",
+    "DEFAULT_BREAKERS",
+    "STALE_MAX_AGE",
+    "BreakerPolicy",
+    "CircuitBreaker",
+    "CircuitBreakers",
+    "get_circuit_breakers",
+    "outcome_of",
+    "set_circuit_breakers",
+    "EXPLORER",
+    "FIGURE_MARKETS",
+    "GITHUB_RAW",
+    "PROVENANCE_API",
+    "override_upstream_urls",
+    "reset_upstream_urls",
+    "set_upstream_base_url",
+    "upstream_base_url",
+    "upstream_base_urls",
+    "upstream_for_url",
+    "upstream_url",
+]
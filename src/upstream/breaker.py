@@ -0,0 +1,243 @@
+"""
+Circuit Breakers per Upstream Host
+
+When an upstream host is down, every request to it would otherwise wait out its full
+timeout (and its retries). A breaker per host tracks request outcomes:
+
+- closed: requests pass; failure_threshold consecutive failures (timeouts, connection
+  errors, 5xx) open the breaker
+- open: requests fail fast with an MCP-ERROR, without touching the rate limiter or the
+  network, for open_for seconds
+- half_open: up to half_open_probes requests are let through as probes; a successful
+  probe closes the breaker, a failed one opens it again
+
+Client errors (4xx) count as successes - the host answered. Requests that were
+cancelled or never reached the host leave the breaker as it is.
+
+While a breaker is open (or the upstream otherwise fails), async_http_get_json serves
+the last-known-good cached response when the calling function declared a cache_ttl,
+for up to UPSTREAM_STALE_MAX_AGE seconds (default 3600) past its storage. Functions
+that received stale data are marked with an MCP-STALE entry giving its age.
+
+Defaults per upstream are in DEFAULT_BREAKERS. Override one with
+UPSTREAM_BREAKER_<NAME>, e.g.
+
+    UPSTREAM_BREAKER_FIGURE_MARKETS="failure_threshold=3,open_for=10"
+
+or turn breakers off with UPSTREAM_BREAKERS=off.
+"""
+
+import os
+import threading
+import time
+from dataclasses import dataclass, fields, replace
+from typing import Any, Dict, Optional
+from urllib.parse import urlsplit
+
+from .endpoints import EXPLORER, FIGURE_MARKETS, GITHUB_RAW, PROVENANCE_API, upstream_for_url
+
+DEFAULT = "default"
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+STALE_MAX_AGE = float(os.environ.get("UPSTREAM_STALE_MAX_AGE", 3600))
+
+
+@dataclass(frozen=True)
+class BreakerPolicy:
+    """When a host's breaker opens and how long it stays open"""
+    failure_threshold: int = 5     # consecutive failures that open the breaker
+    open_for: float = 30.0         # seconds before probes are let through
+    half_open_probes: int = 1      # concurrent probes while half-open
+
+    @classmethod
+    def parse(cls, spec: str, base: Optional["BreakerPolicy"] = None) -> Optional["BreakerPolicy"]:
+        """
+        Parse "failure_threshold=5,open_for=30,half_open_probes=1".
+
+        Keys not given keep their value from base. Returns None for "off".
+
+        Raises:
+            ValueError: On unknown keys or malformed values
+        """
+        base = base or cls()
+        spec = spec.strip()
+        if spec.lower() in ("off", "none", "false", "0"):
+            return None
+        known = {field.name for field in fields(cls)}
+        values: Dict[str, Any] = {}
+        for item in filter(None, (part.strip() for part in spec.split(","))):
+            key, _, raw = item.partition("=")
+            key, raw = key.strip(), raw.strip()
+            if key not in known:
+                raise ValueError(f"Unknown breaker setting: {key}")
+            values[key] = float(raw) if key == "open_for" else int(raw)
+        return replace(base, **values)
+
+
+DEFAULT_BREAKERS: Dict[str, BreakerPolicy] = {
+    EXPLORER: BreakerPolicy(),
+    PROVENANCE_API: BreakerPolicy(),
+    FIGURE_MARKETS: BreakerPolicy(),
+    GITHUB_RAW: BreakerPolicy(failure_threshold=3, open_for=60.0),
+    DEFAULT: BreakerPolicy(),
+}
+
+
+def outcome_of(status: Any) -> Optional[bool]:
+    """
+    Breaker verdict for an attempt's status: True (host healthy), False (host
+    failing) or None (no verdict, e.g. cancelled or rejected before sending)
+    """
+    if isinstance(status, int):
+        return status < 500
+    if status in ("timeout", "error"):
+        return False
+    return None
+
+
+class CircuitBreaker:
+    """Closed/open/half-open state of one upstream host (thread-safe)"""
+
+    def __init__(self, host: str, upstream: str, policy: BreakerPolicy):
+        self.host = host
+        self.upstream = upstream
+        self.policy = policy
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.probes = 0
+        self.counters = dict.fromkeys(("successes", "failures", "opened", "short_circuited"), 0)
+        self.last_failure: Optional[str] = None
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """Whether a request may be sent now; every allowed request must be record()ed"""
+        with self._lock:
+            if self.state == OPEN:
+                if time.monotonic() - self.opened_at < self.policy.open_for:
+                    self.counters["short_circuited"] += 1
+                    return False
+                self.state, self.probes = HALF_OPEN, 0
+            if self.state == HALF_OPEN:
+                if self.probes >= self.policy.half_open_probes:
+                    self.counters["short_circuited"] += 1
+                    return False
+                self.probes += 1
+            return True
+
+    def record(self, healthy: Optional[bool], status: Any = None) -> None:
+        """Record the outcome of an allowed request (see outcome_of)"""
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self.probes = max(0, self.probes - 1)
+            if healthy is None:
+                return
+            if healthy:
+                self.counters["successes"] += 1
+                self.consecutive_failures = 0
+                if self.state == HALF_OPEN:
+                    self.state = CLOSED
+                return
+            self.counters["failures"] += 1
+            self.consecutive_failures += 1
+            self.last_failure = str(status)
+            if self.state == HALF_OPEN or (
+                self.state == CLOSED and self.consecutive_failures >= self.policy.failure_threshold
+            ):
+                self.state = OPEN
+                self.opened_at = time.monotonic()
+                self.counters["opened"] += 1
+
+    def retry_in(self) -> float:
+        """Seconds until an open breaker lets a probe through"""
+        with self._lock:
+            if self.state != OPEN:
+                return 0.0
+            return max(0.0, self.policy.open_for - (time.monotonic() - self.opened_at))
+
+    def stats(self) -> Dict[str, Any]:
+        retry_in = self.retry_in()
+        with self._lock:
+            return {
+                "state": self.state,
+                "upstream": self.upstream,
+                "consecutive_failures": self.consecutive_failures,
+                "retry_in_s": round(retry_in, 2),
+                "last_failure": self.last_failure,
+                **self.counters,
+                "policy": {
+                    "failure_threshold": self.policy.failure_threshold,
+                    "open_for": self.policy.open_for,
+                    "half_open_probes": self.policy.half_open_probes,
+                },
+            }
+
+
+class CircuitBreakers:
+    """Breakers for every upstream host, created on first use"""
+
+    def __init__(self, policies: Optional[Dict[str, BreakerPolicy]] = None, enabled: Optional[bool] = None):
+        if enabled is None:
+            enabled = os.environ.get("UPSTREAM_BREAKERS", "on").lower() not in ("off", "false", "0", "no")
+        self.enabled = enabled
+        self._policies = policies
+        self._breakers: Dict[str, Optional[CircuitBreaker]] = {}
+        self._lock = threading.Lock()
+
+    def policy_for(self, upstream: str) -> Optional[BreakerPolicy]:
+        """Breaker policy of an upstream (or DEFAULT), including env overrides"""
+        policies = self._policies if self._policies is not None else DEFAULT_BREAKERS
+        policy = policies.get(upstream, policies.get(DEFAULT))
+        if self._policies is None:
+            spec = os.environ.get(f"UPSTREAM_BREAKER_{upstream.upper()}")
+            if spec:
+                policy = BreakerPolicy.parse(spec, policy)
+        return policy
+
+    def breaker_for(self, url: str) -> Optional[CircuitBreaker]:
+        """Breaker of the URL's host, or None when breakers are off"""
+        if not self.enabled:
+            return None
+        host = urlsplit(url).netloc
+        if host in self._breakers:
+            return self._breakers[host]
+        with self._lock:
+            if host not in self._breakers:
+                upstream = upstream_for_url(url) or DEFAULT
+                policy = self.policy_for(upstream)
+                self._breakers[host] = CircuitBreaker(host, upstream, policy) if policy else None
+            return self._breakers[host]
+
+    def reset(self) -> None:
+        """Forget all breaker state"""
+        with self._lock:
+            self._breakers.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """State and counters of each host's breaker"""
+        with self._lock:
+            breakers = {host: breaker for host, breaker in self._breakers.items() if breaker is not None}
+        return {
+            "enabled": self.enabled,
+            "stale_max_age_s": STALE_MAX_AGE,
+            "hosts": {host: breaker.stats() for host, breaker in sorted(breakers.items())},
+        }
+
+
+# Global breaker registry
+_global_breakers = CircuitBreakers()
+
+
+def get_circuit_breakers() -> CircuitBreakers:
+    """Get the global circuit breaker registry"""
+    return _global_breakers
+
+
+def set_circuit_breakers(breakers: CircuitBreakers) -> CircuitBreakers:
+    """Replace the global registry (tests, benchmarks); returns the previous one"""
+    global _global_breakers
+    previous, _global_breakers = _global_breakers, breakers
+    return previous
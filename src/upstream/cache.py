@@ -0,0 +1,328 @@
+"""
+TTL Response Cache for Upstream GETs
+
+Caches successful JSON responses from async_http_get_json, keyed by URL and query
+parameters. TTLs are declared per function with @api_function(cache_ttl=...) and are
+carried to the HTTP layer through a context variable, so a cached explorer or exchange
+response is only reused by the endpoint that declared it cacheable.
+
+Two tiers:
+- In-memory LRU tier, bounded by entry count and total stored bytes
+- Optional shared tier (DynamoDB) so warm containers can share entries; enabled by
+  setting the RESPONSE_CACHE_TABLE environment variable
+
+Responses are stored as the raw JSON bytes and parsed on every hit, so callers can
+mutate the returned data without corrupting the cached copy.
+
+Expired in-memory entries double as last-known-good copies: when an upstream fails,
+async_http_get_json may serve one (see upstream/breaker.py) and records its age in
+the calling function's stale_response_scope.
+"""
+
+import asyncio
+import contextvars
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Iterator
+from urllib.parse import urlencode
+
+import structlog
+
+logger = structlog.get_logger()
+
+
+# TTL (seconds) declared by the @api_function currently executing; None disables caching
+_current_cache_ttl: contextvars.ContextVar[float | None] = contextvars.ContextVar(
+    "upstream_cache_ttl", default=None
+)
+
+
+@contextmanager
+def cache_ttl_scope(ttl: float | None) -> Iterator[None]:
+    """Set the cache TTL used by upstream GETs made inside the block"""
+    token = _current_cache_ttl.set(ttl)
+    try:
+        yield
+    finally:
+        _current_cache_ttl.reset(token)
+
+
+def current_cache_ttl() -> float | None:
+    """TTL declared by the calling function, or None when it is not cacheable"""
+    return _current_cache_ttl.get()
+
+
+# Ages (seconds) of stale responses served to the @api_function currently executing
+_stale_ages: contextvars.ContextVar[list[float] | None] = contextvars.ContextVar(
+    "upstream_stale_ages", default=None
+)
+
+
+@contextmanager
+def stale_response_scope() -> Iterator[list[float]]:
+    """
+    Collect the ages of stale responses served to upstream GETs made inside the block.
+
+    On exit the ages are added to the enclosing scope too, so an aggregate is marked
+    stale when a function it called was, whatever it kept of that function's result.
+    """
+    outer = _stale_ages.get()
+    ages: list[float] = []
+    token = _stale_ages.set(ages)
+    try:
+        yield ages
+    finally:
+        _stale_ages.reset(token)
+        if outer is not None:
+            outer.extend(ages)
+
+
+def note_stale_response(age: float) -> None:
+    """Record that a stale response of the given age was served to the caller"""
+    ages = _stale_ages.get()
+    if ages is not None:
+        ages.append(age)
+
+
+def cache_key(url: str, params: dict | None = None) -> str:
+    """Build a stable cache key from a URL and its query parameters"""
+    if not params:
+        return url
+    return f"{url}?{urlencode(sorted((str(k), str(v)) for k, v in params.items()))}"
+
+
+@dataclass
+class CacheEntry:
+    """A cached response body with its freshness window"""
+    body: bytes
+    stored_at: float
+    expires_at: float
+
+    @property
+    def size(self) -> int:
+        return len(self.body)
+
+    def is_fresh(self, now: float | None = None) -> bool:
+        return (now or time.time()) < self.expires_at
+
+    def age(self, now: float | None = None) -> float:
+        return (now or time.time()) - self.stored_at
+
+
+class LRUCacheTier:
+    """
+    In-memory LRU tier bounded by entry count and total body bytes.
+
+    Expired entries are kept until evicted, so callers can still ask for them
+    explicitly (e.g. to serve a stale copy when the upstream is failing).
+    """
+
+    def __init__(self, max_entries: int = 512, max_bytes: int = 16 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[str, CacheEntry] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def get(self, key: str) -> CacheEntry | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key: str, entry: CacheEntry) -> None:
+        if entry.size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old.size
+            self._entries[key] = entry
+            self._bytes += entry.size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.size
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def bytes_used(self) -> int:
+        return self._bytes
+
+
+class SharedCacheTier(ABC):
+    """Interface for a cache tier shared between processes"""
+
+    name = "shared"
+
+    @abstractmethod
+    async def get(self, key: str) -> CacheEntry | None:
+        """The entry stored under key, or None"""
+
+    @abstractmethod
+    async def set(self, key: str, entry: CacheEntry) -> None:
+        """Store entry under key"""
+
+
+class DynamoDBCacheTier(SharedCacheTier):
+    """
+    Shared tier backed by a DynamoDB table with partition key 'cache_key' and a
+    TTL attribute 'ttl'. boto3 is provided by the Lambda runtime and imported lazily.
+    """
+
+    name = "dynamodb"
+
+    def __init__(self, table_name: str):
+        import boto3
+        self.table = boto3.resource("dynamodb").Table(table_name)
+
+    async def get(self, key: str) -> CacheEntry | None:
+        response = await asyncio.to_thread(self.table.get_item, Key={"cache_key": key})
+        item = response.get("Item")
+        if not item:
+            return None
+        return CacheEntry(
+            body=bytes(item["body"]),
+            stored_at=float(item["stored_at"]),
+            expires_at=float(item["expires_at"]),
+        )
+
+    async def set(self, key: str, entry: CacheEntry) -> None:
+        from decimal import Decimal
+        await asyncio.to_thread(self.table.put_item, Item={
+            "cache_key": key,
+            "body": entry.body,
+            "stored_at": Decimal(str(entry.stored_at)),
+            "expires_at": Decimal(str(entry.expires_at)),
+            "ttl": int(entry.expires_at) + 3600,
+        })
+
+
+class ResponseCache:
+    """Two-tier response cache with hit/miss accounting"""
+
+    def __init__(self, memory: LRUCacheTier | None = None, shared: SharedCacheTier | None = None):
+        self.memory = memory or LRUCacheTier()
+        self.shared = shared
+        self._counters = {
+            "hits_memory": 0,
+            "hits_shared": 0,
+            "misses": 0,
+            "expired": 0,
+            "stores": 0,
+            "shared_errors": 0,
+            "stale_served": 0,
+        }
+
+    def _count(self, name: str) -> None:
+        self._counters[name] += 1
+
+    async def get(self, key: str) -> CacheEntry | None:
+        """Return a fresh entry for key from the first tier that has one"""
+        now = time.time()
+        entry = self.memory.get(key)
+        if entry is not None:
+            if entry.is_fresh(now):
+                self._count("hits_memory")
+                return entry
+            self._count("expired")
+
+        if self.shared is not None:
+            try:
+                shared_entry = await self.shared.get(key)
+            except Exception as e:
+                self._count("shared_errors")
+                logger.warning(f"Shared cache read failed: {e}")
+                shared_entry = None
+            if shared_entry is not None and shared_entry.is_fresh(now):
+                self._count("hits_shared")
+                self.memory.set(key, shared_entry)
+                return shared_entry
+
+        self._count("misses")
+        return None
+
+    def get_stale(self, key: str, max_age: float | None = None) -> CacheEntry | None:
+        """
+        Return the last stored in-memory entry for key, fresh or not.
+
+        Args:
+            key: Cache key
+            max_age: Ignore entries stored more than max_age seconds ago
+        """
+        entry = self.memory.get(key)
+        if entry is None or (max_age is not None and entry.age() > max_age):
+            return None
+        self._count("stale_served")
+        return entry
+
+    async def set(self, key: str, body: bytes, ttl: float) -> None:
+        """Store a response body in all tiers for ttl seconds"""
+        now = time.time()
+        entry = CacheEntry(body=body, stored_at=now, expires_at=now + ttl)
+        self.memory.set(key, entry)
+        self._count("stores")
+        if self.shared is not None:
+            try:
+                await self.shared.set(key, entry)
+            except Exception as e:
+                self._count("shared_errors")
+                logger.warning(f"Shared cache write failed: {e}")
+
+    def clear(self) -> None:
+        self.memory.clear()
+
+    def stats(self) -> dict[str, Any]:
+        """Hit/miss counters and tier occupancy"""
+        hits = self._counters["hits_memory"] + self._counters["hits_shared"]
+        lookups = hits + self._counters["misses"]
+        return {
+            **self._counters,
+            "hits": hits,
+            "lookups": lookups,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "memory_entries": len(self.memory),
+            "memory_bytes": self.memory.bytes_used,
+            "memory_max_entries": self.memory.max_entries,
+            "memory_max_bytes": self.memory.max_bytes,
+            "evictions": self.memory.evictions,
+            "shared_tier": self.shared.name if self.shared else None,
+        }
+
+
+def _create_default_cache() -> ResponseCache:
+    memory = LRUCacheTier(
+        max_entries=int(os.environ.get("RESPONSE_CACHE_MAX_ENTRIES", 512)),
+        max_bytes=int(os.environ.get("RESPONSE_CACHE_MAX_BYTES", 16 * 1024 * 1024)),
+    )
+    shared = None
+    table_name = os.environ.get("RESPONSE_CACHE_TABLE")
+    if table_name:
+        try:
+            shared = DynamoDBCacheTier(table_name)
+        except Exception as e:
+            logger.warning(f"Shared response cache disabled: {e}")
+    return ResponseCache(memory=memory, shared=shared)
+
+
+# Global cache instance
+_global_cache = _create_default_cache()
+
+
+def get_response_cache() -> ResponseCache:
+    """Get the global upstream response cache"""
+    return _global_cache
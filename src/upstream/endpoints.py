@@ -0,0 +1,121 @@
+"""
+Upstream Base URLs
+
+Function modules build upstream URLs with upstream_url(<upstream>, <path>) instead of
+hardcoding production hosts, so the whole server can be pointed at a local stand-in
+(see tests/standin.py) for offline tests, benchmarks and load tests.
+
+The base URL of an upstream resolves, in order, from:
+
+- set_upstream_base_url() / override_upstream_urls() (tests, benchmarks)
+- UPSTREAM_<NAME>_URL, e.g. UPSTREAM_EXPLORER_URL=http://127.0.0.1:8765/explorer
+- UPSTREAM_BASE_URL: one server for every upstream, each mounted under /<name>
+- the production default
+
+Environment variables are read once; call reset_upstream_urls() after changing them
+at runtime.
+"""
+
+import os
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, Mapping, Optional
+
+EXPLORER = "explorer"
+PROVENANCE_API = "provenance_api"
+FIGURE_MARKETS = "figure_markets"
+GITHUB_RAW = "github_raw"
+
+DEFAULT_BASE_URLS: Dict[str, str] = {
+    EXPLORER: "https://service-explorer.provenance.io",
+    PROVENANCE_API: "https://api.provenance.io",
+    FIGURE_MARKETS: "https://www.figuremarkets.com",
+    GITHUB_RAW: "https://raw.githubusercontent.com",
+}
+
+_overrides: Dict[str, str] = {}
+_resolved: Optional[Dict[str, str]] = None
+_lock = threading.Lock()
+
+
+def _resolve() -> Dict[str, str]:
+    shared = os.environ.get("UPSTREAM_BASE_URL", "").rstrip("/")
+    resolved = {}
+    for name, default in DEFAULT_BASE_URLS.items():
+        url = (
+            _overrides.get(name)
+            or os.environ.get(f"UPSTREAM_{name.upper()}_URL")
+            or (f"{shared}/{name}" if shared else default)
+        )
+        resolved[name] = url.rstrip("/")
+    return resolved
+
+
+def upstream_base_urls() -> Dict[str, str]:
+    """Current base URL of every upstream"""
+    global _resolved
+    resolved = _resolved
+    if resolved is None:
+        with _lock:
+            resolved = _resolved = _resolve()
+    return resolved
+
+
+def upstream_base_url(name: str) -> str:
+    """
+    Base URL of an upstream.
+
+    Raises:
+        KeyError: If the upstream is unknown
+    """
+    return upstream_base_urls()[name]
+
+
+def upstream_url(name: str, path: str) -> str:
+    """Full URL of path (starting with '/') on the named upstream"""
+    return upstream_base_urls()[name] + path
+
+
+def upstream_for_url(url: str) -> Optional[str]:
+    """Name of the upstream whose base URL prefixes url, or None"""
+    for name, base in upstream_base_urls().items():
+        if url == base or url.startswith(base + "/"):
+            return name
+    return None
+
+
+def set_upstream_base_url(name: str, url: Optional[str]) -> None:
+    """Override an upstream's base URL (None restores env/default resolution)"""
+    global _resolved
+    if name not in DEFAULT_BASE_URLS:
+        raise KeyError(f"Unknown upstream: {name}")
+    with _lock:
+        if url is None:
+            _overrides.pop(name, None)
+        else:
+            _overrides[name] = url
+        _resolved = None
+
+
+def reset_upstream_urls() -> None:
+    """Drop all overrides and re-read the environment on next use"""
+    global _resolved
+    with _lock:
+        _overrides.clear()
+        _resolved = None
+
+
+@contextmanager
+def override_upstream_urls(urls: Mapping[str, str]) -> Iterator[Dict[str, str]]:
+    """Point upstreams at other base URLs for the duration of a block"""
+    previous = dict(_overrides)
+    for name, url in urls.items():
+        set_upstream_base_url(name, url)
+    try:
+        yield upstream_base_urls()
+    finally:
+        global _resolved
+        with _lock:
+            _overrides.clear()
+            _overrides.update(previous)
+            _resolved = None
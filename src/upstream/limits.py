@@ -0,0 +1,382 @@
+"""
+Per-Upstream Rate Limits and Concurrency Bounds
+
+Every request that reaches an upstream (after the response cache and request
+coalescing) first takes a permit from that upstream's limiter:
+
+- a token bucket caps the request rate (requests per second, with a burst allowance)
+- a concurrency gate caps the requests in flight
+
+so burst load from aggregate and batch fan-outs queues up here instead of being
+throttled by service-explorer.provenance.io, api.provenance.io or figuremarkets.com.
+
+Each request may wait at most max_wait seconds for its permit. In fast-fail mode
+(the default) a request whose expected wait already exceeds that deadline - from the
+token bucket's reservations and the queue ahead of it at the observed service time -
+fails immediately with UpstreamQueueFull instead of waiting for the deadline to pass.
+Queue times and rejections are recorded per host in the metrics module.
+
+Limits are configured in one place, DEFAULT_LIMITS, keyed by upstream name (see
+upstream.endpoints). Override one upstream with UPSTREAM_LIMIT_<NAME>, e.g.
+
+    UPSTREAM_LIMIT_EXPLORER="rate=10,burst=20,concurrency=4,max_wait=2"
+
+(keys: rate, burst, concurrency, max_wait, fast_fail; "off" disables the limit) or
+turn limiting off entirely with UPSTREAM_LIMITS=off. Requests to hosts that are not a
+configured upstream use UPSTREAM_LIMIT_DEFAULT.
+
+The limiter is shared by every event loop in the process (the Lambda loop runner, the
+FastAPI loop, asyncio.run in tests), so its state is guarded by a threading lock and
+queued waiters are woken on their own loop.
+"""
+
+import asyncio
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, fields, replace
+from typing import Any, Deque, Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+from metrics import get_metrics
+
+from .endpoints import EXPLORER, FIGURE_MARKETS, GITHUB_RAW, PROVENANCE_API, upstream_for_url
+
+DEFAULT = "default"
+
+
+class UpstreamQueueFull(Exception):
+    """A request could not get an upstream permit within its queue deadline"""
+
+
+@dataclass(frozen=True)
+class HostLimit:
+    """Rate and concurrency limit of one upstream"""
+    rate: Optional[float] = None           # requests per second; None = unlimited
+    burst: int = 1                         # requests allowed back to back
+    concurrency: Optional[int] = None      # requests in flight; None = unlimited
+    max_wait: Optional[float] = 5.0        # seconds a request may queue; None = no deadline
+    fast_fail: bool = True                 # reject at once if the wait would exceed max_wait
+
+    @classmethod
+    def parse(cls, spec: str, base: Optional["HostLimit"] = None) -> Optional["HostLimit"]:
+        """
+        Parse "rate=10,burst=20,concurrency=4,max_wait=2,fast_fail=true".
+
+        Keys not given keep their value from base. "off" (or "none") means no limit.
+
+        Raises:
+            ValueError: On unknown keys or malformed values
+        """
+        spec = spec.strip()
+        if spec.lower() in ("off", "none", "false", "0"):
+            return None
+        known = {field.name: field.type for field in fields(cls)}
+        values: Dict[str, Any] = {}
+        for item in filter(None, (part.strip() for part in spec.split(","))):
+            key, _, raw = item.partition("=")
+            key, raw = key.strip(), raw.strip()
+            if key not in known:
+                raise ValueError(f"Unknown upstream limit setting: {key}")
+            if raw.lower() in ("none", "off", ""):
+                values[key] = None
+            elif key == "fast_fail":
+                values[key] = raw.lower() in ("1", "true", "yes", "on")
+            elif key in ("burst", "concurrency"):
+                values[key] = int(raw)
+            else:
+                values[key] = float(raw)
+        return replace(base or cls(), **values)
+
+
+# One place for the limits of every upstream. Sized to stay well below what the
+# public APIs tolerate per client; the connection pool allows 10 per host.
+DEFAULT_LIMITS: Dict[str, HostLimit] = {
+    EXPLORER: HostLimit(rate=25.0, burst=50, concurrency=10),
+    PROVENANCE_API: HostLimit(rate=25.0, burst=50, concurrency=10),
+    FIGURE_MARKETS: HostLimit(rate=20.0, burst=40, concurrency=8),
+    GITHUB_RAW: HostLimit(rate=5.0, burst=10, concurrency=4),
+    DEFAULT: HostLimit(rate=10.0, burst=20, concurrency=4),
+}
+
+
+class TokenBucket:
+    """Thread-safe token bucket that hands out reservations instead of blocking"""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, max_delay: Optional[float] = None) -> Optional[float]:
+        """
+        Reserve one token.
+
+        Returns:
+            Seconds to wait before using the token, or None (nothing reserved) if
+            that wait would exceed max_delay
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            delay = 0.0 if self._tokens >= 1 else (1 - self._tokens) / self.rate
+            if max_delay is not None and delay > max_delay:
+                return None
+            self._tokens -= 1
+            return delay
+
+    @property
+    def tokens(self) -> float:
+        with self._lock:
+            elapsed = time.monotonic() - self._updated
+            return min(self.burst, self._tokens + elapsed * self.rate)
+
+
+class ConcurrencyGate:
+    """
+    Semaphore shared across event loops, FIFO, with an estimate of the wait ahead.
+
+    The estimate uses an exponentially weighted mean of how long permits are held.
+    """
+
+    def __init__(self, limit: int):
+        self.limit = max(limit, 1)
+        self.in_flight = 0
+        self.mean_hold = 0.0
+        self._waiters: Deque[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = deque()
+        self._lock = threading.Lock()
+
+    def expected_wait(self) -> float:
+        """Seconds until a new request would get a slot, at the observed hold time"""
+        with self._lock:
+            if self.in_flight < self.limit:
+                return 0.0
+            return (len(self._waiters) + 1) / self.limit * self.mean_hold
+
+    async def acquire(self, timeout: Optional[float]) -> None:
+        """
+        Raises:
+            asyncio.TimeoutError: If no slot freed up within timeout
+        """
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self.in_flight < self.limit and not self._waiters:
+                self.in_flight += 1
+                return
+            waiter = (loop, loop.create_future())
+            self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter[1], timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError):
+            with self._lock:
+                try:
+                    self._waiters.remove(waiter)
+                    granted = False
+                except ValueError:
+                    granted = True
+            future = waiter[1]
+            if granted and future.done() and not future.cancelled():
+                self.release()  # the slot arrived as we gave up
+            # (a grant still scheduled finds the future cancelled and passes it on)
+            raise
+
+    def release(self, held: Optional[float] = None) -> None:
+        with self._lock:
+            if held is not None:
+                self.mean_hold = held if not self.mean_hold else 0.8 * self.mean_hold + 0.2 * held
+            if self._waiters:
+                # Hand the slot straight to the next waiter, on its own loop
+                loop, future = self._waiters.popleft()
+            else:
+                self.in_flight -= 1
+                return
+        try:
+            loop.call_soon_threadsafe(self._grant, future)
+        except RuntimeError:
+            self.release()  # the waiter's loop is closed
+
+    def _grant(self, future: asyncio.Future) -> None:
+        if future.done():
+            self.release()  # the waiter gave up in the meantime
+        else:
+            future.set_result(None)
+
+    def queued(self) -> int:
+        with self._lock:
+            return len(self._waiters)
+
+
+class Permit:
+    """Held while a request is in flight; release() when the response is in"""
+
+    __slots__ = ("_gate", "_acquired", "queue_seconds")
+
+    def __init__(self, gate: Optional[ConcurrencyGate], queue_seconds: float):
+        self._gate = gate
+        self._acquired = time.monotonic()
+        self.queue_seconds = queue_seconds
+
+    def release(self) -> None:
+        if self._gate is not None:
+            self._gate.release(time.monotonic() - self._acquired)
+            self._gate = None
+
+
+class _Limiter:
+    """Token bucket and concurrency gate of one upstream"""
+
+    def __init__(self, name: str, limit: HostLimit):
+        self.name = name
+        self.limit = limit
+        self.bucket = TokenBucket(limit.rate, limit.burst) if limit.rate else None
+        self.gate = ConcurrencyGate(limit.concurrency) if limit.concurrency else None
+        self.granted = 0
+        self.rejected = 0
+        self.timed_out = 0
+
+
+class UpstreamLimiter:
+    """Per-upstream rate limits and concurrency bounds for the shared HTTP layer"""
+
+    def __init__(self, limits: Optional[Dict[str, Optional[HostLimit]]] = None, enabled: Optional[bool] = None):
+        if enabled is None:
+            enabled = os.environ.get("UPSTREAM_LIMITS", "on").lower() not in ("off", "false", "0", "no")
+        self.enabled = enabled
+        self._configured = limits
+        self._limiters: Dict[str, Optional[_Limiter]] = {}
+        self._lock = threading.Lock()
+
+    def limit_for(self, name: str) -> Optional[HostLimit]:
+        """Configured limit of an upstream (or DEFAULT), including env overrides"""
+        if self._configured is not None:
+            return self._configured.get(name, self._configured.get(DEFAULT))
+        if name not in DEFAULT_LIMITS:
+            name = DEFAULT
+        base = DEFAULT_LIMITS[name]
+        spec = os.environ.get(f"UPSTREAM_LIMIT_{name.upper()}")
+        return HostLimit.parse(spec, base) if spec else base
+
+    @staticmethod
+    def upstream_for(url: str) -> str:
+        """Upstream name whose base URL prefixes url, or the URL's host"""
+        return upstream_for_url(url) or urlsplit(url).netloc
+
+    def _limiter(self, key: str) -> Optional[_Limiter]:
+        limiter = self._limiters.get(key, False)
+        if limiter is not False:
+            return limiter
+        with self._lock:
+            if key not in self._limiters:
+                limit = self.limit_for(key)
+                self._limiters[key] = _Limiter(key, limit) if limit else None
+            return self._limiters[key]
+
+    async def acquire(self, url: str) -> Permit:
+        """
+        Wait for a permit to send a request to url.
+
+        Raises:
+            UpstreamQueueFull: If the permit is not available within max_wait (or, in
+                               fast-fail mode, would not be)
+        """
+        if not self.enabled:
+            return Permit(None, 0.0)
+        limiter = self._limiter(self.upstream_for(url))
+        if limiter is None:
+            return Permit(None, 0.0)
+
+        limit = limiter.limit
+        host = urlsplit(url).netloc
+        start = time.monotonic()
+        deadline = start + limit.max_wait if limit.max_wait is not None else None
+
+        def reject(reason: str, timed_out: bool = False) -> UpstreamQueueFull:
+            if timed_out:
+                limiter.timed_out += 1
+            else:
+                limiter.rejected += 1
+            get_metrics().record_upstream_queue(host, time.monotonic() - start, rejected=True)
+            return UpstreamQueueFull(f"{limiter.name}: {reason}")
+
+        gate = limiter.gate
+        if gate is not None:
+            if limit.fast_fail and limit.max_wait is not None:
+                expected = gate.expected_wait()
+                if expected > limit.max_wait:
+                    raise reject(f"expected queue wait {expected:.2f}s exceeds {limit.max_wait}s")
+            try:
+                await gate.acquire(None if deadline is None else max(deadline - time.monotonic(), 0))
+            except asyncio.TimeoutError:
+                raise reject(f"no slot within {limit.max_wait}s", timed_out=True) from None
+
+        if limiter.bucket is not None:
+            remaining = None if deadline is None else max(deadline - time.monotonic(), 0)
+            delay = limiter.bucket.reserve(remaining)
+            if delay is None:
+                if not limit.fast_fail:
+                    await asyncio.sleep(remaining)
+                if gate is not None:
+                    gate.release()
+                raise reject(f"rate limit wait exceeds {limit.max_wait}s", timed_out=not limit.fast_fail)
+            if delay:
+                try:
+                    await asyncio.sleep(delay)
+                except asyncio.CancelledError:
+                    if gate is not None:
+                        gate.release()
+                    raise
+
+        queued = time.monotonic() - start
+        limiter.granted += 1
+        get_metrics().record_upstream_queue(host, queued)
+        return Permit(gate, queued)
+
+    def stats(self) -> Dict[str, Any]:
+        """Configuration and live state per upstream limiter"""
+        with self._lock:
+            limiters = dict(self._limiters)
+        upstreams = {}
+        for name in sorted(set(DEFAULT_LIMITS) | set(limiters)):
+            limit = self.limit_for(name)
+            limiter = limiters.get(name)
+            entry: Dict[str, Any] = {
+                "limit": None if limit is None else {
+                    "rate": limit.rate,
+                    "burst": limit.burst,
+                    "concurrency": limit.concurrency,
+                    "max_wait": limit.max_wait,
+                    "fast_fail": limit.fast_fail,
+                },
+            }
+            if limiter is not None:
+                entry.update({
+                    "granted": limiter.granted,
+                    "rejected": limiter.rejected,
+                    "timed_out": limiter.timed_out,
+                    "in_flight": limiter.gate.in_flight if limiter.gate else None,
+                    "queued": limiter.gate.queued() if limiter.gate else 0,
+                    "mean_hold_ms": round(limiter.gate.mean_hold * 1000, 2) if limiter.gate else None,
+                    "tokens": round(limiter.bucket.tokens, 2) if limiter.bucket else None,
+                })
+            upstreams[name] = entry
+        return {"enabled": self.enabled, "upstreams": upstreams}
+
+
+# Global limiter instance
+_global_limiter = UpstreamLimiter()
+
+
+def get_upstream_limiter() -> UpstreamLimiter:
+    """Get the global upstream limiter instance"""
+    return _global_limiter
+
+
+def set_upstream_limiter(limiter: UpstreamLimiter) -> UpstreamLimiter:
+    """Replace the global limiter (tests, benchmarks); returns the previous one"""
+    global _global_limiter
+    previous, _global_limiter = _global_limiter, limiter
+    return previous
@@ -0,0 +1,162 @@
+"""
+Shared HTTP Client Pool
+
+Process-wide pool of httpx.AsyncClient instances used by utils.async_http_get_json.
+Instead of opening a fresh client (and a fresh TCP+TLS handshake) for every upstream
+call, clients are kept alive and reused across calls, warm Lambda invocations and
+FastAPI requests.
+
+httpx clients are bound to the event loop they were first used on, so the pool keeps
+one client per (event loop, upstream host). Giving each host its own client is also
+what makes the connection limits per-host rather than global.
+"""
+
+import asyncio
+import importlib.util
+import os
+import threading
+from typing import Any
+from urllib.parse import urlsplit
+
+import httpx
+
+
+def _env_int(name: str, default: int) -> int:
+    """Read an integer setting from the environment, falling back to default"""
+    try:
+        return int(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+def _env_float(name: str, default: float) -> float:
+    """Read a float setting from the environment, falling back to default"""
+    try:
+        return float(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+def http2_available() -> bool:
+    """HTTP/2 support in httpx needs the optional 'h2' package"""
+    return importlib.util.find_spec("h2") is not None
+
+
+class HTTPClientPool:
+    """
+    Pool of keep-alive httpx.AsyncClient instances, one per (event loop, host).
+
+    Settings default from the environment so they can be tuned per deployment:
+    - UPSTREAM_MAX_CONNECTIONS_PER_HOST: open connections allowed per host (default 10)
+    - UPSTREAM_MAX_KEEPALIVE_PER_HOST: idle connections kept per host (default 10)
+    - UPSTREAM_KEEPALIVE_EXPIRY: seconds an idle connection is kept (default 30)
+    - UPSTREAM_HTTP2: "1"/"true" to negotiate HTTP/2 when the 'h2' package is installed
+    """
+
+    def __init__(
+        self,
+        max_connections_per_host: int | None = None,
+        max_keepalive_per_host: int | None = None,
+        keepalive_expiry: float | None = None,
+        http2: bool | None = None,
+    ):
+        self.max_connections_per_host = max_connections_per_host or _env_int(
+            "UPSTREAM_MAX_CONNECTIONS_PER_HOST", 10
+        )
+        self.max_keepalive_per_host = max_keepalive_per_host or _env_int(
+            "UPSTREAM_MAX_KEEPALIVE_PER_HOST", 10
+        )
+        self.keepalive_expiry = keepalive_expiry or _env_float("UPSTREAM_KEEPALIVE_EXPIRY", 30.0)
+
+        if http2 is None:
+            http2 = os.environ.get("UPSTREAM_HTTP2", "").lower() in ("1", "true", "yes", "on")
+        # Silently fall back to HTTP/1.1 when h2 is not installed
+        self.http2 = http2 and http2_available()
+
+        self._clients: dict[tuple[int, str], tuple[asyncio.AbstractEventLoop, httpx.AsyncClient]] = {}
+        self._lock = threading.Lock()
+        self._clients_created = 0
+
+    @staticmethod
+    def host_key(url: str) -> str:
+        """Normalize a URL to the scheme://host:port it connects to"""
+        parts = urlsplit(url)
+        scheme = parts.scheme or "https"
+        port = parts.port or (443 if scheme == "https" else 80)
+        return f"{scheme}://{parts.hostname}:{port}"
+
+    def _new_client(self) -> httpx.AsyncClient:
+        limits = httpx.Limits(
+            max_connections=self.max_connections_per_host,
+            max_keepalive_connections=self.max_keepalive_per_host,
+            keepalive_expiry=self.keepalive_expiry,
+        )
+        return httpx.AsyncClient(
+            limits=limits,
+            http2=self.http2,
+            headers={"Accept": "application/json"},
+        )
+
+    def _prune_closed_loops(self) -> None:
+        """Drop clients whose event loop is gone (e.g. after asyncio.run returned)"""
+        stale = [key for key, (loop, _) in self._clients.items() if loop.is_closed()]
+        for key in stale:
+            del self._clients[key]
+
+    def get_client(self, url: str) -> httpx.AsyncClient:
+        """
+        Get the pooled client for the host of url on the running event loop.
+
+        Must be called from inside a coroutine.
+        """
+        loop = asyncio.get_running_loop()
+        key = (id(loop), self.host_key(url))
+
+        with self._lock:
+            entry = self._clients.get(key)
+            if entry is not None and entry[0] is loop and not entry[1].is_closed:
+                return entry[1]
+
+            self._prune_closed_loops()
+            client = self._new_client()
+            self._clients[key] = (loop, client)
+            self._clients_created += 1
+            return client
+
+    async def aclose(self) -> None:
+        """Close all clients bound to the running event loop"""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            keys = [key for key, (owner, _) in self._clients.items() if owner is loop]
+            clients = [self._clients.pop(key)[1] for key in keys]
+        for client in clients:
+            await client.aclose()
+
+    def stats(self) -> dict[str, Any]:
+        """Pool configuration and client counts for introspection"""
+        with self._lock:
+            self._prune_closed_loops()
+            hosts = sorted({host for _, host in self._clients})
+            return {
+                "clients_open": len(self._clients),
+                "clients_created": self._clients_created,
+                "hosts": hosts,
+                "max_connections_per_host": self.max_connections_per_host,
+                "max_keepalive_per_host": self.max_keepalive_per_host,
+                "keepalive_expiry": self.keepalive_expiry,
+                "http2": self.http2,
+            }
+
+
+# Global pool instance
+_global_pool = HTTPClientPool()
+
+
+def get_http_pool() -> HTTPClientPool:
+    """Get the global HTTP client pool instance"""
+    return _global_pool
+
+
+async def close_http_clients() -> None:
+    """Close pooled clients on the running loop (FastAPI shutdown, tests)"""
+    await _global_pool.aclose()
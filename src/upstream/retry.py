@@ -0,0 +1,436 @@
+"""
+Retries and Hedged Requests for Upstream GETs
+
+Upstream GETs are idempotent, so a transient failure (timeout, connection error,
+429/5xx) does not have to fail the function - or the whole aggregate - that made it.
+Every GET runs under the retry policy of its endpoint:
+
+- retries with exponential backoff and full jitter (a random delay between 0 and
+  min(max_delay, base_delay * 2^n)), within an overall deadline: every attempt (and
+  hedge) gets at most the time left before the deadline as its timeout, and none is
+  started with less than MIN_ATTEMPT_TIME left
+- a retry budget per upstream: retries (and hedges) may add at most `ratio` extra
+  load on top of the requests of the last `window` seconds, plus a small reserve, so a
+  struggling upstream is not hit with a retry storm
+- optional hedging: when an attempt has not answered by the endpoint's observed p95
+  latency, a duplicate is sent and whichever succeeds first wins (the other is
+  cancelled); hedging starts once the endpoint has enough latency samples
+
+Policies are configured in one place: UPSTREAM_POLICIES per upstream and
+ENDPOINT_POLICIES per path prefix (longest prefix wins). Override an upstream with
+UPSTREAM_RETRY_<NAME>, e.g.
+
+    UPSTREAM_RETRY_EXPLORER="attempts=2,base_delay=0.2,hedge=false"
+
+(keys: attempts, base_delay, max_delay, deadline, hedge, hedge_percentile,
+hedge_min_samples) or turn retries and hedging off with UPSTREAM_RETRIES=off. Hosts
+that are not a configured upstream get a single attempt.
+
+Retries sit inside request coalescing (callers sharing a request share its retries)
+and outside the rate limiter (every attempt takes its own permit). Retry, hedge and
+budget counters are recorded per host in the metrics module and per endpoint here.
+"""
+
+import asyncio
+import os
+import random
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, fields, replace
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from metrics import LatencyHistogram, get_metrics
+
+from .endpoints import (
+    EXPLORER,
+    FIGURE_MARKETS,
+    GITHUB_RAW,
+    PROVENANCE_API,
+    upstream_base_url,
+    upstream_for_url,
+)
+
+DEFAULT = "default"
+
+# (parsed JSON or MCP-ERROR dict, raw body or None on failure, HTTP status or failure kind)
+Attempt = Tuple[Any, Optional[bytes], Any]
+
+# Failure kinds reported by an attempt besides HTTP status codes
+TRANSIENT_FAILURES = frozenset({"timeout", "error"})
+
+# Seconds; no retry or hedge is started with less time left before the deadline
+MIN_ATTEMPT_TIME = 0.25
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """How GETs to one endpoint are retried and hedged"""
+    attempts: int = 3                  # total attempts, including the first
+    base_delay: float = 0.1            # seconds; backoff doubles per retry
+    max_delay: float = 2.0             # cap of a single backoff delay
+    deadline: float = 15.0             # seconds after the first attempt by which every attempt ends
+    retry_statuses: frozenset = frozenset({429, 500, 502, 503, 504})
+    hedge: bool = False
+    hedge_percentile: float = 95.0
+    hedge_min_samples: int = 20        # latency samples needed before hedging starts
+
+    @classmethod
+    def parse(cls, spec: str, base: Optional["RetryPolicy"] = None) -> "RetryPolicy":
+        """
+        Parse "attempts=3,base_delay=0.1,max_delay=2,deadline=15,hedge=true".
+
+        Keys not given keep their value from base. "off" means a single attempt.
+
+        Raises:
+            ValueError: On unknown keys or malformed values
+        """
+        base = base or cls()
+        spec = spec.strip()
+        if spec.lower() in ("off", "none", "false", "0"):
+            return replace(base, attempts=1, hedge=False)
+        known = {field.name for field in fields(cls)} - {"retry_statuses"}
+        values: Dict[str, Any] = {}
+        for item in filter(None, (part.strip() for part in spec.split(","))):
+            key, _, raw = item.partition("=")
+            key, raw = key.strip(), raw.strip()
+            if key not in known:
+                raise ValueError(f"Unknown retry policy setting: {key}")
+            if key == "hedge":
+                values[key] = raw.lower() in ("1", "true", "yes", "on")
+            elif key in ("attempts", "hedge_min_samples"):
+                values[key] = int(raw)
+            else:
+                values[key] = float(raw)
+        return replace(base, **values)
+
+    def backoff(self, retry: int, rng: random.Random) -> float:
+        """Full-jitter delay before retry number retry (1-based)"""
+        return rng.uniform(0, min(self.max_delay, self.base_delay * 2 ** (retry - 1)))
+
+    def is_retryable(self, status: Any) -> bool:
+        return status in TRANSIENT_FAILURES or status in self.retry_statuses
+
+
+@dataclass(frozen=True)
+class EndpointPolicy:
+    """Policy for the paths of an upstream starting with path_prefix"""
+    upstream: str
+    path_prefix: str
+    policy: RetryPolicy
+
+    @property
+    def name(self) -> str:
+        return f"{self.upstream}:{self.path_prefix}"
+
+
+# One place for the retry policy of every upstream and endpoint
+UPSTREAM_POLICIES: Dict[str, RetryPolicy] = {
+    EXPLORER: RetryPolicy(),
+    PROVENANCE_API: RetryPolicy(),
+    FIGURE_MARKETS: RetryPolicy(),
+    GITHUB_RAW: RetryPolicy(attempts=2, base_delay=0.25),
+    DEFAULT: RetryPolicy(attempts=1),
+}
+
+# Latency-sensitive reads fanned out by the aggregates: hedge their slow tail
+ENDPOINT_POLICIES: List[EndpointPolicy] = [
+    EndpointPolicy(EXPLORER, "/api/v2/accounts/", RetryPolicy(hedge=True)),
+    EndpointPolicy(EXPLORER, "/api/v3/accounts/", RetryPolicy(hedge=True)),
+    EndpointPolicy(FIGURE_MARKETS, "/service-hft-exchange/api/v1/", RetryPolicy(hedge=True)),
+]
+
+
+class RetryBudget:
+    """
+    Caps retries at a fraction of recent requests.
+
+    Over a sliding window, retries are allowed while
+    retries < min_per_second * window + ratio * requests.
+    """
+
+    def __init__(self, ratio: float = 0.2, min_per_second: float = 2.0, window: float = 10.0):
+        self.ratio = ratio
+        self.min_per_second = min_per_second
+        self.window = window
+        self._requests: Deque[float] = deque()
+        self._retries: Deque[float] = deque()
+        self._lock = threading.Lock()
+
+    def _trim(self, now: float) -> None:
+        for events in (self._requests, self._retries):
+            while events and now - events[0] > self.window:
+                events.popleft()
+
+    def record_request(self) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self._trim(now)
+            self._requests.append(now)
+
+    def try_spend(self) -> bool:
+        """Take one retry (or hedge) from the budget; False if it is exhausted"""
+        now = time.monotonic()
+        with self._lock:
+            self._trim(now)
+            allowed = self.min_per_second * self.window + self.ratio * len(self._requests)
+            if len(self._retries) >= allowed:
+                return False
+            self._retries.append(now)
+            return True
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            self._trim(time.monotonic())
+            return {"requests": len(self._requests), "retries": len(self._retries)}
+
+
+class _EndpointStats:
+    """Counters and latency distribution of one endpoint (thread-safe)"""
+
+    RECOMPUTE_EVERY = 16
+
+    def __init__(self):
+        self.latency = LatencyHistogram()
+        self.counters = dict.fromkeys(
+            ("requests", "retries", "retry_successes", "budget_exhausted", "deadline_exceeded", "hedges", "hedge_wins",
+             "failures"), 0
+        )
+        self._hedge_delay: Optional[float] = None
+        self._percentile: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def count(self, name: str) -> None:
+        with self._lock:
+            self.counters[name] += 1
+
+    def record_latency(self, seconds: float, percentile: float) -> None:
+        with self._lock:
+            self.latency.record(seconds)
+            if self.latency.count % self.RECOMPUTE_EVERY == 0 or percentile != self._percentile:
+                self._percentile = percentile
+                self._hedge_delay = self.latency.percentile(percentile) / 1_000_000
+
+    def hedge_delay(self, policy: RetryPolicy) -> Optional[float]:
+        """Seconds after which to hedge, or None until there are enough samples"""
+        with self._lock:
+            if self.latency.count < policy.hedge_min_samples:
+                return None
+            if self._percentile != policy.hedge_percentile or self._hedge_delay is None:
+                self._percentile = policy.hedge_percentile
+                self._hedge_delay = self.latency.percentile(policy.hedge_percentile) / 1_000_000
+            return self._hedge_delay
+
+
+class RetryExecutor:
+    """Runs upstream GET attempts under their endpoint's retry and hedging policy"""
+
+    def __init__(
+        self,
+        policies: Optional[Dict[str, RetryPolicy]] = None,
+        endpoint_policies: Optional[List[EndpointPolicy]] = None,
+        enabled: Optional[bool] = None,
+        budget_ratio: float = 0.2,
+        rng: Optional[random.Random] = None,
+    ):
+        if enabled is None:
+            enabled = os.environ.get("UPSTREAM_RETRIES", "on").lower() not in ("off", "false", "0", "no")
+        self.enabled = enabled
+        self._policies = policies
+        self._endpoint_policies = endpoint_policies if endpoint_policies is not None else ENDPOINT_POLICIES
+        self.budget_ratio = budget_ratio
+        self.rng = rng or random.Random()
+        self._budgets: Dict[str, RetryBudget] = {}
+        self._stats: Dict[str, _EndpointStats] = {}
+        self._lock = threading.Lock()
+
+    def upstream_policy(self, name: str) -> RetryPolicy:
+        """Policy of an upstream (or DEFAULT), including env overrides"""
+        policies = self._policies if self._policies is not None else UPSTREAM_POLICIES
+        policy = policies.get(name, policies.get(DEFAULT, RetryPolicy(attempts=1)))
+        return self._with_env(name, policy)
+
+    def _with_env(self, upstream: str, policy: RetryPolicy) -> RetryPolicy:
+        if self._policies is not None:
+            return policy
+        spec = os.environ.get(f"UPSTREAM_RETRY_{upstream.upper()}")
+        return RetryPolicy.parse(spec, policy) if spec else policy
+
+    def policy_for(self, url: str) -> Tuple[str, str, RetryPolicy]:
+        """(endpoint name, upstream name, policy) for a URL"""
+        upstream = upstream_for_url(url)
+        if upstream is None:
+            return DEFAULT, urlsplit(url).netloc, self.upstream_policy(DEFAULT)
+        path = url[len(upstream_base_url(upstream)):]
+        best: Optional[EndpointPolicy] = None
+        for endpoint in self._endpoint_policies:
+            if endpoint.upstream == upstream and path.startswith(endpoint.path_prefix):
+                if best is None or len(endpoint.path_prefix) > len(best.path_prefix):
+                    best = endpoint
+        if best is not None:
+            return best.name, upstream, self._with_env(upstream, best.policy)
+        return upstream, upstream, self.upstream_policy(upstream)
+
+    def _budget(self, upstream: str) -> RetryBudget:
+        budget = self._budgets.get(upstream)
+        if budget is None:
+            with self._lock:
+                budget = self._budgets.setdefault(upstream, RetryBudget(self.budget_ratio))
+        return budget
+
+    def _endpoint_stats(self, endpoint: str) -> _EndpointStats:
+        stats = self._stats.get(endpoint)
+        if stats is None:
+            with self._lock:
+                stats = self._stats.setdefault(endpoint, _EndpointStats())
+        return stats
+
+    async def run(self, url: str, attempt: Callable[[Optional[float]], Awaitable[Attempt]]) -> Attempt:
+        """
+        Run attempt(time_left) until it succeeds, fails permanently, or the policy gives up.
+
+        Args:
+            url: Requested URL (selects the policy)
+            attempt: Coroutine factory performing one GET, returning (data, body, status);
+                called with the seconds left before the policy deadline (None when
+                retries are off), which caps the GET's timeouts
+
+        Returns:
+            (data, body, status) of the successful attempt, or of the last failed one
+        """
+        if not self.enabled:
+            return await attempt(None)
+
+        endpoint, upstream, policy = self.policy_for(url)
+        stats = self._endpoint_stats(endpoint)
+        budget = self._budget(upstream)
+        host = urlsplit(url).netloc
+        metrics = get_metrics()
+        stats.count("requests")
+        budget.record_request()
+        deadline_at = time.monotonic() + policy.deadline
+
+        retry = 0
+        while True:
+            data, body, status = await self._attempt(attempt, policy, stats, budget, host, deadline_at)
+            if body is not None:
+                if retry:
+                    stats.count("retry_successes")
+                return data, body, status
+            retry += 1
+            if retry >= policy.attempts or not policy.is_retryable(status):
+                break
+            delay = policy.backoff(retry, self.rng)
+            if deadline_at - time.monotonic() - delay < MIN_ATTEMPT_TIME:
+                stats.count("deadline_exceeded")
+                break
+            if not budget.try_spend():
+                stats.count("budget_exhausted")
+                metrics.record_upstream_event(host, "retry_budget_exhausted")
+                break
+            stats.count("retries")
+            metrics.record_upstream_event(host, "retries")
+            await asyncio.sleep(delay)
+
+        stats.count("failures")
+        return data, body, status
+
+    async def _attempt(
+        self,
+        attempt: Callable[[Optional[float]], Awaitable[Attempt]],
+        policy: RetryPolicy,
+        stats: _EndpointStats,
+        budget: RetryBudget,
+        host: str,
+        deadline_at: float,
+    ) -> Attempt:
+        async def timed() -> Attempt:
+            started = time.perf_counter()
+            result = await attempt(max(deadline_at - time.monotonic(), 0.0))
+            if result[1] is not None:
+                stats.record_latency(time.perf_counter() - started, policy.hedge_percentile)
+            return result
+
+        hedge_after = stats.hedge_delay(policy) if policy.hedge else None
+        if hedge_after is None:
+            return await timed()
+
+        primary = asyncio.ensure_future(timed())
+        try:
+            done, _ = await asyncio.wait({primary}, timeout=hedge_after)
+            if done or deadline_at - time.monotonic() < MIN_ATTEMPT_TIME or not budget.try_spend():
+                return await primary
+
+            stats.count("hedges")
+            get_metrics().record_upstream_event(host, "hedges")
+            hedge = asyncio.ensure_future(timed())
+            pending = {primary, hedge}
+            result: Optional[Attempt] = None
+            try:
+                while pending:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        result = task.result()
+                        if result[1] is not None:
+                            if task is hedge:
+                                stats.count("hedge_wins")
+                                get_metrics().record_upstream_event(host, "hedge_wins")
+                            return result
+                return result
+            finally:
+                for task in pending:
+                    task.cancel()
+        finally:
+            if not primary.done():
+                primary.cancel()
+
+    def stats(self) -> Dict[str, Any]:
+        """Policies, counters and hedge thresholds per endpoint, and retry budgets"""
+        with self._lock:
+            endpoint_stats = dict(self._stats)
+            budgets = dict(self._budgets)
+
+        def describe(policy: RetryPolicy) -> Dict[str, Any]:
+            return {
+                "attempts": policy.attempts,
+                "base_delay": policy.base_delay,
+                "max_delay": policy.max_delay,
+                "deadline": policy.deadline,
+                "hedge": policy.hedge,
+            }
+
+        policies = {name: describe(self.upstream_policy(name)) for name in UPSTREAM_POLICIES}
+        for endpoint in self._endpoint_policies:
+            policies[endpoint.name] = describe(self._with_env(endpoint.upstream, endpoint.policy))
+
+        endpoints = {}
+        for name, entry in sorted(endpoint_stats.items()):
+            with entry._lock:
+                endpoints[name] = {
+                    **entry.counters,
+                    "hedge_after_ms": round(entry._hedge_delay * 1000, 2) if entry._hedge_delay else None,
+                    "latency": entry.latency.summary(),
+                }
+        return {
+            "enabled": self.enabled,
+            "policies": policies,
+            "endpoints": endpoints,
+            "budgets": {name: budget.stats() for name, budget in sorted(budgets.items())},
+        }
+
+
+# Global executor instance
+_global_executor = RetryExecutor()
+
+
+def get_retry_executor() -> RetryExecutor:
+    """Get the global retry executor instance"""
+    return _global_executor
+
+
+def set_retry_executor(executor: RetryExecutor) -> RetryExecutor:
+    """Replace the global executor (tests, benchmarks); returns the previous one"""
+    global _global_executor
+    previous, _global_executor = _global_executor, executor
+    return previous
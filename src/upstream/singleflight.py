@@ -0,0 +1,85 @@
+"""
+Singleflight Request Coalescing
+
+Concurrent callers asking for the same upstream resource share one in-flight request
+instead of each issuing their own. fetch_complete_wallet_summary, for example, runs
+fetch_account_info and fetch_account_is_vesting concurrently and both GET the same
+/api/v2/accounts/{wallet} URL; with coalescing only one request reaches the explorer.
+
+The shared request runs as its own task, so a caller that is cancelled or times out
+does not cancel the request for the other callers waiting on it.
+"""
+
+import asyncio
+import threading
+from collections import Counter
+from typing import Any, Awaitable, Callable
+from urllib.parse import urlsplit
+
+
+class SingleFlight:
+    """Deduplicates concurrent calls that share a key on the same event loop"""
+
+    def __init__(self):
+        self._inflight: dict[tuple[int, str], asyncio.Task] = {}
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.executions = 0
+        self.collapsed = 0
+        self._collapsed_by_host: Counter[str] = Counter()
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> tuple[Any, bool]:
+        """
+        Run fn() for key, or join the identical call already in flight.
+
+        Args:
+            key: Identity of the request (e.g. the upstream cache key)
+            fn: Zero-argument coroutine factory performing the request
+
+        Returns:
+            (result, shared) where shared is True when this caller joined another
+            caller's request and therefore received the same result object
+        """
+        loop = asyncio.get_running_loop()
+        flight_key = (id(loop), key)
+
+        with self._lock:
+            self.calls += 1
+            task = self._inflight.get(flight_key)
+            shared = task is not None and not task.done() and task.get_loop() is loop
+            if shared:
+                self.collapsed += 1
+                self._collapsed_by_host[urlsplit(key).netloc] += 1
+            else:
+                task = loop.create_task(fn())
+                self._inflight[flight_key] = task
+                self.executions += 1
+                task.add_done_callback(lambda t, k=flight_key: self._forget(k, t))
+
+        return await asyncio.shield(task), shared
+
+    def _forget(self, flight_key: tuple[int, str], task: asyncio.Task) -> None:
+        with self._lock:
+            if self._inflight.get(flight_key) is task:
+                del self._inflight[flight_key]
+
+    def stats(self) -> dict[str, Any]:
+        """Counters showing how many requests were collapsed into shared flights"""
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "upstream_requests": self.executions,
+                "collapsed": self.collapsed,
+                "collapse_rate": round(self.collapsed / self.calls, 4) if self.calls else 0.0,
+                "in_flight": len(self._inflight),
+                "collapsed_by_host": dict(self._collapsed_by_host.most_common()),
+            }
+
+
+# Global singleflight group for upstream GETs
+_global_singleflight = SingleFlight()
+
+
+def get_singleflight() -> SingleFlight:
+    """Get the global singleflight group used by async_http_get_json"""
+    return _global_singleflight
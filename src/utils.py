@@ -2,9 +2,30 @@
 Consolidated HTTP utilities and type definitions for the registry system.
 All functions should use this centralized async_http_get_json implementation.
 """
+import asyncio
+import json
+import time
 from typing import Any, Union
+from urllib.parse import urlsplit
 import httpx
 
+from metrics import get_metrics
+
+from upstream import (
+    STALE_MAX_AGE,
+    UpstreamQueueFull,
+    cache_key,
+    current_cache_ttl,
+    get_circuit_breakers,
+    get_http_pool,
+    get_response_cache,
+    get_retry_executor,
+    get_singleflight,
+    get_upstream_limiter,
+    note_stale_response,
+    outcome_of,
+)
+
 
 # Union type for mixed JSON values
 JSONType = Union[str, int, float, bool, None, dict[str, Any], list[Any]]
@@ -14,7 +35,8 @@ async def async_http_get_json(
     url: str,
     params: dict | None = None,
     timeout: float = 10.0,
-    connect_timeout: float = 5.0
+    connect_timeout: float = 5.0,
+    cache_ttl: float | None = None
 ) -> JSONType:
     """Make an async HTTP GET request and return JSON response.
 
@@ -23,6 +45,8 @@ async def async_http_get_json(
         params: Query parameters to include
         timeout: Total request timeout in seconds
         connect_timeout: Connection timeout in seconds
+        cache_ttl: Seconds to cache a successful response. Defaults to the
+                   cache_ttl declared on the calling @api_function (no caching if unset)
 
     Returns:
         JSON response data on success, or error dict with 'MCP-ERROR' key on failure
@@ -31,28 +55,144 @@ async def async_http_get_json(
     if params is None:
         params = {}
 
+    key = cache_key(url, params)
+    ttl = cache_ttl if cache_ttl is not None else current_cache_ttl()
+
+    cache = get_response_cache()
+    if ttl:
+        entry = await cache.get(key)
+        if entry is not None:
+            return json.loads(entry.body)
+
     timeout_config = httpx.Timeout(timeout, connect=connect_timeout)
-    headers = {"Accept": "application/json"}
-
-    async with httpx.AsyncClient(timeout=timeout_config) as client:
-        try:
-            response = await client.get(url, params=params, headers=headers)
-            response.raise_for_status()
-
-            # Validate content type
-            content_type = response.headers.get("content-type", "")
-            if not content_type.startswith("application/json"):
-                return {"MCP-ERROR": f"Expected JSON, got {content_type}"}
-
-            return response.json()
-
-        except httpx.TimeoutException:
-            return {"MCP-ERROR": "Network Error: Request timed out"}
-        except httpx.HTTPStatusError as e:
-            return {"MCP-ERROR": f"HTTP error: {e.response.status_code}"}
-        except httpx.RequestError as e:
-            return {"MCP-ERROR": f"Request error: {e}"}
-        except ValueError as e:
-            return {"MCP-ERROR": f"Invalid JSON response: {e}"}
-        except Exception as e:
-            return {"MCP-ERROR": f"Unknown exception raised: {e}"}
\ No newline at end of file
+
+    # Concurrent identical GETs share one upstream request; callers that joined
+    # another caller's request get their own parsed copy of the body
+    (data, body, status), shared = await get_singleflight().do(
+        key, lambda: _upstream_get(url, params, timeout_config)
+    )
+    if shared and body is not None:
+        data = json.loads(body)
+
+    if ttl and body is not None and not shared:
+        await cache.set(key, body, ttl)
+
+    # Upstream down or failing (not a client error): serve the last-known-good copy
+    # and let the calling function report its age
+    if ttl and body is None and not (isinstance(status, int) and status < 500 and status != 429):
+        entry = cache.get_stale(key, max_age=STALE_MAX_AGE)
+        if entry is not None:
+            note_stale_response(entry.age())
+            get_metrics().record_upstream_event(urlsplit(url).netloc, "stale_served")
+            return json.loads(entry.body)
+
+    return data
+
+
+async def _upstream_get(
+    url: str,
+    params: dict,
+    timeout_config: httpx.Timeout
+) -> tuple[JSONType, bytes | None, int | str]:
+    """Perform the GET under the endpoint's retry and hedging policy.
+
+    Returns:
+        (parsed JSON, raw body, status) on success, or (error dict with 'MCP-ERROR'
+        key, None, status) - see _upstream_attempt
+    """
+    return await get_retry_executor().run(
+        url, lambda time_left: _upstream_attempt(url, params, timeout_config, time_left)
+    )
+
+
+def _clamp_timeout(timeout_config: httpx.Timeout, time_left: float | None) -> httpx.Timeout:
+    """Cap every phase of timeout_config at time_left seconds (None: no cap)"""
+    if time_left is None:
+        return timeout_config
+
+    def cap(value: float | None) -> float:
+        return time_left if value is None else min(value, time_left)
+
+    return httpx.Timeout(
+        connect=cap(timeout_config.connect),
+        read=cap(timeout_config.read),
+        write=cap(timeout_config.write),
+        pool=cap(timeout_config.pool),
+    )
+
+
+async def _upstream_attempt(
+    url: str,
+    params: dict,
+    timeout_config: httpx.Timeout,
+    time_left: float | None = None
+) -> tuple[JSONType, bytes | None, int | str]:
+    """Perform one GET on the pooled client, its timeouts capped at time_left seconds.
+
+    Returns:
+        (parsed JSON, raw body, status) on success, or (error dict with 'MCP-ERROR'
+        key, None, status) where status is the HTTP status code or one of "timeout",
+        "error", "invalid", "open", "rejected", "exception"
+    """
+    # Fail fast while the host's circuit breaker is open
+    breaker = get_circuit_breakers().breaker_for(url)
+    if breaker is not None and not breaker.allow():
+        get_metrics().record_upstream_event(breaker.host, "short_circuited")
+        return (
+            {"MCP-ERROR": f"Upstream unavailable: circuit open for {breaker.host}, "
+                          f"retrying in {breaker.retry_in():.0f}s"},
+            None,
+            "open",
+        )
+
+    # Per-upstream rate limit and concurrency bound; fails fast when the queue
+    # deadline would be exceeded
+    try:
+        permit = await get_upstream_limiter().acquire(url)
+    except UpstreamQueueFull as e:
+        if breaker is not None:
+            breaker.record(None)
+        return {"MCP-ERROR": f"Upstream busy: {e}"}, None, "rejected"
+
+    # Pooled keep-alive client - reuses connections across calls instead of a
+    # fresh TCP+TLS handshake per request
+    client = get_http_pool().get_client(url)
+    status: int | str = "error"
+    nbytes = 0
+    start = time.perf_counter()
+    try:
+        response = await client.get(url, params=params, timeout=_clamp_timeout(timeout_config, time_left))
+        status = response.status_code
+        nbytes = len(response.content)
+        response.raise_for_status()
+
+        # Validate content type
+        content_type = response.headers.get("content-type", "")
+        if not content_type.startswith("application/json"):
+            return {"MCP-ERROR": f"Expected JSON, got {content_type}"}, None, "invalid"
+
+        return response.json(), response.content, status
+
+    except httpx.TimeoutException:
+        status = "timeout"
+        return {"MCP-ERROR": "Network Error: Request timed out"}, None, status
+    except httpx.HTTPStatusError as e:
+        return {"MCP-ERROR": f"HTTP error: {e.response.status_code}"}, None, status
+    except httpx.RequestError as e:
+        return {"MCP-ERROR": f"Request error: {e}"}, None, status
+    except ValueError as e:
+        return {"MCP-ERROR": f"Invalid JSON response: {e}"}, None, "invalid"
+    except asyncio.CancelledError:
+        # A hedged attempt that lost the race
+        status = "cancelled"
+        raise
+    except Exception as e:
+        return {"MCP-ERROR": f"Unknown exception raised: {e}"}, None, "exception"
+    finally:
+        permit.release()
+        if breaker is not None:
+            breaker.record(outcome_of(status), status)
+        # Per-host latency, status and size of every request that reached the upstream
+        get_metrics().record_upstream(
+            urlsplit(url).netloc, time.perf_counter() - start, status, nbytes
+        )
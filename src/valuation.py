@@ -0,0 +1,156 @@
+"""
+Portfolio Valuation
+
+Values holdings (integer amounts in base denominations, as normalized by the denom
+index) in USD against a price snapshot: the last traded price of every Figure
+Markets pair quoted in USD, taken at one point in time.
+
+Snapshots are shared: get_price_snapshot() reuses the current snapshot until it is
+PRICE_SNAPSHOT_TTL seconds old, and a batch of wallets is valued against the one
+snapshot taken at its start, so every wallet in it is valued at the same prices.
+
+USD amounts are computed with Decimal and returned as strings rounded to cents;
+prices are returned as quoted by the exchange. When the market data was served stale
+(its MCP-STALE entry), the snapshot's time is that of the data, not of the fetch, and
+valuations are flagged with prices_stale.
+"""
+
+import threading
+import time
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+from decimal import ROUND_HALF_EVEN, Decimal
+from typing import Any
+
+import denom
+from fetch_graph import is_error
+from functions.figure_markets_functions import fetch_current_fm_data
+from utils import JSONType
+
+PRICE_SNAPSHOT_TTL = 30.0
+USD_BASE_DENOM = "uusd"
+CENT = Decimal("0.01")
+
+
+@dataclass(frozen=True)
+class PriceSnapshot:
+    """USD prices per whole unit, keyed by base denom"""
+
+    prices: dict[str, Decimal]
+    as_of: str                  # ISO 8601 UTC time the prices were taken
+    taken_at: float             # monotonic time, for reuse
+    stale: bool = False         # the prices were served stale by the upstream layer
+
+    def price(self, base_denom: str) -> Decimal | None:
+        if base_denom == USD_BASE_DENOM:
+            return Decimal(1)
+        return self.prices.get(base_denom)
+
+
+def unit_conv(base_denom: str) -> int | None:
+    """Base units per whole unit of a base denom (nhash -> 10**9), None if unknown"""
+    entry = denom.denom_index.get(base_denom)
+    if entry is None:
+        return None
+    unit = denom.denom_index.get(entry.unit_denom)
+    return unit.conv if unit is not None and unit.base_denom == entry.base_denom else None
+
+
+def usd(value: Decimal) -> str:
+    return str(value.quantize(CENT, rounding=ROUND_HALF_EVEN))
+
+
+def snapshot_from_markets(markets: list[dict[str, Any]], age: float | None = None) -> PriceSnapshot:
+    """Price snapshot from the market list of fetch_current_fm_data, age seconds old if stale"""
+    prices: dict[str, Decimal] = {}
+    for market in markets:
+        quote = denom.denom_index.get(market.get("quoteDenom", ""))
+        base = denom.denom_index.get(market.get("denom", ""))
+        price = market.get("lastTradedPrice")
+        if quote is None or base is None or quote.base_denom != USD_BASE_DENOM or price in (None, ""):
+            continue
+        prices[base.base_denom] = Decimal(str(price))
+    as_of = datetime.now(UTC) - timedelta(seconds=age or 0)
+    return PriceSnapshot(prices, as_of.isoformat(timespec="seconds"), time.monotonic(), age is not None)
+
+
+_snapshot: PriceSnapshot | None = None
+_snapshot_lock = threading.Lock()
+
+
+async def get_price_snapshot(max_age: float = PRICE_SNAPSHOT_TTL) -> PriceSnapshot | JSONType:
+    """The shared price snapshot, retaken when older than max_age seconds
+
+    Returns the snapshot, or the MCP-ERROR dict of the market data fetch.
+    """
+    global _snapshot
+    snapshot = _snapshot
+    if snapshot is not None and time.monotonic() - snapshot.taken_at < max_age:
+        return snapshot
+    await denom.refresh_denom_index()
+    fm_data = await fetch_current_fm_data()
+    if is_error(fm_data):
+        return fm_data
+    stale = fm_data.get("MCP-STALE")
+    snapshot = snapshot_from_markets(fm_data.get("data", []), stale["max_age_seconds"] if stale else None)
+    with _snapshot_lock:
+        _snapshot = snapshot
+    return snapshot
+
+
+def value_holdings(holdings: dict[str, dict[str, int]], snapshot: PriceSnapshot) -> dict[str, Any]:
+    """
+    USD value of holdings against a price snapshot.
+
+    Args:
+        holdings: Integer amount per source (e.g. liquid, delegated) per base denom
+        snapshot: Prices to value the holdings at
+
+    Returns:
+        Dictionary containing:
+        - assets: Per base denom, largest value first: denom, symbol, amount, the
+          amount per source, price_usd and value_usd (None without a price)
+        - total_value_usd: Sum of the priced assets' values
+        - unpriced: Base denoms without a USD price
+        - price_time: When the prices were taken
+        - prices_stale: Whether the prices were served stale (price_time is their age)
+    """
+    valued = []
+    total = Decimal(0)
+    unpriced = []
+    for base_denom, sources in holdings.items():
+        amount = sum(sources.values())
+        entry = denom.denom_index.get(base_denom)
+        price = snapshot.price(base_denom)
+        conv = unit_conv(base_denom)
+        if price is None or not conv:
+            price = value = None
+            unpriced.append(base_denom)
+        else:
+            value = Decimal(amount) * price / conv
+            total += value
+        valued.append((value, {
+            "denom": base_denom,
+            "symbol": entry.symbol if entry else None,
+            "amount": amount,
+            **sources,
+            "price_usd": str(price) if price is not None else None,
+            "value_usd": usd(value) if value is not None else None,
+        }))
+    valued.sort(key=lambda item: (item[0] is None, -(item[0] or 0), item[1]["denom"]))
+    assets = [asset for _, asset in valued]
+    return {
+        "assets": assets,
+        "total_value_usd": usd(total),
+        "unpriced": sorted(unpriced),
+        "price_time": snapshot.as_of,
+        "prices_stale": snapshot.stale,
+    }
+
+
+def set_price_snapshot(snapshot: PriceSnapshot | None) -> PriceSnapshot | None:
+    """Replace the shared snapshot (tests); returns the previous one"""
+    global _snapshot
+    with _snapshot_lock:
+        previous, _snapshot = _snapshot, snapshot
+    return previous
@@ -22,7 +22,9 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 from version import get_version_string, get_full_version_info
 
 # Import registry and function modules
+from loop_runner import run_sync
 from registry import get_registry
+from registry.decorator import require_function_meta
 from registry.registry import FunctionRegistry, FunctionMeta
 import functions  # This registers all @api_function decorated functions
 
@@ -99,34 +101,20 @@ def create_mcp_sync_wrapper(async_func: Callable) -> Callable:
     AWS MCP Handler calls functions synchronously, so we need to convert
     async functions to sync. This is a clean, minimal implementation.
     """
+    # Never dispatch without the binder: raises if the function is unregistered
+    meta = require_function_meta(async_func)
+    
     @wraps(async_func)
     def sync_wrapper(*args, **kwargs):
+        # Coerce tool arguments with the function's compiled binder
+        if not args:
+            kwargs = meta.binder.bind(kwargs)
         if not asyncio.iscoroutinefunction(async_func):
             return async_func(*args, **kwargs)
             
-        # Try asyncio.run first (cleanest approach)
-        try:
-            return asyncio.run(async_func(*args, **kwargs))
-        except RuntimeError as e:
-            if "cannot be called from a running event loop" in str(e):
-                # Fallback: create new event loop in thread
-                import concurrent.futures
-                import threading
-                
-                def run_in_thread():
-                    # Create isolated event loop
-                    loop = asyncio.new_event_loop()
-                    asyncio.set_event_loop(loop)
-                    try:
-                        return loop.run_until_complete(async_func(*args, **kwargs))
-                    finally:
-                        loop.close()
-                
-                with concurrent.futures.ThreadPoolExecutor() as executor:
-                    future = executor.submit(run_in_thread)
-                    return future.result(timeout=30)
-            else:
-                raise
+        # The handler may call us from inside FastAPI's running loop, so the
+        # coroutine runs on the shared persistent loop thread instead
+        return run_sync(async_func(*args, **kwargs))
     
     return sync_wrapper
 
@@ -167,77 +155,30 @@ def register_rest_routes(app: FastAPI, registry: FunctionRegistry):
         def create_route_handler(meta: FunctionMeta):
             async def route_handler(request: Request):
                 try:
-                    # Extract parameters from request
-                    kwargs = {}
-                    
-                    # Path parameters
-                    for param_name, param_value in request.path_params.items():
-                        kwargs[param_name] = param_value
-                    
                     # POST body parameters (for JSON payload)
+                    body = None
                     if request.method == "POST":
                         try:
                             body = await request.json()
-                            if isinstance(body, dict):
-                                for param_name, param in meta.signature.parameters.items():
-                                    if param_name in ('self', 'cls') or param_name in kwargs:
-                                        continue
-                                    
-                                    if param_name in body:
-                                        raw_value = body[param_name]
-                                        param_type = meta.type_hints.get(param_name, str)
-                                        
-                                        try:
-                                            if param_type == int:
-                                                kwargs[param_name] = int(raw_value)
-                                            elif param_type == float:
-                                                kwargs[param_name] = float(raw_value)
-                                            elif param_type == bool:
-                                                kwargs[param_name] = raw_value if isinstance(raw_value, bool) else raw_value.lower() in ('true', '1', 'yes', 'on')
-                                            else:
-                                                kwargs[param_name] = raw_value
-                                        except (ValueError, TypeError):
-                                            raise HTTPException(
-                                                status_code=400,
-                                                detail=f"Invalid value for parameter {param_name}: {raw_value}"
-                                            )
-                        except Exception as e:
-                            # If JSON parsing fails, continue to query params
-                            pass
-                    
-                    # Query parameters with type conversion (fallback)
-                    for param_name, param in meta.signature.parameters.items():
-                        if param_name in ('self', 'cls') or param_name in kwargs:
-                            continue
-                            
-                        if param_name in request.query_params:
-                            raw_value = request.query_params[param_name]
-                            param_type = meta.type_hints.get(param_name, str)
-                            
-                            try:
-                                if param_type == int:
-                                    kwargs[param_name] = int(raw_value)
-                                elif param_type == float:
-                                    kwargs[param_name] = float(raw_value)
-                                elif param_type == bool:
-                                    kwargs[param_name] = raw_value.lower() in ('true', '1', 'yes', 'on')
-                                else:
-                                    kwargs[param_name] = raw_value
-                            except (ValueError, TypeError):
-                                raise HTTPException(
-                                    status_code=400,
-                                    detail=f"Invalid value for parameter {param_name}: {raw_value}"
-                                )
+                        except Exception:
+                            # If JSON parsing fails, fall back to query params
+                            body = None
+                        if not isinstance(body, dict):
+                            body = None
                     
-                    # Set defaults for missing optional parameters
-                    for param_name, param in meta.signature.parameters.items():
-                        if (param_name not in ('self', 'cls') and 
-                            param_name not in kwargs and 
-                            param.default != param.empty):
-                            kwargs[param_name] = param.default
+                    # Build kwargs in one pass with the function's compiled binder:
+                    # path params > JSON body > query params, then defaults
+                    try:
+                        kwargs = meta.binder.bind(
+                            request.path_params,
+                            body,
+                            request.query_params
+                        )
+                    except ValueError as e:
+                        raise HTTPException(status_code=400, detail=str(e)) from e
                     
                     # Execute function - native async support in Web Adapter!
-                    if asyncio.iscoroutinefunction(meta.func):
+                    if meta.binder.is_coroutine:
                         result = await meta.func(**kwargs)  # Clean async execution
                     else:
                         result = meta.func(**kwargs)
@@ -320,6 +261,19 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Close pooled upstream HTTP clients when the container shuts down
+@app.on_event("shutdown")
+async def close_upstream_clients():
+    """Release keep-alive connections held by the shared upstream client pool."""
+    from loop_runner import get_loop_runner
+    from upstream import close_http_clients
+    await close_http_clients()
+    # MCP tool calls ran on the persistent loop thread - close its clients there
+    runner = get_loop_runner()
+    if runner.stats()["running"]:
+        await asyncio.to_thread(run_sync, close_http_clients())
+        runner.close()
+
 # Health check endpoint
 @app.get("/health")
 async def health_check():
@@ -642,6 +596,42 @@ print("🔧 Registering REST routes...")
 register_rest_routes(app, registry)
 print(f"✅ Registered {len(registry.get_rest_functions())} REST endpoints")
 
+# =============================================================================
+# Streaming Batch Endpoints
+# =============================================================================
+
+@app.post("/api/fetch_wallet_summaries_batch/stream")
+async def stream_wallet_summaries_batch(request: Request):
+    """
+    Batch wallet summaries as NDJSON: one line per wallet as soon as it completes,
+    then a final rollup line. Takes the same JSON body as fetch_wallet_summaries_batch.
+    """
+    from fastapi.responses import StreamingResponse
+    from functions.aggregate_functions import (
+        MAX_BATCH_CONCURRENCY,
+        normalize_wallet_addresses,
+        stream_wallet_summaries,
+    )
+
+    try:
+        body = await request.json()
+    except Exception as e:
+        raise HTTPException(status_code=400, detail="Invalid JSON in request body") from e
+    if not isinstance(body, dict):
+        raise HTTPException(status_code=400, detail="Request body must be a JSON object")
+    try:
+        addresses = normalize_wallet_addresses(body.get("wallet_addresses") or [])
+        max_concurrency = max(1, min(int(body.get("max_concurrency", 8)), MAX_BATCH_CONCURRENCY))
+    except (TypeError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+    include_details = body.get("include_details", True) is not False
+
+    async def lines():
+        async for event in stream_wallet_summaries(addresses, max_concurrency, include_details):
+            yield json.dumps(event, separators=(",", ":")) + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
 # =============================================================================
 # Event Replay Architecture for Multi-Browser Synchronization
 # =============================================================================
@@ -0,0 +1,93 @@
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+# Trade history must not leak between test runs through snapshot files
+os.environ.setdefault("TRADE_STORE_DIR", "off")
+
+
+class JSONStubServer:
+    """Local keep-alive HTTP server that answers every GET with a JSON body"""
+
+    def __init__(self):
+        self.connections = 0
+        self.requests = []
+        self.delay = 0.0
+        self.status = 200
+        self.responder = lambda path: {"path": path}
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self):
+                super().setup()
+                stub.connections += 1
+
+            def do_GET(self):
+                stub.requests.append(self.path)
+                if stub.delay:
+                    time.sleep(stub.delay)
+                body = json.dumps(stub.responder(self.path)).encode()
+                self.send_response(stub.status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def shutdown(self):
+        self.server.shutdown()
+
+
+@pytest.fixture
+def json_stub():
+    stub = JSONStubServer()
+    yield stub
+    stub.shutdown()
+
+
+@pytest.fixture
+def run():
+    """run(coro_fn): await coro_fn() on a new event loop, then close the pooled HTTP clients"""
+    import asyncio
+    import os
+    import sys
+    sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+    from upstream import close_http_clients
+
+    def run_coroutine(coro_fn):
+        async def wrapped():
+            try:
+                return await coro_fn()
+            finally:
+                await close_http_clients()
+
+        return asyncio.run(wrapped())
+
+    return run_coroutine
+
+
+@pytest.fixture
+def upstream_standin():
+    """Local stand-in for every upstream API, with this process's upstream URLs pointed at it"""
+    import os
+    import sys
+    sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+    from standin import UpstreamStandin
+    from trade_store import set_trade_store
+
+    previous_store = set_trade_store(None)  # no trades of other upstreams
+    with UpstreamStandin(seed=1) as standin, standin.serving():
+        yield standin
+    set_trade_store(previous_store)
@@ -0,0 +1,415 @@
+"""
+Upstream Stand-In Server
+
+Test and benchmark tooling, not part of the deployed src/ package. A local HTTP server that replays captured Provenance explorer, Provenance API, Figure
+Markets and system-context payloads, so functions can be tested, benchmarked and load
+tested without touching the production APIs.
+
+Every upstream is mounted under /<name> (see upstream.endpoints), so one server
+replaces all of them:
+
+    with UpstreamStandin(latency="lognormal:40:15") as standin, standin.serving():
+        await fetch_complete_wallet_summary("pb1...")  # served locally
+
+or, for a load generator in another process:
+
+    python scripts/upstream_standin.py --port 8765 --latency lognormal:40:15
+    UPSTREAM_BASE_URL=http://127.0.0.1:8765 <server or benchmark>
+
+Fixtures are JSON files (default: tests/fixtures/upstream/<upstream>.json) holding
+{"upstream": name, "fixtures": [{"path", "query"?, "status"?, "body" | "text"}]}.
+Paths may contain {placeholders} matching one path segment, so one fixture serves any
+wallet address. Exact paths win over patterns, and fixtures with a matching query win
+over fixtures without one.
+
+In record mode, requests without a fixture are forwarded to the real upstream and the
+responses are captured as new fixtures (save_recordings() writes them out).
+
+Responses are delayed by a latency model per upstream (fixed, uniform, normal,
+lognormal or exponential, in milliseconds) and can fail with a configurable rate.
+"""
+
+import json
+import math
+import random
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Tuple, Union
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+from upstream.endpoints import DEFAULT_BASE_URLS, override_upstream_urls
+
+DEFAULT_FIXTURES_DIR = Path(__file__).resolve().parent / "fixtures" / "upstream"
+
+
+# =============================================================================
+# Latency models
+# =============================================================================
+
+@dataclass
+class LatencyModel:
+    """Response delay distribution in milliseconds"""
+    kind: str = "fixed"        # fixed | uniform | normal | lognormal | exponential
+    mean_ms: float = 0.0
+    jitter_ms: float = 0.0     # uniform: +/- range; normal/lognormal: standard deviation
+
+    KINDS = ("fixed", "uniform", "normal", "lognormal", "exponential")
+
+    def __post_init__(self):
+        if self.kind not in self.KINDS:
+            raise ValueError(f"Unknown latency distribution: {self.kind}")
+
+    @classmethod
+    def parse(cls, spec: Union[str, float, "LatencyModel", None]) -> "LatencyModel":
+        """
+        Parse "kind:mean_ms[:jitter_ms]" (or a number of milliseconds).
+
+        Examples: "25", "uniform:40:10", "lognormal:80:30", "exponential:50"
+        """
+        if isinstance(spec, LatencyModel):
+            return spec
+        if spec is None or spec == "":
+            return cls()
+        if isinstance(spec, (int, float)):
+            return cls("fixed", float(spec))
+        parts = str(spec).split(":")
+        if len(parts) == 1:
+            return cls("fixed", float(parts[0]))
+        return cls(parts[0], float(parts[1]), float(parts[2]) if len(parts) > 2 else 0.0)
+
+    def sample(self, rng: random.Random) -> float:
+        """One delay in seconds (never negative)"""
+        if self.kind == "fixed":
+            ms = self.mean_ms
+        elif self.kind == "uniform":
+            ms = rng.uniform(self.mean_ms - self.jitter_ms, self.mean_ms + self.jitter_ms)
+        elif self.kind == "normal":
+            ms = rng.gauss(self.mean_ms, self.jitter_ms)
+        elif self.kind == "exponential":
+            ms = rng.expovariate(1.0 / self.mean_ms) if self.mean_ms > 0 else 0.0
+        else:
+            if self.mean_ms <= 0:
+                ms = 0.0
+            else:
+                sigma2 = math.log(1 + (self.jitter_ms / self.mean_ms) ** 2)
+                ms = rng.lognormvariate(math.log(self.mean_ms) - sigma2 / 2, math.sqrt(sigma2))
+        return max(ms, 0.0) / 1000
+
+    def __str__(self) -> str:
+        return f"{self.kind}:{self.mean_ms:g}:{self.jitter_ms:g}"
+
+
+# =============================================================================
+# Fixtures
+# =============================================================================
+
+@dataclass
+class Fixture:
+    """One canned upstream response"""
+    upstream: str
+    path: str
+    status: int = 200
+    body: Any = None
+    text: Optional[str] = None
+    content_type: Optional[str] = None
+    query: Optional[Dict[str, str]] = None
+    _regex: Optional[re.Pattern] = field(default=None, repr=False, compare=False)
+    _encoded: Optional[Tuple[bytes, str]] = field(default=None, repr=False, compare=False)
+
+    def __post_init__(self):
+        if self.query is not None:
+            self.query = {key: str(value) for key, value in self.query.items()}
+        if "{" in self.path:
+            pattern = re.sub(r"\\{[^/]+?\\}", "[^/]+", re.escape(self.path))
+            self._regex = re.compile(f"^{pattern}$")
+
+    @property
+    def is_pattern(self) -> bool:
+        return self._regex is not None
+
+    def matches_query(self, query: Mapping[str, str]) -> bool:
+        return self.query is None or all(query.get(k) == v for k, v in self.query.items())
+
+    def payload(self) -> Tuple[bytes, str]:
+        """Response body and content type (encoded once)"""
+        if self._encoded is None:
+            if self.text is not None:
+                self._encoded = (self.text.encode(), self.content_type or "text/plain; charset=utf-8")
+            else:
+                self._encoded = (json.dumps(self.body).encode(), self.content_type or "application/json")
+        return self._encoded
+
+    def to_dict(self) -> Dict[str, Any]:
+        data: Dict[str, Any] = {"path": self.path}
+        if self.query is not None:
+            data["query"] = self.query
+        if self.status != 200:
+            data["status"] = self.status
+        if self.text is not None:
+            data["text"] = self.text
+            if self.content_type:
+                data["content_type"] = self.content_type
+        else:
+            data["body"] = self.body
+        return data
+
+
+class FixtureStore:
+    """Fixtures indexed by upstream, exact path and path pattern"""
+
+    def __init__(self, fixtures: Optional[List[Fixture]] = None):
+        self._exact: Dict[Tuple[str, str], List[Fixture]] = {}
+        self._patterns: Dict[str, List[Fixture]] = {}
+        self._lock = threading.Lock()
+        for fixture in fixtures or []:
+            self.add(fixture)
+
+    @classmethod
+    def load(cls, directory: Union[str, Path] = DEFAULT_FIXTURES_DIR) -> "FixtureStore":
+        """Load every <upstream>.json fixture file in a directory"""
+        store = cls()
+        for path in sorted(Path(directory).glob("*.json")):
+            data = json.loads(path.read_text())
+            upstream = data.get("upstream", path.stem)
+            for entry in data.get("fixtures", []):
+                store.add(Fixture(upstream=upstream, **entry))
+        return store
+
+    def add(self, fixture: Fixture) -> None:
+        with self._lock:
+            if fixture.is_pattern:
+                bucket = self._patterns.setdefault(fixture.upstream, [])
+            else:
+                bucket = self._exact.setdefault((fixture.upstream, fixture.path), [])
+            # Most specific (most query constraints) first
+            bucket.append(fixture)
+            bucket.sort(key=lambda f: -len(f.query or {}))
+
+    def match(self, upstream: str, path: str, query: Mapping[str, str]) -> Optional[Fixture]:
+        """Best fixture for a request, or None"""
+        for fixture in self._exact.get((upstream, path), ()):
+            if fixture.matches_query(query):
+                return fixture
+        for fixture in self._patterns.get(upstream, ()):
+            if fixture._regex.match(path) and fixture.matches_query(query):
+                return fixture
+        return None
+
+    def fixtures(self) -> List[Fixture]:
+        with self._lock:
+            exact = [f for bucket in self._exact.values() for f in bucket]
+            patterns = [f for bucket in self._patterns.values() for f in bucket]
+        return exact + patterns
+
+    def save(self, directory: Union[str, Path]) -> List[Path]:
+        """Write the fixtures as one <upstream>.json file per upstream"""
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        by_upstream: Dict[str, List[Fixture]] = {}
+        for fixture in self.fixtures():
+            by_upstream.setdefault(fixture.upstream, []).append(fixture)
+        written = []
+        for upstream, fixtures in sorted(by_upstream.items()):
+            target = directory / f"{upstream}.json"
+            target.write_text(json.dumps(
+                {"upstream": upstream, "fixtures": [f.to_dict() for f in fixtures]},
+                indent=1
+            ) + "\n")
+            written.append(target)
+        return written
+
+
+# =============================================================================
+# Server
+# =============================================================================
+
+class UpstreamStandin:
+    """Record/replay HTTP stand-in for all upstream APIs"""
+
+    def __init__(
+        self,
+        fixtures: Union[FixtureStore, str, Path, None] = None,
+        latency: Union[str, float, LatencyModel, Mapping[str, Any], None] = None,
+        mode: str = "replay",
+        error_rate: float = 0.0,
+        error_status: int = 503,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        seed: Optional[int] = None,
+        record_from: Optional[Mapping[str, str]] = None,
+    ):
+        """
+        Args:
+            fixtures: FixtureStore or directory of fixture files (default fixtures if None)
+            latency: One latency spec for every upstream, or {upstream: spec} with an
+                     optional "*" default (see LatencyModel.parse)
+            mode: "replay" (404 for unknown requests) or "record" (forward unknown
+                  requests to the real upstream and capture them)
+            error_rate: Fraction of requests answered with error_status instead
+            error_status: Status code of injected failures
+            host, port: Listen address (port 0 picks a free port)
+            seed: Seed for latency and failure sampling
+            record_from: Base URLs recorded from (default: the production upstreams)
+        """
+        if mode not in ("replay", "record"):
+            raise ValueError(f"Unknown stand-in mode: {mode}")
+        if isinstance(fixtures, FixtureStore):
+            self.fixtures = fixtures
+        else:
+            self.fixtures = FixtureStore.load(fixtures or DEFAULT_FIXTURES_DIR)
+        if isinstance(latency, Mapping):
+            self.latency = {name: LatencyModel.parse(spec) for name, spec in latency.items()}
+        else:
+            self.latency = {"*": LatencyModel.parse(latency)}
+        self.mode = mode
+        self.record_from = dict(record_from or DEFAULT_BASE_URLS)
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()  # also guards the counters
+        self.recorded: List[Fixture] = []
+        self.requests: Counter = Counter()
+        self.misses = 0
+        self.errors_injected = 0
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def base_urls(self) -> Dict[str, str]:
+        """Base URL of every upstream on this server"""
+        return {name: f"{self.url}/{name}" for name in DEFAULT_BASE_URLS}
+
+    def start(self) -> "UpstreamStandin":
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._server.serve_forever, kwargs={"poll_interval": 0.05},
+                name="upstream-standin", daemon=True
+            )
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread = None
+        self._server.server_close()
+
+    def serve_forever(self) -> None:
+        """Serve on the calling thread (for the command-line runner)"""
+        self._server.serve_forever()
+
+    def __enter__(self) -> "UpstreamStandin":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    @contextmanager
+    def serving(self) -> Iterator["UpstreamStandin"]:
+        """Point this process's upstream URLs at the stand-in for a block"""
+        with override_upstream_urls(self.base_urls()):
+            yield self
+
+    def save_recordings(self, directory: Union[str, Path, None] = None) -> List[Path]:
+        """Write recorded responses merged with the loaded fixtures"""
+        return self.fixtures.save(directory or DEFAULT_FIXTURES_DIR)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "url": self.url,
+            "mode": self.mode,
+            "requests": sum(self.requests.values()),
+            "requests_by_upstream": dict(self.requests),
+            "misses": self.misses,
+            "recorded": len(self.recorded),
+            "errors_injected": self.errors_injected,
+            "latency": {name: str(model) for name, model in self.latency.items()},
+        }
+
+    # -------------------------------------------------------------------------
+
+    def _delay(self, upstream: str) -> Tuple[float, bool]:
+        model = self.latency.get(upstream) or self.latency.get("*") or LatencyModel()
+        with self._rng_lock:
+            delay = model.sample(self._rng)
+            fail = self.error_rate > 0 and self._rng.random() < self.error_rate
+        return delay, fail
+
+    def _record(self, upstream: str, path: str, query: Dict[str, str]) -> Optional[Fixture]:
+        import httpx
+        url = self.record_from[upstream] + path
+        response = httpx.get(url, params=query, timeout=30.0)
+        content_type = response.headers.get("content-type", "")
+        fixture = Fixture(upstream=upstream, path=path, status=response.status_code, query=query or None)
+        if content_type.startswith("application/json"):
+            fixture.body = response.json()
+        else:
+            fixture.text = response.text
+            fixture.content_type = content_type or None
+        self.fixtures.add(fixture)
+        self.recorded.append(fixture)
+        return fixture
+
+    def respond(self, raw_path: str) -> Tuple[int, bytes, str, float]:
+        """Resolve a request to (status, body, content type, delay seconds)"""
+        parts = urlsplit(raw_path)
+        upstream, _, path = parts.path.lstrip("/").partition("/")
+        path = "/" + path
+        query = dict(parse_qsl(parts.query))
+        with self._rng_lock:
+            self.requests[upstream] += 1
+
+        if upstream not in DEFAULT_BASE_URLS:
+            return 404, json.dumps({"error": f"Unknown upstream: {upstream}"}).encode(), "application/json", 0.0
+
+        delay, fail = self._delay(upstream)
+        if fail:
+            with self._rng_lock:
+                self.errors_injected += 1
+            return self.error_status, b'{"error": "injected failure"}', "application/json", delay
+
+        fixture = self.fixtures.match(upstream, path, query)
+        if fixture is None and self.mode == "record":
+            fixture = self._record(upstream, path, query)
+            delay = 0.0
+        if fixture is None:
+            with self._rng_lock:
+                self.misses += 1
+            target = path + (f"?{urlencode(query)}" if query else "")
+            return 404, json.dumps({"error": f"No fixture for {upstream} {target}"}).encode(), "application/json", delay
+
+        body, content_type = fixture.payload()
+        return fixture.status, body, content_type, delay
+
+    def _handler_class(self):
+        standin = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                status, body, content_type, delay = standin.respond(self.path)
+                if delay:
+                    time.sleep(delay)
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
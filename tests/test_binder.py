@@ -0,0 +1,68 @@
+import os
+import sys
+from typing import Optional
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from registry import FunctionRegistry
+from registry.binder import ArgumentBinder
+from registry.decorator import require_function_meta
+
+
+async def fetch_trades(token_pair: str, limit: int = 20, ascending: bool = False,
+                       min_price: Optional[float] = None):
+    return None
+
+
+def test_bind_converts_and_fills_defaults():
+    binder = ArgumentBinder(fetch_trades)
+    assert binder.is_coroutine
+    assert binder.bind({"token_pair": "HASH-USD", "limit": "5", "ascending": "yes"}) == {
+        "token_pair": "HASH-USD",
+        "limit": 5,
+        "ascending": True,
+        "min_price": None,
+    }
+    assert binder.bind({"token_pair": "X", "min_price": "0.5", "ascending": False})["min_price"] == 0.5
+
+
+def test_first_source_wins_and_unknown_names_are_dropped():
+    binder = ArgumentBinder(fetch_trades)
+    kwargs = binder.bind({"token_pair": "PATH"}, None, {"token_pair": "QUERY", "limit": "3", "debug": "1"})
+    assert kwargs["token_pair"] == "PATH"
+    assert kwargs["limit"] == 3
+    assert "debug" not in kwargs
+
+
+def test_var_keyword_functions_keep_extra_arguments():
+    def handler(name: str, **extra):
+        return None
+
+    assert ArgumentBinder(handler).bind({"name": "a", "x": 1}, {"x": 2, "y": 3}) == {"name": "a", "x": 1, "y": 3}
+
+
+def test_invalid_values_raise_value_error():
+    with pytest.raises(ValueError, match="Invalid value for parameter limit: many") as error:
+        ArgumentBinder(fetch_trades).bind({"token_pair": "X", "limit": "many"})
+    assert isinstance(error.value.__cause__, ValueError)
+
+
+def test_register_compiles_binder_once():
+    registry = FunctionRegistry()
+    meta = registry.register(fetch_trades, ["rest"], rest_path="/api/trades/{token_pair}")
+    assert meta.binder.params == ("token_pair", "limit", "ascending", "min_price")
+    assert meta.signature is meta.signature
+    match = registry.get_router().match("GET", "/api/trades/HASH-USD")
+    assert meta.binder.bind(match.params, {"limit": "2"}) == {
+        "token_pair": "HASH-USD", "limit": 2, "ascending": False, "min_price": None,
+    }
+
+
+def test_unregistered_functions_are_not_dispatched_without_a_binder():
+    async def not_a_tool(x: int) -> int:
+        return x
+
+    with pytest.raises(LookupError):
+        require_function_meta(not_a_tool)
@@ -0,0 +1,73 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from candles import CandleEngine, CandleSeries
+from functions.figure_markets_functions import fetch_price_candles, fetch_trade_history
+from trade_store import TradeStore, set_trade_store
+
+MINUTE = 60_000
+START_MS = 1_789_948_800_000  # midnight UTC
+
+
+def rows(*trades):
+    """(seconds after START_MS, price, quantity) as trade store rows"""
+    return [(START_MS + int(s * 1000), price, quantity, 1, f"T-{s}") for s, price, quantity in trades]
+
+
+def test_trades_roll_into_ohlcv_bars_incrementally():
+    store = TradeStore(directory="off")
+    trades = store.pair("TEST-USD")
+    trades.replace(rows((0, 2.0, 1), (10, 3.0, 2), (59, 1.5, 1), (60, 2.5, 4), (250, 2.0, 1)))
+    engine = CandleEngine()
+
+    candles = engine.candles(store, "TEST-USD", "1m")
+    assert candles["times_ms"] == [START_MS, START_MS + MINUTE, START_MS + 4 * MINUTE]
+    assert (candles["open"], candles["high"], candles["low"], candles["close"]) == (
+        [2.0, 2.5, 2.0], [3.0, 2.5, 2.0], [1.5, 2.5, 2.0], [1.5, 2.5, 2.0]
+    )
+    assert (candles["volume"], candles["trades"]) == ([4.0, 4.0, 1.0], [3, 1, 1])
+    assert engine.candles(store, "TEST-USD", "5m")["volume"] == [9.0]
+
+    # New trades extend the last bar and open new ones
+    trades.append(rows((270, 4.0, 2), (300, 0.5, 1)))
+    candles = engine.candles(store, "TEST-USD", "1m")
+    assert candles["close"][-2:] == [4.0, 0.5] and candles["high"][-2] == 4.0
+    assert candles["trades"] == [3, 1, 2, 1]
+
+    rebuilt = CandleSeries("TEST-USD", "1m")
+    rebuilt.add(trades.times, trades.prices, trades.quantities)
+    assert rebuilt.columns(10) == candles
+
+    # Replaced history (a gap or a backfill) rebuilds the series
+    trades.replace(rows((600, 9.0, 1)))
+    assert engine.candles(store, "TEST-USD", "1m")["close"] == [9.0]
+
+
+def test_series_are_bounded():
+    store = TradeStore(directory="off")
+    store.pair("TEST-USD").replace(rows(*((minute * 60, float(minute), 1) for minute in range(30))))
+    engine = CandleEngine(max_candles=10)
+
+    candles = engine.candles(store, "TEST-USD", "1m", limit=5)
+    assert candles["count"] == 5 and candles["close"] == [25.0, 26.0, 27.0, 28.0, 29.0]
+    assert len(engine.series("TEST-USD", "1m")) == 10
+    with pytest.raises(ValueError):
+        engine.series("TEST-USD", "2m")
+
+
+def test_candles_cover_every_stored_trade(upstream_standin, run):
+    previous = set_trade_store(TradeStore(directory="off"))
+    try:
+        candles = run(lambda: fetch_price_candles("HASH-USD", "1h"))
+        trades = run(lambda: fetch_trade_history("HASH-USD", 1000))
+    finally:
+        set_trade_store(previous)
+
+    assert sum(candles["trades"]) == trades["count"] == 50
+    assert sum(candles["volume"]) == pytest.approx(sum(trades["quantities"]))
+    assert candles["close"][-1] == trades["prices"][-1]
+    assert run(lambda: fetch_price_candles("HASH-USD", "2h"))["MCP-ERROR"].startswith("Unknown interval")
@@ -0,0 +1,50 @@
+import functools
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from functions import blockchain_functions
+from functions.blockchain_functions import fetch_delegation_breakdown, fetch_total_delegation_data
+from pagination import fetch_all_pages
+from upstream import EXPLORER, override_upstream_urls
+
+MANY_VALIDATORS_WALLET = "pb1standinmanyvalidators0wallet000000000000"
+VALIDATOR = "pbvaloper1standin0validator0"
+
+
+def test_breakdown_joins_all_delegation_pages_by_validator(upstream_standin, run):
+    result = run(lambda: fetch_delegation_breakdown(MANY_VALIDATORS_WALLET))
+
+    assert result["validators"] == [VALIDATOR + suffix for suffix in "acdbe"]
+    assert result["staked"] == [250000000000000, 100000000000000, 50000000000000, 150000000000000, 0]
+    assert result["rewards"] == [1520000000000, 0, 0, 480000000000, 0]
+    assert result["unbonding"] == [10000000000000, 0, 0, 0, 0]
+    assert result["redelegated"] == [0, 0, 0, 0, 20000000000000]  # counted at the destination
+    assert result["totals"]["staked"] == 550000000000000
+    assert (result["denom"], result["validator_count"]) == ("nhash", 5)
+
+
+def test_breakdown_totals_match_the_rollup_totals(upstream_standin, run):
+    wallet = "pb1standinrollup0wallet00000000000000000000"
+    breakdown = run(lambda: fetch_delegation_breakdown(wallet))
+    totals = run(lambda: fetch_total_delegation_data(wallet))
+
+    assert breakdown["totals"]["staked"] == totals["delegated_staked_amount"]["amount"]
+    assert breakdown["totals"]["unbonding"] == totals["delegated_unbonding_amount"]["amount"]
+    assert breakdown["totals"]["redelegated"] == totals["delegated_redelegated_amount"]["amount"]
+    # Rewards are decimals: the rollup truncates their sum, the breakdown each reward
+    assert abs(breakdown["totals"]["rewards"] - totals["delegated_rewards_amount"]["amount"]) <= 1
+
+
+def test_breakdown_reports_upstream_failures(json_stub, run):
+    json_stub.status = 404
+    with override_upstream_urls({EXPLORER: json_stub.url}):
+        result = run(lambda: fetch_delegation_breakdown("pb1missing"))
+    assert result == {"MCP-ERROR": "HTTP error: 404"}
+
+
+def test_breakdown_is_not_partial(upstream_standin, monkeypatch, run):
+    monkeypatch.setattr(blockchain_functions, "fetch_all_pages", functools.partial(fetch_all_pages, max_pages=1))
+    result = run(lambda: fetch_delegation_breakdown(MANY_VALIDATORS_WALLET))
+    assert result["MCP-ERROR"].startswith("Too many delegation pages")
@@ -0,0 +1,70 @@
+import asyncio
+import os
+import sys
+from decimal import Decimal
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+import denom
+from denom import amt_base_denom, amts_base_denom, base_amount, sum_amts_base_denom, update_denom_index
+from upstream import close_http_clients
+
+
+@pytest.fixture
+def restore_index(monkeypatch):
+    monkeypatch.setattr(denom, "denom_index", dict(denom.denom_index))
+    monkeypatch.setattr(denom, "_index_refreshed_at", 0.0)
+
+
+def test_base_amounts_are_exact_integers():
+    assert base_amount(10, 1_000_000) == 10_000_000
+    assert base_amount("1.5", 1_000_000_000) == 1_500_000_000
+    assert base_amount("1e3", 1_000_000) == 1_000_000_000
+    assert base_amount("0.0000000019", 1_000_000_000) == 1  # truncated like int(Decimal(...))
+    assert base_amount("-2.25", 10) == -22
+    big = "123456789012345678901234567890.123456789"
+    assert base_amount(big, 1_000_000_000) == 123456789012345678901234567890123456789
+    for amount in ("1234.5678912345", 7, 0.1, Decimal("3.3")):
+        assert base_amount(amount, 1_000_000) == int(Decimal(amount) * 1_000_000)
+    with pytest.raises(ValueError):
+        base_amount("NaN", 1)
+
+
+def test_bulk_conversion_matches_single_conversion():
+    amounts = [
+        {"amount": "10", "denom": "usd"},
+        {"amount": 3, "denom": "hash"},
+        {"amount": "250", "denom": "neth.figure.se"},
+        {"amount": "1234.5678912345", "denom": "btc.jaja"},
+    ]
+    assert amts_base_denom(amounts) == [amt_base_denom(amount) for amount in amounts]
+    assert sum_amts_base_denom(amounts + [{"amount": "5", "denom": "uusd.trading"}]) == {
+        "uusd": 10_000_005,
+        "nhash": 3_000_000_000,
+        "neth": 250,
+        "btc.jaja": 1234,
+    }
+
+
+def test_exchange_assets_extend_the_index(restore_index):
+    assets = [
+        {"asset_name": "HASH", "asset_exponent": 9, "asset_denom": "nhash"},
+        {"asset_name": "FIGR", "asset_exponent": 6, "asset_denom": "ufigr.figure.se"},
+    ]
+    assert update_denom_index(assets) == ["ufigr.figure.se", "figr"]
+    assert amt_base_denom({"amount": "2.5", "denom": "figr"}) == {"amount": 2_500_000, "denom": "ufigr.figure.se"}
+    assert denom.denom_index["hash"].conv == 1_000_000_000  # known denoms keep their entries
+
+
+def test_refresh_reads_the_listed_assets(upstream_standin, restore_index):
+    async def refresh_twice():
+        try:
+            return await denom.refresh_denom_index(), await denom.refresh_denom_index()
+        finally:
+            await close_http_clients()
+
+    first, second = asyncio.run(refresh_twice())
+    assert (first, second) == (["uusdc.figure.se"], [])  # refreshed once
+    assert amt_base_denom({"amount": 7, "denom": "uusdc.figure.se"}) == {"amount": 7, "denom": "uusdc"}
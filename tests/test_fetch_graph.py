@@ -0,0 +1,134 @@
+import asyncio
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from fetch_graph import FetchGraph, fan_out
+
+
+def _delayed(value, delay=0.0):
+    async def fetch(**_):
+        await asyncio.sleep(delay)
+        return value
+    return fetch
+
+
+def test_dependent_node_starts_when_its_dependency_resolves():
+    graph = FetchGraph()
+    graph.add("fast", _delayed({"v": 1}, 0.01))
+    graph.add("slow", _delayed({"v": 2}, 0.2))
+    graph.add("child", lambda fast: _delayed({"parent": fast["v"]})(), depends_on=["fast"])
+
+    result = asyncio.run(graph.run())
+    assert result["child"] == {"parent": 1}
+    # child did not wait for the unrelated slow node
+    assert result.timings_ms["child"]["end_ms"] < result.timings_ms["slow"]["end_ms"]
+
+
+def test_timeout_yields_partial_results():
+    graph = FetchGraph(default_timeout=0.05)
+    graph.add("ok", _delayed({"v": 1}))
+    graph.add("hangs", _delayed({"v": 2}, 1.0))
+
+    result = asyncio.run(graph.run())
+    assert result["ok"] == {"v": 1}
+    assert result["hangs"] == {"MCP-ERROR": "Timed out after 0.05s"}
+    assert result.partial
+    assert list(result.errors) == ["hangs"]
+
+
+def test_failed_dependency_propagates_without_running_child():
+    calls = []
+
+    async def child(parent):
+        calls.append(parent)
+        return {}
+
+    async def boom():
+        raise RuntimeError("explorer down")
+
+    graph = FetchGraph()
+    graph.add("parent", boom)
+    graph.add("child", child, depends_on=["parent"])
+
+    result = asyncio.run(graph.run())
+    assert result["parent"] == {"MCP-ERROR": "explorer down"}
+    assert result["child"] == {"MCP-ERROR": "Dependency failed: parent"}
+    assert calls == []
+    assert result.skipped == ["child"]
+
+
+def test_when_predicate_skips_node_with_default():
+    graph = FetchGraph()
+    graph.add("is_vesting", _delayed({"wallet_is_vesting": False}))
+    graph.add(
+        "vesting_data",
+        _delayed({"vesting_total_unvested_amount": 5}),
+        depends_on=["is_vesting"],
+        when=lambda is_vesting: is_vesting["wallet_is_vesting"] is True,
+        default={},
+    )
+
+    result = asyncio.run(graph.run())
+    assert result["vesting_data"] == {}
+    assert not result.partial
+
+
+def test_cycles_and_unknown_dependencies_are_rejected():
+    graph = FetchGraph()
+    graph.add("a", _delayed(1), depends_on=["b"])
+    graph.add("b", _delayed(2), depends_on=["a"])
+    with pytest.raises(ValueError, match="cycle"):
+        asyncio.run(graph.run())
+
+    graph = FetchGraph()
+    graph.add("a", _delayed(1), depends_on=["missing"])
+    with pytest.raises(ValueError, match="Unknown dependency"):
+        asyncio.run(graph.run())
+
+
+def test_fan_out_bounds_concurrency_and_yields_in_completion_order():
+    in_flight = peak = 0
+
+    async def fetch(delay):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(delay)
+        in_flight -= 1
+        if delay == 0.03:
+            raise RuntimeError("boom")
+        return {"delay": delay}
+
+    async def collect():
+        return [pair async for pair in fan_out([0.1, 0.01, 0.03, 0.02, 0.5], fetch, max_concurrency=2, timeout=0.2)]
+
+    results = asyncio.run(collect())
+    assert peak == 2
+    assert [index for index, _ in results] == [1, 2, 3, 0, 4]
+    assert dict(results)[2] == {"MCP-ERROR": "boom"}
+    assert dict(results)[4] == {"MCP-ERROR": "Timed out after 0.2s"}
+
+
+def test_closing_fan_out_early_cancels_pending_fetches():
+    cancelled = []
+
+    async def fetch(item):
+        try:
+            await asyncio.sleep(0.01 if item == 0 else 1.0)
+        except asyncio.CancelledError:
+            cancelled.append(item)
+            raise
+        return item
+
+    async def first():
+        stream = fan_out(range(4), fetch, max_concurrency=4)
+        index, _ = await stream.__anext__()
+        await stream.aclose()
+        return index
+
+    assert asyncio.run(first()) == 0
+    assert sorted(cancelled) == [1, 2, 3]
@@ -0,0 +1,47 @@
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from upstream import HTTPClientPool, close_http_clients, get_http_pool
+from utils import async_http_get_json
+
+
+def test_sequential_calls_reuse_one_connection(json_stub):
+    async def run():
+        results = [await async_http_get_json(f"{json_stub.url}/api/{i}") for i in range(5)]
+        await close_http_clients()
+        return results
+
+    results = asyncio.run(run())
+    assert results[3] == {"path": "/api/3"}
+    assert json_stub.connections == 1
+
+
+def test_clients_are_per_host_and_per_loop():
+    pool = HTTPClientPool()
+
+    async def clients():
+        a = pool.get_client("https://service-explorer.provenance.io/api/v2/accounts/x")
+        b = pool.get_client("https://service-explorer.provenance.io/api/v3/utility_token/stats")
+        c = pool.get_client("https://www.figuremarkets.com/service-hft-exchange/api/v1/markets")
+        return a, b, c
+
+    a, b, c = asyncio.run(clients())
+    assert a is b
+    assert a is not c
+
+    # A new event loop gets new clients; clients of the closed loop are pruned
+    a2, _, _ = asyncio.run(clients())
+    assert a2 is not a
+    assert pool.stats()["clients_open"] == 0
+
+
+def test_host_key_normalizes_default_ports():
+    assert HTTPClientPool.host_key("https://api.provenance.io/x") == "https://api.provenance.io:443"
+    assert HTTPClientPool.host_key("http://127.0.0.1:8080/y") == "http://127.0.0.1:8080"
+
+
+def test_global_pool_is_shared():
+    assert get_http_pool() is get_http_pool()
@@ -0,0 +1,90 @@
+import asyncio
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from loop_runner import LoopRunner
+from upstream import close_http_clients, get_http_pool
+from utils import async_http_get_json
+
+
+def test_runs_reuse_one_loop():
+    runner = LoopRunner()
+
+    async def current_loop():
+        return asyncio.get_running_loop()
+
+    try:
+        assert runner.run(current_loop()) is runner.run(current_loop())
+        assert runner.stats()["runs"] == 2
+    finally:
+        runner.close()
+    assert not runner.stats()["running"]
+
+
+def test_exceptions_propagate_and_runner_keeps_working():
+    runner = LoopRunner()
+
+    async def boom():
+        raise ValueError("bad input")
+
+    async def ok():
+        return 42
+
+    try:
+        with pytest.raises(ValueError, match="bad input"):
+            runner.run(boom())
+        assert runner.run(ok()) == 42
+    finally:
+        runner.close()
+
+
+def test_can_be_called_from_inside_a_running_loop():
+    runner = LoopRunner()
+
+    async def ok():
+        return "done"
+
+    async def caller():
+        # A sync tool wrapper invoked from within another event loop
+        return runner.run(ok())
+
+    try:
+        assert asyncio.run(caller()) == "done"
+    finally:
+        runner.close()
+
+
+def test_timeout_cancels_the_coroutine():
+    runner = LoopRunner()
+    cancelled = []
+
+    async def hangs():
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    try:
+        with pytest.raises(TimeoutError):
+            runner.run(hangs(), timeout=0.05)
+        runner.run(asyncio.sleep(0.01))
+        assert cancelled == [True]
+    finally:
+        runner.close()
+
+
+def test_pooled_connections_survive_across_runs(json_stub):
+    runner = LoopRunner()
+    try:
+        for i in range(3):
+            assert runner.run(async_http_get_json(f"{json_stub.url}/api/{i}")) == {"path": f"/api/{i}"}
+        assert json_stub.connections == 1
+        runner.run(close_http_clients())
+    finally:
+        runner.close()
+    assert get_http_pool().stats()["clients_open"] == 0
@@ -0,0 +1,61 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from functions import aggregate_functions
+from functions.aggregate_functions import fetch_market_prices, normalize_token_pairs
+from trade_store import TradeStore, set_trade_store
+
+
+@pytest.fixture
+def store(upstream_standin):
+    store = TradeStore(directory="off")
+    previous = set_trade_store(store)
+    yield store
+    set_trade_store(previous)
+
+
+def test_defaults_to_every_listed_pair(store, run):
+    result = run(lambda: fetch_market_prices())
+
+    assert list(result["prices"]) == ["HASH-USD", "BTC-USD", "ETH-USD", "SOL-USD", "XRP-USD", "USDC-USD"]
+    assert (result["pair_count"], result["errors"]) == (6, {})
+    assert result["prices"]["HASH-USD"] == {
+        "last_price": "0.0280548",
+        "last_trade_time": "2026-10-16T11:57:36Z",
+        "price_change_24h": "0.000313",
+        "percentage_change_24h": "1.1139",
+        "volume_24h": "134803.67",
+        "high_24h": "0.028943",
+        "low_24h": "0.027257",
+        "trade_count_24h": 331,
+    }
+    assert sorted(store.stats()["pairs"]) == sorted(result["prices"])
+
+
+def test_selected_pairs_in_input_order(store, run):
+    result = run(lambda: fetch_market_prices("eth-usd, HASH-USD,ETH-USD,DOGE-USD"))
+    assert list(result["prices"]) == ["ETH-USD", "HASH-USD"]
+    assert result["errors"] == {"DOGE-USD": "Not listed on Figure Markets"}
+
+    assert run(lambda: fetch_market_prices(["HASH"])) == {"MCP-ERROR": "Invalid token pair(s): HASH"}
+    with pytest.raises(ValueError):
+        normalize_token_pairs(" , ")
+
+
+def test_stale_sources_mark_their_pairs(store, monkeypatch, run):
+    fetch = aggregate_functions.fetch_last_crypto_token_price
+
+    async def stale_for_btc(pair, n):
+        result = await fetch(pair, n)
+        if pair == "BTC-USD":
+            result["MCP-STALE"] = {"stale_responses": 1, "max_age_seconds": 90.0}
+        return result
+
+    monkeypatch.setattr(aggregate_functions, "fetch_last_crypto_token_price", stale_for_btc)
+    result = run(lambda: fetch_market_prices(["BTC-USD", "ETH-USD"]))
+    assert result["prices"]["BTC-USD"]["stale_age_seconds"] == 90.0
+    assert "stale_age_seconds" not in result["prices"]["ETH-USD"]
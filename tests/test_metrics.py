@@ -0,0 +1,123 @@
+import asyncio
+import json
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from metrics import LatencyHistogram, MetricsRegistry, _bucket_index, _bucket_range, get_metrics
+from registry import api_function
+from upstream import close_http_clients
+from utils import async_http_get_json
+
+
+def test_buckets_cover_values_with_bounded_relative_error():
+    for value in [0, 1, 127, 128, 129, 255, 256, 1000, 65_432, 10**7, 3_600 * 10**6]:
+        low, high = _bucket_range(_bucket_index(value))
+        assert low <= value <= high
+        assert high - low <= max(value, 1) * 0.016
+        assert abs((low + high) // 2 - value) <= value * 0.01  # reported as the midpoint
+
+
+def test_percentiles_track_exact_values_closely():
+    rng = random.Random(7)
+    samples = sorted(rng.lognormvariate(-4, 1) for _ in range(10_000))
+    histogram = LatencyHistogram()
+    for seconds in samples:
+        histogram.record(seconds)
+
+    for percentile in (50, 95, 99):
+        exact = samples[int(len(samples) * percentile / 100) - 1] * 1e6
+        assert histogram.percentile(percentile) == pytest.approx(exact, rel=0.01)
+
+    summary = histogram.summary()
+    assert summary["count"] == 10_000
+    assert summary["min_ms"] <= summary["p50_ms"] <= summary["p95_ms"] <= summary["p99_ms"] <= summary["max_ms"]
+
+
+def test_merge_equals_recording_into_one_histogram():
+    a, b, both = LatencyHistogram(), LatencyHistogram(), LatencyHistogram()
+    for i in range(1, 200):
+        (a if i % 2 else b).record(i / 1000)
+        both.record(i / 1000)
+    a.merge(b)
+    assert a.summary() == both.summary()
+
+
+def test_decorator_records_tool_latency_and_errors():
+    metrics = get_metrics()
+    metrics.reset()
+
+    @api_function(protocols=[], name="metrics_test_async_tool")
+    async def async_tool(fail: bool = False):
+        await asyncio.sleep(0.002)
+        return {"MCP-ERROR": "failed"} if fail else {"ok": True}
+
+    @api_function(protocols=[], name="metrics_test_sync_tool")
+    def sync_tool():
+        raise ValueError("boom")
+
+    asyncio.run(async_tool())
+    asyncio.run(async_tool(fail=True))
+    with pytest.raises(ValueError):
+        sync_tool()
+
+    tools = metrics.snapshot()["tools"]
+    assert tools["metrics_test_async_tool"]["count"] == 2
+    assert tools["metrics_test_async_tool"]["errors"] == 1
+    assert tools["metrics_test_async_tool"]["p50_ms"] >= 2
+    assert tools["metrics_test_sync_tool"]["errors"] == 1
+
+
+def test_upstream_requests_record_host_status_and_bytes(json_stub):
+    metrics = get_metrics()
+    metrics.reset()
+
+    async def run():
+        await async_http_get_json(f"{json_stub.url}/ok")
+        json_stub.status = 503
+        await async_http_get_json(f"{json_stub.url}/down")
+        await close_http_clients()
+
+    asyncio.run(run())
+    host = json_stub.url.split("//")[1]
+    upstream = metrics.snapshot()["upstreams"][host]
+    assert upstream["count"] == 2
+    assert upstream["statuses"] == {"200": 1, "503": 1}
+    assert upstream["bytes_total"] == len(json.dumps({"path": "/ok"})) + len(json.dumps({"path": "/down"}))
+
+
+def test_emf_documents_cover_the_interval_since_the_last_flush():
+    metrics = MetricsRegistry()
+    for ms in (5, 5, 80):
+        metrics.record_tool("fetch_x", ms / 1000)
+    metrics.record_upstream("api.example", 0.05, 500, 1024)
+
+    documents = metrics.emf_documents(namespace="test")
+    tool, host = documents
+    assert tool["Tool"] == "fetch_x"
+    assert tool["_aws"]["CloudWatchMetrics"][0]["Dimensions"] == [["Tool"]]
+    assert tool["Latency"]["Count"] == 3
+    assert sum(tool["Latency"]["Counts"]) == 3
+    assert len(tool["Latency"]["Values"]) == 2
+    assert host["Host"] == "api.example"
+    assert host["Bytes"] == 1024 and host["Failures"] == 1
+
+    assert metrics.emf_documents() == []
+    assert metrics.snapshot()["tools"]["fetch_x"]["count"] == 3
+
+
+def test_emf_flush_is_opt_in_and_interval_bound(monkeypatch, capsys):
+    metrics = MetricsRegistry()
+    metrics.record_tool("fetch_x", 0.01)
+
+    monkeypatch.delenv("METRICS_EMF", raising=False)
+    assert metrics.maybe_flush_emf(interval=0) == 0
+
+    monkeypatch.setenv("METRICS_EMF", "true")
+    assert metrics.maybe_flush_emf(interval=3600) == 0
+    assert metrics.maybe_flush_emf(interval=0) == 1
+    assert json.loads(capsys.readouterr().out)["Tool"] == "fetch_x"
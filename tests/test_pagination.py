@@ -0,0 +1,106 @@
+import functools
+import os
+import sys
+import threading
+import time
+from contextlib import aclosing
+from urllib.parse import parse_qs, urlsplit
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from functions import blockchain_functions
+from functions.blockchain_functions import fetch_wallet_balances, fetch_wallet_liquid_balance
+from pagination import fetch_all_pages, iter_pages
+
+MANY_DENOMS_WALLET = "pb1standinmanydenoms0wallet0000000000000000"
+
+
+def paged_responder(pages, failing_page=None):
+    """Responder serving `pages` pages of two items each, tracking requests in flight"""
+    state = {"in_flight": 0, "peak": 0}
+    lock = threading.Lock()
+
+    def respond(path):
+        page = int(parse_qs(urlsplit(path).query)["page"][0])
+        with lock:
+            state["in_flight"] += 1
+            state["peak"] = max(state["peak"], state["in_flight"])
+        time.sleep(0.05)
+        with lock:
+            state["in_flight"] -= 1
+        if page == failing_page:
+            return {"error": "boom"}
+        return {"pages": pages, "total": pages * 2, "results": [f"p{page}a", f"p{page}b"]}
+
+    return respond, state
+
+
+def test_pages_after_the_first_are_fetched_concurrently(json_stub, run):
+    json_stub.responder, state = paged_responder(5)
+    url = f"{json_stub.url}/list"
+
+    start = time.perf_counter()
+    result = run(lambda: fetch_all_pages(url, {"filter": "x"}, page_size=2, max_concurrency=4))
+    elapsed = time.perf_counter() - start
+
+    assert result["results"] == [f"p{page}{item}" for page in range(1, 6) for item in "ab"]
+    assert (result["total"], result["pages"], result["truncated"]) == (10, 5, False)
+    assert state["peak"] == 4
+    assert elapsed < 0.25  # page 1, then pages 2-5 in one wave
+    assert all("filter=x" in path and "count=2" in path for path in json_stub.requests)
+
+
+def test_stopping_early_skips_the_remaining_pages(json_stub, run):
+    json_stub.responder, _ = paged_responder(20)
+
+    async def first_two_pages():
+        seen = []
+        async with aclosing(iter_pages(f"{json_stub.url}/list", max_concurrency=2)) as pages:
+            async for page_number, _ in pages:
+                seen.append(page_number)
+                if len(seen) == 2:
+                    break
+        return seen
+
+    seen = run(first_two_pages)
+    assert seen[0] == 1
+    assert len(json_stub.requests) <= 4
+
+
+def test_max_pages_and_page_errors(json_stub, run):
+    json_stub.responder, _ = paged_responder(5)
+    result = run(lambda: fetch_all_pages(f"{json_stub.url}/list", max_pages=2))
+    assert len(result["results"]) == 4 and result["truncated"] is True
+
+    json_stub.status = 500
+    result = run(lambda: fetch_all_pages(f"{json_stub.url}/broken"))
+    assert result == {"MCP-ERROR": "HTTP error: 500"}
+
+
+def test_liquid_balance_finds_hash_on_a_later_page(upstream_standin, run):
+    result = run(lambda: fetch_wallet_liquid_balance(MANY_DENOMS_WALLET))
+    assert result == {"wallet_liquid_balance": {"amount": 42000000000000, "denom": "nhash"}}
+
+    result = run(lambda: fetch_wallet_liquid_balance("pb1standinbalances0wallet000000000000000000"))
+    assert result == {"wallet_liquid_balance": {"amount": 125000000000000, "denom": "nhash"}}
+
+
+def test_wallet_balances_are_normalized_to_base_denoms(upstream_standin, run):
+    result = run(lambda: fetch_wallet_balances(MANY_DENOMS_WALLET))
+    assert result["wallet_balances"] == [
+        {"amount": 5000000, "denom": "nbtc"},
+        {"amount": 1500000000, "denom": "neth"},  # neth.figure.se + neth
+        {"amount": 42000000000000, "denom": "nhash"},
+        {"amount": 7, "denom": "pm.sale.pool.3fnqpz"},  # unknown denoms pass through
+        {"amount": 2500000000, "denom": "uusd"},
+        {"amount": 1000000, "denom": "uusdc"},
+        {"amount": 3000000, "denom": "uylds"},
+    ]
+    assert result["denom_count"] == 7 and result["truncated"] is False
+
+
+def test_wallet_balances_past_max_pages_are_flagged(upstream_standin, monkeypatch, run):
+    monkeypatch.setattr(blockchain_functions, "fetch_all_pages", functools.partial(fetch_all_pages, max_pages=2))
+    result = run(lambda: fetch_wallet_balances(MANY_DENOMS_WALLET))
+    assert result["truncated"] is True
+    assert "nhash" not in [balance["denom"] for balance in result["wallet_balances"]]  # on page 3
@@ -0,0 +1,95 @@
+import asyncio
+import os
+import sys
+from datetime import UTC, datetime, timedelta
+from decimal import Decimal
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+import valuation
+from functions.aggregate_functions import fetch_portfolio_valuation, fetch_portfolio_valuations_batch
+from valuation import PriceSnapshot, set_price_snapshot, value_holdings
+
+MANY_DENOMS_WALLET = "pb1standinmanydenoms0wallet0000000000000000"
+ROLLUP_WALLET = "pb1standinrollup0wallet00000000000000000000"
+
+
+@pytest.fixture
+def fresh_snapshot():
+    previous = set_price_snapshot(None)
+    yield
+    set_price_snapshot(previous)
+
+
+def test_holdings_are_valued_per_whole_unit():
+    snapshot = PriceSnapshot({"nhash": Decimal("0.0281"), "nbtc": Decimal("67250")}, "2026-10-16T12:00:00+00:00", 0.0)
+    result = value_holdings({
+        "nhash": {"liquid": 1_000_000_000, "delegated": 2_500_000_000},
+        "nbtc": {"liquid": 1_000_000},
+        "uusd": {"liquid": 12_345_678},
+        "nfoo": {"liquid": 5},
+    }, snapshot)
+
+    assert [(a["denom"], a["amount"], a["value_usd"]) for a in result["assets"]] == [
+        ("nbtc", 1_000_000, "67.25"),
+        ("uusd", 12_345_678, "12.35"),
+        ("nhash", 3_500_000_000, "0.10"),
+        ("nfoo", 5, None),
+    ]
+    assert result["assets"][2]["delegated"] == 2_500_000_000
+    assert (result["total_value_usd"], result["unpriced"]) == ("79.69", ["nfoo"])
+    assert result["price_time"] == "2026-10-16T12:00:00+00:00" and not result["prices_stale"]
+
+
+def test_wallet_valuation_joins_balances_delegations_and_prices(upstream_standin, fresh_snapshot, run):
+    result = run(lambda: fetch_portfolio_valuation(MANY_DENOMS_WALLET))
+
+    assets = {asset["denom"]: asset for asset in result["assets"]}
+    assert assets["nhash"]["liquid"] == 42_000_000_000_000 and assets["nhash"]["delegated"] > 0
+    assert assets["nhash"]["price_usd"] == "0.0281" and assets["uusd"]["value_usd"] == "2500.00"
+    assert assets["uusdc"]["symbol"] == "USDC"  # uusdc.figure.se priced via the refreshed index
+    assert result["unpriced"] == ["pm.sale.pool.3fnqpz", "uylds"]
+    priced = [Decimal(asset["value_usd"]) for asset in result["assets"] if asset["value_usd"]]
+    assert abs(sum(priced) - Decimal(result["total_value_usd"])) <= Decimal("0.01") * len(priced)
+    assert result["errors"] == {} and not result["prices_stale"]
+
+
+def test_stale_market_data_dates_the_prices(fresh_snapshot, monkeypatch):
+    async def stale_fetch():
+        return {
+            "data": [{"denom": "nhash", "quoteDenom": "uusd.trading", "lastTradedPrice": "0.03"}],
+            "MCP-STALE": {"stale_responses": 1, "max_age_seconds": 3600.0},
+        }
+
+    monkeypatch.setattr(valuation, "fetch_current_fm_data", stale_fetch)
+    monkeypatch.setattr(valuation.denom, "refresh_denom_index", lambda: asyncio.sleep(0))
+    snapshot = asyncio.run(valuation.get_price_snapshot())
+
+    assert snapshot.stale and snapshot.price("nhash") == Decimal("0.03")
+    age = datetime.now(UTC) - datetime.fromisoformat(snapshot.as_of)
+    assert timedelta(minutes=59) < age < timedelta(minutes=61)
+    assert value_holdings({"nhash": {"liquid": 10**9}}, snapshot)["prices_stale"]
+
+
+def test_batch_values_every_wallet_at_one_snapshot(upstream_standin, fresh_snapshot, monkeypatch, run):
+    market_fetches = []
+    fetch = valuation.fetch_current_fm_data
+
+    async def counting_fetch():
+        market_fetches.append(1)
+        return await fetch()
+
+    monkeypatch.setattr(valuation, "fetch_current_fm_data", counting_fetch)
+    result = run(lambda: fetch_portfolio_valuations_batch([MANY_DENOMS_WALLET, ROLLUP_WALLET, MANY_DENOMS_WALLET]))
+
+    assert result["wallet_count"] == 2 and result["errors"] == {}
+    assert {wallet["price_time"] for wallet in result["wallets"]} == {result["price_time"]}
+    assert result["prices_stale"] is False
+    assert Decimal(result["total_value_usd"]) == sum(Decimal(w["total_value_usd"]) for w in result["wallets"])
+    assert len(market_fetches) == 1
+
+    run(lambda: fetch_portfolio_valuation(ROLLUP_WALLET))
+    assert len(market_fetches) == 1  # the snapshot is shared across calls too
+    assert run(lambda: fetch_portfolio_valuations_batch(["nope"]))["MCP-ERROR"].startswith("Invalid Bech32")
@@ -0,0 +1,88 @@
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from registry import FunctionRegistry
+from registry.artifacts import ArtifactCache, surface_fingerprint
+
+
+def _cache(tmp_path, registry, tools):
+    calls = []
+
+    def generate():
+        calls.append(1)
+        return {
+            "tools_list": json.dumps({"tools": tools}),
+            "openapi": json.dumps({"paths": sorted(m.rest_path for m in registry.get_rest_functions())}),
+            "docs_html": "<html></html>",
+        }
+
+    cache = ArtifactCache(
+        registry,
+        fingerprint=lambda: surface_fingerprint(registry, tools, "1.0"),
+        generate=generate,
+        path=tmp_path / "protocol_artifacts.json",
+    )
+    return cache, calls
+
+
+def _registry():
+    registry = FunctionRegistry()
+
+    def fetch_stats() -> dict:
+        """Fetch stats"""
+
+    registry.register(fetch_stats, ["mcp", "rest"], rest_path="/api/fetch_stats")
+    return registry
+
+
+def test_serves_cached_artifacts_until_registry_changes(tmp_path):
+    registry = _registry()
+    cache, calls = _cache(tmp_path, registry, [{"name": "fetch_stats"}])
+
+    first = cache.get()
+    assert cache.get() is first
+    assert len(calls) == 1
+
+    def fetch_more() -> dict:
+        """Fetch more"""
+
+    registry.register(fetch_more, ["rest"], rest_path="/api/fetch_more")
+    assert json.loads(cache.get().openapi) == {"paths": ["/api/fetch_more", "/api/fetch_stats"]}
+    assert cache.stats()["regenerations"] == 2
+
+
+def test_registration_that_keeps_the_surface_does_not_regenerate(tmp_path):
+    registry = _registry()
+    cache, calls = _cache(tmp_path, registry, [{"name": "fetch_stats"}])
+    first = cache.get()
+
+    # Re-registering the same function (e.g. a lazy stub replaced by the real
+    # function) bumps the registry version but leaves the fingerprint unchanged
+    registry.register(registry.get_function("fetch_stats").func, ["mcp", "rest"], rest_path="/api/fetch_stats")
+    assert cache.get() is first
+    assert len(calls) == 1
+
+
+def test_loads_build_artifact_only_when_fingerprint_matches(tmp_path):
+    registry = _registry()
+    builder, _ = _cache(tmp_path, registry, [{"name": "fetch_stats"}])
+    builder.write()
+
+    cache, calls = _cache(tmp_path, registry, [{"name": "fetch_stats"}])
+    assert cache.get().source == "build"
+    assert calls == []
+
+    stale, calls = _cache(tmp_path, registry, [{"name": "fetch_stats"}, {"name": "new_tool"}])
+    assert stale.get().source == "runtime"
+    assert len(calls) == 1
+
+
+def test_tools_list_response_matches_json_rpc_serialization(tmp_path):
+    tools = [{"name": "fetch_stats", "description": "Fetch \"stats\" – now"}]
+    cache, _ = _cache(tmp_path, _registry(), tools)
+    for request_id in (7, "abc", None):
+        expected = json.dumps({"jsonrpc": "2.0", "id": request_id, "result": {"tools": tools}})
+        assert cache.get().tools_list_response_body(request_id) == expected
@@ -0,0 +1,127 @@
+import asyncio
+import json
+import os
+import sys
+import textwrap
+from typing import Any, Dict, List, Optional
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from registry import FunctionRegistry, get_registry
+from registry.decorator import require_function_meta
+from registry.manifest import (
+    annotation_from_str,
+    annotation_to_str,
+    build_manifest,
+    load_manifest,
+    register_lazy_functions,
+)
+from utils import JSONType
+
+PROBE_MODULE = "lazy_manifest_probe"
+PROBE_SOURCE = '''
+from registry import api_function
+from utils import JSONType
+
+
+@api_function(protocols=["mcp", "rest"], path="/api/lazy_probe/{wallet_address}", cache_ttl=5)
+async def lazy_probe(wallet_address: str, limit: int = 3) -> JSONType:
+    """
+    Probe function for the lazy loading tests.
+
+    Args:
+        wallet_address: Wallet's Bech32 address
+        limit: How many items to return
+    """
+    return {"wallet_address": wallet_address, "limit": limit}
+'''
+
+
+@pytest.fixture
+def probe_manifest(tmp_path, monkeypatch):
+    """Manifest entry for a module that is then unloaded again"""
+    (tmp_path / f"{PROBE_MODULE}.py").write_text(textwrap.dedent(PROBE_SOURCE))
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    registry = get_registry()
+    __import__(PROBE_MODULE)
+    source = FunctionRegistry()
+    source._functions["lazy_probe"] = registry.get_function("lazy_probe")
+    manifest = build_manifest(source)
+
+    def unload():
+        registry._functions.pop("lazy_probe", None)
+        registry._router = None
+        sys.modules.pop(PROBE_MODULE, None)
+
+    unload()
+    yield manifest
+    unload()
+
+
+@pytest.mark.parametrize("annotation", [
+    int, str, bool, Optional[int], Dict[str, Any], dict[str, Any] | None, List[Dict[str, Any]], JSONType,
+])
+def test_annotations_round_trip(annotation):
+    assert annotation_from_str(annotation_to_str(annotation)) == annotation
+
+
+def test_stub_mirrors_function_and_imports_module_on_first_call(probe_manifest):
+    registry = get_registry()
+    assert register_lazy_functions(probe_manifest) == 1
+    assert PROBE_MODULE not in sys.modules
+
+    stub_meta = registry.get_function("lazy_probe")
+    assert stub_meta.lazy
+    assert str(stub_meta.signature) == "(wallet_address: str, limit: int = 3) -> Union[str, int, float, bool, NoneType, dict[str, Any], list[Any]]"
+    assert stub_meta.docstring.startswith("Probe function")
+    assert stub_meta.cache_ttl == 5
+
+    match = registry.get_router().match("GET", "/api/lazy_probe/pb1abc")
+    kwargs = match.meta.binder.bind(match.params, {"limit": "7"})
+    assert asyncio.run(match.meta.func(**kwargs)) == {"wallet_address": "pb1abc", "limit": 7}
+
+    assert PROBE_MODULE in sys.modules
+    assert not registry.get_function("lazy_probe").lazy
+
+
+def test_manifest_is_ignored_when_stale_or_missing(tmp_path, probe_manifest):
+    path = tmp_path / "manifest.json"
+    assert load_manifest(path) is None
+
+    path.write_text(json.dumps(probe_manifest))
+    assert load_manifest(path) == probe_manifest
+
+    path.write_text(json.dumps({**probe_manifest, "source_fingerprint": "outdated"}))
+    assert load_manifest(path) is None
+
+
+@pytest.mark.parametrize("app_module", ["web_app_unified", "lambda_handler_unified"])
+def test_mcp_calls_through_lazy_stubs_bind_their_arguments(probe_manifest, monkeypatch, app_module):
+    monkeypatch.setenv("AWS_DEFAULT_REGION", os.environ.get("AWS_DEFAULT_REGION", "us-east-1"))
+    monkeypatch.syspath_prepend(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+    app = __import__(app_module)
+
+    register_lazy_functions(probe_manifest)
+    stub = get_registry().get_function("lazy_probe").func
+    assert require_function_meta(stub).lazy
+
+    # As the MCP handler calls tools: string arguments coerced, unknown ones dropped
+    tool = app.create_mcp_sync_wrapper(stub)
+    assert tool(wallet_address="pb1abc", limit="7", bogus=1) == {"wallet_address": "pb1abc", "limit": 7}
+    assert PROBE_MODULE in sys.modules
+
+
+def test_lambda_rest_dispatch_sees_routes_registered_after_import(probe_manifest, monkeypatch):
+    monkeypatch.setenv("AWS_DEFAULT_REGION", os.environ.get("AWS_DEFAULT_REGION", "us-east-1"))
+    monkeypatch.syspath_prepend(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+    app = __import__("lambda_handler_unified")
+
+    register_lazy_functions(probe_manifest)
+    response = app.handle_api_function(
+        {"path": "/api/lazy_probe/pb1abc", "httpMethod": "GET", "queryStringParameters": {"limit": "7"}}, None
+    )
+    assert response["statusCode"] == 200
+    assert json.loads(response["body"]) == {"wallet_address": "pb1abc", "limit": 7}
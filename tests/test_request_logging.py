@@ -0,0 +1,152 @@
+import asyncio
+import json
+import logging
+import os
+import sys
+import time
+
+import pytest
+import structlog
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+import request_logging
+from request_logging import (
+    LogSettings,
+    configure_logging,
+    get_logging_state,
+    lazy,
+    redact_headers,
+    request_scope,
+    set_debug_logging,
+    should_log_request,
+)
+
+
+@pytest.fixture
+def log_lines(capsys):
+    """Configure JSON logging and return a reader for the emitted events"""
+    previous = request_logging._settings
+    configure_logging(LogSettings(fmt="json", sample_rates=[("/mcp", 0.0), ("/api/*", 1.0)]))
+
+    def read():
+        return [json.loads(line) for line in capsys.readouterr().out.splitlines() if line.strip()]
+
+    yield read
+    configure_logging(previous)
+
+
+def test_one_summary_line_per_request(log_lines):
+    logger = structlog.get_logger()
+    with request_scope(logger, method="GET", path="/api/health") as req:
+        with req.timer("function"):
+            pass
+        req.set(status=200)
+
+    lines = log_lines()
+    assert len(lines) == 1
+    line = lines[0]
+    assert line["event"] == "request"
+    assert line["path"] == "/api/health"
+    assert line["status"] == 200
+    assert line["duration_ms"] >= line["function_ms"] >= 0
+    assert line["sample_rate"] == 1.0
+
+
+def test_sampling_drops_fast_successes_but_keeps_errors_and_slow_requests(log_lines):
+    logger = structlog.get_logger()
+    with request_scope(logger, path="/mcp") as req:
+        req.set(status=200)
+    with request_scope(logger, path="/mcp") as req:
+        req.set(status=500)
+    assert [line["status"] for line in log_lines()] == [500]
+
+    request_logging._settings.slow_ms = 0
+    assert should_log_request("/mcp", 200, 5.0) == (True, 1.0)
+
+
+def test_exception_in_scope_is_logged_as_500(log_lines):
+    logger = structlog.get_logger()
+    with pytest.raises(RuntimeError):
+        with request_scope(logger, path="/mcp"):
+            raise RuntimeError("boom")
+    assert log_lines()[0]["status"] == 500
+
+
+def test_lazy_values_are_only_computed_when_emitted(log_lines):
+    logger = structlog.get_logger()
+    calls = []
+
+    def expensive():
+        calls.append(1)
+        return "payload"
+
+    logger.debug("dropped", body=lazy(expensive))
+    assert calls == []
+
+    logger.info("kept", body=lazy(expensive))
+    assert calls == [1]
+    assert log_lines()[0]["body"] == "payload"
+
+
+def test_debug_toggle_enables_debug_events_and_disables_sampling(log_lines):
+    logger = structlog.get_logger()
+    state = set_debug_logging(True, duration_seconds=60)
+    assert state["debug"] and state["level"] == "DEBUG"
+    assert 0 < state["debug_seconds_remaining"] <= 60
+
+    structlog.get_logger().debug("visible")
+    with request_scope(logger, path="/mcp") as req:
+        req.set(status=200)
+    assert [line["event"] for line in log_lines()] == ["visible", "request"]
+
+    set_debug_logging(False)
+    assert get_logging_state()["level"] == "INFO"
+    structlog.get_logger().debug("hidden")
+    assert log_lines() == []
+
+
+def test_debug_mode_expires(log_lines):
+    set_debug_logging(True, duration_seconds=60)
+    request_logging._settings.debug_until = time.time() - 1
+
+    with request_scope(structlog.get_logger(), path="/api/x") as req:
+        req.set(status=200)
+    assert request_logging._configured_level == logging.INFO
+    assert not get_logging_state()["debug"]
+
+
+def test_debug_mode_is_bounded(log_lines):
+    from functions import system_functions
+
+    state = set_debug_logging(True, duration_seconds=10**9)
+    assert 0 < state["debug_seconds_remaining"] <= request_logging.MAX_DEBUG_SECONDS
+    with pytest.raises(ValueError):
+        set_debug_logging(True, duration_seconds=0)
+
+    result = asyncio.run(system_functions.set_debug_logging(True, duration_seconds=-5))
+    assert result["MCP-ERROR"].startswith("duration_seconds must be positive")
+    state = asyncio.run(system_functions.set_debug_logging(True, duration_seconds=86400))
+    assert state["debug_seconds_remaining"] <= request_logging.MAX_DEBUG_SECONDS
+    set_debug_logging(False)
+
+
+def test_settings_from_env(monkeypatch):
+    monkeypatch.setenv("LOG_LEVEL", "warning")
+    monkeypatch.setenv("LOG_SAMPLE_RATES", "/mcp=0.1, /api/*=2, bad, *=x")
+    monkeypatch.setenv("LOG_SLOW_MS", "250")
+    monkeypatch.setenv("AWS_LAMBDA_FUNCTION_NAME", "fn")
+    settings = LogSettings.from_env()
+
+    assert settings.level == logging.WARNING
+    assert settings.fmt == "json"
+    assert settings.slow_ms == 250
+    assert settings.sample_rate("/mcp") == 0.1
+    assert settings.sample_rate("/api/fetch") == 1.0
+    assert settings.sample_rate("/docs") == 1.0
+
+
+def test_redact_headers():
+    headers = {"Authorization": "Bearer secret", "User-Agent": "client"}
+    assert redact_headers(headers) == {"Authorization": "***", "User-Agent": "client"}
+    assert redact_headers(None) == {}
@@ -0,0 +1,127 @@
+import asyncio
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from registry import api_function, get_registry
+from upstream import (
+    CacheEntry,
+    LRUCacheTier,
+    ResponseCache,
+    SharedCacheTier,
+    cache_key,
+    cache_ttl_scope,
+    close_http_clients,
+    current_cache_ttl,
+    get_response_cache,
+)
+from utils import async_http_get_json
+
+
+def _entry(body: bytes, ttl: float = 60) -> CacheEntry:
+    now = time.time()
+    return CacheEntry(body=body, stored_at=now, expires_at=now + ttl)
+
+
+def test_cache_key_is_independent_of_param_order():
+    assert cache_key("https://x/y", {"b": 2, "a": 1}) == cache_key("https://x/y", {"a": 1, "b": 2})
+    assert cache_key("https://x/y") == "https://x/y"
+
+
+def test_lru_evicts_least_recently_used_by_count():
+    tier = LRUCacheTier(max_entries=2)
+    tier.set("a", _entry(b"1"))
+    tier.set("b", _entry(b"2"))
+    tier.get("a")
+    tier.set("c", _entry(b"3"))
+    assert tier.get("b") is None
+    assert tier.get("a") is not None
+    assert tier.evictions == 1
+
+
+def test_lru_evicts_by_total_bytes():
+    tier = LRUCacheTier(max_entries=100, max_bytes=10)
+    tier.set("a", _entry(b"x" * 6))
+    tier.set("b", _entry(b"y" * 6))
+    assert len(tier) == 1
+    assert tier.bytes_used == 6
+    # Bodies larger than the whole tier are never stored
+    tier.set("c", _entry(b"z" * 11))
+    assert tier.get("c") is None
+
+
+def test_expired_entries_count_as_misses():
+    cache = ResponseCache(memory=LRUCacheTier())
+    cache.memory.set("k", _entry(b"{}", ttl=-1))
+    assert asyncio.run(cache.get("k")) is None
+    stats = cache.stats()
+    assert stats["expired"] == 1
+    assert stats["misses"] == 1
+    assert cache.get_stale("k") is not None
+
+
+def test_shared_tiers_implement_get_and_set():
+    class ReadOnlyTier(SharedCacheTier):
+        async def get(self, key):
+            return None
+
+    with pytest.raises(TypeError):
+        ReadOnlyTier()
+
+    class DictTier(ReadOnlyTier):
+        def __init__(self):
+            self.entries = {}
+
+        async def get(self, key):
+            return self.entries.get(key)
+
+        async def set(self, key, entry):
+            self.entries[key] = entry
+
+    shared = DictTier()
+    asyncio.run(ResponseCache(shared=shared).set("k", b"{}", ttl=60))
+    cache = ResponseCache(shared=shared)
+    assert asyncio.run(cache.get("k")).body == b"{}"
+    assert cache.stats()["hits_shared"] == 1
+
+
+def test_cached_get_hits_upstream_once_and_returns_fresh_copies(json_stub):
+    get_response_cache().clear()
+    url = f"{json_stub.url}/api/v3/utility_token/stats"
+
+    async def run():
+        first = await async_http_get_json(url, cache_ttl=30)
+        first["mutated"] = True
+        second = await async_http_get_json(url, cache_ttl=30)
+        uncached = await async_http_get_json(url)
+        await close_http_clients()
+        return second, uncached
+
+    second, uncached = asyncio.run(run())
+    assert "mutated" not in second
+    assert uncached == second
+    # One request for the cached pair plus one for the uncached call
+    assert len(json_stub.requests) == 2
+
+
+def test_api_function_scopes_its_cache_ttl():
+    seen = []
+
+    @api_function(protocols=[], cache_ttl=42)
+    async def _cache_ttl_probe() -> dict:
+        seen.append(current_cache_ttl())
+        return {}
+
+    with cache_ttl_scope(7):
+        asyncio.run(_cache_ttl_probe())
+        assert current_cache_ttl() == 7
+    assert seen == [42]
+
+    meta = get_registry().get_function("_cache_ttl_probe")
+    assert meta.cache_ttl == 42
+    # Protocol handlers invoke meta.func, which must be the TTL-scoping wrapper
+    assert meta.func is _cache_ttl_probe
@@ -0,0 +1,82 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from registry import FunctionRegistry, Router
+
+
+def _registry():
+    registry = FunctionRegistry()
+
+    def fetch_account_info(wallet_address: str): ...
+    def fetch_trades(token_pair: str, limit: int): ...
+    def fetch_stats(): ...
+    def fetch_latest(): ...
+    def create_session(): ...
+
+    registry.register(fetch_account_info, ["rest"], rest_path="/api/fetch_account_info/{wallet_address}")
+    registry.register(fetch_trades, ["rest"], rest_path="/api/trades/{token_pair}/{limit}")
+    registry.register(fetch_stats, ["rest"], rest_path="/api/fetch_stats")
+    registry.register(fetch_latest, ["rest"], rest_path="/api/trades/latest/recent")
+    registry.register(create_session, ["rest"], rest_path="/api/fetch_stats", rest_method="post")
+    return registry
+
+
+def test_static_and_parameter_routes():
+    router = _registry().get_router()
+    match = router.match("GET", "/api/fetch_account_info/pb1abc")
+    assert match.meta.name == "fetch_account_info"
+    assert match.params == {"wallet_address": "pb1abc"}
+    assert router.match("GET", "/api/fetch_stats").meta.name == "fetch_stats"
+
+
+def test_parameters_are_typed():
+    match = _registry().get_router().match("GET", "/api/trades/HASH-USD/25")
+    assert match.params == {"token_pair": "HASH-USD", "limit": 25}
+
+
+def test_static_segment_wins_then_backtracks_to_parameter():
+    router = _registry().get_router()
+    assert router.match("GET", "/api/trades/latest/recent").meta.name == "fetch_latest"
+    # 'latest' also fits {token_pair}; the static branch fails so the parameter branch matches
+    assert router.match("GET", "/api/trades/latest/5").params == {"token_pair": "latest", "limit": 5}
+
+
+def test_method_dispatch_and_misses():
+    router = _registry().get_router()
+    assert router.match("post", "/api/fetch_stats").meta.name == "create_session"
+    assert router.match("DELETE", "/api/fetch_stats") is None
+    assert router.match("GET", "/api/fetch_account_info/") is None
+    assert router.match("GET", "/api/fetch_account_info/pb1abc/extra") is None
+    assert router.match("GET", "/api/fetch_stats/") is None
+
+
+def test_bad_parameter_type_raises():
+    with pytest.raises(ValueError):
+        _registry().get_router().match("GET", "/api/trades/HASH-USD/many")
+
+
+def test_router_is_cached_until_registry_changes():
+    registry = _registry()
+    router = registry.get_router()
+    assert registry.get_router() is router
+
+    def fetch_new(): ...
+    registry.register(fetch_new, ["rest"], rest_path="/api/fetch_new")
+    assert registry.get_router() is not router
+    assert registry.get_router().match("GET", "/api/fetch_new").meta.name == "fetch_new"
+
+
+def test_first_registration_wins_for_duplicate_routes():
+    registry = FunctionRegistry()
+
+    def first(): ...
+    def second(): ...
+    registry.register(first, ["rest"], rest_path="/api/same")
+    registry.register(second, ["rest"], rest_path="/api/same")
+    router = Router(registry.get_rest_functions())
+    assert len(router) == 1
+    assert router.match("GET", "/api/same").meta.name == "first"
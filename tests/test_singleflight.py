@@ -0,0 +1,79 @@
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from upstream import SingleFlight, close_http_clients, get_singleflight
+from utils import async_http_get_json
+
+
+def test_concurrent_identical_calls_share_one_execution():
+    flight = SingleFlight()
+    executions = []
+
+    async def fetch():
+        executions.append(1)
+        await asyncio.sleep(0.05)
+        return {"value": 1}
+
+    async def run():
+        return await asyncio.gather(*(flight.do("https://host/a", fetch) for _ in range(5)))
+
+    results = asyncio.run(run())
+    assert len(executions) == 1
+    assert [shared for _, shared in results].count(False) == 1
+    assert flight.stats()["collapsed"] == 4
+    assert flight.stats()["collapsed_by_host"] == {"host": 4}
+    assert flight.stats()["in_flight"] == 0
+
+
+def test_sequential_calls_are_not_collapsed():
+    flight = SingleFlight()
+
+    async def fetch():
+        return 1
+
+    async def run():
+        await flight.do("k", fetch)
+        await flight.do("k", fetch)
+
+    asyncio.run(run())
+    assert flight.stats()["upstream_requests"] == 2
+    assert flight.stats()["collapsed"] == 0
+
+
+def test_cancelled_caller_does_not_cancel_shared_request():
+    flight = SingleFlight()
+
+    async def fetch():
+        await asyncio.sleep(0.05)
+        return "done"
+
+    async def run():
+        first = asyncio.ensure_future(flight.do("k", fetch))
+        await asyncio.sleep(0)
+        second = asyncio.ensure_future(flight.do("k", fetch))
+        await asyncio.sleep(0)
+        first.cancel()
+        return await second
+
+    assert asyncio.run(run()) == ("done", True)
+
+
+def test_async_http_get_json_collapses_identical_gets(json_stub):
+    json_stub.delay = 0.05
+    before = get_singleflight().stats()["collapsed"]
+    url = f"{json_stub.url}/api/v2/accounts/pb1wallet"
+
+    async def run():
+        results = await asyncio.gather(*(async_http_get_json(url) for _ in range(4)))
+        await close_http_clients()
+        return results
+
+    results = asyncio.run(run())
+    assert len(json_stub.requests) == 1
+    assert get_singleflight().stats()["collapsed"] - before == 3
+    # Every caller gets its own copy of the response
+    results[0]["mutated"] = True
+    assert "mutated" not in results[1]
@@ -0,0 +1,146 @@
+import os
+import sys
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from candles import get_candle_engine
+from functions.figure_markets_functions import (
+    fetch_last_crypto_token_price,
+    fetch_price_candles,
+    fetch_trade_history,
+)
+from trade_store import TradeStore, iso_time, set_trade_store
+from upstream import FIGURE_MARKETS, RetryExecutor, override_upstream_urls, set_retry_executor, upstream_url
+from utils import async_http_get_json
+
+START_MS = 1_790_000_000_000
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = TradeStore(directory=tmp_path, sync_interval=0)
+    previous = set_trade_store(store)
+    # No hedging: latency samples left by earlier tests could duplicate a request
+    previous_executor = set_retry_executor(RetryExecutor(endpoint_policies=[]))
+    yield store
+    set_retry_executor(previous_executor)
+    set_trade_store(previous)
+
+
+class Exchange:
+    """Trades endpoint serving the newest `size` trades of a growing trade list"""
+
+    def __init__(self, count):
+        self.trades = []
+        self.sizes = []
+        self.trade(count)
+
+    def trade(self, count):
+        for _ in range(count):
+            n = len(self.trades)
+            self.trades.append({
+                "id": f"T-{n}",
+                "symbol": "TEST-USD",
+                "price": f"{1 + n / 100:.2f}",
+                "quantity": str(n + 1),
+                "created": iso_time(START_MS + n * 1000),
+                "initiatorSide": "BUY" if n % 2 else "SELL",
+            })
+
+    def respond(self, path):
+        size = int(parse_qs(urlsplit(path).query)["size"][0])
+        self.sizes.append(size)
+        return {"matches": self.trades[::-1][:size], "totalCount": len(self.trades)}
+
+
+def test_sync_only_downloads_trades_past_the_high_water_mark(json_stub, store, run):
+    exchange = Exchange(1500)
+    json_stub.responder = exchange.respond
+
+    with override_upstream_urls({FIGURE_MARKETS: json_stub.url}):
+        assert run(lambda: store.sync("TEST-USD")) == {"pair": "TEST-USD", "added": 200, "trades": 200}
+        exchange.trade(3)
+        assert run(lambda: store.sync("TEST-USD"))["added"] == 3
+        exchange.trade(60)  # more than one small window: the window grows until it overlaps
+        assert run(lambda: store.sync("TEST-USD"))["added"] == 60
+        assert run(lambda: store.sync("TEST-USD"))["added"] == 0
+    assert exchange.sizes == [200, 25, 25, 50, 100, 25]
+
+    last = store.last("TEST-USD", 3)
+    assert last["ids"] == ["T-1560", "T-1561", "T-1562"]
+    assert last["prices"] == [16.6, 16.61, 16.62] and last["sides"] == ["SELL", "BUY", "SELL"]
+    window = store.between("TEST-USD", START_MS + 1400_000, START_MS + 1402_000)
+    assert window["ids"] == ["T-1400", "T-1401", "T-1402"] and window["count"] == 3
+
+
+def test_backfill_and_gaps(json_stub, store, run):
+    exchange = Exchange(1500)
+    json_stub.responder = exchange.respond
+
+    with override_upstream_urls({FIGURE_MARKETS: json_stub.url}):
+        run(lambda: store.sync("TEST-USD"))
+        # Asking for more trades than held fetches older ones too
+        assert run(lambda: store.sync("TEST-USD", min_trades=500))["added"] == 300
+        assert store.last("TEST-USD", 500)["ids"][0] == "T-1000"
+        # Further behind than the largest window: the history restarts after the gap
+        exchange.trade(1200)
+        assert run(lambda: store.sync("TEST-USD"))["trades"] == 1000
+    assert store.last("TEST-USD", 1000)["ids"][0] == "T-1700"
+    assert store.stats()["rebuilds"] == 1
+
+
+def test_snapshots_restore_the_history_in_a_new_store(json_stub, store, tmp_path, run):
+    exchange = Exchange(40)
+    json_stub.responder = exchange.respond
+    with override_upstream_urls({FIGURE_MARKETS: json_stub.url}):
+        run(lambda: store.sync("TEST-USD"))
+    assert store.save() == 1
+
+    restored = TradeStore(directory=tmp_path)
+    assert restored.last("TEST-USD", 40) == store.last("TEST-USD", 40)
+    assert restored.response("TEST-USD", 40) == {"matches": exchange.trades[::-1], "totalCount": 40}
+    assert restored.pair("TEST-USD").exhausted and restored.stats()["snapshots_loaded"] == 1
+
+    # Served from the snapshot while the exchange is down
+    set_trade_store(restored)
+    json_stub.status = 503
+    with override_upstream_urls({FIGURE_MARKETS: json_stub.url}):
+        result = run(lambda: fetch_trade_history("TEST-USD", 5))
+    assert result["ids"] == [f"T-{n}" for n in range(35, 40)]
+
+
+def test_last_trade_prices_keep_the_upstream_format(upstream_standin, store, run):
+    url = upstream_url(FIGURE_MARKETS, "/service-hft-exchange/api/v1/trades/HASH-USD")
+    upstream = run(lambda: async_http_get_json(url, params={"size": 10}))
+
+    result = run(lambda: fetch_last_crypto_token_price("HASH-USD", 10))
+    assert result == {**upstream, "matches": upstream["matches"][:10]}  # trailing zeros and all
+
+    for n in (0, -1, 1001):
+        assert run(lambda: fetch_last_crypto_token_price("HASH-USD", n)) == {
+            "MCP-ERROR": "last_number_of_trades must be between 1 and 1000"
+        }
+
+    history = run(lambda: fetch_trade_history("HASH-USD", 10))
+    assert history["ids"] == [match["id"] for match in reversed(upstream["matches"][:10])]
+    assert run(lambda: fetch_trade_history("HASH-USD", 10, start_time="not a time"))["MCP-ERROR"].startswith(
+        "Invalid time"
+    )
+
+
+def test_pairs_without_trades_are_not_kept(json_stub, store, tmp_path, run):
+    def respond(path):
+        json_stub.status = 404 if "/NOPE-USD" in path else 200
+        return {"matches": []}
+
+    json_stub.responder = respond
+    with override_upstream_urls({FIGURE_MARKETS: json_stub.url}):
+        assert run(lambda: fetch_last_crypto_token_price("NOPE-USD", 5)) == {"MCP-ERROR": "HTTP error: 404"}
+        assert run(lambda: fetch_trade_history("NEW-USD", 5))["count"] == 0
+        assert run(lambda: fetch_price_candles("NEW-USD", "1h"))["count"] == 0
+    assert store.last("NOPE-USD", 5)["count"] == 0 and store.age("NOPE-USD") is None
+    assert store.stats()["pairs"] == {} and store.save() == 0
+    assert ("NEW-USD", "1h") not in get_candle_engine()._series and list(tmp_path.iterdir()) == []
@@ -0,0 +1,147 @@
+import asyncio
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from metrics import get_metrics
+from registry import api_function
+from registry.decorator import _mark_stale
+from upstream import (
+    BreakerPolicy,
+    CircuitBreaker,
+    CircuitBreakers,
+    RetryExecutor,
+    close_http_clients,
+    get_response_cache,
+    note_stale_response,
+    outcome_of,
+    set_circuit_breakers,
+    set_retry_executor,
+    stale_response_scope,
+)
+from utils import async_http_get_json
+
+
+@pytest.fixture
+def breakers():
+    """Breakers opening after two failures, without retries muddying the counts"""
+    registry = CircuitBreakers({"default": BreakerPolicy(failure_threshold=2, open_for=60)})
+    previous_breakers = set_circuit_breakers(registry)
+    previous_executor = set_retry_executor(RetryExecutor(enabled=False))
+    yield registry
+    set_circuit_breakers(previous_breakers)
+    set_retry_executor(previous_executor)
+
+
+def fetch(url, **kwargs):
+    async def run():
+        try:
+            return await async_http_get_json(url, **kwargs)
+        finally:
+            await close_http_clients()
+
+    return asyncio.run(run())
+
+
+def test_breaker_opens_probes_and_closes(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr("upstream.breaker.time.monotonic", lambda: now[0])
+    breaker = CircuitBreaker("host", "default", BreakerPolicy(failure_threshold=3, open_for=10))
+
+    for status in (503, "timeout", 200, "error", 502):
+        assert breaker.allow()
+        breaker.record(outcome_of(status), status)
+    assert breaker.state == "closed"  # the 200 reset the consecutive count
+    assert breaker.allow()
+    breaker.record(outcome_of("timeout"), "timeout")
+    assert breaker.state == "open" and not breaker.allow()
+    assert breaker.retry_in() == pytest.approx(10)
+
+    now[0] += 10
+    assert breaker.allow() and breaker.state == "half_open"
+    assert not breaker.allow()  # one probe at a time
+    breaker.record(False, 500)
+    assert breaker.state == "open" and breaker.counters["opened"] == 2
+
+    now[0] += 10
+    assert breaker.allow()
+    breaker.record(outcome_of(404), 404)  # the host answered
+    assert breaker.state == "closed" and breaker.consecutive_failures == 0
+    assert breaker.counters["short_circuited"] == 2
+
+
+def test_cancelled_probe_frees_the_half_open_slot(monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr("upstream.breaker.time.monotonic", lambda: now[0])
+    breaker = CircuitBreaker("host", "default", BreakerPolicy(failure_threshold=1, open_for=1))
+    breaker.allow()
+    breaker.record(False, "timeout")
+    now[0] += 1
+    assert breaker.allow()
+    breaker.record(outcome_of("cancelled"))
+    assert breaker.state == "half_open" and breaker.allow()
+
+
+def test_open_breaker_fails_fast_without_reaching_the_host(json_stub, breakers):
+    json_stub.status = 503
+    metrics = get_metrics()
+    metrics.reset()
+
+    errors = [fetch(f"{json_stub.url}/down/{i}")["MCP-ERROR"] for i in range(3)]
+    assert errors[:2] == ["HTTP error: 503"] * 2
+    assert errors[2].startswith("Upstream unavailable: circuit open for 127.0.0.1")
+    assert len(json_stub.requests) == 2
+
+    host = json_stub.url.split("//")[1]
+    stats = breakers.stats()["hosts"][host]
+    assert (stats["state"], stats["failures"], stats["short_circuited"]) == ("open", 2, 1)
+    assert stats["last_failure"] == "503" and stats["retry_in_s"] > 59
+    assert metrics.snapshot()["upstreams"][host]["short_circuited"] == 1
+
+
+def test_failing_upstream_serves_last_known_good_with_its_age(json_stub, breakers):
+    url = f"{json_stub.url}/prices"
+    json_stub.responder = lambda path: {"price": 1.5}
+    assert fetch(url, cache_ttl=0.05) == {"price": 1.5}
+    time.sleep(0.1)
+    json_stub.status = 503
+    served_before = get_response_cache().stats()["stale_served"]
+
+    async def stale_fetch():
+        with stale_response_scope() as ages:
+            result = await async_http_get_json(url, cache_ttl=0.05)
+        await close_http_clients()
+        return result, ages
+
+    result, ages = asyncio.run(stale_fetch())
+    assert result == {"price": 1.5}
+    assert len(ages) == 1 and ages[0] >= 0.1
+    assert get_response_cache().stats()["stale_served"] == served_before + 1
+
+    summary = {"last_price": result["price"]}
+    _mark_stale(summary, ages)
+    assert summary["MCP-STALE"]["stale_responses"] == 1
+
+    # Client errors are the upstream's answer, not an outage
+    json_stub.status = 404
+    assert fetch(url, cache_ttl=0.05) == {"MCP-ERROR": "HTTP error: 404"}
+
+
+def test_stale_inner_calls_mark_the_aggregate():
+    @api_function(protocols=[])
+    async def _stale_inner_probe() -> dict:
+        note_stale_response(120.0)
+        return {"price": 1.5}
+
+    @api_function(protocols=[])
+    async def _stale_outer_probe() -> dict:
+        inner = await asyncio.gather(_stale_inner_probe(), _stale_inner_probe())
+        return {"prices": [result["price"] for result in inner]}
+
+    result = asyncio.run(_stale_outer_probe())
+    assert result["prices"] == [1.5, 1.5]
+    assert result["MCP-STALE"] == {"stale_responses": 2, "max_age_seconds": 120.0}
@@ -0,0 +1,180 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from metrics import get_metrics
+from upstream import (
+    DEFAULT_LIMITS,
+    HostLimit,
+    UpstreamLimiter,
+    UpstreamQueueFull,
+    close_http_clients,
+    set_upstream_limiter,
+)
+from upstream.limits import ConcurrencyGate, TokenBucket
+from utils import async_http_get_json
+
+EXPLORER_URL = "https://service-explorer.provenance.io/api/v3/utility_token/stats"
+
+
+def test_limit_specs_parse_over_a_base(monkeypatch):
+    base = DEFAULT_LIMITS["explorer"]
+    limit = HostLimit.parse("rate=5, concurrency=2, fast_fail=false", base)
+    assert (limit.rate, limit.burst, limit.concurrency, limit.fast_fail) == (5.0, base.burst, 2, False)
+    assert HostLimit.parse("off") is None
+    with pytest.raises(ValueError):
+        HostLimit.parse("speed=3")
+
+    monkeypatch.setenv("UPSTREAM_LIMIT_EXPLORER", "max_wait=0.5")
+    limiter = UpstreamLimiter()
+    assert limiter.limit_for("explorer").max_wait == 0.5
+    assert limiter.limit_for("127.0.0.1:9999") == DEFAULT_LIMITS["default"]
+    assert limiter.upstream_for(EXPLORER_URL) == "explorer"
+    assert limiter.upstream_for("http://127.0.0.1:9999/x") == "127.0.0.1:9999"
+
+
+def test_token_bucket_paces_after_the_burst(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("upstream.limits.time.monotonic", lambda: now[0])
+    bucket = TokenBucket(rate=100.0, burst=2)
+    delays = [bucket.reserve() for _ in range(5)]
+    assert delays[:2] == [0.0, 0.0]
+    assert delays[2:] == pytest.approx([0.01, 0.02, 0.03])
+    assert bucket.reserve(max_delay=0.01) is None  # would wait 0.04s
+    now[0] += 0.05
+    assert bucket.reserve() == pytest.approx(0.0)
+
+
+def test_concurrency_gate_bounds_in_flight_requests_across_loops():
+    gate = ConcurrencyGate(2)
+    in_flight = peak = 0
+    lock = threading.Lock()
+
+    async def request():
+        nonlocal in_flight, peak
+        await gate.acquire(timeout=5)
+        with lock:
+            in_flight += 1
+            peak = max(peak, in_flight)
+        await asyncio.sleep(0.02)
+        with lock:
+            in_flight -= 1
+        gate.release(0.02)
+
+    async def burst():
+        await asyncio.gather(*(request() for _ in range(6)))
+
+    # Two event loops in two threads share the gate
+    threads = [threading.Thread(target=asyncio.run, args=(burst(),)) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert peak == 2
+    assert gate.in_flight == 0 and gate.queued() == 0
+
+
+def test_gate_waiter_that_times_out_does_not_leak_its_slot():
+    gate = ConcurrencyGate(1)
+
+    async def scenario():
+        await gate.acquire(None)
+        with pytest.raises(asyncio.TimeoutError):
+            await gate.acquire(0.01)
+        gate.release()
+        await gate.acquire(0.1)
+        gate.release()
+
+    asyncio.run(scenario())
+    assert gate.in_flight == 0
+
+
+def test_requests_queue_and_record_queue_time(json_stub):
+    metrics = get_metrics()
+    metrics.reset()
+    previous = set_upstream_limiter(UpstreamLimiter({"default": HostLimit(rate=50, burst=1, concurrency=1)}))
+
+    async def run():
+        results = await asyncio.gather(*(async_http_get_json(f"{json_stub.url}/r{i}") for i in range(5)))
+        await close_http_clients()
+        return results
+
+    try:
+        start = time.perf_counter()
+        results = asyncio.run(run())
+        elapsed = time.perf_counter() - start
+    finally:
+        set_upstream_limiter(previous)
+
+    assert all("MCP-ERROR" not in result for result in results)
+    assert elapsed >= 0.07  # 4 requests paced at 50/s after the first
+    host = metrics.snapshot()["upstreams"][json_stub.url.split("//")[1]]
+    assert host["queue"]["count"] == 5
+    assert host["queue"]["max_ms"] >= 60
+    assert host["rejected"] == 0
+
+
+def test_fast_fail_rejects_when_the_wait_would_exceed_the_deadline(json_stub):
+    metrics = get_metrics()
+    metrics.reset()
+    limiter = UpstreamLimiter({"default": HostLimit(rate=1, burst=2, max_wait=0.5)})
+    previous = set_upstream_limiter(limiter)
+
+    async def run():
+        results = await asyncio.gather(*(async_http_get_json(f"{json_stub.url}/f{i}") for i in range(4)))
+        await close_http_clients()
+        return results
+
+    try:
+        start = time.perf_counter()
+        results = asyncio.run(run())
+        elapsed = time.perf_counter() - start
+    finally:
+        set_upstream_limiter(previous)
+
+    errors = [result["MCP-ERROR"] for result in results if "MCP-ERROR" in result]
+    assert len(errors) == 2 and all(error.startswith("Upstream busy:") for error in errors)
+    assert elapsed < 0.4  # rejected at once instead of waiting 1-2s for tokens
+    host = limiter.stats()["upstreams"][json_stub.url.split("//")[1]]
+    assert (host["granted"], host["rejected"]) == (2, 2)
+    assert metrics.snapshot()["upstreams"][json_stub.url.split("//")[1]]["rejected"] == 2
+
+
+def test_limits_can_be_turned_off(json_stub):
+    limiter = UpstreamLimiter({"default": HostLimit(rate=0.001, burst=1, max_wait=0)}, enabled=False)
+
+    async def run():
+        for _ in range(3):
+            await limiter.acquire(json_stub.url)
+
+    asyncio.run(run())
+    with pytest.raises(UpstreamQueueFull):
+        async def limited():
+            limiter.enabled = True
+            for _ in range(2):
+                await limiter.acquire(json_stub.url)
+        asyncio.run(limited())
+
+
+def test_fast_fail_uses_the_observed_hold_time_of_the_concurrency_gate():
+    limiter = UpstreamLimiter({"default": HostLimit(concurrency=1, max_wait=0.05)})
+    url = "http://127.0.0.1:9/x"
+
+    async def scenario():
+        first = await limiter.acquire(url)
+        await asyncio.sleep(0.1)
+        first.release()  # observed hold time ~0.1s
+        held = await limiter.acquire(url)
+        start = time.perf_counter()
+        with pytest.raises(UpstreamQueueFull, match="expected queue wait"):
+            await limiter.acquire(url)
+        assert time.perf_counter() - start < 0.01
+        held.release()
+
+    asyncio.run(scenario())
@@ -0,0 +1,195 @@
+import asyncio
+import os
+import random
+import sys
+import threading
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from metrics import get_metrics
+from upstream import (
+    EXPLORER,
+    UPSTREAM_POLICIES,
+    EndpointPolicy,
+    RetryBudget,
+    RetryExecutor,
+    RetryPolicy,
+    close_http_clients,
+    override_upstream_urls,
+    set_retry_executor,
+)
+from utils import async_http_get_json
+
+
+def fetch_all(urls):
+    async def run():
+        results = await asyncio.gather(*(async_http_get_json(url) for url in urls))
+        await close_http_clients()
+        return results
+
+    return asyncio.run(run())
+
+
+def failing_then_ok(stub, failures, status=503):
+    """Responder failing the first `failures` requests with status"""
+    calls = []
+
+    def respond(path):
+        calls.append(path)
+        stub.status = status if len(calls) <= failures else 200
+        return {"path": path}
+
+    return respond, calls
+
+
+def test_policy_specs_and_endpoint_matching(monkeypatch):
+    policy = RetryPolicy.parse("attempts=5, hedge=true, max_delay=0.5")
+    assert (policy.attempts, policy.hedge, policy.max_delay, policy.base_delay) == (5, True, 0.5, 0.1)
+    assert RetryPolicy.parse("off").attempts == 1
+    with pytest.raises(ValueError):
+        RetryPolicy.parse("tries=3")
+
+    executor = RetryExecutor()
+    endpoint, upstream, policy = executor.policy_for(
+        "https://service-explorer.provenance.io/api/v2/accounts/pb1x/balances"
+    )
+    assert (endpoint, upstream, policy.hedge) == ("explorer:/api/v2/accounts/", "explorer", True)
+    endpoint, _, policy = executor.policy_for("https://service-explorer.provenance.io/api/v3/utility_token/stats")
+    assert endpoint == "explorer" and policy == UPSTREAM_POLICIES[EXPLORER]
+    assert executor.policy_for("http://127.0.0.1:9/x")[2].attempts == 1
+
+    monkeypatch.setenv("UPSTREAM_RETRY_EXPLORER", "attempts=2,hedge=false")
+    _, _, policy = executor.policy_for("https://service-explorer.provenance.io/api/v2/accounts/pb1x")
+    assert (policy.attempts, policy.hedge) == (2, False)
+
+
+def test_backoff_is_full_jitter_capped_at_max_delay():
+    policy = RetryPolicy(base_delay=0.1, max_delay=0.3)
+    rng = random.Random(7)
+    delays = [policy.backoff(retry, rng) for retry in (1, 2, 3, 4) for _ in range(200)]
+    assert all(0 <= delay <= 0.3 for delay in delays)
+    assert max(delays[:200]) <= 0.1 and max(delays[600:]) > 0.2
+
+
+def test_retry_budget_caps_retries_at_a_ratio_of_recent_requests():
+    budget = RetryBudget(ratio=0.5, min_per_second=0, window=10)
+    for _ in range(4):
+        budget.record_request()
+    assert [budget.try_spend() for _ in range(3)] == [True, True, False]
+    assert budget.stats() == {"requests": 4, "retries": 2}
+
+
+def test_transient_failures_are_retried(json_stub):
+    json_stub.responder, calls = failing_then_ok(json_stub, failures=2)
+    executor = RetryExecutor({EXPLORER: RetryPolicy(attempts=3, base_delay=0.01)}, endpoint_policies=[])
+    previous = set_retry_executor(executor)
+    metrics = get_metrics()
+    metrics.reset()
+    try:
+        with override_upstream_urls({EXPLORER: json_stub.url}):
+            [result] = fetch_all([f"{json_stub.url}/api/v3/flaky"])
+    finally:
+        set_retry_executor(previous)
+
+    assert result == {"path": "/api/v3/flaky"}
+    assert len(calls) == 3
+    counters = executor.stats()["endpoints"]["explorer"]
+    assert (counters["retries"], counters["retry_successes"], counters["failures"]) == (2, 1, 0)
+    host = metrics.snapshot()["upstreams"][json_stub.url.split("//")[1]]
+    assert host["retries"] == 2 and host["statuses"] == {"200": 1, "503": 2}
+
+
+def test_client_errors_and_exhausted_budgets_are_not_retried(json_stub):
+    json_stub.responder, calls = failing_then_ok(json_stub, failures=10, status=404)
+    executor = RetryExecutor({EXPLORER: RetryPolicy(attempts=3, base_delay=0.01)}, endpoint_policies=[])
+    previous = set_retry_executor(executor)
+    try:
+        with override_upstream_urls({EXPLORER: json_stub.url}):
+            [result] = fetch_all([f"{json_stub.url}/missing"])
+            assert result == {"MCP-ERROR": "HTTP error: 404"} and len(calls) == 1
+
+            json_stub.responder, calls = failing_then_ok(json_stub, failures=10, status=502)
+            executor._budget(EXPLORER).min_per_second = 0
+            executor._budget(EXPLORER).ratio = 0
+            [result] = fetch_all([f"{json_stub.url}/broken"])
+    finally:
+        set_retry_executor(previous)
+
+    assert result == {"MCP-ERROR": "HTTP error: 502"} and len(calls) == 1
+    counters = executor.stats()["endpoints"]["explorer"]
+    assert (counters["budget_exhausted"], counters["failures"]) == (1, 2)
+
+
+def test_attempts_end_by_the_deadline(json_stub):
+    calls = []
+
+    def respond(path):
+        calls.append(path)
+        time.sleep(1.0)
+        return {"path": path}
+
+    json_stub.responder = respond
+    executor = RetryExecutor({EXPLORER: RetryPolicy(attempts=3, base_delay=0.01, deadline=0.4)}, endpoint_policies=[])
+    previous = set_retry_executor(executor)
+    try:
+        with override_upstream_urls({EXPLORER: json_stub.url}):
+            start = time.perf_counter()
+            [result] = fetch_all([f"{json_stub.url}/slow"])
+            elapsed = time.perf_counter() - start
+    finally:
+        set_retry_executor(previous)
+
+    assert result == {"MCP-ERROR": "Network Error: Request timed out"}
+    assert elapsed < 0.8  # not the 10s request timeout
+    assert len(calls) == 1  # no retry started without time left
+    counters = executor.stats()["endpoints"]["explorer"]
+    assert (counters["retries"], counters["deadline_exceeded"]) == (0, 1)
+
+
+def test_slow_requests_are_hedged_after_the_endpoint_p95(json_stub):
+    slow_paths = set()
+    lock = threading.Lock()
+
+    def respond(path):
+        with lock:
+            first = path.startswith("/slow/") and path not in slow_paths
+            slow_paths.add(path)
+        if first:
+            time.sleep(1.0)
+        return {"path": path}
+
+    json_stub.responder = respond
+    policy = RetryPolicy(hedge=True, hedge_min_samples=5)
+    executor = RetryExecutor(
+        {EXPLORER: RetryPolicy()},
+        endpoint_policies=[EndpointPolicy(EXPLORER, "/", policy)],
+    )
+    previous = set_retry_executor(executor)
+    try:
+        with override_upstream_urls({EXPLORER: json_stub.url}):
+            fetch_all([f"{json_stub.url}/warm/{i}" for i in range(5)])
+            start = time.perf_counter()
+            [result] = fetch_all([f"{json_stub.url}/slow/1"])
+            elapsed = time.perf_counter() - start
+    finally:
+        set_retry_executor(previous)
+
+    assert result == {"path": "/slow/1"}
+    assert elapsed < 0.5  # did not wait for the slow primary
+    counters = executor.stats()["endpoints"]["explorer:/"]
+    assert (counters["hedges"], counters["hedge_wins"]) == (1, 1)
+    assert counters["hedge_after_ms"] is not None
+
+
+def test_retries_can_be_turned_off(json_stub):
+    json_stub.responder, calls = failing_then_ok(json_stub, failures=1)
+    previous = set_retry_executor(RetryExecutor(enabled=False))
+    try:
+        with override_upstream_urls({EXPLORER: json_stub.url}):
+            [result] = fetch_all([f"{json_stub.url}/once"])
+    finally:
+        set_retry_executor(previous)
+    assert result == {"MCP-ERROR": "HTTP error: 503"} and len(calls) == 1
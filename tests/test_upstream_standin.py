@@ -0,0 +1,134 @@
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from standin import Fixture, FixtureStore, LatencyModel, UpstreamStandin
+from upstream import (
+    EXPLORER,
+    FIGURE_MARKETS,
+    close_http_clients,
+    override_upstream_urls,
+    reset_upstream_urls,
+    upstream_base_url,
+    upstream_url,
+)
+from utils import async_http_get_json
+
+VESTING_WALLET = "pb1standinvesting0wallet0000000000000000000"
+
+
+def run(coro):
+    async def main():
+        try:
+            return await coro
+        finally:
+            await close_http_clients()
+    return asyncio.run(main())
+
+
+def test_upstream_urls_resolve_from_overrides_env_and_defaults(monkeypatch):
+    assert upstream_url(EXPLORER, "/api/x") == "https://service-explorer.provenance.io/api/x"
+
+    monkeypatch.setenv("UPSTREAM_BASE_URL", "http://127.0.0.1:9/")
+    monkeypatch.setenv("UPSTREAM_FIGURE_MARKETS_URL", "http://fm.local")
+    reset_upstream_urls()
+    try:
+        assert upstream_base_url(EXPLORER) == "http://127.0.0.1:9/explorer"
+        assert upstream_base_url(FIGURE_MARKETS) == "http://fm.local"
+        with override_upstream_urls({EXPLORER: "http://override"}):
+            assert upstream_url(EXPLORER, "/a") == "http://override/a"
+        assert upstream_base_url(EXPLORER) == "http://127.0.0.1:9/explorer"
+    finally:
+        monkeypatch.delenv("UPSTREAM_BASE_URL")
+        monkeypatch.delenv("UPSTREAM_FIGURE_MARKETS_URL")
+        reset_upstream_urls()
+    assert upstream_base_url(EXPLORER) == "https://service-explorer.provenance.io"
+
+
+def test_latency_models_parse_and_sample():
+    assert LatencyModel.parse("25") == LatencyModel("fixed", 25.0)
+    assert LatencyModel.parse("uniform:40:10") == LatencyModel("uniform", 40.0, 10.0)
+    with pytest.raises(ValueError):
+        LatencyModel.parse("pareto:10")
+
+    rng = random.Random(3)
+    samples = [LatencyModel.parse("lognormal:80:30").sample(rng) * 1000 for _ in range(20_000)]
+    assert statistics.mean(samples) == pytest.approx(80, rel=0.03)
+    assert statistics.stdev(samples) == pytest.approx(30, rel=0.08)
+    assert min(samples) > 0
+
+
+def test_fixture_matching_prefers_exact_paths_and_specific_queries():
+    store = FixtureStore([
+        Fixture("explorer", "/api/v2/accounts/{address}", body="pattern"),
+        Fixture("explorer", "/api/v2/accounts/pb1exact", body="exact"),
+        Fixture("explorer", "/api/v2/accounts/{address}/balances", body="any page"),
+        Fixture("explorer", "/api/v2/accounts/{address}/balances", body="page 2", query={"page": 2}),
+    ])
+    assert store.match("explorer", "/api/v2/accounts/pb1exact", {}).body == "exact"
+    assert store.match("explorer", "/api/v2/accounts/pb1other", {}).body == "pattern"
+    assert store.match("explorer", "/api/v2/accounts/pb1x/balances", {"page": "2"}).body == "page 2"
+    assert store.match("explorer", "/api/v2/accounts/pb1x/balances", {"page": "1"}).body == "any page"
+    assert store.match("explorer", "/api/v2/accounts/a/b/c", {}) is None
+    assert store.match("figure_markets", "/api/v2/accounts/pb1exact", {}) is None
+
+
+def test_functions_run_offline_against_the_standin(upstream_standin):
+    from functions.aggregate_functions import fetch_complete_wallet_summary, fetch_market_overview_summary
+    from functions.stats_functions import fetch_current_hash_statistics
+
+    stats = run(fetch_current_hash_statistics())
+    assert stats["locked"]["amount"] == 4_761_360_000_000_000_000
+
+    summary = run(fetch_complete_wallet_summary(VESTING_WALLET))
+    assert summary["is_vesting"] == {"wallet_is_vesting": True}
+    assert summary["vesting_data"]["vesting_original_amount"] == 500_000_000_000_000
+    assert summary["available_committed"]["available_committed_amount"]["amount"] == 300_000_000_000_000
+
+    overview = run(fetch_market_overview_summary())
+    assert "MCP-ERROR" not in json.dumps(overview)
+    assert overview["key_token_prices"]["BTC_USD"]["matches"][0]["symbol"] == "BTC-USD"
+
+    assert upstream_standin.stats()["misses"] == 0
+    assert set(upstream_standin.stats()["requests_by_upstream"]) == {
+        "explorer", "provenance_api", "figure_markets", "github_raw"
+    }
+
+
+def test_latency_and_failure_injection():
+    with UpstreamStandin(latency={"*": 0, "explorer": "fixed:300"}, seed=1) as standin:
+        start = time.perf_counter()
+        run(async_http_get_json(f"{standin.url}/figure_markets/service-hft-exchange/api/v1/markets"))
+        fast = time.perf_counter() - start
+        start = time.perf_counter()
+        run(async_http_get_json(f"{standin.url}/explorer/api/v3/utility_token/stats"))
+        slow = time.perf_counter() - start
+    assert slow >= 0.3 > fast
+
+    with UpstreamStandin(error_rate=1.0) as standin:
+        result = run(async_http_get_json(f"{standin.url}/explorer/api/v3/utility_token/stats"))
+    assert result == {"MCP-ERROR": "HTTP error: 503"}
+
+
+def test_record_mode_captures_unknown_requests(tmp_path):
+    with UpstreamStandin(seed=1) as origin:
+        with UpstreamStandin(
+            fixtures=FixtureStore(), mode="record", record_from=origin.base_urls()
+        ) as recorder:
+            url = f"{recorder.url}/figure_markets/service-hft-exchange/api/v1/trades/HASH-USD"
+            recorded = run(async_http_get_json(url, params={"size": 2}))
+            assert recorder.stats()["recorded"] == 1
+            recorder.save_recordings(tmp_path)
+
+    replay = FixtureStore.load(tmp_path)
+    fixture = replay.match("figure_markets", "/service-hft-exchange/api/v1/trades/HASH-USD", {"size": "2"})
+    assert fixture.body == recorded
+    assert fixture.query == {"size": "2"}
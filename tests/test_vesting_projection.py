@@ -0,0 +1,76 @@
+import os
+import sys
+from datetime import datetime
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from functions.blockchain_functions import (
+    fetch_vesting_schedule_projection,
+    fetch_vesting_total_unvested_amount,
+    projection_times,
+    vested_amounts,
+)
+
+VESTING_WALLET = "pb1standinvesting0wallet0000000000000000000"
+ORIGINAL = 500000000000000
+
+
+def test_vested_amounts_follow_the_linear_schedule():
+    assert vested_amounts(1000, 100, 200, [0, 100, 150, 199, 200, 300]) == [0, 0, 500, 990, 1000, 1000]
+    assert vested_amounts(1000, 100, 100, [99, 100]) == [0, 1000]
+
+
+def test_monthly_steps_are_calendar_months():
+    day = 86_400_000
+    jan_31 = 1706659200000  # 2024-01-31T00:00:00Z
+    times = projection_times(jan_31, jan_31 + 70 * day, "1mo")
+    assert [t - jan_31 for t in times] == [0, 29 * day, 60 * day, 70 * day]  # Feb 29, Mar 31, end
+    assert len(projection_times(0, 10 * day, "1d")) == 11
+
+
+def test_projections_hold_at_most_max_points_including_the_end():
+    def ms(text):
+        return int(datetime.fromisoformat(text).timestamp() * 1000)
+
+    assert len(projection_times(ms("2000-01-31T00:00:00+00:00"), ms("2083-04-30T00:00:00+00:00"), "1mo")) == 1000
+    assert len(projection_times(ms("2000-01-31T00:00:00+00:00"), ms("2083-03-31T01:00:00+00:00"), "1mo")) == 1000
+    for end in ("2083-04-30T01:00:00+00:00", "2083-05-15T00:00:00+00:00"):  # 1000 steps plus the end
+        with pytest.raises(ValueError):
+            projection_times(ms("2000-01-31T00:00:00+00:00"), ms(end), "1mo")
+
+
+def test_default_projection_covers_the_vesting_period_monthly(upstream_standin, run):
+    result = run(lambda: fetch_vesting_schedule_projection(VESTING_WALLET))
+
+    assert result["points"] == len(result["timestamps"]) == 49  # June 2023 to June 2027
+    assert result["timestamps"][0] == "2023-06-01T00:00:00+00:00"
+    assert result["timestamps"][-1] == "2027-06-01T00:00:00+00:00"
+    assert (result["vested"][0], result["vested"][-1]) == (0, ORIGINAL)
+    assert all(v + u == ORIGINAL for v, u in zip(result["vested"], result["unvested"]))
+    assert sum(result["vested_in_period"]) == ORIGINAL
+    assert result["vested"] == sorted(result["vested"])
+
+
+def test_explicit_timestamps_match_single_point_calls(upstream_standin, run):
+    dates = ["2026-01-15T12:00:00+00:00", "2024-03-01T00:00:00+00:00", "2030-01-01T00:00:00+00:00"]
+    result = run(lambda: fetch_vesting_schedule_projection(VESTING_WALLET, timestamps=",".join(dates)))
+
+    assert result["timestamps"] == sorted(dates)
+    for date, unvested in zip(result["timestamps"], result["unvested"]):
+        single = run(lambda: fetch_vesting_total_unvested_amount(VESTING_WALLET, date))
+        assert single["vesting_total_unvested_amount"] == unvested
+
+
+def test_ranges_and_invalid_requests(upstream_standin, run):
+    result = run(lambda: fetch_vesting_schedule_projection(
+        VESTING_WALLET, start_time="2025-01-01", end_time="2025-03-01", step="2w"
+    ))
+    assert result["points"] == 6  # five two-week steps, then the end
+    assert result["timestamps"][-1] == "2025-03-01T00:00:00+00:00"
+
+    for kwargs in ({"step": "5x"}, {"step": "1h"}, {"timestamps": ["yesterday"]},
+                   {"start_time": "2026-01-01", "end_time": "2025-01-01"}):
+        result = run(lambda: fetch_vesting_schedule_projection(VESTING_WALLET, **kwargs))
+        assert result["MCP-ERROR"].startswith("Invalid projection request")
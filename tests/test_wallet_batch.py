@@ -0,0 +1,76 @@
+import asyncio
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from functions.aggregate_functions import (
+    fetch_complete_wallet_summary,
+    fetch_wallet_summaries_batch,
+    normalize_wallet_addresses,
+    stream_wallet_summaries,
+)
+
+VESTING_WALLET = "pb1standinvesting0wallet0000000000000000000"
+OTHER_WALLETS = [f"pb1standinbatch{i:02d}wallet000000000000000000000" for i in range(5)]
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_addresses_are_deduplicated_and_validated():
+    assert normalize_wallet_addresses(f"{VESTING_WALLET}, {VESTING_WALLET},pb1abcdefgh") == [
+        VESTING_WALLET, "pb1abcdefgh"
+    ]
+    for bad in ([], ["not an address"], ["PB1UPPERCASE0000"], [f"pb1wallet{i:06d}" for i in range(501)]):
+        with pytest.raises(ValueError):
+            normalize_wallet_addresses(bad)
+    assert "MCP-ERROR" in run(fetch_wallet_summaries_batch(["nope"]))
+
+
+def test_batch_matches_single_wallet_summaries_and_rolls_up_totals(upstream_standin):
+    wallets = [VESTING_WALLET, *OTHER_WALLETS]
+    single = run(fetch_complete_wallet_summary(VESTING_WALLET))
+    assert "MCP-ERROR" not in single["summary_totals"]
+
+    batch = run(fetch_wallet_summaries_batch(wallets + [VESTING_WALLET], max_concurrency=3))
+    assert batch["wallet_count"] == len(wallets)
+    assert [summary["wallet_address"] for summary in batch["wallets"]] == wallets
+    assert batch["errors"] == {}
+    for name in ("account_liquid_hash", "delegation_total_hash", "trading_liquid_hash"):
+        # (the unvested amount depends on the time of the call)
+        assert batch["wallets"][0]["summary_totals"][name] == single["summary_totals"][name]
+
+    rollup = batch["rollup"]
+    assert rollup["wallets"] == rollup["wallets_with_totals"] == len(wallets)
+    assert rollup["vesting_wallets"] == 1
+    assert rollup["total_hash_all_sources"] == sum(
+        summary["summary_totals"]["total_hash_all_sources"] for summary in batch["wallets"]
+    )
+
+
+def test_stream_yields_each_wallet_then_the_rollup(upstream_standin):
+    async def collect():
+        return [event async for event in stream_wallet_summaries(OTHER_WALLETS, 2, include_details=False)]
+
+    events = run(collect())
+    assert [event["type"] for event in events] == ["wallet"] * len(OTHER_WALLETS) + ["rollup"]
+    assert sorted(event["index"] for event in events[:-1]) == list(range(len(OTHER_WALLETS)))
+    assert set(events[0]["summary"]) == {"wallet_address", "summary_totals"}
+    assert events[-1]["rollup"]["wallets"] == len(OTHER_WALLETS)
+
+
+def test_failed_wallets_are_reported_without_failing_the_batch():
+    # No stand-in: every upstream call for the wallet fails
+    from upstream import override_upstream_urls
+    with override_upstream_urls({name: "http://127.0.0.1:9" for name in (
+        "explorer", "provenance_api", "figure_markets", "github_raw"
+    )}):
+        batch = run(fetch_wallet_summaries_batch([VESTING_WALLET]))
+    assert list(batch["errors"]) == [VESTING_WALLET]
+    assert batch["rollup"]["wallets_with_totals"] == 0
+    json.dumps(batch)